@@ -65,6 +65,14 @@ using (
     select 'SPREAD_BPS',
            '0',
            'Optional bid/ask spread (bps, applied half per side)'
+    union all
+    select 'AUDIT_LOG_DETAIL_RETENTION_DAYS',
+           '30',
+           'Days per-scope PIPELINE_STEP events stay in MIP_AUDIT_LOG before SP_AUDIT_LOG_RETENTION rolls them up'
+    union all
+    select 'AUDIT_LOG_RETENTION_DAYS',
+           '90',
+           'Days audit events stay in MIP_AUDIT_LOG before SP_AUDIT_LOG_RETENTION moves them to MIP_AUDIT_LOG_ARCHIVE'
 ) s
 on t.CONFIG_KEY = s.CONFIG_KEY
 when matched then update set
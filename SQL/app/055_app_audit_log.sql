@@ -2,6 +2,8 @@
 -- Purpose: Append-only audit log for MIP procedures and tasks.
 -- REPLAY_CONTEXT: when set for a run_id (day_run_id), SP_AUDIT_LOG_STEP and SP_LOG_EVENT
 -- write EVENT_TYPE='REPLAY' and add mode, replay_batch_id, effective_to_ts, day_run_id to DETAILS.
+-- PIPELINE_RUN: one row per SP_RUN_DAILY_PIPELINE run (started/completed/status), maintained by SP_LOG_EVENT
+-- so /runs and /live/metrics read a few rows instead of grouping raw audit events.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
@@ -30,6 +32,49 @@ create table if not exists MIP.APP.MIP_AUDIT_LOG (
     SESSION_ID        string        default current_session()
 );
 
+-- Timeline reads (GET /runs/{run_id}) filter one run's events, written within minutes of each other:
+-- cluster by day, then by root run id (PARENT_RUN_ID for step/child events, RUN_ID for the run itself).
+alter table MIP.APP.MIP_AUDIT_LOG cluster by (to_date(EVENT_TS), coalesce(PARENT_RUN_ID, RUN_ID));
+
+create table if not exists MIP.APP.PIPELINE_RUN (
+    RUN_ID           string primary key,
+    EVENT_TYPE       string,          -- PIPELINE or REPLAY
+    STARTED_AT       timestamp_ntz,
+    COMPLETED_AT     timestamp_ntz,   -- null while RUNNING
+    STATUS           string,          -- RUNNING until the terminal SP_RUN_DAILY_PIPELINE event
+    ROWS_AFFECTED    number,
+    DURATION_SECONDS number(18,3),
+    DETAILS          variant,         -- details of the latest event (terminal event once completed)
+    ERROR_MESSAGE    string,
+    UPDATED_AT       timestamp_ntz default current_timestamp()
+);
+
+-- Backfill from existing audit history (idempotent; runs already summarized are left alone).
+merge into MIP.APP.PIPELINE_RUN t
+using (
+    select
+        RUN_ID,
+        max(EVENT_TYPE) as EVENT_TYPE,
+        min(EVENT_TS) as STARTED_AT,
+        max(iff(STATUS <> 'START', EVENT_TS, null)) as COMPLETED_AT,
+        coalesce(max_by(iff(STATUS <> 'START', STATUS, null), iff(STATUS <> 'START', EVENT_TS, null)), 'RUNNING') as STATUS,
+        max_by(ROWS_AFFECTED, EVENT_TS) as ROWS_AFFECTED,
+        max_by(DETAILS, EVENT_TS) as DETAILS,
+        max_by(ERROR_MESSAGE, EVENT_TS) as ERROR_MESSAGE
+    from MIP.APP.MIP_AUDIT_LOG
+    where EVENT_TYPE in ('PIPELINE', 'REPLAY')
+      and EVENT_NAME = 'SP_RUN_DAILY_PIPELINE'
+      and RUN_ID is not null
+    group by RUN_ID
+) s
+on t.RUN_ID = s.RUN_ID
+when not matched then insert (
+    RUN_ID, EVENT_TYPE, STARTED_AT, COMPLETED_AT, STATUS, ROWS_AFFECTED, DURATION_SECONDS, DETAILS, ERROR_MESSAGE
+) values (
+    s.RUN_ID, s.EVENT_TYPE, s.STARTED_AT, s.COMPLETED_AT, s.STATUS, s.ROWS_AFFECTED,
+    datediff(millisecond, s.STARTED_AT, s.COMPLETED_AT) / 1000.0, s.DETAILS, s.ERROR_MESSAGE
+);
+
 create or replace procedure MIP.APP.SP_LOG_EVENT(
     P_EVENT_TYPE string,
     P_EVENT_NAME string,
@@ -55,6 +100,7 @@ declare
     v_replay_batch_id string;
     v_effective_to_ts timestamp_ntz;
     v_replay_run_id string;
+    v_event_ts timestamp_ntz := current_timestamp();
 begin
     if (:P_EVENT_TYPE = 'PIPELINE') then
         v_run_id := coalesce(:P_RUN_ID, nullif(current_query_tag(), ''), uuid_string());
@@ -100,7 +146,7 @@ begin
         ERROR_MESSAGE
     )
     select
-        CURRENT_TIMESTAMP(),
+        :v_event_ts,
         :v_run_id,
         :v_parent_run_id,
         :v_event_type,
@@ -110,6 +156,44 @@ begin
         :v_details,
         :P_ERROR_MESSAGE;
 
+    -- Keep the PIPELINE_RUN summary in step with pipeline START / terminal events.
+    if (:P_EVENT_NAME = 'SP_RUN_DAILY_PIPELINE' and v_event_type in ('PIPELINE', 'REPLAY')) then
+        merge into MIP.APP.PIPELINE_RUN t
+        using (
+            select
+                :v_run_id as RUN_ID,
+                :v_event_type as EVENT_TYPE,
+                :v_event_ts as EVENT_TS,
+                :P_STATUS as STATUS,
+                :P_ROWS_AFFECTED as ROWS_AFFECTED,
+                :v_details as DETAILS,
+                :P_ERROR_MESSAGE as ERROR_MESSAGE
+        ) s
+        on t.RUN_ID = s.RUN_ID
+        when matched and s.STATUS = 'START' then update set
+            t.STARTED_AT = least(t.STARTED_AT, s.EVENT_TS),
+            t.UPDATED_AT = s.EVENT_TS
+        when matched then update set
+            t.COMPLETED_AT = s.EVENT_TS,
+            t.STATUS = s.STATUS,
+            t.ROWS_AFFECTED = s.ROWS_AFFECTED,
+            t.DURATION_SECONDS = datediff(millisecond, t.STARTED_AT, s.EVENT_TS) / 1000.0,
+            t.DETAILS = s.DETAILS,
+            t.ERROR_MESSAGE = s.ERROR_MESSAGE,
+            t.UPDATED_AT = s.EVENT_TS
+        when not matched then insert (
+            RUN_ID, EVENT_TYPE, STARTED_AT, COMPLETED_AT, STATUS, ROWS_AFFECTED, DURATION_SECONDS,
+            DETAILS, ERROR_MESSAGE, UPDATED_AT
+        ) values (
+            s.RUN_ID, s.EVENT_TYPE, s.EVENT_TS,
+            iff(s.STATUS = 'START', null, s.EVENT_TS),
+            iff(s.STATUS = 'START', 'RUNNING', s.STATUS),
+            s.ROWS_AFFECTED,
+            iff(s.STATUS = 'START', null, 0),
+            s.DETAILS, s.ERROR_MESSAGE, s.EVENT_TS
+        );
+    end if;
+
     return v_run_id;
 end;
 $$;
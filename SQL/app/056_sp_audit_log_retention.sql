@@ -0,0 +1,232 @@
+-- 056_sp_audit_log_retention.sql
+-- Purpose: Retention for MIP.APP.MIP_AUDIT_LOG.
+-- Detail events (PIPELINE_STEP / REPLAY rows with DETAILS:scope other than AGG, e.g. per MARKET_TYPE or
+-- PORTFOLIO) older than AUDIT_LOG_DETAIL_RETENTION_DAYS are rolled into MIP_AUDIT_LOG_ROLLUP (one row per
+-- root run / event / scope / status) and deleted. All remaining events older than AUDIT_LOG_RETENTION_DAYS
+-- are moved to MIP_AUDIT_LOG_ARCHIVE. PIPELINE_RUN is never pruned, so /runs keeps listing old runs;
+-- GET /runs/{run_id} reads the archive (and rollups) for runs older than the watermarks in
+-- AUDIT_LOG_RETENTION_STATE. Scheduled by TASK_AUDIT_LOG_RETENTION (151).
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create table if not exists MIP.APP.MIP_AUDIT_LOG_ARCHIVE (
+    EVENT_TS          timestamp_ntz,
+    RUN_ID            string,
+    PARENT_RUN_ID     string,
+    EVENT_TYPE        string,
+    EVENT_NAME        string,
+    STATUS            string,
+    ROWS_AFFECTED     number,
+    DETAILS           variant,
+    ERROR_MESSAGE     string,
+    INVOKED_BY_USER   string,
+    INVOKED_BY_ROLE   string,
+    INVOKED_WAREHOUSE string,
+    QUERY_ID          string,
+    SESSION_ID        string,
+    ARCHIVED_AT       timestamp_ntz default current_timestamp()
+)
+cluster by (to_date(EVENT_TS), coalesce(PARENT_RUN_ID, RUN_ID));
+
+create table if not exists MIP.APP.MIP_AUDIT_LOG_ROLLUP (
+    ROOT_RUN_ID        string        not null,   -- PARENT_RUN_ID of the rolled-up events (pipeline run)
+    EVENT_TYPE         string        not null,
+    EVENT_NAME         string        not null,
+    SCOPE              string        not null,
+    STATUS             string        not null,
+    EVENT_COUNT        number,
+    SCOPE_KEY_COUNT    number,                   -- distinct scope_key values (market types, portfolios, ...)
+    ROWS_AFFECTED_SUM  number,
+    ERROR_COUNT        number,
+    FIRST_EVENT_TS     timestamp_ntz,
+    LAST_EVENT_TS      timestamp_ntz,
+    SAMPLE_ERROR       string,
+    ROLLED_UP_AT       timestamp_ntz default current_timestamp(),
+    constraint PK_MIP_AUDIT_LOG_ROLLUP primary key (ROOT_RUN_ID, EVENT_TYPE, EVENT_NAME, SCOPE, STATUS)
+);
+
+create table if not exists MIP.APP.AUDIT_LOG_RETENTION_STATE (
+    RETENTION_RUN_ID   string primary key,
+    ROLLED_UP_BEFORE   timestamp_ntz,   -- detail events with EVENT_TS < this live only in MIP_AUDIT_LOG_ROLLUP
+    ARCHIVED_BEFORE    timestamp_ntz,   -- events with EVENT_TS < this live in MIP_AUDIT_LOG_ARCHIVE
+    ROLLED_UP_EVENTS   number,
+    ARCHIVED_EVENTS    number,
+    CREATED_AT         timestamp_ntz default current_timestamp()
+);
+
+create or replace procedure MIP.APP.SP_AUDIT_LOG_RETENTION(
+    P_DETAIL_RETENTION_DAYS number default null,   -- null = APP_CONFIG AUDIT_LOG_DETAIL_RETENTION_DAYS (30)
+    P_RETENTION_DAYS number default null,          -- null = APP_CONFIG AUDIT_LOG_RETENTION_DAYS (90)
+    P_DRY_RUN boolean default false
+)
+returns variant
+language sql
+execute as owner
+as
+$$
+declare
+    v_retention_run_id string := uuid_string();
+    v_detail_days number;
+    v_retention_days number;
+    v_detail_cutoff timestamp_ntz;
+    v_archive_cutoff timestamp_ntz;
+    v_detail_events number := 0;
+    v_archive_events number := 0;
+    v_result variant;
+begin
+    v_detail_days := :P_DETAIL_RETENTION_DAYS;
+    if (v_detail_days is null) then
+        select try_to_number(CONFIG_VALUE)
+          into :v_detail_days
+          from MIP.APP.APP_CONFIG
+         where CONFIG_KEY = 'AUDIT_LOG_DETAIL_RETENTION_DAYS'
+         limit 1;
+    end if;
+    v_detail_days := coalesce(v_detail_days, 30);
+
+    v_retention_days := :P_RETENTION_DAYS;
+    if (v_retention_days is null) then
+        select try_to_number(CONFIG_VALUE)
+          into :v_retention_days
+          from MIP.APP.APP_CONFIG
+         where CONFIG_KEY = 'AUDIT_LOG_RETENTION_DAYS'
+         limit 1;
+    end if;
+    -- Archive horizon never precedes the rollup horizon (rolled-up details would otherwise be archived raw).
+    v_retention_days := greatest(coalesce(v_retention_days, 90), v_detail_days);
+
+    v_detail_cutoff := dateadd(day, -1 * v_detail_days, current_timestamp()::timestamp_ntz);
+    v_archive_cutoff := dateadd(day, -1 * v_retention_days, current_timestamp()::timestamp_ntz);
+
+    select count(*)
+      into :v_detail_events
+      from MIP.APP.MIP_AUDIT_LOG
+     where EVENT_TS < :v_detail_cutoff
+       and EVENT_TYPE in ('PIPELINE_STEP', 'REPLAY')
+       and PARENT_RUN_ID is not null
+       and coalesce(DETAILS:"scope"::string, 'AGG') <> 'AGG';
+
+    select count(*)
+      into :v_archive_events
+      from MIP.APP.MIP_AUDIT_LOG
+     where EVENT_TS < :v_archive_cutoff
+       and not (
+           EVENT_TYPE in ('PIPELINE_STEP', 'REPLAY')
+           and PARENT_RUN_ID is not null
+           and coalesce(DETAILS:"scope"::string, 'AGG') <> 'AGG'
+       );
+
+    v_result := object_construct(
+        'retention_run_id', :v_retention_run_id,
+        'dry_run', :P_DRY_RUN,
+        'detail_retention_days', :v_detail_days,
+        'retention_days', :v_retention_days,
+        'rolled_up_before', :v_detail_cutoff,
+        'archived_before', :v_archive_cutoff,
+        'detail_events', :v_detail_events,
+        'archived_events', :v_archive_events
+    );
+    if (P_DRY_RUN) then
+        return v_result;
+    end if;
+
+    begin transaction;
+
+    -- Additive merge: a run straddling the cutoff is rolled up across two retention runs.
+    merge into MIP.APP.MIP_AUDIT_LOG_ROLLUP t
+    using (
+        select
+            PARENT_RUN_ID as ROOT_RUN_ID,
+            EVENT_TYPE,
+            EVENT_NAME,
+            DETAILS:"scope"::string as SCOPE,
+            STATUS,
+            count(*) as EVENT_COUNT,
+            count(distinct DETAILS:"scope_key"::string) as SCOPE_KEY_COUNT,
+            sum(ROWS_AFFECTED) as ROWS_AFFECTED_SUM,
+            count_if(ERROR_MESSAGE is not null) as ERROR_COUNT,
+            min(EVENT_TS) as FIRST_EVENT_TS,
+            max(EVENT_TS) as LAST_EVENT_TS,
+            max(ERROR_MESSAGE) as SAMPLE_ERROR
+        from MIP.APP.MIP_AUDIT_LOG
+        where EVENT_TS < :v_detail_cutoff
+          and EVENT_TYPE in ('PIPELINE_STEP', 'REPLAY')
+          and PARENT_RUN_ID is not null
+          and coalesce(DETAILS:"scope"::string, 'AGG') <> 'AGG'
+        group by PARENT_RUN_ID, EVENT_TYPE, EVENT_NAME, DETAILS:"scope"::string, STATUS
+    ) s
+    on t.ROOT_RUN_ID = s.ROOT_RUN_ID
+   and t.EVENT_TYPE = s.EVENT_TYPE
+   and t.EVENT_NAME = s.EVENT_NAME
+   and t.SCOPE = s.SCOPE
+   and t.STATUS = s.STATUS
+    when matched then update set
+        t.EVENT_COUNT = t.EVENT_COUNT + s.EVENT_COUNT,
+        t.SCOPE_KEY_COUNT = greatest(t.SCOPE_KEY_COUNT, s.SCOPE_KEY_COUNT),
+        t.ROWS_AFFECTED_SUM = coalesce(t.ROWS_AFFECTED_SUM, 0) + coalesce(s.ROWS_AFFECTED_SUM, 0),
+        t.ERROR_COUNT = t.ERROR_COUNT + s.ERROR_COUNT,
+        t.FIRST_EVENT_TS = least(t.FIRST_EVENT_TS, s.FIRST_EVENT_TS),
+        t.LAST_EVENT_TS = greatest(t.LAST_EVENT_TS, s.LAST_EVENT_TS),
+        t.SAMPLE_ERROR = coalesce(t.SAMPLE_ERROR, s.SAMPLE_ERROR),
+        t.ROLLED_UP_AT = current_timestamp()
+    when not matched then insert (
+        ROOT_RUN_ID, EVENT_TYPE, EVENT_NAME, SCOPE, STATUS, EVENT_COUNT, SCOPE_KEY_COUNT,
+        ROWS_AFFECTED_SUM, ERROR_COUNT, FIRST_EVENT_TS, LAST_EVENT_TS, SAMPLE_ERROR
+    ) values (
+        s.ROOT_RUN_ID, s.EVENT_TYPE, s.EVENT_NAME, s.SCOPE, s.STATUS, s.EVENT_COUNT, s.SCOPE_KEY_COUNT,
+        s.ROWS_AFFECTED_SUM, s.ERROR_COUNT, s.FIRST_EVENT_TS, s.LAST_EVENT_TS, s.SAMPLE_ERROR
+    );
+
+    delete from MIP.APP.MIP_AUDIT_LOG
+     where EVENT_TS < :v_detail_cutoff
+       and EVENT_TYPE in ('PIPELINE_STEP', 'REPLAY')
+       and PARENT_RUN_ID is not null
+       and coalesce(DETAILS:"scope"::string, 'AGG') <> 'AGG';
+
+    insert into MIP.APP.MIP_AUDIT_LOG_ARCHIVE (
+        EVENT_TS, RUN_ID, PARENT_RUN_ID, EVENT_TYPE, EVENT_NAME, STATUS, ROWS_AFFECTED, DETAILS,
+        ERROR_MESSAGE, INVOKED_BY_USER, INVOKED_BY_ROLE, INVOKED_WAREHOUSE, QUERY_ID, SESSION_ID
+    )
+    select
+        EVENT_TS, RUN_ID, PARENT_RUN_ID, EVENT_TYPE, EVENT_NAME, STATUS, ROWS_AFFECTED, DETAILS,
+        ERROR_MESSAGE, INVOKED_BY_USER, INVOKED_BY_ROLE, INVOKED_WAREHOUSE, QUERY_ID, SESSION_ID
+      from MIP.APP.MIP_AUDIT_LOG
+     where EVENT_TS < :v_archive_cutoff;
+
+    delete from MIP.APP.MIP_AUDIT_LOG
+     where EVENT_TS < :v_archive_cutoff;
+
+    insert into MIP.APP.AUDIT_LOG_RETENTION_STATE (
+        RETENTION_RUN_ID, ROLLED_UP_BEFORE, ARCHIVED_BEFORE, ROLLED_UP_EVENTS, ARCHIVED_EVENTS
+    )
+    values (:v_retention_run_id, :v_detail_cutoff, :v_archive_cutoff, :v_detail_events, :v_archive_events);
+
+    commit;
+
+    call MIP.APP.SP_LOG_EVENT(
+        'AUDIT',
+        'SP_AUDIT_LOG_RETENTION',
+        'SUCCESS',
+        :v_detail_events + :v_archive_events,
+        :v_result,
+        null,
+        :v_retention_run_id
+    );
+
+    return v_result;
+exception
+    when other then
+        rollback;
+        call MIP.APP.SP_LOG_EVENT(
+            'AUDIT',
+            'SP_AUDIT_LOG_RETENTION',
+            'FAIL',
+            null,
+            :v_result,
+            :sqlerrm,
+            :v_retention_run_id
+        );
+        raise;
+end;
+$$;
@@ -1,10 +1,12 @@
 -- /sql/app/095_pattern_scorecard.sql
 -- Purpose: Aggregate recommendation outcomes into a pattern training scorecard
+-- V_PATTERN_SCORECARD reads the materialized KPI_PATTERN_SCORECARD (015), rebuilt every pipeline run from
+-- V_PATTERN_SCORECARD_LIVE by SP_PIPELINE_REFRESH_KPI_LAYER; the 90-day window is as of that refresh.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
 
-create or replace view MIP.APP.V_PATTERN_SCORECARD as
+create or replace view MIP.APP.V_PATTERN_SCORECARD_LIVE as
 select
     r.PATTERN_ID,
     r.MARKET_TYPE,
@@ -33,3 +35,7 @@ where o.REALIZED_RETURN is not null
   and o.HORIZON_BARS = 5
   and o.ENTRY_TS >= dateadd(day, -90, current_date())
 group by r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES;
+
+create or replace view MIP.APP.V_PATTERN_SCORECARD as
+select * exclude (RUN_ID, REFRESHED_AT)
+from MIP.MART.KPI_PATTERN_SCORECARD;
@@ -4,6 +4,38 @@
 use role MIP_ADMIN_ROLE;
 use database MIP;
 
+-- One-row counters for GET /live/metrics, maintained by SP_EVALUATE_RECOMMENDATIONS after each merge so the
+-- poll is a point lookup instead of count(*)/max(CALCULATED_AT) over RECOMMENDATION_OUTCOMES.
+-- Every outcome written by one evaluation shares its CALCULATED_AT, so outcomes calculated after a timestamp T
+-- are LAST_BATCH_ROWS when PREV_CALCULATED_AT <= T < LAST_CALCULATED_AT, and 0 when T >= LAST_CALCULATED_AT.
+create table if not exists MIP.APP.RECOMMENDATION_OUTCOME_STATS (
+    STATS_KEY          string        not null,   -- 'ALL'
+    TOTAL_OUTCOMES     number,
+    LAST_CALCULATED_AT timestamp_ntz,
+    LAST_BATCH_ROWS    number,
+    PREV_CALCULATED_AT timestamp_ntz,
+    UPDATED_AT         timestamp_ntz default current_timestamp(),
+    constraint PK_RECOMMENDATION_OUTCOME_STATS primary key (STATS_KEY)
+);
+
+merge into MIP.APP.RECOMMENDATION_OUTCOME_STATS t
+using (
+    select
+        'ALL' as STATS_KEY,
+        count(*) as TOTAL_OUTCOMES,
+        max(CALCULATED_AT) as LAST_CALCULATED_AT,
+        count_if(CALCULATED_AT = (select max(CALCULATED_AT) from MIP.APP.RECOMMENDATION_OUTCOMES)) as LAST_BATCH_ROWS,
+        max(case when CALCULATED_AT < (select max(CALCULATED_AT) from MIP.APP.RECOMMENDATION_OUTCOMES)
+                 then CALCULATED_AT end) as PREV_CALCULATED_AT
+    from MIP.APP.RECOMMENDATION_OUTCOMES
+) s
+on t.STATS_KEY = s.STATS_KEY
+when not matched then insert (
+    STATS_KEY, TOTAL_OUTCOMES, LAST_CALCULATED_AT, LAST_BATCH_ROWS, PREV_CALCULATED_AT
+) values (
+    s.STATS_KEY, s.TOTAL_OUTCOMES, s.LAST_CALCULATED_AT, s.LAST_BATCH_ROWS, s.PREV_CALCULATED_AT
+);
+
 CREATE OR REPLACE PROCEDURE MIP.APP.SP_EVALUATE_RECOMMENDATIONS(
     P_FROM_DATE TIMESTAMP_NTZ,
     P_TO_DATE   TIMESTAMP_NTZ,
@@ -20,6 +52,7 @@ DECLARE
     v_merged  NUMBER := 0;
     v_horizon_counts VARIANT;
     v_run_id  STRING := COALESCE(NULLIF(CURRENT_QUERY_TAG(), ''), UUID_STRING());
+    v_calc_ts TIMESTAMP_NTZ := CURRENT_TIMESTAMP()::TIMESTAMP_NTZ;
 BEGIN
     CALL MIP.APP.SP_LOG_EVENT(
         'EVALUATION',
@@ -120,7 +153,7 @@ BEGIN
                 WHEN fb.EXIT_PRICE  IS NULL OR fb.EXIT_PRICE  = 0 THEN 'INSUFFICIENT_FUTURE_DATA'
                 ELSE 'SUCCESS'
             END AS EVAL_STATUS,
-            CURRENT_TIMESTAMP() AS CALCULATED_AT
+            :v_calc_ts AS CALCULATED_AT
         FROM future_bars fb
     ) s
       ON t.RECOMMENDATION_ID = s.RECOMMENDATION_ID
@@ -169,6 +202,27 @@ BEGIN
 
     v_merged := SQLROWCOUNT;
 
+    -- Live counters (RECOMMENDATION_OUTCOME_STATS); count(*) without a filter is answered from metadata.
+    IF (v_merged > 0) THEN
+        MERGE INTO MIP.APP.RECOMMENDATION_OUTCOME_STATS t
+        USING (
+            SELECT 'ALL' AS STATS_KEY, COUNT(*) AS TOTAL_OUTCOMES
+            FROM MIP.APP.RECOMMENDATION_OUTCOMES
+        ) s
+          ON t.STATS_KEY = s.STATS_KEY
+        WHEN MATCHED THEN UPDATE SET
+            t.TOTAL_OUTCOMES     = s.TOTAL_OUTCOMES,
+            t.PREV_CALCULATED_AT = t.LAST_CALCULATED_AT,
+            t.LAST_CALCULATED_AT = :v_calc_ts,
+            t.LAST_BATCH_ROWS    = :v_merged,
+            t.UPDATED_AT         = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED THEN INSERT (
+            STATS_KEY, TOTAL_OUTCOMES, LAST_CALCULATED_AT, LAST_BATCH_ROWS, PREV_CALCULATED_AT
+        ) VALUES (
+            s.STATS_KEY, s.TOTAL_OUTCOMES, :v_calc_ts, :v_merged, NULL
+        );
+    END IF;
+
     -- counts by horizon for this run's window
     SELECT OBJECT_AGG(HORIZON_BARS, CNT)
       INTO :v_horizon_counts
@@ -1,5 +1,7 @@
 -- 143_sp_pipeline_refresh_returns.sql
--- Purpose: Pipeline step to refresh MARKET_RETURNS view
+-- Purpose: Pipeline step to refresh/verify MARKET_RETURNS.
+-- MARKET_RETURNS is a static view (MART/010_mart_market_bars.sql); this step no longer issues DDL.
+-- Replay days read their point-in-time snapshot through the same view (see 149a).
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
@@ -42,93 +44,6 @@ begin
     end if;
 
     begin
-        create or replace view MIP.MART.MARKET_RETURNS as
-        with bars_scoped as (
-            select *
-              from MIP.MART.MARKET_BARS
-             where (
-                   (select EFFECTIVE_TO_TS from MIP.APP.RUN_SCOPE_OVERRIDE where RUN_ID = current_query_tag() limit 1) is null
-                   or TS <= (select EFFECTIVE_TO_TS from MIP.APP.RUN_SCOPE_OVERRIDE where RUN_ID = current_query_tag() limit 1)
-             )
-        ),
-        deduped as (
-            select
-                TS,
-                SYMBOL,
-                SOURCE,
-                MARKET_TYPE,
-                INTERVAL_MINUTES,
-                OPEN,
-                HIGH,
-                LOW,
-                CLOSE,
-                VOLUME,
-                INGESTED_AT
-            from (
-                select
-                    TS,
-                    SYMBOL,
-                    SOURCE,
-                    MARKET_TYPE,
-                    INTERVAL_MINUTES,
-                    OPEN,
-                    HIGH,
-                    LOW,
-                    CLOSE,
-                    VOLUME,
-                    INGESTED_AT,
-                    row_number() over (
-                        partition by MARKET_TYPE, SYMBOL, INTERVAL_MINUTES, TS
-                        order by INGESTED_AT desc, SOURCE desc
-                    ) as RN
-                from bars_scoped
-            )
-            where RN = 1
-        ),
-        ordered as (
-            select
-                TS,
-                SYMBOL,
-                SOURCE,
-                MARKET_TYPE,
-                INTERVAL_MINUTES,
-                OPEN,
-                HIGH,
-                LOW,
-                CLOSE,
-                VOLUME,
-                INGESTED_AT,
-                lag(CLOSE) over (
-                    partition by SYMBOL, MARKET_TYPE, INTERVAL_MINUTES
-                    order by TS
-                ) as PREV_CLOSE
-            from deduped
-        )
-        select
-            TS,
-            SYMBOL,
-            SOURCE,
-            MARKET_TYPE,
-            INTERVAL_MINUTES,
-            OPEN,
-            HIGH,
-            LOW,
-            CLOSE,
-            VOLUME,
-            INGESTED_AT,
-            PREV_CLOSE,
-            case
-                when PREV_CLOSE is not null and PREV_CLOSE <> 0
-                then (CLOSE - PREV_CLOSE) / PREV_CLOSE
-                else null
-            end as RETURN_SIMPLE,
-            case
-                when PREV_CLOSE is not null and PREV_CLOSE > 0 and CLOSE > 0
-                then ln(CLOSE / PREV_CLOSE)
-                else null
-            end as RETURN_LOG
-        from ordered;
-
         select max(TS)
           into :v_latest_returns_ts
           from MIP.MART.MARKET_RETURNS;
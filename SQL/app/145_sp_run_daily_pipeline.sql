@@ -64,6 +64,9 @@ declare
     v_trusted_candidates number := 0;
     v_trusted_patterns number := 0;
     v_gate_param_set string := null;
+    v_kpi_layer_result variant;
+    v_trust_classification_result variant;
+    v_today_insights_result variant;
     v_proposer_start timestamp_ntz;
     v_proposer_end timestamp_ntz;
     v_executor_start timestamp_ntz;
@@ -88,6 +91,7 @@ declare
     v_brief_rows_delta number := 0;
     v_brief_ids array := array_construct();
     v_agent_brief_result variant;
+    v_agent_proposals_result variant;
     v_agent_brief_id number;
     v_agent_brief_status string;
     v_agent_brief_start timestamp_ntz;
@@ -296,6 +300,21 @@ begin
             ),
             null
         );
+        call MIP.APP.SP_AUDIT_LOG_STEP(
+            :v_run_id,
+            'KPI_LAYER_REFRESH',
+            'SKIPPED_NO_NEW_BARS',
+            null,
+            object_construct(
+                'step_name', 'kpi_layer_refresh',
+                'scope', 'AGG',
+                'scope_key', null,
+                'started_at', :v_step_start,
+                'completed_at', :v_step_end,
+                'reason', 'NO_NEW_BARS'
+            ),
+            null
+        );
         call MIP.APP.SP_AUDIT_LOG_STEP(
             :v_run_id,
             'PORTFOLIO_SIMULATION',
@@ -326,6 +345,36 @@ begin
             ),
             null
         );
+        call MIP.APP.SP_AUDIT_LOG_STEP(
+            :v_run_id,
+            'TRUST_CLASSIFICATION',
+            'SKIPPED_NO_NEW_BARS',
+            null,
+            object_construct(
+                'step_name', 'trust_classification',
+                'scope', 'AGG',
+                'scope_key', null,
+                'started_at', :v_step_start,
+                'completed_at', :v_step_end,
+                'reason', 'NO_NEW_BARS'
+            ),
+            null
+        );
+        call MIP.APP.SP_AUDIT_LOG_STEP(
+            :v_run_id,
+            'TODAY_INSIGHTS',
+            'SKIPPED_NO_NEW_BARS',
+            null,
+            object_construct(
+                'step_name', 'today_insights',
+                'scope', 'AGG',
+                'scope_key', null,
+                'started_at', :v_step_start,
+                'completed_at', :v_step_end,
+                'reason', 'NO_NEW_BARS'
+            ),
+            null
+        );
         call MIP.APP.SP_AUDIT_LOG_STEP(
             :v_run_id,
             'MORNING_BRIEF',
@@ -402,7 +451,10 @@ begin
             'returns_refresh', :v_returns_result,
             'recommendations', object_construct('status', 'SKIPPED_NO_NEW_BARS', 'reason', 'NO_NEW_BARS'),
             'evaluation', object_construct('status', 'SKIPPED_NO_NEW_BARS', 'reason', 'NO_NEW_BARS'),
+            'kpi_layer', object_construct('status', 'SKIPPED_NO_NEW_BARS', 'reason', 'NO_NEW_BARS'),
             'portfolio_simulation', object_construct('status', 'SKIPPED_NO_NEW_BARS', 'reason', 'NO_NEW_BARS'),
+            'trust_classification', object_construct('status', 'SKIPPED_NO_NEW_BARS', 'reason', 'NO_NEW_BARS'),
+            'today_insights', object_construct('status', 'SKIPPED_NO_NEW_BARS', 'reason', 'NO_NEW_BARS'),
             'morning_brief', object_construct('status', 'SKIPPED_NO_NEW_BARS', 'reason', 'NO_NEW_BARS'),
             'agent_generate_morning_brief', object_construct('status', 'SKIPPED_NO_NEW_BARS', 'reason', 'NO_NEW_BARS')
         );
@@ -551,6 +603,18 @@ begin
         null
     );
 
+    -- Materialized trust/KPI layer: after evaluation so trust gating, portfolios and insights read this run's KPIs.
+    -- On failure the step has logged FAIL; the previous KPI tables stay readable, so the run continues on them.
+    begin
+        v_kpi_layer_result := (call MIP.APP.SP_PIPELINE_REFRESH_KPI_LAYER(
+            :v_run_id,
+            :v_run_id
+        ));
+    exception
+        when other then
+            v_kpi_layer_result := object_construct('status', 'FAIL', 'error', :sqlerrm);
+    end;
+
     create or replace temporary table MIP.APP.TMP_PIPELINE_PORTFOLIOS (PORTFOLIO_ID number);
     insert into MIP.APP.TMP_PIPELINE_PORTFOLIOS (PORTFOLIO_ID)
     select PORTFOLIO_ID
@@ -726,6 +790,31 @@ begin
         null
     );
 
+    -- Per-run trust snapshot: V_SIGNALS_ELIGIBLE_TODAY (insights, agents, proposal validation) reads it from here on.
+    -- On failure the step has logged FAIL; the run continues and the agent pass below is skipped.
+    begin
+        v_trust_classification_result := (call MIP.APP.SP_PIPELINE_CLASSIFY_SIGNALS(
+            :v_run_id,
+            :v_run_id
+        ));
+    exception
+        when other then
+            v_trust_classification_result := object_construct('status', 'FAIL', 'error', :sqlerrm);
+    end;
+
+    -- /today insights snapshot: after trust refresh so candidates reflect this run's eligibility.
+    -- A UI snapshot only: the step logs its own FAIL, /today keeps the previous snapshot and the run continues.
+    begin
+        v_today_insights_result := (call MIP.APP.SP_PIPELINE_REFRESH_TODAY_INSIGHTS(
+            :v_effective_to_ts,
+            :v_run_id,
+            :v_run_id
+        ));
+    exception
+        when other then
+            v_today_insights_result := object_construct('status', 'FAIL', 'error', :sqlerrm);
+    end;
+
     -- [A4] Agent step: pass pipeline RUN_ID into SP_AGENT_RUN_ALL; log step with run_id, as_of_ts, agent_results
     v_agent_brief_start := current_timestamp();
     if (v_run_id is not null) then
@@ -844,8 +933,24 @@ begin
           from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY
          where IS_ELIGIBLE
            and RUN_ID = :v_run_id;
+
+        -- One set-based propose/validate/execute pass for all pipeline portfolios, ahead of the brief loop.
+        -- Without this run's trust snapshot validation would reject every proposal, so the pass is skipped.
+        if (v_trust_classification_result:status::string = 'FAIL') then
+            v_agent_proposals_result := object_construct('status', 'SKIPPED', 'reason', 'TRUST_CLASSIFICATION_FAILED');
+        else
+            v_agent_proposals_result := (call MIP.APP.SP_AGENT_PROPOSE_AND_EXECUTE(
+                :v_run_id,
+                :v_run_id
+            ));
+        end if;
+    else
+        v_agent_proposals_result := object_construct('status', 'SKIPPED', 'reason', 'NO_RUN_ID');
     end if;
 
+    v_proposer_end := current_timestamp();
+    v_executor_end := :v_proposer_end;
+
     v_brief_results := array_construct();
     v_brief_count := 0;
     v_portfolios := (
@@ -888,8 +993,6 @@ begin
     end if;
 
     v_brief_end := current_timestamp();
-    v_proposer_end := :v_brief_end;
-    v_executor_end := :v_brief_end;
 
     select count(*)
       into :v_brief_rows_after
@@ -1046,7 +1149,11 @@ begin
         'returns_refresh', :v_returns_result,
         'recommendations', :v_recommendation_results,
         'evaluation', :v_eval_result,
+        'kpi_layer', :v_kpi_layer_result,
         'portfolio_simulation', :v_portfolio_result,
+        'trust_classification', :v_trust_classification_result,
+        'agent_proposals', :v_agent_proposals_result,
+        'today_insights', :v_today_insights_result,
         'agent_generate_morning_brief', object_construct(
             'status', iff(:v_agent_brief_status = 'SUCCESS', 'SUCCESS', :v_agent_brief_status),
             'brief_id', :v_agent_brief_id
@@ -0,0 +1,306 @@
+-- 146a_sp_pipeline_refresh_kpi_layer.sql
+-- Purpose: Pipeline step that refreshes the materialized trust/KPI layer (MIP.MART.KPI_*, 015) once per run,
+-- right after evaluation, so V_SIGNAL_OUTCOME_KPIS / V_TRUST_METRICS / V_TRUSTED_SIGNAL_POLICY /
+-- V_SCORE_CALIBRATION / REC_TRAINING_KPIS / V_PATTERN_SCORECARD are table reads instead of full-history aggregations.
+-- KPI_SIGNAL_OUTCOME and KPI_SCORE_CALIBRATION are incremental: evaluation stamps every outcome it writes or
+-- re-evaluates with CALCULATED_AT, so only groups with outcomes past the stored watermark are recomputed from the
+-- *_LIVE views. KPI_REC_TRAINING and KPI_PATTERN_SCORECARD have clock-relative windows and are rebuilt each run.
+-- Per-day quantile sketches (KPI_OUTCOME_SKETCH) are rebuilt for the touched (group, entry day) pairs first; medians
+-- and p10/p90 are then merged from them (V_OUTCOME_QUANTILES) rather than sorted from the outcomes.
+-- P_FULL_REFRESH (or an empty state row) recomputes everything, e.g. after outcomes were deleted or backfilled.
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create or replace procedure MIP.APP.SP_PIPELINE_REFRESH_KPI_LAYER(
+    P_RUN_ID string,
+    P_PARENT_RUN_ID string default null,
+    P_FULL_REFRESH boolean default false
+)
+returns variant
+language sql
+execute as caller
+as
+$$
+declare
+    v_run_id string := coalesce(:P_RUN_ID, nullif(current_query_tag(), ''), uuid_string());
+    v_step_start timestamp_ntz := current_timestamp();
+    v_step_end timestamp_ntz;
+    v_full_refresh boolean := coalesce(:P_FULL_REFRESH, false);
+    v_watermark timestamp_ntz;
+    v_new_watermark timestamp_ntz;
+    v_dirty_groups number := 0;
+    v_dirty_days number := 0;
+    v_sketch_rows number := 0;
+    v_signal_outcome_rows number := 0;
+    v_score_calibration_rows number := 0;
+    v_rec_training_rows number := 0;
+    v_pattern_scorecard_rows number := 0;
+begin
+    begin
+        select max(OUTCOMES_WATERMARK)
+          into :v_watermark
+          from MIP.MART.KPI_LAYER_REFRESH_STATE
+         where STATE_KEY = 'KPI_LAYER';
+        if (v_watermark is null) then
+            v_full_refresh := true;
+        end if;
+
+        -- Read before the dirty scan: outcomes landing in between are past the new watermark and picked up next run.
+        select max(CALCULATED_AT)
+          into :v_new_watermark
+          from MIP.APP.RECOMMENDATION_OUTCOMES;
+
+        create or replace temporary table MIP.MART.TMP_KPI_DIRTY_DAYS as
+        select distinct
+            r.PATTERN_ID,
+            r.MARKET_TYPE,
+            r.INTERVAL_MINUTES,
+            o.HORIZON_BARS,
+            o.ENTRY_TS::date as ENTRY_DATE
+        from MIP.APP.RECOMMENDATION_OUTCOMES o
+        join MIP.APP.RECOMMENDATION_LOG r
+          on r.RECOMMENDATION_ID = o.RECOMMENDATION_ID
+        where :v_full_refresh
+           or o.CALCULATED_AT > :v_watermark;
+
+        select count(*), count(distinct PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS)
+          into :v_dirty_days, :v_dirty_groups
+          from MIP.MART.TMP_KPI_DIRTY_DAYS;
+
+        begin transaction;
+
+        delete from MIP.MART.KPI_OUTCOME_SKETCH
+         where :v_full_refresh
+            or (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, ENTRY_DATE) in (
+                select PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, ENTRY_DATE
+                  from MIP.MART.TMP_KPI_DIRTY_DAYS
+            );
+
+        insert into MIP.MART.KPI_OUTCOME_SKETCH (
+            PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, ENTRY_DATE, N_SUCCESS,
+            RETURN_SKETCH, SCORE_SKETCH, RUN_ID, REFRESHED_AT
+        )
+        select
+            r.PATTERN_ID,
+            r.MARKET_TYPE,
+            r.INTERVAL_MINUTES,
+            o.HORIZON_BARS,
+            o.ENTRY_TS::date,
+            count(*),
+            approx_percentile_accumulate(o.REALIZED_RETURN),
+            approx_percentile_accumulate(r.SCORE),
+            :v_run_id,
+            :v_step_start
+        from MIP.APP.RECOMMENDATION_OUTCOMES o
+        join MIP.APP.RECOMMENDATION_LOG r
+          on r.RECOMMENDATION_ID = o.RECOMMENDATION_ID
+        where o.EVAL_STATUS = 'SUCCESS'
+          and o.REALIZED_RETURN is not null
+          and (
+              :v_full_refresh
+              or (r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES, o.HORIZON_BARS, o.ENTRY_TS::date) in (
+                  select PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, ENTRY_DATE
+                    from MIP.MART.TMP_KPI_DIRTY_DAYS
+              )
+          )
+        group by r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES, o.HORIZON_BARS, o.ENTRY_TS::date;
+        v_sketch_rows := SQLROWCOUNT;
+
+        delete from MIP.MART.KPI_SIGNAL_OUTCOME
+         where :v_full_refresh
+            or (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS) in (
+                select PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS
+                  from MIP.MART.TMP_KPI_DIRTY_DAYS
+            );
+
+        insert into MIP.MART.KPI_SIGNAL_OUTCOME (
+            PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, N_TOTAL, N_SUCCESS, N_PENDING, COVERAGE_RATE,
+            AVG_RETURN, MEDIAN_RETURN, P10_RETURN, P90_RETURN, STDDEV_RETURN, MIN_RETURN, MAX_RETURN, HIT_RATE,
+            AVG_WIN, AVG_LOSS, SCORE_RETURN_CORR, OLDEST_NOT_READY_ENTRY_TS, NEWEST_NOT_READY_ENTRY_TS,
+            LATEST_MATURED_ENTRY_TS, RUN_ID, REFRESHED_AT
+        )
+        select
+            v.PATTERN_ID, v.MARKET_TYPE, v.INTERVAL_MINUTES, v.HORIZON_BARS, v.N_TOTAL, v.N_SUCCESS, v.N_PENDING,
+            v.COVERAGE_RATE, v.AVG_RETURN, q.MEDIAN_RETURN, q.P10_RETURN, q.P90_RETURN, v.STDDEV_RETURN,
+            v.MIN_RETURN, v.MAX_RETURN, v.HIT_RATE, v.AVG_WIN, v.AVG_LOSS, v.SCORE_RETURN_CORR,
+            v.OLDEST_NOT_READY_ENTRY_TS, v.NEWEST_NOT_READY_ENTRY_TS, v.LATEST_MATURED_ENTRY_TS,
+            :v_run_id, :v_step_start
+        from MIP.MART.V_SIGNAL_OUTCOME_KPIS_LIVE v
+        left join MIP.MART.V_OUTCOME_QUANTILES q
+          on q.PATTERN_ID = v.PATTERN_ID
+         and q.MARKET_TYPE = v.MARKET_TYPE
+         and q.INTERVAL_MINUTES = v.INTERVAL_MINUTES
+         and q.HORIZON_BARS = v.HORIZON_BARS
+        where :v_full_refresh
+           or (v.PATTERN_ID, v.MARKET_TYPE, v.INTERVAL_MINUTES, v.HORIZON_BARS) in (
+               select PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS
+                 from MIP.MART.TMP_KPI_DIRTY_DAYS
+           );
+        v_signal_outcome_rows := SQLROWCOUNT;
+
+        delete from MIP.MART.KPI_SCORE_CALIBRATION
+         where :v_full_refresh
+            or (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS) in (
+                select PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS
+                  from MIP.MART.TMP_KPI_DIRTY_DAYS
+            );
+
+        insert into MIP.MART.KPI_SCORE_CALIBRATION (
+            PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, SCORE_DECILE, N, AVG_RETURN, MEDIAN_RETURN,
+            HIT_RATE, SCORE_MIN, SCORE_MAX, RUN_ID, REFRESHED_AT
+        )
+        select
+            PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, SCORE_DECILE, N, AVG_RETURN, MEDIAN_RETURN,
+            HIT_RATE, SCORE_MIN, SCORE_MAX, :v_run_id, :v_step_start
+        from MIP.MART.V_SCORE_CALIBRATION_LIVE
+        where :v_full_refresh
+           or (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS) in (
+               select PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS
+                 from MIP.MART.TMP_KPI_DIRTY_DAYS
+           );
+        v_score_calibration_rows := SQLROWCOUNT;
+
+        delete from MIP.MART.KPI_REC_TRAINING;
+
+        insert into MIP.MART.KPI_REC_TRAINING (
+            PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, N, HIT_RATE, AVG_RETURN, MEDIAN_RETURN,
+            AVG_WIN, AVG_LOSS, EXPECTANCY, RETURN_STDDEV, MAX_LOSS_STREAK,
+            N_30D, HIT_RATE_30D, AVG_RETURN_30D, MEDIAN_RETURN_30D, AVG_WIN_30D, AVG_LOSS_30D, EXPECTANCY_30D,
+            RETURN_STDDEV_30D,
+            N_90D, HIT_RATE_90D, AVG_RETURN_90D, MEDIAN_RETURN_90D, AVG_WIN_90D, AVG_LOSS_90D, EXPECTANCY_90D,
+            RETURN_STDDEV_90D,
+            RUN_ID, REFRESHED_AT
+        )
+        select
+            v.PATTERN_ID, v.MARKET_TYPE, v.INTERVAL_MINUTES, v.HORIZON_BARS, v.N, v.HIT_RATE, v.AVG_RETURN,
+            q.MEDIAN_RETURN, v.AVG_WIN, v.AVG_LOSS, v.EXPECTANCY, v.RETURN_STDDEV, v.MAX_LOSS_STREAK,
+            v.N_30D, v.HIT_RATE_30D, v.AVG_RETURN_30D, v.MEDIAN_RETURN_30D, v.AVG_WIN_30D, v.AVG_LOSS_30D,
+            v.EXPECTANCY_30D, v.RETURN_STDDEV_30D,
+            v.N_90D, v.HIT_RATE_90D, v.AVG_RETURN_90D, v.MEDIAN_RETURN_90D, v.AVG_WIN_90D, v.AVG_LOSS_90D,
+            v.EXPECTANCY_90D, v.RETURN_STDDEV_90D,
+            :v_run_id, :v_step_start
+        from MIP.MART.REC_TRAINING_KPIS_LIVE v
+        left join MIP.MART.V_OUTCOME_QUANTILES q
+          on q.PATTERN_ID = v.PATTERN_ID
+         and q.MARKET_TYPE = v.MARKET_TYPE
+         and q.INTERVAL_MINUTES = v.INTERVAL_MINUTES
+         and q.HORIZON_BARS = v.HORIZON_BARS;
+        v_rec_training_rows := SQLROWCOUNT;
+
+        delete from MIP.MART.KPI_PATTERN_SCORECARD;
+
+        insert into MIP.MART.KPI_PATTERN_SCORECARD (
+            PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, SAMPLE_COUNT, HIT_RATE, AVG_FORWARD_RETURN,
+            MEDIAN_FORWARD_RETURN, MIN_FORWARD_RETURN, MAX_FORWARD_RETURN, LAST_SIGNAL_DATE, PATTERN_STATUS,
+            RUN_ID, REFRESHED_AT
+        )
+        with h5_90d as (
+            -- V_PATTERN_SCORECARD_LIVE's window (H5, ENTRY_TS in the last 90 days) on whole entry days.
+            select
+                PATTERN_ID,
+                MARKET_TYPE,
+                INTERVAL_MINUTES,
+                approx_percentile_estimate(approx_percentile_combine(RETURN_SKETCH), 0.5) as MEDIAN_FORWARD_RETURN
+            from MIP.MART.KPI_OUTCOME_SKETCH
+            where HORIZON_BARS = 5
+              and ENTRY_DATE >= dateadd(day, -90, current_date())
+            group by PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES
+        )
+        select
+            v.PATTERN_ID, v.MARKET_TYPE, v.INTERVAL_MINUTES, v.SAMPLE_COUNT, v.HIT_RATE, v.AVG_FORWARD_RETURN,
+            q.MEDIAN_FORWARD_RETURN, v.MIN_FORWARD_RETURN, v.MAX_FORWARD_RETURN, v.LAST_SIGNAL_DATE,
+            v.PATTERN_STATUS, :v_run_id, :v_step_start
+        from MIP.APP.V_PATTERN_SCORECARD_LIVE v
+        left join h5_90d q
+          on q.PATTERN_ID = v.PATTERN_ID
+         and q.MARKET_TYPE = v.MARKET_TYPE
+         and q.INTERVAL_MINUTES = v.INTERVAL_MINUTES;
+        v_pattern_scorecard_rows := SQLROWCOUNT;
+
+        merge into MIP.MART.KPI_LAYER_REFRESH_STATE t
+        using (select 'KPI_LAYER' as STATE_KEY) s
+           on t.STATE_KEY = s.STATE_KEY
+        when matched then update set
+            t.RUN_ID = :v_run_id,
+            t.OUTCOMES_WATERMARK = coalesce(:v_new_watermark, t.OUTCOMES_WATERMARK),
+            t.DIRTY_GROUPS = :v_dirty_groups,
+            t.DIRTY_DAYS = :v_dirty_days,
+            t.FULL_REFRESH = :v_full_refresh,
+            t.REFRESHED_AT = :v_step_start
+        when not matched then insert (
+            STATE_KEY, RUN_ID, OUTCOMES_WATERMARK, DIRTY_GROUPS, DIRTY_DAYS, FULL_REFRESH, REFRESHED_AT
+        ) values (
+            s.STATE_KEY, :v_run_id, :v_new_watermark, :v_dirty_groups, :v_dirty_days, :v_full_refresh, :v_step_start
+        );
+
+        commit;
+
+        v_step_end := current_timestamp();
+
+        call MIP.APP.SP_AUDIT_LOG_STEP(
+            :P_PARENT_RUN_ID,
+            'KPI_LAYER_REFRESH',
+            'SUCCESS',
+            :v_signal_outcome_rows + :v_score_calibration_rows + :v_rec_training_rows + :v_pattern_scorecard_rows,
+            object_construct(
+                'step_name', 'kpi_layer_refresh',
+                'scope', 'AGG',
+                'scope_key', null,
+                'run_id', :v_run_id,
+                'started_at', :v_step_start,
+                'completed_at', :v_step_end,
+                'full_refresh', :v_full_refresh,
+                'watermark_before', :v_watermark,
+                'watermark_after', :v_new_watermark,
+                'dirty_groups', :v_dirty_groups,
+                'dirty_days', :v_dirty_days,
+                'sketch_rows', :v_sketch_rows,
+                'signal_outcome_rows', :v_signal_outcome_rows,
+                'score_calibration_rows', :v_score_calibration_rows,
+                'rec_training_rows', :v_rec_training_rows,
+                'pattern_scorecard_rows', :v_pattern_scorecard_rows
+            ),
+            null
+        );
+
+        return object_construct(
+            'status', 'SUCCESS',
+            'run_id', :v_run_id,
+            'full_refresh', :v_full_refresh,
+            'watermark_before', :v_watermark,
+            'watermark_after', :v_new_watermark,
+            'dirty_groups', :v_dirty_groups,
+            'dirty_days', :v_dirty_days,
+            'sketch_rows', :v_sketch_rows,
+            'signal_outcome_rows', :v_signal_outcome_rows,
+            'score_calibration_rows', :v_score_calibration_rows,
+            'rec_training_rows', :v_rec_training_rows,
+            'pattern_scorecard_rows', :v_pattern_scorecard_rows,
+            'started_at', :v_step_start,
+            'completed_at', :v_step_end
+        );
+    exception
+        when other then
+            rollback;
+            v_step_end := current_timestamp();
+            call MIP.APP.SP_AUDIT_LOG_STEP(
+                :P_PARENT_RUN_ID,
+                'KPI_LAYER_REFRESH',
+                'FAIL',
+                null,
+                object_construct(
+                    'step_name', 'kpi_layer_refresh',
+                    'scope', 'AGG',
+                    'scope_key', null,
+                    'run_id', :v_run_id,
+                    'started_at', :v_step_start,
+                    'completed_at', :v_step_end,
+                    'full_refresh', :v_full_refresh
+                ),
+                :sqlerrm
+            );
+            raise;
+    end;
+end;
+$$;
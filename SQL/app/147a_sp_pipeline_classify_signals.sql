@@ -0,0 +1,134 @@
+-- 147a_sp_pipeline_classify_signals.sql
+-- Purpose: Pipeline step that classifies today's signals once per run.
+-- Snapshots V_TRUSTED_SIGNAL_CLASSIFICATION (policy ranking + score fallback) for recommendations generated today
+-- into TRUSTED_SIGNAL_CLASSIFICATION, keyed by (RUN_ID, RECOMMENDATION_ID). Runs after the KPI layer and trusted
+-- signal refresh; V_SIGNALS_ELIGIBLE_TODAY reads the latest snapshot per recommendation, so today insights, agents,
+-- proposal validation and /signals share one trust decision instead of re-ranking policies on every read.
+-- Earlier runs' rows are kept as the record of the trust decision each run acted on.
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create table if not exists MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION (
+    RUN_ID              string        not null,
+    RECOMMENDATION_ID   number        not null,
+    SYMBOL              string        not null,
+    MARKET_TYPE         string        not null,
+    INTERVAL_MINUTES    number        not null,
+    TS                  timestamp_ntz not null,
+    PATTERN_ID          number        not null,
+    GENERATED_AT        timestamp_ntz,
+    TRUST_LABEL         string,
+    RECOMMENDED_ACTION  string,
+    GATING_REASON       variant,
+    CLASSIFIED_AT       timestamp_ntz default current_timestamp(),
+    constraint PK_TRUSTED_SIGNAL_CLASSIFICATION primary key (RUN_ID, RECOMMENDATION_ID)
+);
+
+create or replace procedure MIP.APP.SP_PIPELINE_CLASSIFY_SIGNALS(
+    P_RUN_ID string,
+    P_PARENT_RUN_ID string default null
+)
+returns variant
+language sql
+execute as caller
+as
+$$
+declare
+    v_run_id string := coalesce(:P_RUN_ID, nullif(current_query_tag(), ''), uuid_string());
+    v_step_start timestamp_ntz := current_timestamp();
+    v_step_end timestamp_ntz;
+    v_rows number := 0;
+    v_trusted number := 0;
+    v_eligible number := 0;
+begin
+    begin
+        begin transaction;
+
+        -- Re-running a pipeline run replaces its snapshot.
+        delete from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION
+         where RUN_ID = :v_run_id;
+
+        insert into MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION (
+            RUN_ID, RECOMMENDATION_ID, SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS, PATTERN_ID, GENERATED_AT,
+            TRUST_LABEL, RECOMMENDED_ACTION, GATING_REASON, CLASSIFIED_AT
+        )
+        select
+            :v_run_id,
+            c.RECOMMENDATION_ID,
+            c.SYMBOL,
+            c.MARKET_TYPE,
+            c.INTERVAL_MINUTES,
+            c.TS,
+            c.PATTERN_ID,
+            c.GENERATED_AT,
+            c.TRUST_LABEL,
+            c.RECOMMENDED_ACTION,
+            c.GATING_REASON,
+            :v_step_start
+          from MIP.APP.V_TRUSTED_SIGNAL_CLASSIFICATION c
+         where c.GENERATED_AT::date = current_date();
+
+        select
+            count(*),
+            count_if(TRUST_LABEL = 'TRUSTED'),
+            count_if(TRUST_LABEL = 'TRUSTED' and RECOMMENDED_ACTION = 'ENABLE')
+          into :v_rows, :v_trusted, :v_eligible
+          from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION
+         where RUN_ID = :v_run_id;
+
+        commit;
+
+        v_step_end := current_timestamp();
+
+        call MIP.APP.SP_AUDIT_LOG_STEP(
+            :P_PARENT_RUN_ID,
+            'TRUST_CLASSIFICATION',
+            'SUCCESS',
+            :v_rows,
+            object_construct(
+                'step_name', 'trust_classification',
+                'scope', 'AGG',
+                'scope_key', null,
+                'run_id', :v_run_id,
+                'started_at', :v_step_start,
+                'completed_at', :v_step_end,
+                'classified_count', :v_rows,
+                'trusted_count', :v_trusted,
+                'eligible_count', :v_eligible
+            ),
+            null
+        );
+
+        return object_construct(
+            'status', 'SUCCESS',
+            'run_id', :v_run_id,
+            'classified_count', :v_rows,
+            'trusted_count', :v_trusted,
+            'eligible_count', :v_eligible,
+            'started_at', :v_step_start,
+            'completed_at', :v_step_end
+        );
+    exception
+        when other then
+            rollback;
+            v_step_end := current_timestamp();
+            call MIP.APP.SP_AUDIT_LOG_STEP(
+                :P_PARENT_RUN_ID,
+                'TRUST_CLASSIFICATION',
+                'FAIL',
+                null,
+                object_construct(
+                    'step_name', 'trust_classification',
+                    'scope', 'AGG',
+                    'scope_key', null,
+                    'run_id', :v_run_id,
+                    'started_at', :v_step_start,
+                    'completed_at', :v_step_end
+                ),
+                :sqlerrm
+            );
+            raise;
+    end;
+end;
+$$;
@@ -1,6 +1,8 @@
 -- 148_sp_pipeline_write_morning_briefs.sql
 -- Purpose: Pipeline step to persist morning briefs for active portfolios.
 -- Passes as_of_ts and run_id from pipeline; brief write is deterministic + idempotent.
+-- Proposals are generated, validated and executed for all portfolios by SP_AGENT_PROPOSE_AND_EXECUTE (189a)
+-- before the per-portfolio brief loop, so each brief reads the run's final proposal statuses.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
@@ -8,7 +10,7 @@ use database MIP;
 create or replace procedure MIP.APP.SP_PIPELINE_WRITE_MORNING_BRIEF(
     P_PORTFOLIO_ID number,
     P_AS_OF_TS timestamp_ntz,
-    P_RUN_ID string,   -- pipeline run id (canonical); used for propose/validate and brief
+    P_RUN_ID string,   -- pipeline run id (canonical); used for brief
     P_PARENT_RUN_ID string default null
 )
 returns variant
@@ -22,8 +24,6 @@ declare
     v_step_end timestamp_ntz;
     v_rows_before number;
     v_rows_after number;
-    v_propose_result variant;
-    v_validate_result variant;
 begin
     v_step_start := current_timestamp();
 
@@ -35,23 +35,6 @@ begin
            and RUN_ID = :v_run_id
            and AS_OF_TS = :P_AS_OF_TS;
 
-        if (v_run_id is not null) then
-            v_propose_result := (call MIP.APP.SP_AGENT_PROPOSE_TRADES(
-                :P_PORTFOLIO_ID,
-                :v_run_id,
-                :P_PARENT_RUN_ID
-            ));
-
-            v_validate_result := (call MIP.APP.SP_VALIDATE_AND_EXECUTE_PROPOSALS(
-                :P_PORTFOLIO_ID,
-                :v_run_id,
-                :P_PARENT_RUN_ID
-            ));
-        else
-            v_propose_result := object_construct('status', 'SKIPPED', 'reason', 'NO_RUN_ID');
-            v_validate_result := object_construct('status', 'SKIPPED', 'reason', 'NO_RUN_ID');
-        end if;
-
         call MIP.APP.SP_WRITE_MORNING_BRIEF(:P_PORTFOLIO_ID, :P_AS_OF_TS, :v_run_id, 'MORNING_BRIEF');
 
         select count(*)
@@ -78,9 +61,7 @@ begin
                 'started_at', :v_step_start,
                 'completed_at', :v_step_end,
                 'rows_before', :v_rows_before,
-                'rows_after', :v_rows_after,
-                'proposal_result', :v_propose_result,
-                'validation_result', :v_validate_result
+                'rows_after', :v_rows_after
             ),
             null
         );
@@ -90,9 +71,7 @@ begin
             'as_of_ts', :P_AS_OF_TS,
             'run_id', :v_run_id,
             'rows_before', :v_rows_before,
-            'rows_after', :v_rows_after,
-            'proposal_result', :v_propose_result,
-            'validation_result', :v_validate_result
+            'rows_after', :v_rows_after
         );
     exception
         when other then
@@ -134,7 +113,13 @@ declare
     v_result variant;
     v_results array := array_construct();
     v_portfolio_count number := 0;
+    v_agent_result variant;
 begin
+    v_agent_result := (call MIP.APP.SP_AGENT_PROPOSE_AND_EXECUTE(
+        :v_run_id,
+        :P_PARENT_RUN_ID
+    ));
+
     v_portfolios := (
         select PORTFOLIO_ID
           from MIP.APP.PORTFOLIO
@@ -157,6 +142,7 @@ begin
     return object_construct(
         'status', 'SUCCESS',
         'portfolio_count', :v_portfolio_count,
+        'agent_result', :v_agent_result,
         'results', :v_results
     );
 end;
@@ -0,0 +1,265 @@
+-- 148a_sp_pipeline_refresh_today_insights.sql
+-- Purpose: Pipeline step that precomputes the ranked insights list served by GET /today.
+-- One snapshot per pipeline run (the table holds the latest run only): candidates are today's signals from
+-- V_SIGNALS_ELIGIBLE_TODAY (1440), enriched with training maturity (same scoring and reasons as
+-- apps/mip_ui_api/app/training_status.py) and per-horizon outcome performance, ranked by TODAY_SCORE.
+-- /today reads the top rows with a single ordered select instead of aggregating the full history per request.
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create table if not exists MIP.APP.TODAY_INSIGHTS (
+    RUN_ID               string        not null,
+    AS_OF_TS             timestamp_ntz,
+    INSIGHT_RANK         number        not null,
+    SYMBOL               string        not null,
+    MARKET_TYPE          string        not null,
+    PATTERN_ID           number        not null,
+    INTERVAL_MINUTES     number        not null,
+    RECS_TOTAL           number,
+    OUTCOMES_TOTAL       number,
+    HORIZONS_COVERED     number,
+    MATURITY_SCORE       float,
+    MATURITY_STAGE       string,
+    REASONS              variant,
+    MEAN_H5              float,
+    PCT_POSITIVE_H5      float,
+    TODAY_SCORE          float,
+    PERFORMANCE_SUMMARY  variant,
+    CREATED_AT           timestamp_ntz default current_timestamp(),
+    constraint PK_TODAY_INSIGHTS primary key (INSIGHT_RANK)
+);
+
+create or replace procedure MIP.APP.SP_PIPELINE_REFRESH_TODAY_INSIGHTS(
+    P_AS_OF_TS timestamp_ntz,
+    P_RUN_ID string,
+    P_PARENT_RUN_ID string default null
+)
+returns variant
+language sql
+execute as caller
+as
+$$
+declare
+    v_run_id string := coalesce(:P_RUN_ID, nullif(current_query_tag(), ''), uuid_string());
+    v_step_start timestamp_ntz := current_timestamp();
+    v_step_end timestamp_ntz;
+    v_candidates number := 0;
+    v_rows_after number := 0;
+    -- training_status.py: DEFAULT_MIN_SIGNALS, MAX_HORIZONS; /today keeps pairs with >= min_signals / 2 recs.
+    -- /today has always scored with the default, not the /training TRAINING_GATE_PARAMS row.
+    v_min_signals number := 40;
+    v_max_horizons number := 5;
+begin
+    begin
+        begin transaction;
+
+        delete from MIP.APP.TODAY_INSIGHTS;
+
+        insert into MIP.APP.TODAY_INSIGHTS (
+            RUN_ID, AS_OF_TS, INSIGHT_RANK, SYMBOL, MARKET_TYPE, PATTERN_ID, INTERVAL_MINUTES,
+            RECS_TOTAL, OUTCOMES_TOTAL, HORIZONS_COVERED, MATURITY_SCORE, MATURITY_STAGE, REASONS,
+            MEAN_H5, PCT_POSITIVE_H5, TODAY_SCORE, PERFORMANCE_SUMMARY, CREATED_AT
+        )
+        with candidates as (
+            select distinct SYMBOL, MARKET_TYPE, PATTERN_ID
+              from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY
+             where INTERVAL_MINUTES = 1440
+        ),
+        recs as (
+            select r.RECOMMENDATION_ID, r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID
+              from MIP.APP.RECOMMENDATION_LOG r
+              join candidates c
+                on c.SYMBOL = r.SYMBOL
+               and c.MARKET_TYPE = r.MARKET_TYPE
+               and c.PATTERN_ID = r.PATTERN_ID
+             where r.INTERVAL_MINUTES = 1440
+        ),
+        training as (
+            select
+                r.MARKET_TYPE,
+                r.SYMBOL,
+                r.PATTERN_ID,
+                count(distinct r.RECOMMENDATION_ID) as RECS_TOTAL,
+                count(o.RECOMMENDATION_ID) as OUTCOMES_TOTAL,
+                count(distinct o.HORIZON_BARS) as HORIZONS_COVERED
+              from recs r
+              left join MIP.APP.RECOMMENDATION_OUTCOMES o
+                on o.RECOMMENDATION_ID = r.RECOMMENDATION_ID
+             group by r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID
+        ),
+        perf as (
+            select
+                r.MARKET_TYPE,
+                r.SYMBOL,
+                r.PATTERN_ID,
+                o.HORIZON_BARS,
+                count(*) as N_OUTCOMES,
+                avg(o.REALIZED_RETURN) as MEAN_OUTCOME,
+                count_if(o.REALIZED_RETURN > 0) / nullif(count(*), 0) as PCT_POSITIVE
+              from recs r
+              join MIP.APP.RECOMMENDATION_OUTCOMES o
+                on o.RECOMMENDATION_ID = r.RECOMMENDATION_ID
+             where o.EVAL_STATUS = 'SUCCESS'
+               and o.REALIZED_RETURN is not null
+             group by r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID, o.HORIZON_BARS
+        ),
+        perf_agg as (
+            -- 5-bar horizon when present, otherwise the shortest evaluated horizon.
+            select
+                MARKET_TYPE,
+                SYMBOL,
+                PATTERN_ID,
+                max_by(MEAN_OUTCOME, iff(HORIZON_BARS = 5, -1, HORIZON_BARS)) as MEAN_H5,
+                max_by(PCT_POSITIVE, iff(HORIZON_BARS = 5, -1, HORIZON_BARS)) as PCT_POSITIVE_H5,
+                object_agg(
+                    to_varchar(HORIZON_BARS),
+                    object_construct(
+                        'mean_outcome', MEAN_OUTCOME,
+                        'pct_positive', PCT_POSITIVE,
+                        'n_outcomes', N_OUTCOMES
+                    )
+                ) as PERFORMANCE_SUMMARY
+              from perf
+             group by MARKET_TYPE, SYMBOL, PATTERN_ID
+        ),
+        scored as (
+            select
+                t.*,
+                least(1, iff(t.RECS_TOTAL > 0, t.OUTCOMES_TOTAL / (t.RECS_TOTAL * :v_max_horizons), 0)) as COVERAGE_RATIO,
+                least(100, greatest(0,
+                    30 * least(1, t.RECS_TOTAL / :v_min_signals)
+                    + 40 * COVERAGE_RATIO
+                    + 30 * t.HORIZONS_COVERED / :v_max_horizons
+                )) as TOTAL_SCORE,
+                case
+                    when TOTAL_SCORE < 25 then 'INSUFFICIENT'
+                    when TOTAL_SCORE < 50 then 'WARMING_UP'
+                    when TOTAL_SCORE < 75 then 'LEARNING'
+                    else 'CONFIDENT'
+                end as MATURITY_STAGE,
+                round(TOTAL_SCORE, 1) as MATURITY_SCORE,
+                coalesce(p.MEAN_H5, 0) as MEAN_H5,
+                coalesce(p.PCT_POSITIVE_H5, 0) as PCT_POSITIVE_H5,
+                coalesce(p.PERFORMANCE_SUMMARY, object_construct()) as PERFORMANCE_SUMMARY
+              from training t
+              left join perf_agg p
+                on p.MARKET_TYPE = t.MARKET_TYPE
+               and p.SYMBOL = t.SYMBOL
+               and p.PATTERN_ID = t.PATTERN_ID
+        ),
+        ranked as (
+            select
+                s.*,
+                round(0.5 * MATURITY_SCORE / 100 + 0.3 * greatest(0, MEAN_H5) * 10 + 0.2 * PCT_POSITIVE_H5, 3) as TODAY_SCORE
+              from scored s
+             where MATURITY_STAGE <> 'INSUFFICIENT'
+               and RECS_TOTAL >= greatest(1, floor(:v_min_signals / 2))
+        )
+        select
+            :v_run_id,
+            :P_AS_OF_TS,
+            row_number() over (order by TODAY_SCORE desc, MATURITY_SCORE desc, SYMBOL, PATTERN_ID),
+            SYMBOL,
+            MARKET_TYPE,
+            PATTERN_ID,
+            1440,
+            RECS_TOTAL,
+            OUTCOMES_TOTAL,
+            HORIZONS_COVERED,
+            MATURITY_SCORE,
+            MATURITY_STAGE,
+            array_construct(
+                iff(RECS_TOTAL < :v_min_signals,
+                    'Not enough recommendations yet; more data will improve the score.',
+                    'Enough recommendations to start judging quality.'),
+                case
+                    when COVERAGE_RATIO < 0.5 then 'Many recommendations are still waiting for outcome data.'
+                    when COVERAGE_RATIO < 1 then 'Most recommendations have been evaluated; some are still pending.'
+                    else 'All recommendations have outcome data for the horizons evaluated.'
+                end,
+                iff(HORIZONS_COVERED < :v_max_horizons,
+                    'Outcome data is available for ' || HORIZONS_COVERED || ' of ' || :v_max_horizons
+                        || ' time windows; more windows will strengthen the score.',
+                    'All time windows have outcome data.'),
+                case MATURITY_STAGE
+                    when 'WARMING_UP' then 'Overall: data is building; confidence is growing.'
+                    when 'LEARNING' then 'Overall: enough data to learn from; score is meaningful.'
+                    else 'Overall: strong data coverage and outcome completeness.'
+                end
+            ),
+            MEAN_H5,
+            PCT_POSITIVE_H5,
+            TODAY_SCORE,
+            PERFORMANCE_SUMMARY,
+            current_timestamp()
+          from ranked;
+
+        select count(*)
+          into :v_candidates
+          from (
+            select distinct SYMBOL, MARKET_TYPE, PATTERN_ID
+              from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY
+             where INTERVAL_MINUTES = 1440
+          );
+
+        select count(*)
+          into :v_rows_after
+          from MIP.APP.TODAY_INSIGHTS;
+
+        commit;
+
+        v_step_end := current_timestamp();
+
+        call MIP.APP.SP_AUDIT_LOG_STEP(
+            :P_PARENT_RUN_ID,
+            'TODAY_INSIGHTS',
+            'SUCCESS',
+            :v_rows_after,
+            object_construct(
+                'step_name', 'today_insights',
+                'scope', 'AGG',
+                'scope_key', null,
+                'as_of_ts', :P_AS_OF_TS,
+                'run_id', :v_run_id,
+                'started_at', :v_step_start,
+                'completed_at', :v_step_end,
+                'candidate_count', :v_candidates,
+                'insight_count', :v_rows_after
+            ),
+            null
+        );
+
+        return object_construct(
+            'status', 'SUCCESS',
+            'run_id', :v_run_id,
+            'as_of_ts', :P_AS_OF_TS,
+            'candidate_count', :v_candidates,
+            'insight_count', :v_rows_after,
+            'started_at', :v_step_start,
+            'completed_at', :v_step_end
+        );
+    exception
+        when other then
+            rollback;
+            v_step_end := current_timestamp();
+            call MIP.APP.SP_AUDIT_LOG_STEP(
+                :P_PARENT_RUN_ID,
+                'TODAY_INSIGHTS',
+                'FAIL',
+                null,
+                object_construct(
+                    'step_name', 'today_insights',
+                    'scope', 'AGG',
+                    'scope_key', null,
+                    'as_of_ts', :P_AS_OF_TS,
+                    'run_id', :v_run_id,
+                    'started_at', :v_step_start,
+                    'completed_at', :v_step_end
+                ),
+                :sqlerrm
+            );
+            raise;
+    end;
+end;
+$$;
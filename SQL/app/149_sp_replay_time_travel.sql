@@ -1,17 +1,45 @@
 -- 149_sp_replay_time_travel.sql
 -- Purpose: One-off historical replay (time travel) excluding ingestion.
 -- Loops day-by-day from P_FROM_DATE to P_TO_DATE, sets effective_to_ts per day,
--- runs returns refresh, recommendations, evaluation, and optionally portfolio + briefs.
+-- runs returns refresh, recommendations, evaluation, the KPI layer refresh, trust classification, and optionally
+-- portfolio + briefs.
 -- Does NOT call ingestion. Logs REPLAY events via SP_LOG_EVENT.
+--
+-- Checkpointing: every replay day writes a row to REPLAY_CHECKPOINT (RUNNING -> SUCCESS/FAIL)
+-- with per-stage timings. Pass P_REPLAY_BATCH_ID of a failed/interrupted batch to resume:
+-- days already at SUCCESS for that batch are skipped, the rest are replayed.
+-- Recommendation generation runs one async child job per market type (they write disjoint
+-- RECOMMENDATION_LOG slices) and is awaited before evaluation starts.
+--
+-- Snapshot: returns are materialized once for the whole range (SP_REPLAY_SNAPSHOT_INIT, 149a) and
+-- extended one day at a time (SP_REPLAY_SNAPSHOT_EXTEND); no DDL runs inside the day loop.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
 
+create table if not exists MIP.APP.REPLAY_CHECKPOINT (
+    REPLAY_BATCH_ID    string        not null,
+    REPLAY_DAY         date          not null,
+    DAY_RUN_ID         string,
+    STATUS             string        not null,   -- RUNNING | SUCCESS | FAIL
+    STARTED_AT         timestamp_ntz,
+    COMPLETED_AT       timestamp_ntz,
+    DURATION_MS        number,
+    STAGE_TIMINGS      variant,                  -- {returns_ms, recommendations_ms, evaluation_ms, kpi_layer_ms, classification_ms, portfolios_ms, agent_proposals_ms, briefs_ms}
+    ERROR_MESSAGE      string,
+    UPDATED_AT         timestamp_ntz default current_timestamp(),
+    constraint PK_REPLAY_CHECKPOINT primary key (REPLAY_BATCH_ID, REPLAY_DAY)
+);
+
+-- Drop the pre-checkpoint 4-arg signature so 4-arg calls bind to the version below (see 185d).
+drop procedure if exists MIP.APP.SP_REPLAY_TIME_TRAVEL(date, date, boolean, boolean);
+
 create or replace procedure MIP.APP.SP_REPLAY_TIME_TRAVEL(
     P_FROM_DATE        date,
     P_TO_DATE          date,
     P_RUN_PORTFOLIOS   boolean default false,
-    P_RUN_BRIEFS       boolean default false
+    P_RUN_BRIEFS       boolean default false,
+    P_REPLAY_BATCH_ID  string  default null   -- set to resume a previous batch from its checkpoints
 )
 returns variant
 language sql
@@ -32,9 +60,20 @@ declare
     v_portfolio_id     number;
     v_returns_result   variant;
     v_eval_result      variant;
+    v_kpi_layer_result variant;
+    v_classify_result  variant;
     v_summary          variant := object_construct();
     v_day_count        number := 0;
-    v_replay_run_id    string := uuid_string();
+    v_skipped_count    number := 0;
+    v_replay_run_id    string := coalesce(nullif(:P_REPLAY_BATCH_ID, ''), uuid_string());
+    v_is_resume        boolean := (nullif(:P_REPLAY_BATCH_ID, '') is not null);
+    v_day_done         number := 0;
+    v_day_start        timestamp_ntz;
+    v_stage_start      timestamp_ntz;
+    v_stage_timings    variant;
+    v_day_duration_ms  number;
+    v_day_timings      array := array_construct();
+    v_snapshot_result  variant;
 begin
     if (v_d > v_end) then
         return object_construct('status', 'SKIP', 'reason', 'from_date > to_date', 'day_count', 0);
@@ -53,16 +92,54 @@ begin
             'from_date', :P_FROM_DATE,
             'to_date', :P_TO_DATE,
             'run_portfolios', :P_RUN_PORTFOLIOS,
-            'run_briefs', :P_RUN_BRIEFS
+            'run_briefs', :P_RUN_BRIEFS,
+            'resume', :v_is_resume
         ),
         null,
         :v_replay_run_id,
         null
     );
 
+    -- Point-in-time returns for the whole range; rebuilt on resume (deterministic)
+    v_snapshot_result := (call MIP.APP.SP_REPLAY_SNAPSHOT_INIT(
+        :v_replay_run_id,
+        to_timestamp_ntz(:v_d),
+        dateadd(second, -1, dateadd(day, 1, to_timestamp_ntz(:v_end)))
+    ));
+
     while (v_d <= v_end) do
+        -- Resume: skip days this batch already completed
+        select count(*)
+          into :v_day_done
+          from MIP.APP.REPLAY_CHECKPOINT
+         where REPLAY_BATCH_ID = :v_replay_run_id
+           and REPLAY_DAY = :v_d
+           and STATUS = 'SUCCESS';
+        if (v_day_done > 0) then
+            v_skipped_count := v_skipped_count + 1;
+            v_d := dateadd(day, 1, v_d);
+            continue;
+        end if;
+
         v_run_id := uuid_string();
         v_effective_to_ts := dateadd(second, -1, dateadd(day, 1, to_timestamp_ntz(:v_d)));
+        v_day_start := current_timestamp();
+        v_stage_timings := object_construct();
+
+        merge into MIP.APP.REPLAY_CHECKPOINT t
+        using (select :v_replay_run_id as REPLAY_BATCH_ID, :v_d as REPLAY_DAY) s
+        on t.REPLAY_BATCH_ID = s.REPLAY_BATCH_ID and t.REPLAY_DAY = s.REPLAY_DAY
+        when matched then update set
+            t.DAY_RUN_ID = :v_run_id,
+            t.STATUS = 'RUNNING',
+            t.STARTED_AT = :v_day_start,
+            t.COMPLETED_AT = null,
+            t.DURATION_MS = null,
+            t.STAGE_TIMINGS = null,
+            t.ERROR_MESSAGE = null,
+            t.UPDATED_AT = current_timestamp()
+        when not matched then insert (REPLAY_BATCH_ID, REPLAY_DAY, DAY_RUN_ID, STATUS, STARTED_AT)
+            values (s.REPLAY_BATCH_ID, s.REPLAY_DAY, :v_run_id, 'RUNNING', :v_day_start);
 
         execute immediate 'alter session set query_tag = ''' || :v_run_id || '''';
 
@@ -89,7 +166,10 @@ begin
 
         call MIP.APP.SP_ENFORCE_RUN_SCOPING(:v_run_id, null, :v_effective_to_ts);
 
+        v_stage_start := current_timestamp();
+        call MIP.APP.SP_REPLAY_SNAPSHOT_EXTEND(:v_replay_run_id, :v_effective_to_ts);
         v_returns_result := (call MIP.APP.SP_PIPELINE_REFRESH_RETURNS(:v_run_id));
+        v_stage_timings := object_insert(:v_stage_timings, 'returns_ms', datediff(millisecond, :v_stage_start, current_timestamp()));
 
         create or replace temporary table MIP.APP.TMP_PIPELINE_MARKET_TYPES (MARKET_TYPE string);
         insert into MIP.APP.TMP_PIPELINE_MARKET_TYPES (MARKET_TYPE)
@@ -103,16 +183,33 @@ begin
            and b.TS <= :v_effective_to_ts
            and b.MARKET_TYPE not in (select MARKET_TYPE from MIP.APP.TMP_PIPELINE_MARKET_TYPES);
 
+        -- Market types are independent: fan out one child job each, then wait for all of them
+        v_stage_start := current_timestamp();
         v_market_types := (select MARKET_TYPE from MIP.APP.TMP_PIPELINE_MARKET_TYPES order by MARKET_TYPE);
         for rec in v_market_types do
             v_market_type := rec.MARKET_TYPE;
-            call MIP.APP.SP_PIPELINE_GENERATE_RECOMMENDATIONS(:v_market_type, :v_interval_minutes, :v_run_id);
+            async (call MIP.APP.SP_PIPELINE_GENERATE_RECOMMENDATIONS(:v_market_type, :v_interval_minutes, :v_run_id));
         end for;
+        await all;
+        v_stage_timings := object_insert(:v_stage_timings, 'recommendations_ms', datediff(millisecond, :v_stage_start, current_timestamp()));
 
         v_from_ts := dateadd(day, -90, :v_effective_to_ts);
+        v_stage_start := current_timestamp();
         v_eval_result := (call MIP.APP.SP_PIPELINE_EVALUATE_RECOMMENDATIONS(:v_from_ts, :v_effective_to_ts, :v_run_id));
+        v_stage_timings := object_insert(:v_stage_timings, 'evaluation_ms', datediff(millisecond, :v_stage_start, current_timestamp()));
+
+        -- Trust/KPI tables follow each replayed day's outcomes, as in SP_RUN_DAILY_PIPELINE (incremental, so cheap).
+        v_stage_start := current_timestamp();
+        v_kpi_layer_result := (call MIP.APP.SP_PIPELINE_REFRESH_KPI_LAYER(:v_run_id, :v_run_id));
+        v_stage_timings := object_insert(:v_stage_timings, 'kpi_layer_ms', datediff(millisecond, :v_stage_start, current_timestamp()));
+
+        -- Trust snapshot for this day's recommendations: V_SIGNALS_ELIGIBLE_TODAY (proposal validation) reads it.
+        v_stage_start := current_timestamp();
+        v_classify_result := (call MIP.APP.SP_PIPELINE_CLASSIFY_SIGNALS(:v_run_id, :v_run_id));
+        v_stage_timings := object_insert(:v_stage_timings, 'classification_ms', datediff(millisecond, :v_stage_start, current_timestamp()));
 
         if (:P_RUN_PORTFOLIOS) then
+            v_stage_start := current_timestamp();
             v_portfolios := (
                 select PORTFOLIO_ID
                   from MIP.APP.PORTFOLIO
@@ -129,9 +226,15 @@ begin
                     :v_run_id
                 );
             end for;
+            v_stage_timings := object_insert(:v_stage_timings, 'portfolios_ms', datediff(millisecond, :v_stage_start, current_timestamp()));
         end if;
 
         if (:P_RUN_BRIEFS) then
+            v_stage_start := current_timestamp();
+            call MIP.APP.SP_AGENT_PROPOSE_AND_EXECUTE(:v_run_id, :v_run_id);
+            v_stage_timings := object_insert(:v_stage_timings, 'agent_proposals_ms', datediff(millisecond, :v_stage_start, current_timestamp()));
+
+            v_stage_start := current_timestamp();
             v_portfolios := (
                 select PORTFOLIO_ID
                   from MIP.APP.PORTFOLIO
@@ -147,8 +250,11 @@ begin
                     :v_run_id
                 );
             end for;
+            v_stage_timings := object_insert(:v_stage_timings, 'briefs_ms', datediff(millisecond, :v_stage_start, current_timestamp()));
         end if;
 
+        v_day_duration_ms := datediff(millisecond, :v_day_start, current_timestamp());
+
         call MIP.APP.SP_LOG_EVENT(
             'REPLAY',
             'REPLAY_DAY',
@@ -161,7 +267,11 @@ begin
                 'day_run_id', :v_run_id,
                 'day', :v_d,
                 'returns_result', :v_returns_result,
-                'evaluation_result', :v_eval_result
+                'evaluation_result', :v_eval_result,
+                'kpi_layer_result', :v_kpi_layer_result,
+                'trust_classification_result', :v_classify_result,
+                'duration_ms', :v_day_duration_ms,
+                'stage_timings', :v_stage_timings
             ),
             null,
             :v_run_id,
@@ -171,18 +281,38 @@ begin
         delete from MIP.APP.REPLAY_CONTEXT where RUN_ID = :v_run_id;
         delete from MIP.APP.RUN_SCOPE_OVERRIDE where RUN_ID = :v_run_id;
 
+        update MIP.APP.REPLAY_CHECKPOINT
+           set STATUS = 'SUCCESS',
+               COMPLETED_AT = current_timestamp(),
+               DURATION_MS = :v_day_duration_ms,
+               STAGE_TIMINGS = :v_stage_timings,
+               UPDATED_AT = current_timestamp()
+         where REPLAY_BATCH_ID = :v_replay_run_id
+           and REPLAY_DAY = :v_d;
+
+        v_day_timings := array_append(
+            :v_day_timings,
+            object_construct('day', :v_d, 'duration_ms', :v_day_duration_ms, 'stage_timings', :v_stage_timings)
+        );
+
         v_day_count := v_day_count + 1;
         v_d := dateadd(day, 1, v_d);
     end while;
 
+    call MIP.APP.SP_REPLAY_SNAPSHOT_RELEASE(:v_replay_run_id);
+
     v_summary := object_construct(
         'status', 'SUCCESS',
         'from_date', :P_FROM_DATE,
         'to_date', :P_TO_DATE,
         'day_count', :v_day_count,
+        'skipped_day_count', :v_skipped_count,
+        'resume', :v_is_resume,
         'run_portfolios', :P_RUN_PORTFOLIOS,
         'run_briefs', :P_RUN_BRIEFS,
-        'replay_batch_id', :v_replay_run_id
+        'replay_batch_id', :v_replay_run_id,
+        'day_timings', :v_day_timings,
+        'snapshot', :v_snapshot_result
     );
     v_summary := object_insert(v_summary, 'mode', 'REPLAY');
     v_summary := object_insert(v_summary, 'effective_to_ts', null);
@@ -202,6 +332,17 @@ begin
     return :v_summary;
 exception
     when other then
+        -- Leave the checkpoint at FAIL so a resume call replays this day first
+        update MIP.APP.REPLAY_CHECKPOINT
+           set STATUS = 'FAIL',
+               COMPLETED_AT = current_timestamp(),
+               ERROR_MESSAGE = :sqlerrm,
+               UPDATED_AT = current_timestamp()
+         where REPLAY_BATCH_ID = :v_replay_run_id
+           and REPLAY_DAY = :v_d
+           and STATUS = 'RUNNING';
+        delete from MIP.APP.REPLAY_CONTEXT where RUN_ID = :v_run_id;
+        delete from MIP.APP.RUN_SCOPE_OVERRIDE where RUN_ID = :v_run_id;
         call MIP.APP.SP_LOG_EVENT(
             'REPLAY',
             'SP_REPLAY_TIME_TRAVEL',
@@ -214,7 +355,8 @@ exception
                 'day_run_id', null,
                 'from_date', :P_FROM_DATE,
                 'to_date', :P_TO_DATE,
-                'day_count', :v_day_count
+                'day_count', :v_day_count,
+                'failed_day', :v_d
             ),
             :sqlerrm,
             :v_replay_run_id,
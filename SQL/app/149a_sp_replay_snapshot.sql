@@ -0,0 +1,196 @@
+-- 149a_sp_replay_snapshot.sql
+-- Purpose: Point-in-time returns snapshot for SP_REPLAY_TIME_TRAVEL.
+-- SP_REPLAY_SNAPSHOT_INIT computes deduped bars + returns once for the whole replay range into
+-- MART.MARKET_RETURNS_REPLAY_STAGE and seeds MART.MARKET_RETURNS_SNAPSHOT with history before the
+-- first replay day. SP_REPLAY_SNAPSHOT_EXTEND then appends one day per replay step (DML only).
+-- MART.MARKET_RETURNS routes replay-day sessions (query tag in REPLAY_CONTEXT) to the snapshot.
+-- Returns only look backward (lag over earlier bars), so a row computed once over the full range
+-- equals the row the old per-day view would have produced with TS <= effective_to_ts.
+-- A failed replay keeps its snapshot rows; the resume call re-inits them, a successful run releases them.
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create table if not exists MIP.APP.REPLAY_SNAPSHOT_STATE (
+    REPLAY_BATCH_ID    string primary key,
+    BUILT_TO_TS        timestamp_ntz,   -- stage covers TS <= BUILT_TO_TS
+    SNAPSHOT_TO_TS     timestamp_ntz,   -- snapshot covers TS <= SNAPSHOT_TO_TS
+    STAGE_ROWS         number,
+    SNAPSHOT_ROWS      number,
+    CREATED_AT         timestamp_ntz default current_timestamp(),
+    UPDATED_AT         timestamp_ntz default current_timestamp()
+);
+
+create or replace procedure MIP.APP.SP_REPLAY_SNAPSHOT_INIT(
+    P_REPLAY_BATCH_ID string,
+    P_FROM_TS timestamp_ntz,   -- first replay day start; snapshot is seeded with TS < P_FROM_TS
+    P_TO_TS timestamp_ntz      -- last replay day end; stage is built for TS <= P_TO_TS
+)
+returns variant
+language sql
+execute as caller
+as
+$$
+declare
+    v_stage_rows number := 0;
+    v_snapshot_rows number := 0;
+    v_seed_to_ts timestamp_ntz := dateadd(second, -1, :P_FROM_TS);
+begin
+    delete from MIP.MART.MARKET_RETURNS_REPLAY_STAGE where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID;
+    delete from MIP.MART.MARKET_RETURNS_SNAPSHOT where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID;
+
+    insert into MIP.MART.MARKET_RETURNS_REPLAY_STAGE (
+        REPLAY_BATCH_ID, TS, SYMBOL, SOURCE, MARKET_TYPE, INTERVAL_MINUTES,
+        OPEN, HIGH, LOW, CLOSE, VOLUME, INGESTED_AT,
+        PREV_CLOSE, RETURN_SIMPLE, RETURN_LOG
+    )
+    with deduped as (
+        select *
+          from MIP.MART.MARKET_BARS
+         where TS <= :P_TO_TS
+        qualify row_number() over (
+            partition by MARKET_TYPE, SYMBOL, INTERVAL_MINUTES, TS
+            order by INGESTED_AT desc, SOURCE desc
+        ) = 1
+    ),
+    ordered as (
+        select
+            d.*,
+            lag(CLOSE) over (
+                partition by SYMBOL, MARKET_TYPE, INTERVAL_MINUTES
+                order by TS
+            ) as PREV_CLOSE
+        from deduped d
+    )
+    select
+        :P_REPLAY_BATCH_ID,
+        TS,
+        SYMBOL,
+        SOURCE,
+        MARKET_TYPE,
+        INTERVAL_MINUTES,
+        OPEN,
+        HIGH,
+        LOW,
+        CLOSE,
+        VOLUME,
+        INGESTED_AT,
+        PREV_CLOSE,
+        case
+            when PREV_CLOSE is not null and PREV_CLOSE <> 0
+            then (CLOSE - PREV_CLOSE) / PREV_CLOSE
+            else null
+        end,
+        case
+            when PREV_CLOSE is not null and PREV_CLOSE > 0 and CLOSE > 0
+            then ln(CLOSE / PREV_CLOSE)
+            else null
+        end
+    from ordered;
+    v_stage_rows := sqlrowcount;
+
+    insert into MIP.MART.MARKET_RETURNS_SNAPSHOT
+    select *
+      from MIP.MART.MARKET_RETURNS_REPLAY_STAGE
+     where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID
+       and TS <= :v_seed_to_ts;
+    v_snapshot_rows := sqlrowcount;
+
+    merge into MIP.APP.REPLAY_SNAPSHOT_STATE t
+    using (select :P_REPLAY_BATCH_ID as REPLAY_BATCH_ID) s
+    on t.REPLAY_BATCH_ID = s.REPLAY_BATCH_ID
+    when matched then update set
+        t.BUILT_TO_TS = :P_TO_TS,
+        t.SNAPSHOT_TO_TS = :v_seed_to_ts,
+        t.STAGE_ROWS = :v_stage_rows,
+        t.SNAPSHOT_ROWS = :v_snapshot_rows,
+        t.UPDATED_AT = current_timestamp()
+    when not matched then insert (REPLAY_BATCH_ID, BUILT_TO_TS, SNAPSHOT_TO_TS, STAGE_ROWS, SNAPSHOT_ROWS)
+        values (s.REPLAY_BATCH_ID, :P_TO_TS, :v_seed_to_ts, :v_stage_rows, :v_snapshot_rows);
+
+    return object_construct(
+        'status', 'SUCCESS',
+        'replay_batch_id', :P_REPLAY_BATCH_ID,
+        'built_to_ts', :P_TO_TS,
+        'snapshot_to_ts', :v_seed_to_ts,
+        'stage_rows', :v_stage_rows,
+        'snapshot_rows', :v_snapshot_rows
+    );
+end;
+$$;
+
+create or replace procedure MIP.APP.SP_REPLAY_SNAPSHOT_EXTEND(
+    P_REPLAY_BATCH_ID string,
+    P_EFFECTIVE_TO_TS timestamp_ntz
+)
+returns variant
+language sql
+execute as caller
+as
+$$
+declare
+    v_snapshot_to_ts timestamp_ntz;
+    v_built_to_ts timestamp_ntz;
+    v_rows_added number := 0;
+begin
+    select SNAPSHOT_TO_TS, BUILT_TO_TS
+      into :v_snapshot_to_ts, :v_built_to_ts
+      from MIP.APP.REPLAY_SNAPSHOT_STATE
+     where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID;
+
+    if (v_built_to_ts is null) then
+        return object_construct(
+            'status', 'ERROR',
+            'reason', 'SNAPSHOT_NOT_INITIALIZED',
+            'replay_batch_id', :P_REPLAY_BATCH_ID
+        );
+    end if;
+
+    -- Already covered (e.g. a resumed day): nothing to append
+    if (v_snapshot_to_ts is not null and v_snapshot_to_ts >= :P_EFFECTIVE_TO_TS) then
+        return object_construct(
+            'status', 'SUCCESS',
+            'replay_batch_id', :P_REPLAY_BATCH_ID,
+            'snapshot_to_ts', :v_snapshot_to_ts,
+            'rows_added', 0
+        );
+    end if;
+
+    insert into MIP.MART.MARKET_RETURNS_SNAPSHOT
+    select *
+      from MIP.MART.MARKET_RETURNS_REPLAY_STAGE
+     where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID
+       and TS > coalesce(:v_snapshot_to_ts, '1900-01-01'::timestamp_ntz)
+       and TS <= :P_EFFECTIVE_TO_TS;
+    v_rows_added := sqlrowcount;
+
+    update MIP.APP.REPLAY_SNAPSHOT_STATE
+       set SNAPSHOT_TO_TS = :P_EFFECTIVE_TO_TS,
+           SNAPSHOT_ROWS = coalesce(SNAPSHOT_ROWS, 0) + :v_rows_added,
+           UPDATED_AT = current_timestamp()
+     where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID;
+
+    return object_construct(
+        'status', 'SUCCESS',
+        'replay_batch_id', :P_REPLAY_BATCH_ID,
+        'snapshot_to_ts', :P_EFFECTIVE_TO_TS,
+        'rows_added', :v_rows_added
+    );
+end;
+$$;
+
+create or replace procedure MIP.APP.SP_REPLAY_SNAPSHOT_RELEASE(
+    P_REPLAY_BATCH_ID string
+)
+returns variant
+language sql
+execute as caller
+as
+$$
+begin
+    delete from MIP.MART.MARKET_RETURNS_SNAPSHOT where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID;
+    delete from MIP.MART.MARKET_RETURNS_REPLAY_STAGE where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID;
+    delete from MIP.APP.REPLAY_SNAPSHOT_STATE where REPLAY_BATCH_ID = :P_REPLAY_BATCH_ID;
+    return object_construct('status', 'SUCCESS', 'replay_batch_id', :P_REPLAY_BATCH_ID);
+end;
+$$;
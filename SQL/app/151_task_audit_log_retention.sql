@@ -0,0 +1,13 @@
+-- 151_task_audit_log_retention.sql
+-- Purpose: Schedule weekly audit log retention (roll up per-scope step events, archive old events)
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create or replace task MIP.APP.TASK_AUDIT_LOG_RETENTION
+    warehouse = MIP_WH_XS
+    schedule = 'USING CRON 0 5 * * SUN Europe/Berlin'
+as
+    call MIP.APP.SP_AUDIT_LOG_RETENTION();
+
+alter task MIP.APP.TASK_AUDIT_LOG_RETENTION resume;
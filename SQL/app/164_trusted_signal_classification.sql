@@ -1,5 +1,7 @@
 -- 164_trusted_signal_classification.sql
 -- Purpose: Canonical trust/gating classification for signals
+-- SP_PIPELINE_CLASSIFY_SIGNALS (147a) snapshots this view once per pipeline run into
+-- MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION; V_SIGNALS_ELIGIBLE_TODAY and its readers use the snapshot.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
@@ -7,6 +9,7 @@ use database MIP;
 create or replace view MIP.APP.V_TRUSTED_SIGNAL_CLASSIFICATION as
 with recs as (
     select
+        r.RECOMMENDATION_ID,
         r.SYMBOL,
         r.MARKET_TYPE,
         r.INTERVAL_MINUTES,
@@ -43,11 +46,13 @@ policy_ranked as (
     from policy_scored p
 )
 select
+    r.RECOMMENDATION_ID,
     r.SYMBOL,
     r.MARKET_TYPE,
     r.INTERVAL_MINUTES,
     r.TS,
     r.PATTERN_ID,
+    r.GENERATED_AT,
     coalesce(
         p.TRUST_LABEL,
         case
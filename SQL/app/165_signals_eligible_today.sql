@@ -1,5 +1,7 @@
 -- 165_signals_eligible_today.sql
 -- Purpose: Canonical control-plane view for eligible signals (today + history)
+-- Trust comes from the latest per-run snapshot in MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION (147a). Signals not yet
+-- classified by a pipeline run have no TRUST_LABEL and are not eligible.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
@@ -22,6 +24,15 @@ with recs as (
         ) as RUN_GENERATED_AT
     from MIP.APP.RECOMMENDATION_LOG r
 ),
+classified as (
+    select c.*
+      from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION c
+     where c.GENERATED_AT::date = current_date()
+    qualify row_number() over (
+        partition by c.RECOMMENDATION_ID
+        order by c.CLASSIFIED_AT desc, c.RUN_ID desc
+    ) = 1
+),
 daily_flags as (
     select
         count_if(LOG_RUN_ID is not null and GENERATED_AT::date = current_date()) > 0 as HAS_DAILY_RUN_ID
@@ -45,15 +56,12 @@ select
         true,
         false
     ) as IS_ELIGIBLE,
-    c.GATING_REASON
+    c.GATING_REASON,
+    c.RUN_ID as CLASSIFICATION_RUN_ID
 from recs r
 cross join daily_flags f
-left join MIP.APP.V_TRUSTED_SIGNAL_CLASSIFICATION c
-  on c.SYMBOL = r.SYMBOL
- and c.MARKET_TYPE = r.MARKET_TYPE
- and c.INTERVAL_MINUTES = r.INTERVAL_MINUTES
- and c.TS = r.TS
- and c.PATTERN_ID = r.PATTERN_ID
+left join classified c
+  on c.RECOMMENDATION_ID = r.RECOMMENDATION_ID
 where (
     (f.HAS_DAILY_RUN_ID and r.LOG_RUN_ID is not null and r.GENERATED_AT::date = current_date())
     or (not f.HAS_DAILY_RUN_ID and r.GENERATED_AT::date = current_date())
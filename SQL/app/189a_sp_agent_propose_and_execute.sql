@@ -0,0 +1,935 @@
+-- 189a_sp_agent_propose_and_execute.sql
+-- Purpose: Set-based agent pass for one pipeline run: propose, validate and execute for all portfolios at once.
+-- Shared inputs are read once per run instead of once per portfolio:
+--   TMP_AGENT_CANDIDATES      trusted candidates at the latest bar (V_TRUSTED_SIGNALS_LATEST_TS), deduped per symbol
+--   TMP_AGENT_OPEN_POSITIONS  open positions per portfolio/symbol (all bars and current bar)
+--   TMP_AGENT_PORTFOLIO_STATE one row per portfolio: profile limits, capacity, risk gate, equity, market quotas
+-- Selection ranks candidates per portfolio with window functions (held symbols last, then score), fills the
+-- STOCK/FX quotas and backfills to capacity; validation, exposure/position caps and paper execution then run as one
+-- statement each over every portfolio's proposals. Statement count is independent of the number of portfolios.
+-- SP_AGENT_PROPOSE_TRADES (188) and SP_VALIDATE_AND_EXECUTE_PROPOSALS (189) call this for a single portfolio.
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create or replace procedure MIP.APP.SP_AGENT_PROPOSE_AND_EXECUTE(
+    P_RUN_ID string,   -- pipeline run id for deterministic tie-back to recommendations
+    P_PARENT_RUN_ID string default null,
+    P_PORTFOLIO_ID number default null,   -- null = all ACTIVE portfolios
+    P_PROPOSE boolean default true,
+    P_VALIDATE boolean default true
+)
+returns variant
+language sql
+execute as caller
+as
+$$
+declare
+    v_run_id_string string := :P_RUN_ID;
+    v_started_at timestamp_ntz := current_timestamp();
+    v_target_weight float := 0.05;
+    v_current_bar_index number := 0;
+    v_candidate_count_raw number := 0;
+    v_candidate_count_trusted number := 0;
+    v_available_stock number := 0;
+    v_available_fx number := 0;
+    v_slippage_bps number(18,8);
+    v_fee_bps number(18,8);
+    v_min_fee number(18,8);
+    v_spread_bps number(18,8);
+    v_portfolio_count number := 0;
+    v_inserted_count number := 0;
+    v_executed_count number := 0;
+    v_classified_count number := 0;
+    v_totals variant;
+    v_results array;
+begin
+    select coalesce(max(BAR_INDEX), 0)
+      into :v_current_bar_index
+      from (
+        select BAR_INDEX
+          from MIP.MART.V_BAR_INDEX
+        qualify row_number() over (partition by TS order by BAR_INDEX) = 1
+         order by TS desc
+         limit 1
+      );
+
+    select
+        coalesce(try_to_number(max(case when CONFIG_KEY = 'SLIPPAGE_BPS' then CONFIG_VALUE end)), 2),
+        coalesce(try_to_number(max(case when CONFIG_KEY = 'FEE_BPS' then CONFIG_VALUE end)), 1),
+        coalesce(try_to_number(max(case when CONFIG_KEY = 'MIN_FEE' then CONFIG_VALUE end)), 0),
+        coalesce(try_to_number(max(case when CONFIG_KEY = 'SPREAD_BPS' then CONFIG_VALUE end)), 0)
+      into v_slippage_bps,
+           v_fee_bps,
+           v_min_fee,
+           v_spread_bps
+      from MIP.APP.APP_CONFIG;
+
+    -- Trusted view has one row per (recommendation, trusted horizon); DEDUP_RN = 1 is the best row per symbol.
+    create or replace temporary table MIP.APP.TMP_AGENT_CANDIDATES as
+    select
+        s.*,
+        iff(s.MARKET_TYPE = 'FX', 'FX', 'STOCK') as MARKET_TYPE_GROUP,
+        row_number() over (
+            partition by s.SYMBOL
+            order by s.SCORE desc, s.RECOMMENDATION_ID
+        ) as DEDUP_RN
+      from MIP.MART.V_TRUSTED_SIGNALS_LATEST_TS s
+     where s.RUN_ID = :v_run_id_string;
+
+    select count(*)
+      into :v_candidate_count_raw
+      from MIP.MART.V_SIGNALS_LATEST_TS
+     where RUN_ID = :v_run_id_string;
+
+    select
+        count(*),
+        count_if(DEDUP_RN = 1 and MARKET_TYPE_GROUP = 'STOCK'),
+        count_if(DEDUP_RN = 1 and MARKET_TYPE_GROUP = 'FX')
+      into :v_candidate_count_trusted,
+           :v_available_stock,
+           :v_available_fx
+      from MIP.APP.TMP_AGENT_CANDIDATES;
+
+    create or replace temporary table MIP.APP.TMP_AGENT_OPEN_POSITIONS as
+    select
+        op.PORTFOLIO_ID,
+        op.SYMBOL,
+        op.MARKET_TYPE,
+        count(*) as OPEN_POSITIONS,
+        count_if(op.CURRENT_BAR_INDEX = :v_current_bar_index) as OPEN_POSITIONS_CURRENT
+      from MIP.MART.V_PORTFOLIO_OPEN_POSITIONS_CANONICAL op
+      join MIP.APP.PORTFOLIO p
+        on p.PORTFOLIO_ID = op.PORTFOLIO_ID
+     where (:P_PORTFOLIO_ID is null and p.STATUS = 'ACTIVE')
+        or p.PORTFOLIO_ID = :P_PORTFOLIO_ID
+     group by op.PORTFOLIO_ID, op.SYMBOL, op.MARKET_TYPE;
+
+    create or replace temporary table MIP.APP.TMP_AGENT_PORTFOLIO_STATE as
+    with portfolios as (
+        select
+            p.PORTFOLIO_ID,
+            p.PROFILE_ID,
+            p.STARTING_CASH,
+            coalesce(prof.MAX_POSITIONS, 5) as MAX_POSITIONS,
+            prof.MAX_POSITION_PCT
+          from MIP.APP.PORTFOLIO p
+          left join MIP.APP.PORTFOLIO_PROFILE prof
+            on prof.PROFILE_ID = p.PROFILE_ID
+         where (:P_PORTFOLIO_ID is null and p.STATUS = 'ACTIVE')
+            or p.PORTFOLIO_ID = :P_PORTFOLIO_ID
+    ),
+    open_counts as (
+        select
+            PORTFOLIO_ID,
+            sum(OPEN_POSITIONS) as OPEN_POSITIONS_ALL,
+            sum(OPEN_POSITIONS_CURRENT) as OPEN_POSITIONS
+          from MIP.APP.TMP_AGENT_OPEN_POSITIONS
+         group by PORTFOLIO_ID
+    ),
+    held_candidates as (
+        select
+            op.PORTFOLIO_ID,
+            count(distinct c.SYMBOL) as HELD_CANDIDATES
+          from MIP.APP.TMP_AGENT_OPEN_POSITIONS op
+          join MIP.APP.TMP_AGENT_CANDIDATES c
+            on c.SYMBOL = op.SYMBOL
+           and c.DEDUP_RN = 1
+         where op.OPEN_POSITIONS_CURRENT > 0
+         group by op.PORTFOLIO_ID
+    ),
+    risk as (
+        select
+            PORTFOLIO_ID,
+            coalesce(max(ENTRIES_BLOCKED), false) as ENTRIES_BLOCKED,
+            max(STOP_REASON) as STOP_REASON,
+            max(ALLOWED_ACTIONS) as ALLOWED_ACTIONS
+          from MIP.MART.V_PORTFOLIO_RISK_STATE
+         where PORTFOLIO_ID in (select PORTFOLIO_ID from portfolios)
+         group by PORTFOLIO_ID
+    ),
+    equity as (
+        select PORTFOLIO_ID, TOTAL_EQUITY
+          from MIP.APP.PORTFOLIO_DAILY
+         where PORTFOLIO_ID in (select PORTFOLIO_ID from portfolios)
+        qualify row_number() over (partition by PORTFOLIO_ID order by TS desc) = 1
+    ),
+    capacity as (
+        select
+            p.*,
+            coalesce(o.OPEN_POSITIONS, 0) as OPEN_POSITIONS,
+            coalesce(o.OPEN_POSITIONS_ALL, 0) as OPEN_POSITIONS_ALL,
+            greatest(p.MAX_POSITIONS - coalesce(o.OPEN_POSITIONS, 0), 0) as REMAINING_CAPACITY,
+            coalesce(h.HELD_CANDIDATES, 0) as HELD_CANDIDATES,
+            coalesce(r.ENTRIES_BLOCKED, false) as ENTRIES_BLOCKED,
+            r.STOP_REASON,
+            r.ALLOWED_ACTIONS,
+            coalesce(e.TOTAL_EQUITY, p.STARTING_CASH)::number(18,2) as TOTAL_EQUITY
+          from portfolios p
+          left join open_counts o on o.PORTFOLIO_ID = p.PORTFOLIO_ID
+          left join held_candidates h on h.PORTFOLIO_ID = p.PORTFOLIO_ID
+          left join risk r on r.PORTFOLIO_ID = p.PORTFOLIO_ID
+          left join equity e on e.PORTFOLIO_ID = p.PORTFOLIO_ID
+    ),
+    quotas as (
+        select
+            c.*,
+            ceil(c.REMAINING_CAPACITY * 0.6) as DEFAULT_STOCK_QUOTA
+          from capacity c
+    )
+    select
+        q.PORTFOLIO_ID,
+        q.PROFILE_ID,
+        q.MAX_POSITIONS,
+        -- Proposals record the profile limit with the proposer's 5% default; validation enforces it with 100%.
+        coalesce(q.MAX_POSITION_PCT, 0.05) as PROPOSAL_MAX_POSITION_PCT,
+        coalesce(q.MAX_POSITION_PCT, 1.0) as MAX_POSITION_PCT,
+        q.OPEN_POSITIONS,
+        q.OPEN_POSITIONS_ALL,
+        q.REMAINING_CAPACITY,
+        q.ENTRIES_BLOCKED,
+        q.STOP_REASON,
+        q.ALLOWED_ACTIONS,
+        q.TOTAL_EQUITY,
+        case
+            when :v_available_stock = 0 and :v_available_fx > 0 then 0
+            when :v_available_fx = 0 and :v_available_stock > 0 then q.REMAINING_CAPACITY
+            else q.DEFAULT_STOCK_QUOTA
+        end as MAX_NEW_STOCK,
+        case
+            when :v_available_stock = 0 and :v_available_fx > 0 then q.REMAINING_CAPACITY
+            when :v_available_fx = 0 and :v_available_stock > 0 then 0
+            else q.REMAINING_CAPACITY - q.DEFAULT_STOCK_QUOTA
+        end as MAX_NEW_FX,
+        -- Held candidates are only counted as skipped when an unheld candidate exists.
+        iff(q.HELD_CANDIDATES < :v_available_stock + :v_available_fx, q.HELD_CANDIDATES, 0) as SKIPPED_HELD_COUNT,
+        case
+            when q.PROFILE_ID is null then 'ERROR'
+            when q.MAX_POSITIONS <= 0 then 'ERROR'
+            when q.ENTRIES_BLOCKED then 'SKIP_ENTRIES_BLOCKED'
+            when :v_candidate_count_trusted = 0 then 'NO_ELIGIBLE_SIGNALS'
+            when q.REMAINING_CAPACITY = 0 then 'NO_CAPACITY'
+            else 'SUCCESS'
+        end as PROPOSE_STATUS,
+        case
+            when q.PROFILE_ID is null then 'Portfolio not found'
+            when q.MAX_POSITIONS <= 0 then 'Invalid max positions configuration'
+        end as ERROR_MESSAGE,
+        0 as PROPOSAL_INSERTED,
+        0 as SELECTED_STOCK,
+        0 as SELECTED_FX,
+        0 as SELECTED_ETF,
+        0 as PROPOSAL_COUNT,
+        0 as APPROVED_COUNT,
+        0 as REJECTED_COUNT,
+        0 as EXECUTED_COUNT,
+        0 as BUY_PROPOSALS_BLOCKED,
+        0::float as TOTAL_EXPOSURE_PCT
+      from quotas q;
+
+    select count(*)
+      into :v_portfolio_count
+      from MIP.APP.TMP_AGENT_PORTFOLIO_STATE;
+
+    if (:P_PROPOSE) then
+        merge into MIP.AGENT_OUT.ORDER_PROPOSALS as target
+        using (
+            with prioritized as (
+                select
+                    st.PORTFOLIO_ID,
+                    st.MAX_POSITIONS,
+                    st.OPEN_POSITIONS,
+                    st.REMAINING_CAPACITY,
+                    st.PROPOSAL_MAX_POSITION_PCT,
+                    st.MAX_NEW_STOCK,
+                    st.MAX_NEW_FX,
+                    c.*,
+                    iff(coalesce(op.OPEN_POSITIONS_CURRENT, 0) > 0, 1, 0) as HELD_PRIORITY
+                  from MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+                  join MIP.APP.TMP_AGENT_CANDIDATES c
+                    on c.DEDUP_RN = 1
+                  left join (
+                      select PORTFOLIO_ID, SYMBOL, sum(OPEN_POSITIONS_CURRENT) as OPEN_POSITIONS_CURRENT
+                        from MIP.APP.TMP_AGENT_OPEN_POSITIONS
+                       group by PORTFOLIO_ID, SYMBOL
+                  ) op
+                    on op.PORTFOLIO_ID = st.PORTFOLIO_ID
+                   and op.SYMBOL = c.SYMBOL
+                 where st.PROPOSE_STATUS = 'SUCCESS'
+            ),
+            ranked as (
+                select
+                    p.*,
+                    row_number() over (
+                        partition by p.PORTFOLIO_ID
+                        order by p.HELD_PRIORITY asc, p.SCORE desc, p.RECOMMENDATION_ID
+                    ) as OVERALL_RANK,
+                    row_number() over (
+                        partition by p.PORTFOLIO_ID, p.MARKET_TYPE_GROUP
+                        order by p.HELD_PRIORITY asc, p.SCORE desc, p.RECOMMENDATION_ID
+                    ) as TYPE_RANK
+                  from prioritized p
+            ),
+            quota_flagged as (
+                select
+                    r.*,
+                    r.TYPE_RANK <= iff(r.MARKET_TYPE_GROUP = 'STOCK', r.MAX_NEW_STOCK, r.MAX_NEW_FX) as IN_QUOTA
+                  from ranked r
+            ),
+            primary_flagged as (
+                select
+                    q.*,
+                    q.IN_QUOTA and row_number() over (
+                        partition by q.PORTFOLIO_ID, q.IN_QUOTA
+                        order by q.OVERALL_RANK
+                    ) <= q.REMAINING_CAPACITY as IS_PRIMARY
+                  from quota_flagged q
+            ),
+            -- Backfill: candidates outside the quotas fill the slots the quotas left empty, in overall rank order.
+            backfill_ranked as (
+                select
+                    p.*,
+                    count_if(p.IS_PRIMARY) over (partition by p.PORTFOLIO_ID) as PRIMARY_COUNT,
+                    row_number() over (
+                        partition by p.PORTFOLIO_ID, p.IS_PRIMARY
+                        order by p.OVERALL_RANK
+                    ) as GROUP_RANK
+                  from primary_flagged p
+            ),
+            final_ranked as (
+                select
+                    b.*,
+                    row_number() over (
+                        partition by b.PORTFOLIO_ID
+                        order by b.OVERALL_RANK
+                    ) as SELECTION_RANK
+                  from backfill_ranked b
+                 where b.IS_PRIMARY
+                    or b.GROUP_RANK <= greatest(b.REMAINING_CAPACITY - b.PRIMARY_COUNT, 0)
+            )
+            select
+                :P_RUN_ID as RUN_ID_VARCHAR,
+                s.PORTFOLIO_ID,
+                s.SYMBOL,
+                s.MARKET_TYPE,
+                s.INTERVAL_MINUTES,
+                'BUY' as SIDE,
+                :v_target_weight as TARGET_WEIGHT,
+                s.RECOMMENDATION_ID,
+                s.SIGNAL_TS,
+                s.PATTERN_ID as SIGNAL_PATTERN_ID,
+                s.INTERVAL_MINUTES as SIGNAL_INTERVAL_MINUTES,
+                s.RUN_ID as SIGNAL_RUN_ID,
+                s.DETAILS as SIGNAL_SNAPSHOT,
+                object_construct(
+                    'recommendation_id', s.RECOMMENDATION_ID,
+                    'pattern_id', s.PATTERN_ID,
+                    'ts', s.SIGNAL_TS,
+                    'score', s.SCORE,
+                    'interval_minutes', s.INTERVAL_MINUTES,
+                    'run_id', s.RUN_ID,
+                    'trust_label', 'TRUSTED',
+                    'recommended_action', 'ENABLE',
+                    'held_priority', s.HELD_PRIORITY,
+                    'market_type_group', s.MARKET_TYPE_GROUP,
+                    'trust_reason', s.TRUST_REASON
+                ) as SOURCE_SIGNALS,
+                object_construct(
+                    'strategy', 'diversified_capacity_aware_top_n',
+                    'max_positions', s.MAX_POSITIONS,
+                    'open_positions', s.OPEN_POSITIONS,
+                    'remaining_capacity', s.REMAINING_CAPACITY,
+                    'max_position_pct', s.PROPOSAL_MAX_POSITION_PCT,
+                    'market_type_quota', object_construct(
+                        'STOCK', s.MAX_NEW_STOCK,
+                        'FX', s.MAX_NEW_FX
+                    ),
+                    'selection_rank', s.SELECTION_RANK
+                ) as RATIONALE
+              from final_ranked s
+             where s.SELECTION_RANK <= s.REMAINING_CAPACITY
+        ) as source
+        on target.PORTFOLIO_ID = source.PORTFOLIO_ID
+       and target.RUN_ID_VARCHAR = source.RUN_ID_VARCHAR
+       and target.RECOMMENDATION_ID = source.RECOMMENDATION_ID
+        when not matched then
+            insert (
+                RUN_ID_VARCHAR,
+                PORTFOLIO_ID,
+                SYMBOL,
+                MARKET_TYPE,
+                INTERVAL_MINUTES,
+                SIDE,
+                TARGET_WEIGHT,
+                RECOMMENDATION_ID,
+                SIGNAL_TS,
+                SIGNAL_PATTERN_ID,
+                SIGNAL_INTERVAL_MINUTES,
+                SIGNAL_RUN_ID,
+                SIGNAL_SNAPSHOT,
+                SOURCE_SIGNALS,
+                RATIONALE,
+                STATUS
+            )
+            values (
+                source.RUN_ID_VARCHAR,
+                source.PORTFOLIO_ID,
+                source.SYMBOL,
+                source.MARKET_TYPE,
+                source.INTERVAL_MINUTES,
+                source.SIDE,
+                source.TARGET_WEIGHT,
+                source.RECOMMENDATION_ID,
+                source.SIGNAL_TS,
+                source.SIGNAL_PATTERN_ID,
+                source.SIGNAL_INTERVAL_MINUTES,
+                source.SIGNAL_RUN_ID,
+                source.SIGNAL_SNAPSHOT,
+                source.SOURCE_SIGNALS,
+                source.RATIONALE,
+                'PROPOSED'
+            );
+
+        v_inserted_count := SQLROWCOUNT;
+
+        update MIP.APP.TMP_AGENT_PORTFOLIO_STATE as st
+           set PROPOSAL_INSERTED = n.INSERTED,
+               SELECTED_STOCK = n.SELECTED_STOCK,
+               SELECTED_FX = n.SELECTED_FX,
+               SELECTED_ETF = n.SELECTED_ETF
+          from (
+            select
+                PORTFOLIO_ID,
+                count_if(PROPOSED_AT >= :v_started_at) as INSERTED,
+                count_if(STATUS = 'PROPOSED' and MARKET_TYPE <> 'FX') as SELECTED_STOCK,
+                count_if(STATUS = 'PROPOSED' and MARKET_TYPE = 'FX') as SELECTED_FX,
+                count_if(STATUS = 'PROPOSED' and MARKET_TYPE = 'ETF') as SELECTED_ETF
+              from MIP.AGENT_OUT.ORDER_PROPOSALS
+             where RUN_ID_VARCHAR = :P_RUN_ID
+             group by PORTFOLIO_ID
+          ) n
+         where n.PORTFOLIO_ID = st.PORTFOLIO_ID
+           and st.PROPOSE_STATUS = 'SUCCESS';
+
+        insert into MIP.APP.MIP_AUDIT_LOG (
+            EVENT_TS,
+            RUN_ID,
+            PARENT_RUN_ID,
+            EVENT_TYPE,
+            EVENT_NAME,
+            STATUS,
+            ROWS_AFFECTED,
+            DETAILS
+        )
+        select
+            current_timestamp(),
+            :v_run_id_string,
+            :P_PARENT_RUN_ID,
+            'AGENT',
+            'SP_AGENT_PROPOSE_TRADES',
+            iff(st.PROPOSE_STATUS = 'SKIP_ENTRIES_BLOCKED', 'SKIP_ENTRIES_BLOCKED', 'INFO'),
+            st.PROPOSAL_INSERTED,
+            object_construct(
+                'portfolio_id', st.PORTFOLIO_ID,
+                'entries_blocked', st.ENTRIES_BLOCKED,
+                'stop_reason', st.STOP_REASON,
+                'allowed_actions', st.ALLOWED_ACTIONS,
+                'max_positions', st.MAX_POSITIONS,
+                'open_positions', st.OPEN_POSITIONS,
+                'remaining_capacity', st.REMAINING_CAPACITY,
+                'candidate_count', :v_candidate_count_trusted,
+                'proposed_count', iff(
+                    st.PROPOSE_STATUS = 'SUCCESS',
+                    least(st.REMAINING_CAPACITY, st.SELECTED_STOCK + st.SELECTED_FX),
+                    least(:v_candidate_count_trusted, st.REMAINING_CAPACITY)
+                ),
+                'candidate_count_raw', :v_candidate_count_raw,
+                'candidate_count_trusted', :v_candidate_count_trusted,
+                'trusted_rejected_count', greatest(:v_candidate_count_raw - :v_candidate_count_trusted, 0),
+                'picked_by_market_type', iff(
+                    st.PROPOSE_STATUS = 'SUCCESS',
+                    object_construct('STOCK', st.SELECTED_STOCK, 'FX', st.SELECTED_FX, 'ETF', st.SELECTED_ETF),
+                    null
+                ),
+                'skipped_held_count', iff(st.PROPOSE_STATUS = 'SUCCESS', st.SKIPPED_HELD_COUNT, null)
+            )
+          from MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+         where st.PROPOSE_STATUS <> 'ERROR';
+    end if;
+
+    if (:P_VALIDATE) then
+        -- Validation reads trust from V_SIGNALS_ELIGIBLE_TODAY, i.e. from TRUSTED_SIGNAL_CLASSIFICATION. Callers that
+        -- run ahead of the pipeline's classification step (standalone 148/189) classify the run here first.
+        select count(*)
+          into :v_classified_count
+          from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION
+         where RUN_ID = :P_RUN_ID;
+        if (v_classified_count = 0) then
+            call MIP.APP.SP_PIPELINE_CLASSIFY_SIGNALS(:P_RUN_ID, :P_PARENT_RUN_ID);
+        end if;
+
+        -- CRIT-001: entry gate - reject BUY-side proposals of blocked portfolios (exits-only mode).
+        update MIP.APP.TMP_AGENT_PORTFOLIO_STATE as st
+           set BUY_PROPOSALS_BLOCKED = n.BLOCKED
+          from (
+            select PORTFOLIO_ID, count(*) as BLOCKED
+              from MIP.AGENT_OUT.ORDER_PROPOSALS
+             where RUN_ID_VARCHAR = :P_RUN_ID
+               and STATUS in ('PROPOSED', 'APPROVED')
+               and SIDE = 'BUY'
+             group by PORTFOLIO_ID
+          ) n
+         where n.PORTFOLIO_ID = st.PORTFOLIO_ID
+           and st.ENTRIES_BLOCKED
+           and st.PROFILE_ID is not null;
+
+        update MIP.AGENT_OUT.ORDER_PROPOSALS as p
+           set STATUS = 'REJECTED',
+               VALIDATION_ERRORS = array_construct_compact('ENTRY_GATE_BLOCKED', st.STOP_REASON),
+               APPROVED_AT = null
+          from MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+         where p.PORTFOLIO_ID = st.PORTFOLIO_ID
+           and st.BUY_PROPOSALS_BLOCKED > 0
+           and p.RUN_ID_VARCHAR = :P_RUN_ID
+           and p.STATUS in ('PROPOSED', 'APPROVED')
+           and p.SIDE = 'BUY';
+
+        insert into MIP.APP.MIP_AUDIT_LOG (
+            EVENT_TS,
+            RUN_ID,
+            PARENT_RUN_ID,
+            EVENT_TYPE,
+            EVENT_NAME,
+            STATUS,
+            ROWS_AFFECTED,
+            DETAILS
+        )
+        select
+            current_timestamp(),
+            :v_run_id_string,
+            :P_PARENT_RUN_ID,
+            'AGENT',
+            'SP_VALIDATE_AND_EXECUTE_PROPOSALS',
+            'ENTRY_GATE_BLOCKED',
+            st.BUY_PROPOSALS_BLOCKED,
+            object_construct(
+                'entries_blocked', st.ENTRIES_BLOCKED,
+                'stop_reason', st.STOP_REASON,
+                'allowed_actions', st.ALLOWED_ACTIONS,
+                'buy_proposals_rejected', st.BUY_PROPOSALS_BLOCKED,
+                'portfolio_id', st.PORTFOLIO_ID
+            )
+          from MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+         where st.BUY_PROPOSALS_BLOCKED > 0;
+
+        create or replace temporary table MIP.APP.TMP_PROPOSAL_VALIDATION as
+        with proposals as (
+            select
+                p.*,
+                row_number() over (
+                    partition by p.PORTFOLIO_ID
+                    order by p.PROPOSED_AT, p.PROPOSAL_ID
+                ) as PROPOSAL_RANK
+              from MIP.AGENT_OUT.ORDER_PROPOSALS p
+              join MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+                on st.PORTFOLIO_ID = p.PORTFOLIO_ID
+               and st.PROFILE_ID is not null
+             where p.RUN_ID_VARCHAR = :P_RUN_ID
+               and p.STATUS = 'PROPOSED'
+        ),
+        latest_prices as (
+            select b.SYMBOL, b.MARKET_TYPE, b.CLOSE
+              from MIP.MART.MARKET_BARS b
+             where b.INTERVAL_MINUTES = 1440
+               and (b.SYMBOL, b.MARKET_TYPE) in (select SYMBOL, MARKET_TYPE from proposals)
+            qualify row_number() over (partition by b.SYMBOL, b.MARKET_TYPE order by b.TS desc) = 1
+        ),
+        proposal_dupes as (
+            select
+                PORTFOLIO_ID,
+                SYMBOL,
+                MARKET_TYPE,
+                count(*) as PROPOSAL_COUNT,
+                count(distinct SIDE) as SIDE_COUNT
+              from proposals
+             group by PORTFOLIO_ID, SYMBOL, MARKET_TYPE
+        )
+        select
+            p.PROPOSAL_ID,
+            p.PORTFOLIO_ID,
+            p.PROPOSAL_RANK,
+            p.TARGET_WEIGHT,
+            p.SYMBOL,
+            p.MARKET_TYPE,
+            p.INTERVAL_MINUTES,
+            p.SIDE,
+            p.SOURCE_SIGNALS,
+            v.SYMBOL as ELIGIBLE_SYMBOL,
+            v.IS_ELIGIBLE as ELIGIBLE_FLAG,
+            lp.CLOSE as LATEST_PRICE,
+            op.OPEN_POSITIONS,
+            pd.PROPOSAL_COUNT,
+            pd.SIDE_COUNT,
+            array_construct_compact(
+                -- CRIT-001: Entry gate check - reject BUY proposals when entries_blocked=true
+                iff(st.ENTRIES_BLOCKED and p.SIDE = 'BUY', 'ENTRY_GATE_BLOCKED', null),
+                iff(st.ENTRIES_BLOCKED and p.SIDE = 'BUY', st.STOP_REASON, null),
+                iff(p.RECOMMENDATION_ID is null, 'MISSING_RECOMMENDATION_ID', null),
+                iff(p.RECOMMENDATION_ID is not null and v.RECOMMENDATION_ID is null, 'NO_SIGNAL_MATCH', null),
+                iff(v.RECOMMENDATION_ID is not null and not v.IS_ELIGIBLE, 'INELIGIBLE_SIGNAL', null),
+                iff(p.TARGET_WEIGHT > st.MAX_POSITION_PCT, 'EXCEEDS_MAX_POSITION_PCT', null),
+                iff(p.PROPOSAL_RANK > st.MAX_POSITIONS, 'EXCEEDS_MAX_POSITIONS', null),
+                iff(p.SIDE = 'BUY' and coalesce(op.OPEN_POSITIONS, 0) > 0, 'ALREADY_OPEN_POSITION', null),
+                iff(p.SIDE = 'SELL' and coalesce(op.OPEN_POSITIONS, 0) = 0, 'NO_OPEN_POSITION', null),
+                iff(coalesce(pd.PROPOSAL_COUNT, 0) > 1, 'DUPLICATE_SYMBOL_PROPOSAL', null),
+                iff(coalesce(pd.SIDE_COUNT, 0) > 1, 'CONFLICTING_SIDE_PROPOSALS', null),
+                iff(lp.CLOSE is null, 'MISSING_PRICE', null)
+            ) as VALIDATION_ERRORS
+          from proposals p
+          join MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+            on st.PORTFOLIO_ID = p.PORTFOLIO_ID
+          left join MIP.APP.V_SIGNALS_ELIGIBLE_TODAY v
+            on v.RECOMMENDATION_ID = p.RECOMMENDATION_ID
+          left join MIP.APP.TMP_AGENT_OPEN_POSITIONS op
+            on op.PORTFOLIO_ID = p.PORTFOLIO_ID
+           and op.SYMBOL = p.SYMBOL
+           and op.MARKET_TYPE = p.MARKET_TYPE
+          left join proposal_dupes pd
+            on pd.PORTFOLIO_ID = p.PORTFOLIO_ID
+           and pd.SYMBOL = p.SYMBOL
+           and pd.MARKET_TYPE = p.MARKET_TYPE
+          left join latest_prices lp
+            on lp.SYMBOL = p.SYMBOL
+           and lp.MARKET_TYPE = p.MARKET_TYPE;
+
+        update MIP.AGENT_OUT.ORDER_PROPOSALS as p
+           set STATUS = iff(array_size(v.VALIDATION_ERRORS) > 0, 'REJECTED', 'APPROVED'),
+               APPROVED_AT = iff(array_size(v.VALIDATION_ERRORS) > 0, p.APPROVED_AT, current_timestamp()),
+               VALIDATION_ERRORS = iff(array_size(v.VALIDATION_ERRORS) > 0, v.VALIDATION_ERRORS, null)
+          from MIP.APP.TMP_PROPOSAL_VALIDATION v
+         where p.PROPOSAL_ID = v.PROPOSAL_ID;
+
+        -- Phase 3.6: total exposure and position count caps per portfolio over this run's approved BUYs.
+        update MIP.APP.TMP_AGENT_PORTFOLIO_STATE as st
+           set PROPOSAL_COUNT = n.PROPOSAL_COUNT,
+               APPROVED_COUNT = n.APPROVED_COUNT,
+               REJECTED_COUNT = n.REJECTED_COUNT,
+               TOTAL_EXPOSURE_PCT = coalesce(e.TOTAL_EXPOSURE_PCT, 0)
+          from (
+            select
+                PORTFOLIO_ID,
+                count(*) as PROPOSAL_COUNT,
+                count_if(array_size(VALIDATION_ERRORS) = 0) as APPROVED_COUNT,
+                count_if(array_size(VALIDATION_ERRORS) > 0) as REJECTED_COUNT
+              from MIP.APP.TMP_PROPOSAL_VALIDATION
+             group by PORTFOLIO_ID
+          ) n
+          left join (
+            select PORTFOLIO_ID, sum(TARGET_WEIGHT) as TOTAL_EXPOSURE_PCT
+              from MIP.AGENT_OUT.ORDER_PROPOSALS
+             where RUN_ID_VARCHAR = :P_RUN_ID
+               and STATUS = 'APPROVED'
+               and SIDE = 'BUY'
+             group by PORTFOLIO_ID
+          ) e
+            on e.PORTFOLIO_ID = n.PORTFOLIO_ID
+         where n.PORTFOLIO_ID = st.PORTFOLIO_ID;
+
+        create or replace temporary table MIP.APP.TMP_AGENT_CAP_REJECTS as
+        with approved_buys as (
+            select
+                p.PROPOSAL_ID,
+                p.PORTFOLIO_ID,
+                -- Allow 1% tolerance for rounding
+                st.TOTAL_EXPOSURE_PCT > st.MAX_POSITION_PCT * 1.01 as EXPOSURE_EXCEEDED,
+                st.OPEN_POSITIONS_ALL + st.APPROVED_COUNT > st.MAX_POSITIONS as POSITIONS_EXCEEDED,
+                greatest(st.MAX_POSITIONS - st.OPEN_POSITIONS_ALL, 0) as POSITION_SLOTS,
+                row_number() over (
+                    partition by p.PORTFOLIO_ID
+                    order by p.PROPOSED_AT desc, p.PROPOSAL_ID desc
+                ) as RECENCY_RANK
+              from MIP.AGENT_OUT.ORDER_PROPOSALS p
+              join MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+                on st.PORTFOLIO_ID = p.PORTFOLIO_ID
+             where p.RUN_ID_VARCHAR = :P_RUN_ID
+               and p.STATUS = 'APPROVED'
+               and p.SIDE = 'BUY'
+        )
+        select PROPOSAL_ID, PORTFOLIO_ID, REASONS
+          from (
+            select
+                PROPOSAL_ID,
+                PORTFOLIO_ID,
+                -- A proposal over both caps keeps both reasons (and shows up in both audit rows).
+                array_construct_compact(
+                    iff(EXPOSURE_EXCEEDED, 'TOTAL_EXPOSURE_EXCEEDS_LIMIT', null),
+                    iff(POSITIONS_EXCEEDED and RECENCY_RANK > POSITION_SLOTS, 'EXCEEDS_MAX_POSITIONS', null)
+                ) as REASONS
+              from approved_buys
+          )
+         where array_size(REASONS) > 0;
+
+        update MIP.AGENT_OUT.ORDER_PROPOSALS as p
+           set STATUS = 'REJECTED',
+               VALIDATION_ERRORS = r.REASONS,
+               APPROVED_AT = null
+          from MIP.APP.TMP_AGENT_CAP_REJECTS r
+         where p.PROPOSAL_ID = r.PROPOSAL_ID;
+
+        insert into MIP.APP.MIP_AUDIT_LOG (
+            EVENT_TS,
+            RUN_ID,
+            PARENT_RUN_ID,
+            EVENT_TYPE,
+            EVENT_NAME,
+            STATUS,
+            ROWS_AFFECTED,
+            DETAILS
+        )
+        select
+            current_timestamp(),
+            :v_run_id_string,
+            :P_PARENT_RUN_ID,
+            'AGENT',
+            'SP_VALIDATE_AND_EXECUTE_PROPOSALS',
+            iff(r.REASON = 'TOTAL_EXPOSURE_EXCEEDS_LIMIT', 'TOTAL_EXPOSURE_EXCEEDED', 'POSITION_COUNT_EXCEEDED'),
+            r.REJECTED,
+            iff(
+                r.REASON = 'TOTAL_EXPOSURE_EXCEEDS_LIMIT',
+                object_construct(
+                    'portfolio_id', st.PORTFOLIO_ID,
+                    'total_exposure_pct', st.TOTAL_EXPOSURE_PCT,
+                    'max_position_pct', st.MAX_POSITION_PCT,
+                    'open_positions', st.OPEN_POSITIONS_ALL,
+                    'max_positions', st.MAX_POSITIONS
+                ),
+                object_construct(
+                    'portfolio_id', st.PORTFOLIO_ID,
+                    'open_positions', st.OPEN_POSITIONS_ALL,
+                    'approved_count', st.APPROVED_COUNT,
+                    'max_positions', st.MAX_POSITIONS
+                )
+            )
+          from (
+            select c.PORTFOLIO_ID, f.VALUE::string as REASON, count(*) as REJECTED
+              from MIP.APP.TMP_AGENT_CAP_REJECTS c,
+                   table(flatten(input => c.REASONS)) f
+             group by c.PORTFOLIO_ID, f.VALUE::string
+          ) r
+          join MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+            on st.PORTFOLIO_ID = r.PORTFOLIO_ID;
+
+        merge into MIP.APP.PORTFOLIO_TRADES as target
+        using (
+            with base as (
+                select
+                    p.PROPOSAL_ID,
+                    p.PORTFOLIO_ID,
+                    to_varchar(:P_RUN_ID) as RUN_ID,
+                    p.SYMBOL,
+                    p.MARKET_TYPE,
+                    1440 as INTERVAL_MINUTES,
+                    current_timestamp() as TRADE_TS,
+                    p.SIDE,
+                    v.LATEST_PRICE as MID_PRICE,
+                    st.TOTAL_EQUITY,
+                    st.TOTAL_EQUITY * p.TARGET_WEIGHT as NOTIONAL,
+                    p.SOURCE_SIGNALS:score::number as SCORE
+                  from MIP.AGENT_OUT.ORDER_PROPOSALS p
+                  join MIP.APP.TMP_PROPOSAL_VALIDATION v
+                    on v.PROPOSAL_ID = p.PROPOSAL_ID
+                  join MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+                    on st.PORTFOLIO_ID = p.PORTFOLIO_ID
+                 where p.RUN_ID_VARCHAR = :P_RUN_ID
+                   and p.STATUS = 'APPROVED'
+                   and v.LATEST_PRICE is not null
+                   -- CRIT-001: Extra safety - never execute BUY trades when entry gate is active
+                   and not (st.ENTRIES_BLOCKED and p.SIDE = 'BUY')
+            ),
+            priced as (
+                select
+                    *,
+                    case
+                        when SIDE = 'BUY' then MID_PRICE * (1 + ((:v_slippage_bps + (:v_spread_bps / 2)) / 10000))
+                        when SIDE = 'SELL' then MID_PRICE * (1 - ((:v_slippage_bps + (:v_spread_bps / 2)) / 10000))
+                        else MID_PRICE
+                    end as PRICE
+                  from base
+            ),
+            costed as (
+                select
+                    *,
+                    iff(PRICE is null or PRICE = 0, null, NOTIONAL / nullif(PRICE, 0)) as QUANTITY,
+                    greatest(coalesce(:v_min_fee, 0), abs(NOTIONAL) * :v_fee_bps / 10000) as FEE
+                  from priced
+            )
+            select
+                PROPOSAL_ID,
+                PORTFOLIO_ID,
+                RUN_ID,
+                SYMBOL,
+                MARKET_TYPE,
+                INTERVAL_MINUTES,
+                TRADE_TS,
+                SIDE,
+                PRICE,
+                QUANTITY,
+                NOTIONAL,
+                null as REALIZED_PNL,
+                case
+                    when SIDE = 'BUY' then TOTAL_EQUITY - (NOTIONAL + FEE)
+                    when SIDE = 'SELL' then TOTAL_EQUITY + (NOTIONAL - FEE)
+                    else TOTAL_EQUITY
+                end as CASH_AFTER,
+                SCORE
+              from costed
+        ) as source
+        on target.PORTFOLIO_ID = source.PORTFOLIO_ID
+           and target.PROPOSAL_ID = source.PROPOSAL_ID
+        when not matched then
+            insert (
+                PROPOSAL_ID,
+                PORTFOLIO_ID,
+                RUN_ID,
+                SYMBOL,
+                MARKET_TYPE,
+                INTERVAL_MINUTES,
+                TRADE_TS,
+                SIDE,
+                PRICE,
+                QUANTITY,
+                NOTIONAL,
+                REALIZED_PNL,
+                CASH_AFTER,
+                SCORE
+            )
+            values (
+                source.PROPOSAL_ID,
+                source.PORTFOLIO_ID,
+                source.RUN_ID,
+                source.SYMBOL,
+                source.MARKET_TYPE,
+                source.INTERVAL_MINUTES,
+                source.TRADE_TS,
+                source.SIDE,
+                source.PRICE,
+                source.QUANTITY,
+                source.NOTIONAL,
+                source.REALIZED_PNL,
+                source.CASH_AFTER,
+                source.SCORE
+            );
+
+        update MIP.AGENT_OUT.ORDER_PROPOSALS as p
+           set STATUS = 'EXECUTED',
+               EXECUTED_AT = current_timestamp()
+          from MIP.APP.TMP_AGENT_PORTFOLIO_STATE st
+         where p.PORTFOLIO_ID = st.PORTFOLIO_ID
+           and st.PROFILE_ID is not null
+           and p.RUN_ID_VARCHAR = :P_RUN_ID
+           and p.STATUS = 'APPROVED'
+           and not (st.ENTRIES_BLOCKED and p.SIDE = 'BUY');
+
+        v_executed_count := SQLROWCOUNT;
+
+        update MIP.APP.TMP_AGENT_PORTFOLIO_STATE as st
+           set EXECUTED_COUNT = n.EXECUTED
+          from (
+            select PORTFOLIO_ID, count(*) as EXECUTED
+              from MIP.AGENT_OUT.ORDER_PROPOSALS
+             where RUN_ID_VARCHAR = :P_RUN_ID
+               and STATUS = 'EXECUTED'
+               and EXECUTED_AT >= :v_started_at
+             group by PORTFOLIO_ID
+          ) n
+         where n.PORTFOLIO_ID = st.PORTFOLIO_ID;
+    end if;
+
+    select
+        object_construct(
+            'proposal_inserted', coalesce(sum(PROPOSAL_INSERTED), 0),
+            'approved_count', coalesce(sum(APPROVED_COUNT), 0),
+            'rejected_count', coalesce(sum(REJECTED_COUNT), 0),
+            'executed_count', coalesce(sum(EXECUTED_COUNT), 0)
+        ),
+        array_agg(
+            object_construct(
+                'portfolio_id', PORTFOLIO_ID,
+                'proposal_result', iff(
+                    PROPOSE_STATUS = 'ERROR',
+                    object_construct(
+                        'status', 'ERROR',
+                        'message', ERROR_MESSAGE,
+                        'portfolio_id', PORTFOLIO_ID,
+                        'max_positions', iff(PROFILE_ID is null, null, MAX_POSITIONS)
+                    ),
+                    object_construct(
+                        'status', PROPOSE_STATUS,
+                        'run_id', :P_RUN_ID,
+                        'portfolio_id', PORTFOLIO_ID,
+                        'entries_blocked', ENTRIES_BLOCKED,
+                        'stop_reason', STOP_REASON,
+                        'allowed_actions', ALLOWED_ACTIONS,
+                        'max_positions', MAX_POSITIONS,
+                        'open_positions', OPEN_POSITIONS,
+                        'remaining_capacity', REMAINING_CAPACITY,
+                        'proposal_candidates', :v_candidate_count_trusted,
+                        'proposal_selected', iff(
+                            PROPOSE_STATUS = 'SUCCESS',
+                            least(REMAINING_CAPACITY, SELECTED_STOCK + SELECTED_FX),
+                            least(:v_candidate_count_trusted, REMAINING_CAPACITY)
+                        ),
+                        'proposal_inserted', PROPOSAL_INSERTED,
+                        'target_weight', :v_target_weight,
+                        'market_type_quota', iff(
+                            PROPOSE_STATUS = 'SUCCESS',
+                            object_construct('STOCK', MAX_NEW_STOCK, 'FX', MAX_NEW_FX),
+                            null
+                        ),
+                        'picked_by_market_type', iff(
+                            PROPOSE_STATUS = 'SUCCESS',
+                            object_construct('STOCK', SELECTED_STOCK, 'FX', SELECTED_FX, 'ETF', SELECTED_ETF),
+                            null
+                        ),
+                        'skipped_held_count', iff(PROPOSE_STATUS = 'SUCCESS', SKIPPED_HELD_COUNT, null)
+                    )
+                ),
+                'validation_result', iff(
+                    PROFILE_ID is null,
+                    object_construct('status', 'ERROR', 'message', 'Portfolio not found', 'portfolio_id', PORTFOLIO_ID),
+                    object_construct(
+                        'status', 'SUCCESS',
+                        'run_id', :P_RUN_ID,
+                        'portfolio_id', PORTFOLIO_ID,
+                        'proposal_count', PROPOSAL_COUNT,
+                        'approved_count', APPROVED_COUNT,
+                        'rejected_count', REJECTED_COUNT,
+                        'executed_count', EXECUTED_COUNT,
+                        'entries_blocked', ENTRIES_BLOCKED,
+                        'stop_reason', STOP_REASON,
+                        'allowed_actions', ALLOWED_ACTIONS,
+                        'buy_proposals_blocked', BUY_PROPOSALS_BLOCKED
+                    )
+                )
+            )
+        ) within group (order by PORTFOLIO_ID)
+      into :v_totals,
+           :v_results
+      from MIP.APP.TMP_AGENT_PORTFOLIO_STATE;
+
+    return object_construct(
+        'status', 'SUCCESS',
+        'run_id', :P_RUN_ID,
+        'portfolio_count', :v_portfolio_count,
+        'candidate_count_raw', :v_candidate_count_raw,
+        'candidate_count_trusted', :v_candidate_count_trusted,
+        'proposal_inserted', :v_totals:proposal_inserted,
+        'approved_count', :v_totals:approved_count,
+        'rejected_count', :v_totals:rejected_count,
+        'executed_count', :v_totals:executed_count,
+        'started_at', :v_started_at,
+        'completed_at', current_timestamp(),
+        'results', coalesce(:v_results, array_construct())
+    );
+end;
+$$;
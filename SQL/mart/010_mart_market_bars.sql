@@ -3,7 +3,8 @@
 --   Analytic views on top of MIP.MART.MARKET_BARS
 --   - MARKET_BARS: cleaned base table
 --   - MARKET_LATEST_PER_SYMBOL: latest bar per symbol/interval
---   - MARKET_RETURNS: simple & log returns per bar
+--   - MARKET_RETURNS_REPLAY_STAGE / MARKET_RETURNS_SNAPSHOT: point-in-time returns for replay
+--   - MARKET_RETURNS: simple & log returns per bar (replay sessions read their snapshot)
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
@@ -95,10 +96,65 @@ where RN = 1;
 
 
 ----------------------------------------------
--- 3. Returns: MARKET_RETURNS
+-- 3. Replay snapshot tables
 ----------------------------------------------
+-- Point-in-time returns for time-travel replay (see APP/149a_sp_replay_snapshot.sql).
+-- STAGE holds the full deduped returns up to the replay end date, computed once per batch.
+-- SNAPSHOT holds only the rows visible at the current replay day; it is extended one day
+-- at a time with plain inserts, so the replay loop never recreates MARKET_RETURNS.
+create table if not exists MIP.MART.MARKET_RETURNS_REPLAY_STAGE (
+    REPLAY_BATCH_ID  STRING,
+    TS               TIMESTAMP_NTZ,
+    SYMBOL           STRING,
+    SOURCE           STRING,
+    MARKET_TYPE      STRING,
+    INTERVAL_MINUTES NUMBER,
+    OPEN             NUMBER(18,8),
+    HIGH             NUMBER(18,8),
+    LOW              NUMBER(18,8),
+    CLOSE            NUMBER(18,8),
+    VOLUME           NUMBER,
+    INGESTED_AT      TIMESTAMP_NTZ,
+    PREV_CLOSE       NUMBER(18,8),
+    RETURN_SIMPLE    FLOAT,
+    RETURN_LOG       FLOAT
+)
+cluster by (REPLAY_BATCH_ID, TS);
+
+create table if not exists MIP.MART.MARKET_RETURNS_SNAPSHOT (
+    REPLAY_BATCH_ID  STRING,
+    TS               TIMESTAMP_NTZ,
+    SYMBOL           STRING,
+    SOURCE           STRING,
+    MARKET_TYPE      STRING,
+    INTERVAL_MINUTES NUMBER,
+    OPEN             NUMBER(18,8),
+    HIGH             NUMBER(18,8),
+    LOW              NUMBER(18,8),
+    CLOSE            NUMBER(18,8),
+    VOLUME           NUMBER,
+    INGESTED_AT      TIMESTAMP_NTZ,
+    PREV_CLOSE       NUMBER(18,8),
+    RETURN_SIMPLE    FLOAT,
+    RETURN_LOG       FLOAT
+)
+cluster by (REPLAY_BATCH_ID, MARKET_TYPE, INTERVAL_MINUTES, TS);
+
+----------------------------------------------
+-- 4. Returns: MARKET_RETURNS
+----------------------------------------------
+-- Created once at deploy time (SP_PIPELINE_REFRESH_RETURNS no longer recreates it).
+-- Live sessions read the deduped returns over MARKET_BARS. A replay day session (query tag
+-- registered in APP.REPLAY_CONTEXT) reads its batch's MARKET_RETURNS_SNAPSHOT instead; the
+-- scope lookup is a single uncorrelated probe per query, not a per-row filter.
+-- Requires MIP.APP.REPLAY_CONTEXT (APP/055_app_audit_log.sql).
 create or replace view MIP.MART.MARKET_RETURNS as
-with deduped as (
+with replay_scope as (
+    select REPLAY_BATCH_ID
+      from MIP.APP.REPLAY_CONTEXT
+     where RUN_ID = current_query_tag()
+),
+deduped as (
     select
         TS,
         SYMBOL,
@@ -129,6 +185,7 @@ with deduped as (
                 order by INGESTED_AT desc, SOURCE desc
             ) as RN
         from MIP.MART.MARKET_BARS
+        where not exists (select 1 from replay_scope)
     )
     where RN = 1
 ),
@@ -174,4 +231,22 @@ select
         then ln(CLOSE / PREV_CLOSE)
         else null
     end as RETURN_LOG
-from ordered;
+from ordered
+union all
+select
+    s.TS,
+    s.SYMBOL,
+    s.SOURCE,
+    s.MARKET_TYPE,
+    s.INTERVAL_MINUTES,
+    s.OPEN,
+    s.HIGH,
+    s.LOW,
+    s.CLOSE,
+    s.VOLUME,
+    s.INGESTED_AT,
+    s.PREV_CLOSE,
+    s.RETURN_SIMPLE,
+    s.RETURN_LOG
+from MIP.MART.MARKET_RETURNS_SNAPSHOT s
+where s.REPLAY_BATCH_ID in (select REPLAY_BATCH_ID from replay_scope);
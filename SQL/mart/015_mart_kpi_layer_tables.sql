@@ -0,0 +1,142 @@
+-- 015_mart_kpi_layer_tables.sql
+-- Purpose: Materialized trust/KPI layer.
+-- The KPI views (V_SIGNAL_OUTCOME_KPIS, V_SCORE_CALIBRATION, REC_TRAINING_KPIS, V_PATTERN_SCORECARD) read these
+-- tables; their full-history definitions live on as *_LIVE views next to them. SP_PIPELINE_REFRESH_KPI_LAYER (146a)
+-- refreshes the tables once per pipeline run, after evaluation:
+--   KPI_SIGNAL_OUTCOME, KPI_SCORE_CALIBRATION: incremental - only (pattern, market, interval, horizon) groups with
+--     outcomes calculated after KPI_LAYER_REFRESH_STATE.OUTCOMES_WATERMARK are recomputed.
+--   KPI_REC_TRAINING, KPI_PATTERN_SCORECARD: rebuilt every run (30/90-day windows move with the clock); their
+--     windows are anchored at REFRESHED_AT rather than at query time.
+-- V_TRUST_METRICS and V_TRUSTED_SIGNAL_POLICY select from V_SIGNAL_OUTCOME_KPIS, so they read the table too.
+-- Medians / p10 / p90 in the KPI tables come from KPI_OUTCOME_SKETCH: one mergeable quantile sketch
+-- (APPROX_PERCENTILE_ACCUMULATE, Snowflake's t-digest) per group and ENTRY_TS day, rebuilt only for days with newly
+-- calculated outcomes and merged with APPROX_PERCENTILE_COMBINE instead of sorting every outcome of the group.
+-- The estimate's error is bounded in rank, not value (smallest toward the tails); V_OUTCOME_QUANTILE_ERROR reports
+-- the observed rank error per group against the exact outcomes.
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create table if not exists MIP.MART.KPI_SIGNAL_OUTCOME (
+    PATTERN_ID                 number        not null,
+    MARKET_TYPE                string        not null,
+    INTERVAL_MINUTES           number        not null,
+    HORIZON_BARS               number        not null,
+    N_TOTAL                    number,
+    N_SUCCESS                  number,
+    N_PENDING                  number,
+    COVERAGE_RATE              float,
+    AVG_RETURN                 float,
+    MEDIAN_RETURN              float,
+    P10_RETURN                 float,
+    P90_RETURN                 float,
+    STDDEV_RETURN              float,
+    MIN_RETURN                 float,
+    MAX_RETURN                 float,
+    HIT_RATE                   float,
+    AVG_WIN                    float,
+    AVG_LOSS                   float,
+    SCORE_RETURN_CORR          float,
+    OLDEST_NOT_READY_ENTRY_TS  timestamp_ntz,
+    NEWEST_NOT_READY_ENTRY_TS  timestamp_ntz,
+    LATEST_MATURED_ENTRY_TS    timestamp_ntz,
+    RUN_ID                     string,
+    REFRESHED_AT               timestamp_ntz default current_timestamp(),
+    constraint PK_KPI_SIGNAL_OUTCOME primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS)
+);
+
+create table if not exists MIP.MART.KPI_SCORE_CALIBRATION (
+    PATTERN_ID        number        not null,
+    MARKET_TYPE       string        not null,
+    INTERVAL_MINUTES  number        not null,
+    HORIZON_BARS      number        not null,
+    SCORE_DECILE      number        not null,
+    N                 number,
+    AVG_RETURN        float,
+    MEDIAN_RETURN     float,
+    HIT_RATE          float,
+    SCORE_MIN         float,
+    SCORE_MAX         float,
+    RUN_ID            string,
+    REFRESHED_AT      timestamp_ntz default current_timestamp(),
+    constraint PK_KPI_SCORE_CALIBRATION primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, SCORE_DECILE)
+);
+
+create table if not exists MIP.MART.KPI_REC_TRAINING (
+    PATTERN_ID         number        not null,
+    MARKET_TYPE        string        not null,
+    INTERVAL_MINUTES   number        not null,
+    HORIZON_BARS       number        not null,
+    N                  number,
+    HIT_RATE           float,
+    AVG_RETURN         float,
+    MEDIAN_RETURN      float,
+    AVG_WIN            float,
+    AVG_LOSS           float,
+    EXPECTANCY         float,
+    RETURN_STDDEV      float,
+    MAX_LOSS_STREAK    number,
+    N_30D              number,
+    HIT_RATE_30D       float,
+    AVG_RETURN_30D     float,
+    MEDIAN_RETURN_30D  float,
+    AVG_WIN_30D        float,
+    AVG_LOSS_30D       float,
+    EXPECTANCY_30D     float,
+    RETURN_STDDEV_30D  float,
+    N_90D              number,
+    HIT_RATE_90D       float,
+    AVG_RETURN_90D     float,
+    MEDIAN_RETURN_90D  float,
+    AVG_WIN_90D        float,
+    AVG_LOSS_90D       float,
+    EXPECTANCY_90D     float,
+    RETURN_STDDEV_90D  float,
+    RUN_ID             string,
+    REFRESHED_AT       timestamp_ntz default current_timestamp(),
+    constraint PK_KPI_REC_TRAINING primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS)
+);
+
+create table if not exists MIP.MART.KPI_PATTERN_SCORECARD (
+    PATTERN_ID             number        not null,
+    MARKET_TYPE            string        not null,
+    INTERVAL_MINUTES       number        not null,
+    SAMPLE_COUNT           number,
+    HIT_RATE               float,
+    AVG_FORWARD_RETURN     float,
+    MEDIAN_FORWARD_RETURN  float,
+    MIN_FORWARD_RETURN     float,
+    MAX_FORWARD_RETURN     float,
+    LAST_SIGNAL_DATE       date,
+    PATTERN_STATUS         string,
+    RUN_ID                 string,
+    REFRESHED_AT           timestamp_ntz default current_timestamp(),
+    constraint PK_KPI_PATTERN_SCORECARD primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES)
+);
+
+-- SUCCESS outcomes with a REALIZED_RETURN, by group and entry day; sketches are APPROX_PERCENTILE_ACCUMULATE states.
+create table if not exists MIP.MART.KPI_OUTCOME_SKETCH (
+    PATTERN_ID        number        not null,
+    MARKET_TYPE       string        not null,
+    INTERVAL_MINUTES  number        not null,
+    HORIZON_BARS      number        not null,
+    ENTRY_DATE        date          not null,
+    N_SUCCESS         number,
+    RETURN_SKETCH     variant,
+    SCORE_SKETCH      variant,
+    RUN_ID            string,
+    REFRESHED_AT      timestamp_ntz default current_timestamp(),
+    constraint PK_KPI_OUTCOME_SKETCH primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, ENTRY_DATE)
+);
+
+-- One row (STATE_KEY = 'KPI_LAYER'). OUTCOMES_WATERMARK = max(RECOMMENDATION_OUTCOMES.CALCULATED_AT) folded in.
+create table if not exists MIP.MART.KPI_LAYER_REFRESH_STATE (
+    STATE_KEY           string        not null,
+    RUN_ID              string,
+    OUTCOMES_WATERMARK  timestamp_ntz,
+    DIRTY_GROUPS        number,
+    DIRTY_DAYS          number,
+    FULL_REFRESH        boolean,
+    REFRESHED_AT        timestamp_ntz default current_timestamp(),
+    constraint PK_KPI_LAYER_REFRESH_STATE primary key (STATE_KEY)
+);
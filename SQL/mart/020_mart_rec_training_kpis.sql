@@ -1,11 +1,13 @@
 -- 020_mart_rec_training_kpis.sql
 -- Purpose:
 --   Training KPI view for recommendation outcomes by pattern/market/interval/horizon
+--   REC_TRAINING_KPIS reads the materialized KPI_REC_TRAINING (015), rebuilt every pipeline run from
+--   REC_TRAINING_KPIS_LIVE by SP_PIPELINE_REFRESH_KPI_LAYER; 30/90-day windows are as of that refresh.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
 
-create or replace view MIP.MART.REC_TRAINING_KPIS as
+create or replace view MIP.MART.REC_TRAINING_KPIS_LIVE as
 with base as (
     select
         r.PATTERN_ID,
@@ -131,3 +133,7 @@ group by
     b.INTERVAL_MINUTES,
     b.HORIZON_BARS,
     ls.MAX_LOSS_STREAK;
+
+create or replace view MIP.MART.REC_TRAINING_KPIS as
+select * exclude (RUN_ID, REFRESHED_AT)
+from MIP.MART.KPI_REC_TRAINING;
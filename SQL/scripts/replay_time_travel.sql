@@ -17,6 +17,10 @@
 --   set run_briefs     = false;
 --   call MIP.APP.SP_REPLAY_TIME_TRAVEL($from_date, $to_date, $run_portfolios, $run_briefs);
 --
+-- Resume: every day is checkpointed in MIP.APP.REPLAY_CHECKPOINT. If a replay fails, re-run it with the
+-- replay_batch_id from the FAIL event (or the checkpoint table); completed days are skipped:
+--   call MIP.APP.SP_REPLAY_TIME_TRAVEL($from_date, $to_date, $run_portfolios, $run_briefs, '<replay_batch_id>');
+--
 -- Acceptance: Outcomes count increases for older dates; re-running the same range does not create duplicates.
 
 use role MIP_ADMIN_ROLE;
@@ -69,6 +73,21 @@ call MIP.APP.SP_REPLAY_TIME_TRAVEL(
     $run_briefs
 );
 
+-- Checkpoint progress + per-day timings (latest batch first)
+select
+  replay_batch_id,
+  replay_day,
+  status,
+  duration_ms,
+  stage_timings:returns_ms::number         as returns_ms,
+  stage_timings:recommendations_ms::number as recommendations_ms,
+  stage_timings:evaluation_ms::number      as evaluation_ms,
+  stage_timings:portfolios_ms::number      as portfolios_ms,
+  stage_timings:briefs_ms::number          as briefs_ms,
+  error_message
+from MIP.APP.REPLAY_CHECKPOINT
+order by started_at desc, replay_day;
+
 select
   count(*) as outcomes_total,
   min(calculated_at) as min_calculated_at,
@@ -0,0 +1,56 @@
+-- replay_agent_proposals_smoke.sql
+-- Purpose: Smoke test that replay days classify their signals and the agent pass approves proposals.
+-- Proposal validation reads trust from V_SIGNALS_ELIGIBLE_TODAY (TRUSTED_SIGNAL_CLASSIFICATION); a replay day
+-- without its trust snapshot rejects every proposal as INELIGIBLE_SIGNAL.
+-- Replays the last 3 days of bars with portfolios + briefs. Expect classified_count > 0 per day,
+-- ineligible_rejects = 0, and approved_or_executed > 0 on at least one day (RESULT = PASS).
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+set to_date = (select max(TS)::date from MIP.MART.MARKET_BARS where INTERVAL_MINUTES = 1440);
+set from_date = dateadd(day, -2, $to_date);
+
+call MIP.APP.SP_REPLAY_TIME_TRAVEL(to_date($from_date), to_date($to_date), true, true);
+
+set replay_batch_id = (
+    select REPLAY_BATCH_ID
+      from MIP.APP.REPLAY_CHECKPOINT
+     order by STARTED_AT desc
+     limit 1
+);
+
+create or replace temporary table MIP.APP.TMP_REPLAY_AGENT_SMOKE as
+select
+    d.REPLAY_DAY,
+    d.DAY_RUN_ID,
+    d.STATUS,
+    (select count(*)
+       from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION c
+      where c.RUN_ID = d.DAY_RUN_ID) as CLASSIFIED_COUNT,
+    count(p.PROPOSAL_ID) as PROPOSALS,
+    count_if(p.STATUS in ('APPROVED', 'EXECUTED')) as APPROVED_OR_EXECUTED,
+    count_if(array_contains('INELIGIBLE_SIGNAL'::variant, p.VALIDATION_ERRORS)) as INELIGIBLE_REJECTS
+  from MIP.APP.REPLAY_CHECKPOINT d
+  left join MIP.AGENT_OUT.ORDER_PROPOSALS p
+    on p.RUN_ID_VARCHAR = d.DAY_RUN_ID
+ where d.REPLAY_BATCH_ID = $replay_batch_id
+ group by d.REPLAY_DAY, d.DAY_RUN_ID, d.STATUS;
+
+select *
+  from MIP.APP.TMP_REPLAY_AGENT_SMOKE
+ order by REPLAY_DAY;
+
+select
+    iff(
+        count_if(STATUS <> 'SUCCESS') = 0
+        and count_if(CLASSIFIED_COUNT = 0) = 0
+        and sum(INELIGIBLE_REJECTS) = 0
+        and sum(APPROVED_OR_EXECUTED) > 0,
+        'PASS',
+        'FAIL'
+    ) as RESULT,
+    sum(PROPOSALS) as PROPOSALS,
+    sum(APPROVED_OR_EXECUTED) as APPROVED_OR_EXECUTED,
+    sum(INELIGIBLE_REJECTS) as INELIGIBLE_REJECTS
+  from MIP.APP.TMP_REPLAY_AGENT_SMOKE;
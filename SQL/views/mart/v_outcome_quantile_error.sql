@@ -0,0 +1,39 @@
+-- v_outcome_quantile_error.sql
+-- Purpose: Observed rank error of the sketch quantiles in V_OUTCOME_QUANTILES against the exact outcomes.
+-- RANK_ERROR = |share of returns <= estimate - target quantile|; an exact quantile still shows up to 1 / N_SUCCESS
+-- from ties and discreteness. Counts only (no sort), but scans every matured outcome: for audits, not dashboards.
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create or replace view MIP.MART.V_OUTCOME_QUANTILE_ERROR as
+select
+    q.PATTERN_ID,
+    q.MARKET_TYPE,
+    q.INTERVAL_MINUTES,
+    q.HORIZON_BARS,
+    count(*) as N_SUCCESS,
+    q.P10_RETURN,
+    q.MEDIAN_RETURN,
+    q.P90_RETURN,
+    abs(count_if(o.REALIZED_RETURN <= q.P10_RETURN) / count(*) - 0.1) as P10_RANK_ERROR,
+    abs(count_if(o.REALIZED_RETURN <= q.MEDIAN_RETURN) / count(*) - 0.5) as MEDIAN_RANK_ERROR,
+    abs(count_if(o.REALIZED_RETURN <= q.P90_RETURN) / count(*) - 0.9) as P90_RANK_ERROR
+from MIP.MART.V_OUTCOME_QUANTILES q
+join MIP.APP.RECOMMENDATION_LOG r
+  on r.PATTERN_ID = q.PATTERN_ID
+ and r.MARKET_TYPE = q.MARKET_TYPE
+ and r.INTERVAL_MINUTES = q.INTERVAL_MINUTES
+join MIP.APP.RECOMMENDATION_OUTCOMES o
+  on o.RECOMMENDATION_ID = r.RECOMMENDATION_ID
+ and o.HORIZON_BARS = q.HORIZON_BARS
+where o.EVAL_STATUS = 'SUCCESS'
+  and o.REALIZED_RETURN is not null
+group by
+    q.PATTERN_ID,
+    q.MARKET_TYPE,
+    q.INTERVAL_MINUTES,
+    q.HORIZON_BARS,
+    q.P10_RETURN,
+    q.MEDIAN_RETURN,
+    q.P90_RETURN;
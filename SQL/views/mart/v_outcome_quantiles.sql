@@ -0,0 +1,50 @@
+-- v_outcome_quantiles.sql
+-- Purpose: Approximate return quantiles and score decile boundaries by pattern and horizon, merged from the
+-- per-day quantile sketches in KPI_OUTCOME_SKETCH (015) instead of sorting every matured outcome of the group.
+-- SCORE_DECILE_BOUNDARIES holds the 10th..90th score percentiles (the 9 cut points between calibration deciles).
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create or replace view MIP.MART.V_OUTCOME_QUANTILES as
+with merged as (
+    select
+        PATTERN_ID,
+        MARKET_TYPE,
+        INTERVAL_MINUTES,
+        HORIZON_BARS,
+        sum(N_SUCCESS) as N_SUCCESS,
+        min(ENTRY_DATE) as FIRST_ENTRY_DATE,
+        max(ENTRY_DATE) as LAST_ENTRY_DATE,
+        approx_percentile_combine(RETURN_SKETCH) as RETURN_SKETCH,
+        approx_percentile_combine(SCORE_SKETCH) as SCORE_SKETCH
+    from MIP.MART.KPI_OUTCOME_SKETCH
+    group by
+        PATTERN_ID,
+        MARKET_TYPE,
+        INTERVAL_MINUTES,
+        HORIZON_BARS
+)
+select
+    PATTERN_ID,
+    MARKET_TYPE,
+    INTERVAL_MINUTES,
+    HORIZON_BARS,
+    N_SUCCESS,
+    FIRST_ENTRY_DATE,
+    LAST_ENTRY_DATE,
+    approx_percentile_estimate(RETURN_SKETCH, 0.1) as P10_RETURN,
+    approx_percentile_estimate(RETURN_SKETCH, 0.5) as MEDIAN_RETURN,
+    approx_percentile_estimate(RETURN_SKETCH, 0.9) as P90_RETURN,
+    array_construct(
+        approx_percentile_estimate(SCORE_SKETCH, 0.1),
+        approx_percentile_estimate(SCORE_SKETCH, 0.2),
+        approx_percentile_estimate(SCORE_SKETCH, 0.3),
+        approx_percentile_estimate(SCORE_SKETCH, 0.4),
+        approx_percentile_estimate(SCORE_SKETCH, 0.5),
+        approx_percentile_estimate(SCORE_SKETCH, 0.6),
+        approx_percentile_estimate(SCORE_SKETCH, 0.7),
+        approx_percentile_estimate(SCORE_SKETCH, 0.8),
+        approx_percentile_estimate(SCORE_SKETCH, 0.9)
+    ) as SCORE_DECILE_BOUNDARIES
+from merged;
@@ -0,0 +1,89 @@
+-- v_pipeline_step_profile.sql
+-- Purpose: Per-step latency/throughput profile of daily pipeline runs (PIPELINE_RUN + MIP_AUDIT_LOG steps)
+-- One row per pipeline run + AGG step (runs without step events keep one row with null step columns).
+-- DURATION_SECONDS comes from the step's started_at/completed_at DETAILS written by SP_AUDIT_LOG_STEP;
+-- SHARE_OF_RUN is relative to the run's START..terminal event span. PREV_AVG_DURATION_SECONDS averages the
+-- same step over the 10 preceding runs of the same kind (live vs replay); DURATION_VS_PREV_AVG > 1 = slower.
+-- The windows span the whole audit log: GET /runs/{run_id}/profile runs a copy of this logic restricted to the
+-- profiled run and its recent history (PROFILE_SQL in apps/mip_ui_api/app/routers/runs.py); keep the two in sync.
+
+use role MIP_ADMIN_ROLE;
+use database MIP;
+
+create or replace view MIP.MART.V_PIPELINE_STEP_PROFILE as
+with runs as (
+    select
+        RUN_ID as PIPELINE_RUN_ID,
+        EVENT_TYPE = 'REPLAY' as IS_REPLAY,
+        STARTED_AT as RUN_STARTED_AT,
+        COMPLETED_AT as RUN_COMPLETED_AT,
+        STATUS as RUN_STATUS
+    from MIP.APP.PIPELINE_RUN
+),
+steps as (
+    select
+        PARENT_RUN_ID as PIPELINE_RUN_ID,
+        EVENT_NAME,
+        DETAILS:"step_name"::string as STEP_NAME,
+        STATUS as STEP_STATUS,
+        ROWS_AFFECTED,
+        EVENT_TS,
+        try_to_timestamp_ntz(DETAILS:"started_at"::string) as STARTED_AT,
+        coalesce(try_to_timestamp_ntz(DETAILS:"completed_at"::string), EVENT_TS) as COMPLETED_AT
+    from MIP.APP.MIP_AUDIT_LOG
+    where EVENT_TYPE in ('PIPELINE_STEP', 'REPLAY')
+      and PARENT_RUN_ID is not null
+      and DETAILS:"step_name"::string is not null
+      and coalesce(DETAILS:"scope"::string, 'AGG') = 'AGG'
+      and STATUS <> 'START'
+    qualify row_number() over (
+        partition by PARENT_RUN_ID, EVENT_NAME, DETAILS:"step_name"::string
+        order by EVENT_TS desc
+    ) = 1
+),
+profiled as (
+    select
+        r.PIPELINE_RUN_ID,
+        r.IS_REPLAY,
+        r.RUN_STARTED_AT,
+        r.RUN_COMPLETED_AT,
+        r.RUN_STATUS,
+        datediff(millisecond, r.RUN_STARTED_AT, r.RUN_COMPLETED_AT) / 1000.0 as RUN_DURATION_SECONDS,
+        s.EVENT_NAME,
+        s.STEP_NAME,
+        s.STEP_STATUS,
+        s.STARTED_AT,
+        s.COMPLETED_AT,
+        datediff(millisecond, s.STARTED_AT, s.COMPLETED_AT) / 1000.0 as DURATION_SECONDS,
+        s.ROWS_AFFECTED
+    from runs r
+    left join steps s
+      on s.PIPELINE_RUN_ID = r.PIPELINE_RUN_ID
+)
+select
+    PIPELINE_RUN_ID,
+    IS_REPLAY,
+    RUN_STARTED_AT,
+    RUN_COMPLETED_AT,
+    RUN_STATUS,
+    RUN_DURATION_SECONDS,
+    EVENT_NAME,
+    STEP_NAME,
+    STEP_STATUS,
+    STARTED_AT,
+    COMPLETED_AT,
+    DURATION_SECONDS,
+    ROWS_AFFECTED,
+    iff(DURATION_SECONDS > 0, ROWS_AFFECTED / DURATION_SECONDS, null) as ROWS_PER_SEC,
+    iff(RUN_DURATION_SECONDS > 0, DURATION_SECONDS / RUN_DURATION_SECONDS, null) as SHARE_OF_RUN,
+    avg(DURATION_SECONDS) over (
+        partition by IS_REPLAY, EVENT_NAME, STEP_NAME
+        order by RUN_STARTED_AT
+        rows between 10 preceding and 1 preceding
+    ) as PREV_AVG_DURATION_SECONDS,
+    DURATION_SECONDS / nullif(avg(DURATION_SECONDS) over (
+        partition by IS_REPLAY, EVENT_NAME, STEP_NAME
+        order by RUN_STARTED_AT
+        rows between 10 preceding and 1 preceding
+    ), 0) as DURATION_VS_PREV_AVG
+from profiled;
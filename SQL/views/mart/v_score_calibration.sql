@@ -1,10 +1,12 @@
 -- v_score_calibration.sql
 -- Purpose: Score calibration deciles by pattern and horizon
+-- V_SCORE_CALIBRATION reads the materialized KPI_SCORE_CALIBRATION (015, refreshed per pipeline run by
+-- SP_PIPELINE_REFRESH_KPI_LAYER); V_SCORE_CALIBRATION_LIVE is the full-history aggregation it is refreshed from.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
 
-create or replace view MIP.MART.V_SCORE_CALIBRATION as
+create or replace view MIP.MART.V_SCORE_CALIBRATION_LIVE as
 with scored as (
     select
         r.PATTERN_ID,
@@ -44,3 +46,7 @@ group by
     INTERVAL_MINUTES,
     HORIZON_BARS,
     SCORE_DECILE;
+
+create or replace view MIP.MART.V_SCORE_CALIBRATION as
+select * exclude (RUN_ID, REFRESHED_AT)
+from MIP.MART.KPI_SCORE_CALIBRATION;
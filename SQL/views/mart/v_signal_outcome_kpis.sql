@@ -1,10 +1,12 @@
 -- v_signal_outcome_kpis.sql
 -- Purpose: Signal/outcome KPIs by pattern and horizon
+-- V_SIGNAL_OUTCOME_KPIS reads the materialized KPI_SIGNAL_OUTCOME (015, refreshed per pipeline run by
+-- SP_PIPELINE_REFRESH_KPI_LAYER); V_SIGNAL_OUTCOME_KPIS_LIVE is the full-history aggregation it is refreshed from.
 
 use role MIP_ADMIN_ROLE;
 use database MIP;
 
-create or replace view MIP.MART.V_SIGNAL_OUTCOME_KPIS as
+create or replace view MIP.MART.V_SIGNAL_OUTCOME_KPIS_LIVE as
 select
     r.PATTERN_ID,
     r.MARKET_TYPE,
@@ -85,3 +87,7 @@ group by
     r.MARKET_TYPE,
     r.INTERVAL_MINUTES,
     o.HORIZON_BARS;
+
+create or replace view MIP.MART.V_SIGNAL_OUTCOME_KPIS as
+select * exclude (RUN_ID, REFRESHED_AT)
+from MIP.MART.KPI_SIGNAL_OUTCOME;
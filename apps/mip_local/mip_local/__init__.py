@@ -0,0 +1,49 @@
+"""
+MIP local backend: DuckDB stand-in for the Snowflake MIP database.
+Runs the MART views and a Python/DuckDB port of the daily pipeline from Parquet fixtures so the UI API
+and benchmarks can run without a Snowflake account.
+"""
+from .backend import LocalConnection, connect, open_database, reset, translate_sql, view_report
+from .barstore import BarStore, export_bar_store
+from .fixtures import export_fixtures, load_fixtures
+from .execution import simulate_fills
+from .synthetic import generate_market
+from .pipeline import (
+    audit_log_retention,
+    classify_signals,
+    evaluate_recommendations,
+    execute_proposals,
+    generate_momentum_recs,
+    propose_and_execute,
+    refresh_kpi_layer,
+    refresh_today_insights,
+    run_daily_pipeline,
+    run_portfolio_simulation,
+    write_morning_brief,
+)
+
+__all__ = [
+    "LocalConnection",
+    "connect",
+    "open_database",
+    "reset",
+    "translate_sql",
+    "view_report",
+    "BarStore",
+    "export_bar_store",
+    "export_fixtures",
+    "load_fixtures",
+    "generate_market",
+    "simulate_fills",
+    "audit_log_retention",
+    "classify_signals",
+    "evaluate_recommendations",
+    "execute_proposals",
+    "generate_momentum_recs",
+    "propose_and_execute",
+    "refresh_kpi_layer",
+    "refresh_today_insights",
+    "run_daily_pipeline",
+    "run_portfolio_simulation",
+    "write_morning_brief",
+]
@@ -0,0 +1,95 @@
+"""
+CLI for the local backend.
+  python -m mip_local pipeline --db mip.duckdb --fixtures fixtures/ [--to 2025-06-30]
+  python -m mip_local export --db mip.duckdb --out fixtures/
+  python -m mip_local barstore --db mip.duckdb --out bars/
+  python -m mip_local views
+  python -m mip_local bench --scales 100,1000 [--out bench_results/base.json]
+  python -m mip_local compare bench_results/base.json bench_results/new.json
+"""
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+
+from .backend import connect, open_database, view_report
+from .barstore import export_bar_store
+from .benchmark import DEFAULT_SCALES, compare, run_benchmark, write_result
+from .fixtures import export_fixtures
+from .pipeline import run_daily_pipeline
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="mip_local", description="MIP local DuckDB backend")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_pipeline = sub.add_parser("pipeline", help="run the daily pipeline port once")
+    p_pipeline.add_argument("--db", default=None, help="DuckDB file (default: in-memory)")
+    p_pipeline.add_argument("--fixtures", default=None, help="Parquet fixtures directory to load")
+    p_pipeline.add_argument("--to", default=None, help="effective to_ts (ISO date); default latest bar")
+
+    p_export = sub.add_parser("export", help="write all non-empty tables as Parquet fixtures")
+    p_export.add_argument("--db", default=None)
+    p_export.add_argument("--fixtures", default=None)
+    p_export.add_argument("--out", required=True)
+
+    p_barstore = sub.add_parser("barstore", help="snapshot bars + returns into a memory-mapped columnar store")
+    p_barstore.add_argument("--db", default=None)
+    p_barstore.add_argument("--fixtures", default=None)
+    p_barstore.add_argument("--out", required=True)
+
+    p_views = sub.add_parser("views", help="list MIP/SQL views that could not be created locally")
+    p_views.add_argument("--db", default=None)
+
+    p_bench = sub.add_parser("bench", help="synthetic-market benchmark of pipeline stages and API endpoints")
+    p_bench.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                         help="comma-separated symbol counts (default 100,1000,10000)")
+    p_bench.add_argument("--years", type=float, default=1.0, help="years of daily bars per symbol")
+    p_bench.add_argument("--days", type=int, default=5, help="trailing trading days to run the pipeline for")
+    p_bench.add_argument("--repeat", type=int, default=3, help="calls per endpoint (median is reported)")
+    p_bench.add_argument("--no-endpoints", action="store_true", help="skip the UI API endpoint timings")
+    p_bench.add_argument("--out", default=None, help="result file (default bench_results/<commit>.json)")
+
+    p_compare = sub.add_parser("compare", help="compare two bench results; exit 1 on regression")
+    p_compare.add_argument("baseline")
+    p_compare.add_argument("current")
+    p_compare.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown ratio (0.2 = 20%%)")
+
+    args = parser.parse_args(argv)
+    if args.command == "pipeline":
+        conn = connect(args.db, args.fixtures)
+        to_ts = datetime.fromisoformat(args.to) if args.to else None
+        result = run_daily_pipeline(conn, to_ts=to_ts)
+        print(json.dumps({k: result[k] for k in ("status", "run_id", "from_ts", "to_ts")}, default=str))
+    elif args.command == "export":
+        written = export_fixtures(open_database(args.db, args.fixtures), args.out)
+        print(json.dumps(written))
+    elif args.command == "barstore":
+        try:
+            manifest = export_bar_store(open_database(args.db, args.fixtures), args.out)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(json.dumps(manifest["partitions"]))
+    elif args.command == "views":
+        open_database(args.db)
+        report = view_report(args.db)
+        print(json.dumps({"loaded": len(report["loaded"]), "failed": report["failed"]}, indent=2))
+    elif args.command == "bench":
+        scales = [int(s) for s in args.scales.split(",") if s.strip()]
+        result = run_benchmark(scales, years=args.years, days=args.days, repeat=args.repeat,
+                               endpoints=not args.no_endpoints)
+        print(write_result(result, args.out))
+    elif args.command == "compare":
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+        rows = compare(baseline, current, threshold=args.threshold)
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['metric']:<50} {row['baseline']:>10.4f} {row['current']:>10.4f} "
+                  f"{row['ratio'] or 0:>7.2f}x {flag}")
+        return 1 if any(r["regression"] for r in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+"""
+Local embedded-database backend (DuckDB) for MIP.
+connect() returns a process-wide DuckDB database with the MIP catalog attached (MIP.APP / MIP.MART /
+MIP.AGENT_OUT) and, optionally, Parquet fixtures loaded. LocalConnection wraps it with the small
+DB-API surface app/db.py relies on (cursor/execute/fetchall/description/close) and rewrites the few
+Snowflake-only constructs the UI API and MIP/SQL views use: %s / %(name)s params, VARIANT paths
+(COL:key::type), dateadd/datediff(part, ...), object_construct, and agg(...) within group (order by ...).
+"""
+import logging
+import re
+import threading
+from pathlib import Path
+
+import duckdb
+
+from .schema import create_schema
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_databases: dict[str, duckdb.DuckDBPyConnection] = {}
+_view_reports: dict[str, dict] = {}
+
+_IDENT_PATH = re.compile(r"(?<![\w:.'])([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)?)((?::(?!:)(?:[A-Za-z_]\w*|\"[^\"]+\"))+)")
+_PYFORMAT = re.compile(r"%\((\w+)\)s")
+_DATEADD = re.compile(r"\bdateadd\(\s*([A-Za-z_]+)\s*,", re.IGNORECASE)
+_DATEDIFF = re.compile(r"\bdatediff\(\s*([A-Za-z_]+)\s*,", re.IGNORECASE)
+_CURRENT_TS = re.compile(r"\bcurrent_timestamp\(\)", re.IGNORECASE)
+_RENAMES = (
+    (re.compile(r"\bobject_construct(?:_keep_null)?\(", re.IGNORECASE), "json_object("),
+    (re.compile(r"\barray_construct\(", re.IGNORECASE), "json_array("),
+    (re.compile(r"\bobject_agg\(", re.IGNORECASE), "json_group_object("),
+    (re.compile(r"\bboolor_agg\(", re.IGNORECASE), "bool_or("),
+    (re.compile(r"\bbooland_agg\(", re.IGNORECASE), "bool_and("),
+)
+_WITHIN_GROUP = re.compile(r"\)\s*within\s+group\s*\(\s*order\s+by\s+", re.IGNORECASE)
+_ORDERED_SET = ("percentile_cont", "percentile_disc", "mode")
+
+
+def _split_quoted(sql: str):
+    """Yield (is_quoted, chunk) pieces of sql so rewrites skip string literals."""
+    pos = 0
+    for m in re.finditer(r"'(?:[^']|'')*'", sql):
+        if m.start() > pos:
+            yield False, sql[pos:m.start()]
+        yield True, m.group(0)
+        pos = m.end()
+    if pos < len(sql):
+        yield False, sql[pos:]
+
+
+def _variant_path(m: re.Match) -> str:
+    keys = ".".join(k.strip('"') for k in m.group(2).lstrip(":").split(":"))
+    return f"json_extract_string({m.group(1)}, '$.{keys}')"
+
+
+def _closing_paren(sql: str, open_idx: int) -> int:
+    depth = 0
+    for i in range(open_idx, len(sql)):
+        if sql[i] == "(":
+            depth += 1
+        elif sql[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _opening_paren(sql: str, close_idx: int) -> int:
+    depth = 0
+    for i in range(close_idx, -1, -1):
+        if sql[i] == ")":
+            depth += 1
+        elif sql[i] == "(":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _move_within_group(sql: str) -> str:
+    """agg(x) within group (order by y) -> agg(x order by y); ordered-set aggregates are left alone."""
+    pos = 0
+    while True:
+        m = _WITHIN_GROUP.search(sql, pos)
+        if not m:
+            return sql
+        agg_close = m.start()
+        agg_open = _opening_paren(sql, agg_close)
+        name = re.search(r"(\w+)\s*$", sql[:agg_open])
+        group_open = sql.index("(", m.start() + 1, m.end())
+        group_close = _closing_paren(sql, group_open)
+        if agg_open < 0 or group_close < 0 or (name and name.group(1).lower() in _ORDERED_SET):
+            pos = m.end()
+            continue
+        order_by = sql[m.end():group_close].strip()
+        sql = sql[:agg_close] + f" order by {order_by})" + sql[group_close + 1:]
+        pos = agg_close
+
+
+def translate_sql(sql: str) -> str:
+    """Rewrite Snowflake-dialect SQL used by the API into DuckDB SQL."""
+    out = []
+    for quoted, chunk in _split_quoted(sql):
+        if not quoted:
+            chunk = chunk.replace("%s", "?")
+            chunk = _PYFORMAT.sub(r"$\1", chunk)
+            chunk = _IDENT_PATH.sub(_variant_path, chunk)
+            chunk = _DATEADD.sub(lambda m: f"dateadd('{m.group(1).lower()}',", chunk)
+            chunk = _DATEDIFF.sub(lambda m: f"date_diff('{m.group(1).lower()}',", chunk)
+            chunk = _CURRENT_TS.sub("current_timestamp", chunk)
+            for pattern, replacement in _RENAMES:
+                chunk = pattern.sub(replacement, chunk)
+        out.append(chunk)
+    return _move_within_group("".join(out))
+
+
+class LocalCursor:
+    """Cursor over a DuckDB connection with Snowflake-connector-like behaviour."""
+
+    def __init__(self, con: duckdb.DuckDBPyConnection):
+        self._con = con
+        self.sfqid = None
+        self.rowcount = -1
+
+    @property
+    def description(self):
+        desc = self._con.description
+        if desc is None:
+            return None
+        # Snowflake returns unquoted identifiers upper-cased; routers rely on that.
+        return [(str(d[0]).upper(),) + tuple(d[1:]) for d in desc]
+
+    def execute(self, sql: str, params=None):
+        translated = translate_sql(sql)
+        if params is None:
+            self._con.execute(translated)
+        elif isinstance(params, dict):
+            # pyformat %(name)s -> $name; DuckDB rejects unused named parameters.
+            used = set(_PYFORMAT.findall(sql))
+            self._con.execute(translated, {k: v for k, v in params.items() if k in used})
+        else:
+            self._con.execute(translated, list(params))
+        self.rowcount = -1
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        self._con.executemany(translate_sql(sql), [list(p) for p in seq_of_params])
+        return self
+
+    def fetchone(self):
+        return self._con.fetchone()
+
+    def fetchmany(self, size: int = 1000):
+        return self._con.fetchmany(size)
+
+    def fetchall(self):
+        return self._con.fetchall()
+
+    def fetch_arrow_table(self):
+        return self._con.fetch_arrow_table()
+
+    def fetch_pandas_all(self):
+        return self._con.fetchdf()
+
+    def close(self):
+        self._con.close()
+
+
+class LocalConnection:
+    """Per-request handle; close() releases the cursor, not the shared database."""
+
+    def __init__(self, database: duckdb.DuckDBPyConnection):
+        self._database = database
+        self._cursors: list[LocalCursor] = []
+
+    def cursor(self) -> LocalCursor:
+        con = self._database.cursor()
+        # Cursors share the database but not the session; compat macros live in MIP.main.
+        con.execute("use MIP")
+        cur = LocalCursor(con)
+        self._cursors.append(cur)
+        return cur
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        for cur in self._cursors:
+            try:
+                cur.close()
+            except Exception:
+                pass
+        self._cursors = []
+
+
+def open_database(db_path: str | None = None, fixtures_dir: str | None = None) -> duckdb.DuckDBPyConnection:
+    """
+    Open (or reuse) the DuckDB database for db_path (None/':memory:' = in-memory), create the MIP
+    catalog and load Parquet fixtures from fixtures_dir the first time it is opened.
+    """
+    key = db_path or ":memory:"
+    with _lock:
+        db = _databases.get(key)
+        if db is not None:
+            return db
+        db = duckdb.connect()
+        attach_path = ":memory:" if key == ":memory:" else str(Path(key).expanduser())
+        db.execute(f"attach '{attach_path}' as MIP")
+        db.execute("use MIP")
+        create_schema(db)
+        from .repo_views import load_repo_views
+
+        report = load_repo_views(db)
+        for name, error in report["failed"].items():
+            logger.debug("mip_local: view %s not available locally: %s", name, error)
+        _view_reports[key] = report
+        if fixtures_dir:
+            from .fixtures import load_fixtures
+
+            load_fixtures(db, fixtures_dir)
+        _databases[key] = db
+        return db
+
+
+def view_report(db_path: str | None = None) -> dict:
+    """Views loaded from MIP/SQL for db_path and the ones that failed to translate."""
+    return _view_reports.get(db_path or ":memory:", {"loaded": [], "failed": {}})
+
+
+def connect(db_path: str | None = None, fixtures_dir: str | None = None) -> LocalConnection:
+    """Return a LocalConnection on the shared database for db_path."""
+    return LocalConnection(open_database(db_path, fixtures_dir))
+
+
+def reset(db_path: str | None = None) -> None:
+    """Drop the cached database for db_path (tests / benchmarks start from a clean catalog)."""
+    key = db_path or ":memory:"
+    with _lock:
+        db = _databases.pop(key, None)
+        _view_reports.pop(key, None)
+    if db is not None:
+        db.close()
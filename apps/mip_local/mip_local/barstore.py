@@ -0,0 +1,184 @@
+"""
+Memory-mapped columnar bar store for offline research and simulation.
+export_bar_store() snapshots MIP.MART.MARKET_RETURNS (deduplicated MARKET_BARS plus RETURN_SIMPLE / RETURN_LOG)
+into one directory per <MARKET_TYPE>_<INTERVAL_MINUTES>: one .npy file per column, rows sorted by (SYMBOL, TS), and
+an index.json of per-symbol row ranges. BarStore opens the columns with mmap_mode="r", so per-symbol and
+date-range reads are slices of the mapped files (zero-copy views, no deserialization, no warehouse round trip).
+"""
+from __future__ import annotations
+
+import json
+import shutil
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+INDEX = "index.json"
+VALUE_COLUMNS = ("OPEN", "HIGH", "LOW", "CLOSE", "VOLUME", "RETURN_SIMPLE", "RETURN_LOG")
+COLUMNS = ("TS",) + VALUE_COLUMNS
+
+
+def _partition_dir(market_type: str, interval_minutes: int) -> str:
+    return f"{market_type}_{int(interval_minutes)}"
+
+
+def _as_datetime64(value) -> np.datetime64 | None:
+    if value is None:
+        return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return np.datetime64(value, "us")
+
+
+def _filled(values) -> np.ndarray:
+    """DuckDB returns masked arrays for nullable columns; store NULL as NaN."""
+    return np.ma.filled(np.ma.asarray(values, dtype=np.float64), np.nan)
+
+
+def export_bar_store(db, out_dir: str | Path) -> dict:
+    """
+    Write the bar store for every (MARKET_TYPE, INTERVAL_MINUTES) in MARKET_RETURNS to out_dir, replacing any
+    previous snapshot (built in a sibling staging directory, then swapped in). Returns the manifest.
+    out_dir must be missing, empty or an earlier bar store (has a manifest.json); anything else raises ValueError
+    rather than being deleted.
+    """
+    out_dir = Path(out_dir).resolve()
+    if out_dir.exists() and not (out_dir.is_dir() and (not any(out_dir.iterdir()) or (out_dir / MANIFEST).is_file())):
+        raise ValueError(f"{out_dir} exists and is not a bar store (no {MANIFEST}); refusing to replace it")
+    staging = out_dir.with_name(out_dir.name + ".staging")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    partitions = db.execute(
+        """
+        select MARKET_TYPE, INTERVAL_MINUTES
+        from MIP.MART.MARKET_BARS
+        group by MARKET_TYPE, INTERVAL_MINUTES
+        order by MARKET_TYPE, INTERVAL_MINUTES
+        """
+    ).fetchall()
+    manifest_partitions = []
+    for market_type, interval_minutes in partitions:
+        data = db.execute(
+            f"""
+            select SYMBOL, TS, {", ".join(VALUE_COLUMNS)}
+            from MIP.MART.MARKET_RETURNS
+            where MARKET_TYPE = ? and INTERVAL_MINUTES = ?
+            order by SYMBOL, TS
+            """,
+            [market_type, interval_minutes],
+        ).fetchnumpy()
+        symbols = np.asarray(data["SYMBOL"], dtype=object)
+        if not len(symbols):
+            continue
+        part = staging / _partition_dir(market_type, interval_minutes)
+        part.mkdir()
+        np.save(part / "TS.npy", np.asarray(data["TS"], dtype="datetime64[us]"))
+        for col in VALUE_COLUMNS:
+            np.save(part / f"{col}.npy", _filled(data[col]))
+
+        # Rows are symbol-sorted, so each symbol is one contiguous [start, stop) range.
+        starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+        stops = np.r_[starts[1:], len(symbols)]
+        index = {str(symbols[a]): [int(a), int(b)] for a, b in zip(starts, stops)}
+        (part / INDEX).write_text(json.dumps(index), encoding="utf-8")
+
+        ts = np.asarray(data["TS"], dtype="datetime64[us]")
+        manifest_partitions.append(
+            {
+                "market_type": market_type,
+                "interval_minutes": int(interval_minutes),
+                "path": part.name,
+                "rows": int(len(symbols)),
+                "symbols": len(index),
+                "min_ts": str(ts.min()),
+                "max_ts": str(ts.max()),
+            }
+        )
+
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": "MIP.MART.MARKET_RETURNS",
+        "columns": {"TS": "datetime64[us]", **{col: "float64" for col in VALUE_COLUMNS}},
+        "partitions": manifest_partitions,
+    }
+    (staging / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    staging.rename(out_dir)
+    return manifest
+
+
+class BarStore:
+    """
+    Read side of export_bar_store(). Columns are memory-mapped lazily per partition; every array returned is a
+    read-only view into the mapped file.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.manifest = json.loads((self.path / MANIFEST).read_text(encoding="utf-8"))
+        self._partitions = {(p["market_type"], p["interval_minutes"]): p for p in self.manifest["partitions"]}
+        self._columns: dict[tuple, dict[str, np.ndarray]] = {}
+        self._indexes: dict[tuple, dict[str, list[int]]] = {}
+
+    def partitions(self) -> list[tuple[str, int]]:
+        return list(self._partitions)
+
+    def _key(self, market_type: str, interval_minutes: int) -> tuple:
+        key = (market_type, int(interval_minutes))
+        if key not in self._partitions:
+            raise KeyError(f"No bar store partition for {market_type}/{interval_minutes}")
+        return key
+
+    def _index(self, key: tuple) -> dict[str, list[int]]:
+        if key not in self._indexes:
+            part = self.path / self._partitions[key]["path"]
+            self._indexes[key] = json.loads((part / INDEX).read_text(encoding="utf-8"))
+        return self._indexes[key]
+
+    def column(self, market_type: str, interval_minutes: int, name: str) -> np.ndarray:
+        """Whole memory-mapped column for a partition (all symbols, symbol-sorted)."""
+        key = self._key(market_type, interval_minutes)
+        cols = self._columns.setdefault(key, {})
+        if name not in cols:
+            if name not in COLUMNS:
+                raise KeyError(f"Unknown bar store column {name!r}")
+            part = self.path / self._partitions[key]["path"]
+            cols[name] = np.load(part / f"{name}.npy", mmap_mode="r")
+        return cols[name]
+
+    def symbols(self, market_type: str, interval_minutes: int = 1440) -> list[str]:
+        return list(self._index(self._key(market_type, interval_minutes)))
+
+    def bars(
+        self,
+        symbol: str,
+        market_type: str,
+        interval_minutes: int = 1440,
+        start=None,
+        end=None,
+        columns: tuple[str, ...] = COLUMNS,
+    ) -> dict[str, np.ndarray]:
+        """
+        {column: view} for one symbol, optionally limited to start <= TS <= end (dates, datetimes, ISO strings or
+        numpy datetime64). Unknown symbols return empty views.
+        """
+        key = self._key(market_type, interval_minutes)
+        lo, hi = self._index(key).get(symbol, (0, 0))
+        ts = self.column(market_type, interval_minutes, "TS")[lo:hi]
+        if start is not None:
+            lo += int(np.searchsorted(ts, _as_datetime64(start), side="left"))
+        if end is not None:
+            hi = lo + int(np.searchsorted(self.column(market_type, interval_minutes, "TS")[lo:hi],
+                                          _as_datetime64(end), side="right"))
+        return {col: self.column(market_type, interval_minutes, col)[lo:hi] for col in columns}
+
+    def scan(self, market_type: str, interval_minutes: int = 1440, start=None, end=None,
+             columns: tuple[str, ...] = COLUMNS):
+        """Yield (symbol, {column: view}) for every symbol in the partition, in symbol order."""
+        for symbol in self.symbols(market_type, interval_minutes):
+            yield symbol, self.bars(symbol, market_type, interval_minutes, start, end, columns)
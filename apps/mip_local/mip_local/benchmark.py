@@ -0,0 +1,221 @@
+"""
+End-to-end benchmark on the local backend.
+For each scale (number of symbols) a fresh in-memory database is filled by synthetic.generate_market,
+run_daily_pipeline is replayed over the last N trading days (per-stage wall time and rows from the
+pipeline's step_timings) and the UI API endpoints are called through FastAPI's TestClient (median wall
+time, rows and bytes of the response). Results are plain JSON so runs from two commits can be diffed
+with compare().
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import duckdb
+
+from .backend import connect, reset
+from .pipeline import run_daily_pipeline
+from .synthetic import generate_market
+
+DEFAULT_SCALES = (100, 1000, 10000)
+_API_DIR = Path(__file__).resolve().parents[2] / "mip_ui_api"
+
+# (name, path template); {run_id} / {portfolio_id} are filled from the benchmark database.
+ENDPOINTS = (
+    ("runs", "/runs"),
+    ("run_detail", "/runs/{run_id}"),
+    ("run_profile", "/runs/{run_id}/profile"),
+    ("live_metrics", "/live/metrics"),
+    ("status", "/status"),
+    ("portfolios", "/portfolios"),
+    ("portfolio_detail", "/portfolios/{portfolio_id}"),
+    ("portfolio_snapshot", "/portfolios/{portfolio_id}/snapshot"),
+    ("brief_latest", "/briefs/latest?portfolio_id={portfolio_id}"),
+    ("signals", "/signals"),
+    ("today", "/today?portfolio_id={portfolio_id}"),
+    ("performance_summary", "/performance/summary"),
+    ("training_status", "/training/status"),
+)
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return out.stdout.strip() or "unknown"
+
+
+def _trading_days(end: date, count: int) -> list[datetime]:
+    days, d = [], end
+    while len(days) < count:
+        if d.isoweekday() <= 5:
+            days.append(datetime(d.year, d.month, d.day))
+        d -= timedelta(days=1)
+    return sorted(days)
+
+
+def _response_rows(payload) -> int:
+    if isinstance(payload, list):
+        return len(payload)
+    if isinstance(payload, dict):
+        return sum(len(v) for v in payload.values() if isinstance(v, list))
+    return 0
+
+
+def _api_client():
+    """TestClient on the UI API wired to the local backend, or (None, reason) when fastapi is missing."""
+    os.environ["MIP_DB_BACKEND"] = "local"
+    os.environ.pop("MIP_LOCAL_DB_PATH", None)
+    os.environ.pop("MIP_LOCAL_FIXTURES_DIR", None)
+    if str(_API_DIR) not in sys.path:
+        sys.path.insert(0, str(_API_DIR))
+    try:
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+    except ImportError as exc:
+        return None, str(exc)
+    return TestClient(app), None
+
+
+def bench_endpoints(conn, run_id: str, repeat: int = 3) -> dict:
+    """{name: {"status", "seconds" (median), "rows", "bytes"}} for ENDPOINTS."""
+    client, reason = _api_client()
+    if client is None:
+        return {"skipped": reason}
+    cur = conn.cursor()
+    cur.execute("select min(PORTFOLIO_ID) from MIP.APP.PORTFOLIO")
+    portfolio_id = cur.fetchone()[0] or 1
+    results = {}
+    for name, template in ENDPOINTS:
+        path = template.format(run_id=run_id, portfolio_id=portfolio_id)
+        samples, response = [], None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            response = client.get(path)
+            samples.append(time.perf_counter() - started)
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        results[name] = {
+            "path": path,
+            "status": response.status_code,
+            "seconds": round(statistics.median(samples), 6),
+            "rows": _response_rows(payload),
+            "bytes": len(response.content),
+        }
+    return results
+
+
+def bench_scale(n_symbols: int, years: float = 1.0, days: int = 5, repeat: int = 3,
+                endpoints: bool = True, seed: int = 0) -> dict:
+    """Generate n_symbols of synthetic history, replay the pipeline for `days` days, time stages/endpoints."""
+    reset()
+    conn = connect()
+    try:
+        started = time.perf_counter()
+        market = generate_market(conn, n_symbols, years=years, seed=seed)
+        generate_seconds = time.perf_counter() - started
+
+        stages, runs, run_id = {}, [], None
+        for to_ts in _trading_days(date.fromisoformat(market["end_date"]), days):
+            started = time.perf_counter()
+            summary = run_daily_pipeline(conn, to_ts=to_ts)
+            runs.append(round(time.perf_counter() - started, 6))
+            run_id = summary["run_id"]
+            for stage, timing in summary["step_timings"].items():
+                agg = stages.setdefault(stage, {"seconds": 0.0, "rows": 0})
+                agg["seconds"] += timing["seconds"]
+                agg["rows"] += timing["rows"] or 0
+        for agg in stages.values():
+            agg["seconds"] = round(agg["seconds"], 6)
+            agg["seconds_per_run"] = round(agg["seconds"] / max(len(runs), 1), 6)
+            agg["rows_per_sec"] = round(agg["rows"] / agg["seconds"], 1) if agg["seconds"] else None
+
+        return {
+            "symbols": n_symbols,
+            "market": market,
+            "generate_seconds": round(generate_seconds, 6),
+            "pipeline": {
+                "runs": len(runs),
+                "total_seconds": round(sum(runs), 6),
+                "median_run_seconds": round(statistics.median(runs), 6) if runs else None,
+                "stages": stages,
+            },
+            "endpoints": bench_endpoints(conn, run_id, repeat) if endpoints and run_id else {},
+        }
+    finally:
+        conn.close()
+        reset()
+
+
+def run_benchmark(scales=DEFAULT_SCALES, years: float = 1.0, days: int = 5, repeat: int = 3,
+                  endpoints: bool = True, seed: int = 0) -> dict:
+    """Benchmark every scale; the result carries enough metadata to compare across commits."""
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "duckdb": duckdb.__version__,
+            "platform": platform.platform(),
+            "years": years,
+            "days": days,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "scales": {
+            str(n): bench_scale(n, years=years, days=days, repeat=repeat, endpoints=endpoints, seed=seed)
+            for n in scales
+        },
+    }
+
+
+def _timings(result: dict) -> dict:
+    """Flatten a benchmark result to {"<scale>/<metric>": seconds}."""
+    flat = {}
+    for scale, data in result.get("scales", {}).items():
+        flat[f"{scale}/generate"] = data.get("generate_seconds")
+        pipeline = data.get("pipeline", {})
+        flat[f"{scale}/pipeline/median_run"] = pipeline.get("median_run_seconds")
+        for stage, timing in pipeline.get("stages", {}).items():
+            flat[f"{scale}/stage/{stage}"] = timing.get("seconds_per_run")
+        for name, timing in data.get("endpoints", {}).items():
+            if isinstance(timing, dict):
+                flat[f"{scale}/endpoint/{name}"] = timing.get("seconds")
+    return {k: v for k, v in flat.items() if v is not None}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, min_seconds: float = 0.005) -> list[dict]:
+    """
+    Metrics present in both results, slowest-ratio first. A metric is a regression when it is more than
+    `threshold` slower and the absolute difference exceeds min_seconds (filters timer noise on tiny steps).
+    """
+    old, new = _timings(baseline), _timings(current)
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        ratio = after / before if before else None
+        rows.append({
+            "metric": key,
+            "baseline": before,
+            "current": after,
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regression": ratio is not None and ratio > 1 + threshold and after - before > min_seconds,
+        })
+    return sorted(rows, key=lambda r: -(r["ratio"] or 0))
+
+
+def write_result(result: dict, out: str | Path | None = None) -> Path:
+    path = Path(out) if out else Path("bench_results") / f"{result['meta']['commit']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2, default=str), encoding="utf-8")
+    return path
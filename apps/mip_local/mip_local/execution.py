@@ -0,0 +1,48 @@
+"""
+Vectorized paper-execution engine for validated proposals.
+simulate_fills() prices every approved proposal of a run in one array pass, using the same arithmetic as the
+PORTFOLIO_TRADES merge in 189a_sp_agent_propose_and_execute.sql: slippage plus half the spread moves the mid price
+against the trade, NOTIONAL = equity * TARGET_WEIGHT, FEE = greatest(MIN_FEE, |NOTIONAL| * FEE_BPS / 10000) and
+CASH_AFTER = equity -/+ (NOTIONAL +/- FEE). The exposure (1% tolerance) and position-count caps have already
+rejected proposals by then, so every approved proposal with a price is filled. Pure numpy, so it can be checked
+against fixture proposals offline.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def _floats(values) -> np.ndarray:
+    """Nullable DuckDB columns arrive as masked arrays; NULL becomes NaN."""
+    return np.ma.filled(np.ma.asarray(values, dtype=np.float64), np.nan)
+
+
+def simulate_fills(side, mid_price, target_weight, total_equity, slippage_bps=2.0, fee_bps=1.0, min_fee=0.0,
+                   spread_bps=0.0) -> dict[str, np.ndarray]:
+    """
+    Fills for aligned proposal arrays (one element per proposal). total_equity is each proposal's portfolio equity.
+    Returns PRICE, QUANTITY, NOTIONAL, FEE, CASH_AFTER and FILLED (False where the mid price is missing or zero;
+    those rows are not executable and their other values are NaN).
+    """
+    side = np.asarray(side).astype(str)
+    mid = _floats(mid_price)
+    equity = _floats(total_equity)
+    notional = equity * _floats(target_weight)
+    is_buy = side == "BUY"
+    is_sell = side == "SELL"
+    cost = (slippage_bps + spread_bps / 2) / 10000
+    price = mid * np.where(is_buy, 1 + cost, np.where(is_sell, 1 - cost, 1.0))
+    filled = np.isfinite(price) & (price != 0) & np.isfinite(notional)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quantity = np.where(filled, notional / price, np.nan)
+    fee = np.maximum(min_fee or 0.0, np.abs(notional) * fee_bps / 10000)
+    cash_after = np.where(is_buy, equity - (notional + fee), np.where(is_sell, equity + (notional - fee), equity))
+    return {
+        "PRICE": np.where(filled, price, np.nan),
+        "QUANTITY": quantity,
+        "NOTIONAL": np.where(filled, notional, np.nan),
+        "FEE": np.where(filled, fee, np.nan),
+        "CASH_AFTER": np.where(filled, cash_after, np.nan),
+        "FILLED": filled,
+    }
+
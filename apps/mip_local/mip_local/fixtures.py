@@ -0,0 +1,116 @@
+"""
+Parquet fixtures for the local backend.
+One file per table named <SCHEMA>.<TABLE>.parquet (e.g. MART.MARKET_BARS.parquet). Loading appends
+into the existing MIP tables by column name; exporting writes every non-empty table.
+"""
+from pathlib import Path
+
+from .schema import TABLES
+
+
+def _fixture_path(fixtures_dir: str | Path, table: str) -> Path:
+    return Path(fixtures_dir) / f"{table}.parquet"
+
+
+def load_fixtures(db, fixtures_dir: str | Path) -> dict:
+    """Load every <SCHEMA>.<TABLE>.parquet in fixtures_dir; returns {table: rows_loaded}."""
+    loaded = {}
+    for table in TABLES:
+        path = _fixture_path(fixtures_dir, table)
+        if not path.exists():
+            continue
+        before = db.execute(f"select count(*) from MIP.{table}").fetchone()[0]
+        db.execute(f"insert into MIP.{table} by name select * from read_parquet(?)", [str(path)])
+        after = db.execute(f"select count(*) from MIP.{table}").fetchone()[0]
+        loaded[table] = after - before
+    _advance_sequences(db)
+    _backfill_pipeline_runs(db)
+    _backfill_outcome_stats(db)
+    return loaded
+
+
+def export_fixtures(db, fixtures_dir: str | Path) -> dict:
+    """Write every non-empty MIP table to fixtures_dir; returns {table: rows_written}."""
+    Path(fixtures_dir).mkdir(parents=True, exist_ok=True)
+    written = {}
+    for table in TABLES:
+        n = db.execute(f"select count(*) from MIP.{table}").fetchone()[0]
+        if not n:
+            continue
+        path = _fixture_path(fixtures_dir, table)
+        db.execute(f"copy (select * from MIP.{table}) to '{path}' (format parquet)")
+        written[table] = n
+    return written
+
+
+# Identity columns loaded from fixtures must not collide with later nextval() defaults.
+_SEQUENCE_COLUMNS = (
+    ("MIP.APP.SEQ_PATTERN_ID", "MIP.APP.PATTERN_DEFINITION", "PATTERN_ID"),
+    ("MIP.APP.SEQ_RECOMMENDATION_ID", "MIP.APP.RECOMMENDATION_LOG", "RECOMMENDATION_ID"),
+    ("MIP.APP.SEQ_PORTFOLIO_PROFILE_ID", "MIP.APP.PORTFOLIO_PROFILE", "PROFILE_ID"),
+    ("MIP.APP.SEQ_PORTFOLIO_ID", "MIP.APP.PORTFOLIO", "PORTFOLIO_ID"),
+    ("MIP.APP.SEQ_EPISODE_ID", "MIP.APP.PORTFOLIO_EPISODE", "EPISODE_ID"),
+    ("MIP.APP.SEQ_TRADE_ID", "MIP.APP.PORTFOLIO_TRADES", "TRADE_ID"),
+    ("MIP.AGENT_OUT.SEQ_BRIEF_ID", "MIP.AGENT_OUT.MORNING_BRIEF", "BRIEF_ID"),
+    ("MIP.AGENT_OUT.SEQ_PROPOSAL_ID", "MIP.AGENT_OUT.ORDER_PROPOSALS", "PROPOSAL_ID"),
+)
+
+
+def _advance_sequences(db) -> None:
+    # DuckDB has no ALTER SEQUENCE ... RESTART, so draw values until the sequence passes max(id).
+    for seq, table, column in _SEQUENCE_COLUMNS:
+        max_id = db.execute(f"select coalesce(max({column}), 0) from {table}").fetchone()[0]
+        if not max_id:
+            continue
+        current = db.execute(f"select nextval('{seq}')").fetchone()[0]
+        if current < max_id:
+            db.execute(f"select max(nextval('{seq}')) from range(?)", [int(max_id - current)])
+
+
+def _backfill_pipeline_runs(db) -> None:
+    """Summarize audit-log runs missing from PIPELINE_RUN (fixtures exported before it existed)."""
+    db.execute(
+        """
+        insert into MIP.APP.PIPELINE_RUN (
+            RUN_ID, EVENT_TYPE, STARTED_AT, COMPLETED_AT, STATUS, ROWS_AFFECTED, DURATION_SECONDS,
+            DETAILS, ERROR_MESSAGE
+        )
+        select
+            RUN_ID,
+            max(EVENT_TYPE),
+            min(EVENT_TS),
+            max(case when STATUS <> 'START' then EVENT_TS end),
+            coalesce(arg_max(case when STATUS <> 'START' then STATUS end,
+                             case when STATUS <> 'START' then EVENT_TS end), 'RUNNING'),
+            arg_max(ROWS_AFFECTED, EVENT_TS),
+            date_diff('millisecond', min(EVENT_TS), max(case when STATUS <> 'START' then EVENT_TS end)) / 1000.0,
+            arg_max(DETAILS, EVENT_TS),
+            arg_max(ERROR_MESSAGE, EVENT_TS)
+        from MIP.APP.MIP_AUDIT_LOG
+        where EVENT_TYPE in ('PIPELINE', 'REPLAY')
+          and EVENT_NAME = 'SP_RUN_DAILY_PIPELINE'
+          and RUN_ID is not null
+          and RUN_ID not in (select RUN_ID from MIP.APP.PIPELINE_RUN)
+        group by RUN_ID
+        """
+    )
+
+
+def _backfill_outcome_stats(db) -> None:
+    """RECOMMENDATION_OUTCOME_STATS from the loaded outcomes (same backfill as 105 on deploy)."""
+    db.execute(
+        """
+        insert into MIP.APP.RECOMMENDATION_OUTCOME_STATS (
+            STATS_KEY, TOTAL_OUTCOMES, LAST_CALCULATED_AT, LAST_BATCH_ROWS, PREV_CALCULATED_AT
+        )
+        with last as (select max(CALCULATED_AT) as TS from MIP.APP.RECOMMENDATION_OUTCOMES)
+        select
+            'ALL',
+            count(*),
+            max(o.CALCULATED_AT),
+            count_if(o.CALCULATED_AT = last.TS),
+            max(case when o.CALCULATED_AT < last.TS then o.CALCULATED_AT end)
+        from MIP.APP.RECOMMENDATION_OUTCOMES o, last
+        on conflict (STATS_KEY) do nothing
+        """
+    )
@@ -0,0 +1,1841 @@
+"""
+Local ports of the daily pipeline procedures (MIP/SQL/app) for the DuckDB backend.
+Each function mirrors one Snowflake procedure closely enough for development, UI work and
+benchmarks: same tables, same thresholds/config keys, same audit events (SP_LOG_EVENT /
+SP_AUDIT_LOG_STEP shapes), so /runs, /live and /briefs render against local data.
+Not a bit-for-bit replacement: training gates and ingestion are out of scope; agent proposals/execution
+(propose_and_execute) are ported but not part of run_daily_pipeline.
+"""
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from .execution import simulate_fills
+
+HORIZONS = (1, 3, 5, 10, 20)
+
+# SP_GENERATE_MOMENTUM_RECS defaults (070), overridden by MOMENTUM_DEMO params and APP_CONFIG.
+_MOMENTUM_DEFAULTS = {
+    "fast_window": 20,
+    "slow_window": 3,
+    "lookback_days": 1,
+    "min_return": 0.002,
+    "min_zscore": 1.0,
+    "market_type": "STOCK",
+    "interval_minutes": 1440,
+}
+
+
+def _now() -> datetime:
+    return datetime.now()
+
+
+def _json(value) -> str:
+    return json.dumps(value, default=str)
+
+
+def _execute(conn, sql: str, params=None):
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    return cur
+
+
+def _scalar(conn, sql: str, params=None):
+    row = _execute(conn, sql, params).fetchone()
+    return row[0] if row else None
+
+
+def _insert_rows(conn, table: str, columns: list[str], rows: list[tuple], chunk: int = 500) -> int:
+    """Multi-row VALUES inserts; DuckDB executemany runs one statement per row."""
+    if not rows:
+        return 0
+    cur = conn.cursor()
+    row_sql = "(" + ", ".join("?" for _ in columns) + ")"
+    for i in range(0, len(rows), chunk):
+        batch = rows[i:i + chunk]
+        cur.execute(
+            f"insert into {table} ({', '.join(columns)}) values " + ", ".join(row_sql for _ in batch),
+            [v for row in batch for v in row],
+        )
+    return len(rows)
+
+
+def _config_number(conn, key: str, default: float) -> float:
+    value = _scalar(
+        conn,
+        "select try_cast(CONFIG_VALUE as double) from MIP.APP.APP_CONFIG where CONFIG_KEY = ? limit 1",
+        [key],
+    )
+    return default if value is None else value
+
+
+# ---------------------------------------------------------------------------
+# Audit (055_app_audit_log.sql)
+# ---------------------------------------------------------------------------
+
+def log_event(conn, event_type, event_name, status, rows=None, details=None, error=None,
+              run_id=None, parent_run_id=None) -> str:
+    """SP_LOG_EVENT: PIPELINE events keep run_id; other events get a fresh id under parent_run_id."""
+    if event_type == "PIPELINE":
+        event_run_id = run_id or str(uuid.uuid4())
+    else:
+        parent_run_id = parent_run_id or run_id
+        event_run_id = str(uuid.uuid4())
+    event_ts = _now()
+    details_json = _json(details) if details is not None else None
+    _execute(
+        conn,
+        """
+        insert into MIP.APP.MIP_AUDIT_LOG (
+            EVENT_TS, RUN_ID, PARENT_RUN_ID, EVENT_TYPE, EVENT_NAME, STATUS,
+            ROWS_AFFECTED, DETAILS, ERROR_MESSAGE
+        ) values (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [event_ts, event_run_id, parent_run_id, event_type, event_name, status, rows, details_json, error],
+    )
+    if event_name == "SP_RUN_DAILY_PIPELINE" and event_type in ("PIPELINE", "REPLAY"):
+        _upsert_pipeline_run(conn, event_run_id, event_type, event_ts, status, rows, details_json, error)
+    return event_run_id
+
+
+def _upsert_pipeline_run(conn, run_id, event_type, event_ts, status, rows, details_json, error):
+    """PIPELINE_RUN merge from SP_LOG_EVENT: START opens the row as RUNNING, any other status completes it."""
+    if status == "START":
+        _execute(
+            conn,
+            """
+            insert into MIP.APP.PIPELINE_RUN (RUN_ID, EVENT_TYPE, STARTED_AT, STATUS, DETAILS, UPDATED_AT)
+            values (?, ?, ?, 'RUNNING', ?, ?)
+            on conflict (RUN_ID) do update set
+                STARTED_AT = least(PIPELINE_RUN.STARTED_AT, excluded.STARTED_AT),
+                UPDATED_AT = excluded.UPDATED_AT
+            """,
+            [run_id, event_type, event_ts, details_json, event_ts],
+        )
+        return
+    _execute(
+        conn,
+        """
+        insert into MIP.APP.PIPELINE_RUN (
+            RUN_ID, EVENT_TYPE, STARTED_AT, COMPLETED_AT, STATUS, ROWS_AFFECTED, DURATION_SECONDS,
+            DETAILS, ERROR_MESSAGE, UPDATED_AT
+        ) values (?, ?, ?, ?, ?, ?, 0, ?, ?, ?)
+        on conflict (RUN_ID) do update set
+            COMPLETED_AT = excluded.COMPLETED_AT,
+            STATUS = excluded.STATUS,
+            ROWS_AFFECTED = excluded.ROWS_AFFECTED,
+            DURATION_SECONDS = date_diff('millisecond', PIPELINE_RUN.STARTED_AT, excluded.COMPLETED_AT) / 1000.0,
+            DETAILS = excluded.DETAILS,
+            ERROR_MESSAGE = excluded.ERROR_MESSAGE,
+            UPDATED_AT = excluded.UPDATED_AT
+        """,
+        [run_id, event_type, event_ts, event_ts, status, rows, details_json, error, event_ts],
+    )
+
+
+def audit_log_step(conn, parent_run_id, event_name, status, rows, details, error=None) -> str:
+    """SP_AUDIT_LOG_STEP: PIPELINE_STEP row, idempotent on (parent, name, status, step_name, scope, scope_key)."""
+    details = dict(details or {})
+    details.setdefault("scope", "AGG")
+    existing = _scalar(
+        conn,
+        """
+        select RUN_ID from MIP.APP.MIP_AUDIT_LOG
+         where PARENT_RUN_ID = ? and EVENT_TYPE = 'PIPELINE_STEP' and EVENT_NAME = ? and STATUS = ?
+           and json_extract_string(DETAILS, '$.step_name') is not distinct from ?
+           and coalesce(json_extract_string(DETAILS, '$.scope'), 'AGG') = ?
+           and json_extract_string(DETAILS, '$.scope_key') is not distinct from ?
+         limit 1
+        """,
+        [parent_run_id, event_name, status, details.get("step_name"), details["scope"],
+         None if details.get("scope_key") is None else str(details.get("scope_key"))],
+    )
+    if existing:
+        return existing
+    step_run_id = str(uuid.uuid4())
+    _execute(
+        conn,
+        """
+        insert into MIP.APP.MIP_AUDIT_LOG (
+            EVENT_TS, RUN_ID, PARENT_RUN_ID, EVENT_TYPE, EVENT_NAME, STATUS,
+            ROWS_AFFECTED, DETAILS, ERROR_MESSAGE
+        ) values (current_timestamp, ?, ?, 'PIPELINE_STEP', ?, ?, ?, ?, ?)
+        """,
+        [step_run_id, parent_run_id, event_name, status, rows, _json(details), error],
+    )
+    return step_run_id
+
+
+_DETAIL_EVENT = """
+    EVENT_TYPE in ('PIPELINE_STEP', 'REPLAY')
+    and PARENT_RUN_ID is not null
+    and coalesce(json_extract_string(DETAILS, '$.scope'), 'AGG') <> 'AGG'
+"""
+
+
+def audit_log_retention(conn, detail_retention_days=None, retention_days=None, as_of=None) -> dict:
+    """SP_AUDIT_LOG_RETENTION (056): roll up + delete old detail events, move old events to the archive."""
+    detail_days = detail_retention_days
+    if detail_days is None:
+        detail_days = _config_number(conn, "AUDIT_LOG_DETAIL_RETENTION_DAYS", 30)
+    days = retention_days
+    if days is None:
+        days = _config_number(conn, "AUDIT_LOG_RETENTION_DAYS", 90)
+    days = max(days, detail_days)
+    as_of = as_of or _now()
+    detail_cutoff = as_of - timedelta(days=detail_days)
+    archive_cutoff = as_of - timedelta(days=days)
+    retention_run_id = str(uuid.uuid4())
+
+    detail_events = _scalar(
+        conn, f"select count(*) from MIP.APP.MIP_AUDIT_LOG where EVENT_TS < ? and {_DETAIL_EVENT}", [detail_cutoff]
+    )
+    _execute(
+        conn,
+        f"""
+        insert into MIP.APP.MIP_AUDIT_LOG_ROLLUP (
+            ROOT_RUN_ID, EVENT_TYPE, EVENT_NAME, SCOPE, STATUS, EVENT_COUNT, SCOPE_KEY_COUNT,
+            ROWS_AFFECTED_SUM, ERROR_COUNT, FIRST_EVENT_TS, LAST_EVENT_TS, SAMPLE_ERROR, ROLLED_UP_AT
+        )
+        select
+            PARENT_RUN_ID,
+            EVENT_TYPE,
+            EVENT_NAME,
+            json_extract_string(DETAILS, '$.scope'),
+            STATUS,
+            count(*),
+            count(distinct json_extract_string(DETAILS, '$.scope_key')),
+            sum(ROWS_AFFECTED),
+            count_if(ERROR_MESSAGE is not null),
+            min(EVENT_TS),
+            max(EVENT_TS),
+            max(ERROR_MESSAGE),
+            ?
+        from MIP.APP.MIP_AUDIT_LOG
+        where EVENT_TS < ? and {_DETAIL_EVENT}
+        group by all
+        on conflict (ROOT_RUN_ID, EVENT_TYPE, EVENT_NAME, SCOPE, STATUS) do update set
+            EVENT_COUNT = MIP_AUDIT_LOG_ROLLUP.EVENT_COUNT + excluded.EVENT_COUNT,
+            SCOPE_KEY_COUNT = greatest(MIP_AUDIT_LOG_ROLLUP.SCOPE_KEY_COUNT, excluded.SCOPE_KEY_COUNT),
+            ROWS_AFFECTED_SUM = coalesce(MIP_AUDIT_LOG_ROLLUP.ROWS_AFFECTED_SUM, 0)
+                                + coalesce(excluded.ROWS_AFFECTED_SUM, 0),
+            ERROR_COUNT = MIP_AUDIT_LOG_ROLLUP.ERROR_COUNT + excluded.ERROR_COUNT,
+            FIRST_EVENT_TS = least(MIP_AUDIT_LOG_ROLLUP.FIRST_EVENT_TS, excluded.FIRST_EVENT_TS),
+            LAST_EVENT_TS = greatest(MIP_AUDIT_LOG_ROLLUP.LAST_EVENT_TS, excluded.LAST_EVENT_TS),
+            SAMPLE_ERROR = coalesce(MIP_AUDIT_LOG_ROLLUP.SAMPLE_ERROR, excluded.SAMPLE_ERROR),
+            ROLLED_UP_AT = excluded.ROLLED_UP_AT
+        """,
+        [as_of, detail_cutoff],
+    )
+    _execute(conn, f"delete from MIP.APP.MIP_AUDIT_LOG where EVENT_TS < ? and {_DETAIL_EVENT}", [detail_cutoff])
+
+    archived_events = _scalar(conn, "select count(*) from MIP.APP.MIP_AUDIT_LOG where EVENT_TS < ?", [archive_cutoff])
+    _execute(
+        conn,
+        """
+        insert into MIP.APP.MIP_AUDIT_LOG_ARCHIVE
+        select *, ? from MIP.APP.MIP_AUDIT_LOG where EVENT_TS < ?
+        """,
+        [as_of, archive_cutoff],
+    )
+    _execute(conn, "delete from MIP.APP.MIP_AUDIT_LOG where EVENT_TS < ?", [archive_cutoff])
+    _execute(
+        conn,
+        """
+        insert into MIP.APP.AUDIT_LOG_RETENTION_STATE (
+            RETENTION_RUN_ID, ROLLED_UP_BEFORE, ARCHIVED_BEFORE, ROLLED_UP_EVENTS, ARCHIVED_EVENTS, CREATED_AT
+        ) values (?, ?, ?, ?, ?, ?)
+        """,
+        [retention_run_id, detail_cutoff, archive_cutoff, detail_events, archived_events, as_of],
+    )
+    result = {
+        "retention_run_id": retention_run_id,
+        "detail_retention_days": detail_days,
+        "retention_days": days,
+        "rolled_up_before": detail_cutoff,
+        "archived_before": archive_cutoff,
+        "detail_events": detail_events,
+        "archived_events": archived_events,
+    }
+    log_event(conn, "AUDIT", "SP_AUDIT_LOG_RETENTION", "SUCCESS", detail_events + archived_events, result,
+              None, retention_run_id)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Recommendations (070_sp_generate_momentum_recs.sql)
+# ---------------------------------------------------------------------------
+
+def _momentum_patterns(conn, market_type, interval_minutes):
+    defaults = dict(_MOMENTUM_DEFAULTS)
+    row = _execute(
+        conn,
+        "select PARAMS_JSON from MIP.APP.PATTERN_DEFINITION where upper(NAME) = 'MOMENTUM_DEMO' limit 1",
+    ).fetchone()
+    if row and row[0]:
+        defaults.update({k: v for k, v in json.loads(row[0]).items() if v is not None})
+    min_trades = _config_number(conn, "PATTERN_MIN_TRADES", 30)
+    rows = _execute(
+        conn,
+        """
+        select PATTERN_ID, upper(NAME), PARAMS_JSON
+          from MIP.APP.PATTERN_DEFINITION
+         where coalesce(IS_ACTIVE, 'N') = 'Y'
+           and coalesce(ENABLED, true)
+           and (LAST_TRADE_COUNT is null or LAST_TRADE_COUNT = 0 or LAST_TRADE_COUNT >= ?)
+         order by PATTERN_ID
+        """,
+        [min_trades],
+    ).fetchall()
+    patterns = []
+    for pattern_id, key, params_json in rows:
+        params = {**defaults, **{k: v for k, v in json.loads(params_json or "{}").items() if v is not None}}
+        params["market_type"] = str(params.get("market_type") or market_type or defaults["market_type"]).upper()
+        params["interval_minutes"] = int(params.get("interval_minutes") or interval_minutes or 1440)
+        if market_type and params["market_type"] != market_type.upper():
+            continue
+        if interval_minutes and params["interval_minutes"] != interval_minutes:
+            continue
+        patterns.append((pattern_id, key, params))
+    return patterns
+
+
+def generate_momentum_recs(conn, market_type=None, interval_minutes=None, run_id=None,
+                           min_return=None, lookback_days=None, min_zscore=None, to_ts=None) -> dict:
+    """
+    SP_GENERATE_MOMENTUM_RECS: insert momentum recommendations at the latest bar (not-exists dedup).
+    to_ts caps the as-of bar, standing in for the replay-scoped MARKET_RETURNS view.
+    """
+    run_id = run_id or str(uuid.uuid4())
+    log_event(conn, "RECOMMENDATIONS", "SP_GENERATE_MOMENTUM_RECS", "START", None,
+              {"scope": "MARKET_TYPE", "scope_key": market_type, "step_name": "recommendations",
+               "market_type": market_type, "interval_minutes": interval_minutes}, None, run_id)
+    _execute(
+        conn,
+        """
+        delete from MIP.APP.RECOMMENDATION_LOG
+         where PATTERN_ID in (select PATTERN_ID from MIP.APP.PATTERN_DEFINITION where coalesce(IS_ACTIVE, 'N') <> 'Y')
+        """,
+    )
+    min_volume = _config_number(conn, "MIN_VOLUME", 1000)
+    rows_before = _scalar(conn, "select count(*) from MIP.APP.RECOMMENDATION_LOG")
+    skipped = []
+    for pattern_id, key, params in _momentum_patterns(conn, market_type, interval_minutes):
+        mt, interval = params["market_type"], params["interval_minutes"]
+        fast, slow = max(int(params["fast_window"]), 1), max(int(params["slow_window"]), 1)
+        zscore = min_zscore if min_zscore is not None else params["min_zscore"]
+        threshold = min_return if min_return is not None else params["min_return"]
+        history_days = max(int(lookback_days or params["lookback_days"]), 30)
+        if mt not in ("STOCK", "ETF", "FX"):
+            skipped.append({"pattern": key, "reason": "unsupported market_type"})
+            continue
+        source = "MIP.MART.MARKET_BARS" if mt == "FX" else "MIP.MART.MARKET_RETURNS"
+        as_of_ts = _scalar(
+            conn,
+            f"""
+            select max(TS) from {source}
+             where MARKET_TYPE = ? and INTERVAL_MINUTES = ? and (?::timestamp is null or TS <= ?)
+            """,
+            [mt, interval, to_ts, to_ts],
+        )
+        if as_of_ts is None:
+            skipped.append({"pattern": key, "reason": "as_of_ts is null"})
+            continue
+        if mt == "FX":
+            sql = f"""
+                with bars as (
+                    select mb.*,
+                           lag(CLOSE) over w as PREV_CLOSE
+                      from MIP.MART.MARKET_BARS mb
+                     where MARKET_TYPE = ? and INTERVAL_MINUTES = ?
+                       and TS::date >= ?::date - {history_days}
+                    window w as (partition by SYMBOL, MARKET_TYPE, INTERVAL_MINUTES order by TS)
+                ),
+                returns as (
+                    select b.*,
+                           case when PREV_CLOSE is null or PREV_CLOSE = 0 then null else CLOSE / PREV_CLOSE - 1 end as RETURN_SIMPLE
+                      from bars b
+                ),
+                scored as (
+                    select r.*,
+                           avg(CLOSE) over (w rows between {fast - 1} preceding and current row) as SMA_FAST,
+                           avg(CLOSE) over (w rows between {slow - 1} preceding and current row) as SMA_SLOW,
+                           avg(RETURN_SIMPLE) over (w rows between {fast - 1} preceding and current row) as AVG_RETURN_WINDOW,
+                           stddev_samp(RETURN_SIMPLE) over (w rows between {fast - 1} preceding and current row) as STDDEV_WINDOW
+                      from returns r
+                    window w as (partition by SYMBOL, MARKET_TYPE, INTERVAL_MINUTES order by TS)
+                )
+                select SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS, RETURN_SIMPLE,
+                       json_object('pattern_key', ?, 'return_simple', RETURN_SIMPLE, 'prev_close', PREV_CLOSE,
+                                   'close', CLOSE, 'sma_fast', SMA_FAST, 'sma_slow', SMA_SLOW,
+                                   'avg_return_window', AVG_RETURN_WINDOW)
+                  from scored
+                 where RETURN_SIMPLE is not null and SMA_FAST is not null and SMA_SLOW is not null
+                   and CLOSE >= SMA_FAST and CLOSE >= SMA_SLOW
+                   and coalesce(AVG_RETURN_WINDOW, 0) >= ?
+                   and (?::double is null or STDDEV_WINDOW is null or STDDEV_WINDOW = 0 or RETURN_SIMPLE / STDDEV_WINDOW >= ?)
+                   and TS::date = ?::date
+            """
+            params_list = [mt, interval, as_of_ts, key, threshold, zscore, zscore, as_of_ts]
+        else:
+            sql = f"""
+                with returns_filtered as (
+                    select r.*
+                      from MIP.MART.MARKET_RETURNS r
+                     where MARKET_TYPE = ? and INTERVAL_MINUTES = ?
+                       and RETURN_SIMPLE is not null and VOLUME >= ?
+                       and TS::date >= ?::date - {history_days}
+                ),
+                scored as (
+                    select rf.*,
+                           count_if(RETURN_SIMPLE > 0) over (w rows between {slow} preceding and 1 preceding) as POSITIVE_LAG_COUNT,
+                           max(CLOSE) over (w rows between {fast} preceding and 1 preceding) as MAX_PREV_CLOSE,
+                           stddev_samp(RETURN_SIMPLE) over (w rows between {fast - 1} preceding and current row) as STDDEV_WINDOW
+                      from returns_filtered rf
+                    window w as (partition by SYMBOL, MARKET_TYPE, INTERVAL_MINUTES order by TS)
+                )
+                select SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS, RETURN_SIMPLE,
+                       json_object('pattern_key', ?, 'return_simple', RETURN_SIMPLE,
+                                   'prev_close', PREV_CLOSE, 'close', CLOSE)
+                  from scored
+                 where RETURN_SIMPLE >= ?
+                   and POSITIVE_LAG_COUNT >= ?
+                   and (MAX_PREV_CLOSE is null or CLOSE >= MAX_PREV_CLOSE)
+                   and (?::double is null or STDDEV_WINDOW is null
+                        or (STDDEV_WINDOW > 0 and RETURN_SIMPLE / STDDEV_WINDOW >= ?))
+                   and TS::date = ?::date
+            """
+            params_list = [mt, interval, min_volume, as_of_ts, key, threshold, slow, zscore, zscore, as_of_ts]
+        _execute(
+            conn,
+            f"""
+            insert into MIP.APP.RECOMMENDATION_LOG (PATTERN_ID, SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS, SCORE, DETAILS)
+            select {int(pattern_id)}, p.*
+              from ({sql}) p (SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS, SCORE, DETAILS)
+             where not exists (
+                select 1 from MIP.APP.RECOMMENDATION_LOG existing
+                 where existing.PATTERN_ID = {int(pattern_id)}
+                   and existing.SYMBOL = p.SYMBOL
+                   and existing.MARKET_TYPE = p.MARKET_TYPE
+                   and existing.INTERVAL_MINUTES = p.INTERVAL_MINUTES
+                   and existing.TS = p.TS
+             )
+            """,
+            params_list,
+        )
+    rows_after = _scalar(conn, "select count(*) from MIP.APP.RECOMMENDATION_LOG")
+    result = {
+        "status": "SUCCESS",
+        "market_type": market_type,
+        "rows_before": rows_before,
+        "rows_after": rows_after,
+        "inserted_count": rows_after - rows_before,
+        "skipped": skipped,
+    }
+    log_event(conn, "RECOMMENDATIONS", "SP_GENERATE_MOMENTUM_RECS", "SUCCESS", result["inserted_count"],
+              {"scope": "MARKET_TYPE", "scope_key": market_type, "step_name": "recommendations", **result},
+              None, run_id)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Evaluation (105_sp_evaluate_recommendations.sql)
+# ---------------------------------------------------------------------------
+
+def evaluate_recommendations(conn, from_ts=None, to_ts=None, min_return_threshold=0.0, run_id=None) -> dict:
+    """SP_EVALUATE_RECOMMENDATIONS: forward returns at 1/3/5/10/20 bars, upserted into RECOMMENDATION_OUTCOMES."""
+    run_id = run_id or str(uuid.uuid4())
+    to_ts = to_ts or _now()
+    from_ts = from_ts or to_ts - timedelta(days=90)
+    thr = min_return_threshold or 0.0
+    log_event(conn, "EVALUATION", "SP_EVALUATE_RECOMMENDATIONS", "START", None,
+              {"scope": "AGG", "step_name": "evaluation", "from_ts": from_ts, "to_ts": to_ts,
+               "min_return_threshold": thr}, None, run_id)
+    before = _scalar(conn, "select count(*) from MIP.APP.RECOMMENDATION_OUTCOMES")
+    calc_ts = _now()
+    horizons = ", ".join(f"({h})" for h in HORIZONS)
+    cur = _execute(
+        conn,
+        f"""
+        insert or replace into MIP.APP.RECOMMENDATION_OUTCOMES (
+            RECOMMENDATION_ID, HORIZON_BARS, ENTRY_TS, EXIT_TS, ENTRY_PRICE, EXIT_PRICE,
+            REALIZED_RETURN, DIRECTION, HIT_FLAG, HIT_RULE, MIN_RETURN_THRESHOLD, EVAL_STATUS, CALCULATED_AT
+        )
+        with horizons(HORIZON_BARS) as (values {horizons}),
+        entry_bars as (
+            select r.RECOMMENDATION_ID, r.SYMBOL, r.MARKET_TYPE, r.INTERVAL_MINUTES,
+                   r.TS as ENTRY_TS, b.CLOSE as ENTRY_PRICE
+              from MIP.APP.RECOMMENDATION_LOG r
+              left join MIP.MART.MARKET_BARS b
+                on b.SYMBOL = r.SYMBOL and b.MARKET_TYPE = r.MARKET_TYPE
+               and b.INTERVAL_MINUTES = r.INTERVAL_MINUTES and b.TS = r.TS
+             where r.TS >= ? and r.TS <= ?
+        ),
+        future_ranked as (
+            select e.RECOMMENDATION_ID, b.TS as EXIT_TS, b.CLOSE as EXIT_PRICE,
+                   row_number() over (partition by e.RECOMMENDATION_ID order by b.TS) as FUTURE_RN
+              from entry_bars e
+              join MIP.MART.MARKET_BARS b
+                on b.SYMBOL = e.SYMBOL and b.MARKET_TYPE = e.MARKET_TYPE
+               and b.INTERVAL_MINUTES = e.INTERVAL_MINUTES and b.TS > e.ENTRY_TS
+             where e.ENTRY_PRICE is not null and e.ENTRY_PRICE <> 0
+        ),
+        future_bars as (
+            select e.RECOMMENDATION_ID, e.ENTRY_TS, e.ENTRY_PRICE, h.HORIZON_BARS, fr.EXIT_TS, fr.EXIT_PRICE
+              from entry_bars e
+             cross join horizons h
+              left join future_ranked fr
+                on fr.RECOMMENDATION_ID = e.RECOMMENDATION_ID and fr.FUTURE_RN = h.HORIZON_BARS
+        )
+        select
+            RECOMMENDATION_ID, HORIZON_BARS, ENTRY_TS, EXIT_TS, ENTRY_PRICE, EXIT_PRICE,
+            case when ENTRY_PRICE <> 0 and EXIT_PRICE <> 0 then EXIT_PRICE / ENTRY_PRICE - 1 end,
+            'LONG',
+            case when ENTRY_PRICE <> 0 and EXIT_PRICE <> 0 then (EXIT_PRICE / ENTRY_PRICE - 1) >= ? end,
+            'THRESHOLD',
+            ?,
+            case
+                when ENTRY_PRICE is null or ENTRY_PRICE = 0 then 'FAILED_NO_ENTRY_BAR'
+                when EXIT_PRICE is null or EXIT_PRICE = 0 then 'INSUFFICIENT_FUTURE_DATA'
+                else 'SUCCESS'
+            end,
+            ?
+        from future_bars
+        """,
+        [from_ts, to_ts, thr, thr, calc_ts],
+    )
+    merged = cur.fetchone()[0] if cur.description else None
+    after = _scalar(conn, "select count(*) from MIP.APP.RECOMMENDATION_OUTCOMES")
+    if merged:
+        _execute(
+            conn,
+            """
+            insert into MIP.APP.RECOMMENDATION_OUTCOME_STATS (
+                STATS_KEY, TOTAL_OUTCOMES, LAST_CALCULATED_AT, LAST_BATCH_ROWS, PREV_CALCULATED_AT, UPDATED_AT
+            ) values ('ALL', ?, ?, ?, null, ?)
+            on conflict (STATS_KEY) do update set
+                TOTAL_OUTCOMES = excluded.TOTAL_OUTCOMES,
+                PREV_CALCULATED_AT = RECOMMENDATION_OUTCOME_STATS.LAST_CALCULATED_AT,
+                LAST_CALCULATED_AT = excluded.LAST_CALCULATED_AT,
+                LAST_BATCH_ROWS = excluded.LAST_BATCH_ROWS,
+                UPDATED_AT = excluded.UPDATED_AT
+            """,
+            [after, calc_ts, merged, calc_ts],
+        )
+    horizon_counts = dict(
+        _execute(
+            conn,
+            """
+            select HORIZON_BARS, count(*) from MIP.APP.RECOMMENDATION_OUTCOMES
+             where ENTRY_TS >= ? and ENTRY_TS <= ? and EVAL_STATUS = 'SUCCESS'
+             group by HORIZON_BARS
+            """,
+            [from_ts, to_ts],
+        ).fetchall()
+    )
+    result = {
+        "status": "SUCCESS",
+        "from_ts": from_ts,
+        "to_ts": to_ts,
+        "rows_merged": merged,
+        "rows_delta": after - before,
+        "horizon_counts": horizon_counts,
+    }
+    log_event(conn, "EVALUATION", "SP_EVALUATE_RECOMMENDATIONS", "SUCCESS", merged,
+              {"scope": "AGG", "step_name": "evaluation", **result}, None, run_id)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Portfolio simulation (180_sp_run_portfolio_simulation.sql)
+# ---------------------------------------------------------------------------
+
+def run_portfolio_simulation(conn, portfolio_id, from_ts, to_ts, run_id=None) -> dict:
+    """SP_RUN_PORTFOLIO_SIMULATION: bar-by-bar exits then entries, writes trades/positions/daily."""
+    sim_run_id = str(uuid.uuid4())
+    row = _execute(
+        conn,
+        """
+        select p.STARTING_CASH, p.PROFILE_ID, p.LAST_SIMULATION_RUN_ID,
+               prof.MAX_POSITIONS, prof.MAX_POSITION_PCT, prof.BUST_EQUITY_PCT,
+               prof.BUST_ACTION, prof.DRAWDOWN_STOP_PCT
+          from MIP.APP.PORTFOLIO p
+          left join MIP.APP.PORTFOLIO_PROFILE prof on prof.PROFILE_ID = p.PROFILE_ID
+         where p.PORTFOLIO_ID = ?
+        """,
+        [portfolio_id],
+    ).fetchone()
+    if row is None or row[0] is None:
+        log_event(conn, "PORTFOLIO_SIM", "FAIL", "ERROR", None,
+                  {"portfolio_id": portfolio_id, "reason": "PORTFOLIO_NOT_FOUND"}, "Portfolio not found",
+                  sim_run_id, run_id)
+        return {"status": "ERROR", "message": "Portfolio not found", "portfolio_id": portfolio_id,
+                "run_id": sim_run_id}
+    starting_cash, profile_id, last_sim_run_id, max_positions, max_position_pct, bust_pct, _, dd_stop = row
+    # After a hard reset (no previous run) only the last day is simulated, as in 180.
+    effective_from_ts = from_ts if last_sim_run_id else datetime.combine(to_ts.date(), datetime.min.time())
+    max_positions = int(max_positions or 5)
+    max_position_pct = float(max_position_pct or 0.05)
+    bust_pct = 0.60 if bust_pct is None else float(bust_pct)
+    dd_stop = 0.10 if dd_stop is None else float(dd_stop)
+    slippage_bps = _config_number(conn, "SLIPPAGE_BPS", 2)
+    fee_bps = _config_number(conn, "FEE_BPS", 1)
+    min_fee = _config_number(conn, "MIN_FEE", 0)
+    spread_bps = _config_number(conn, "SPREAD_BPS", 0)
+    log_event(conn, "PORTFOLIO_SIM", "START", "INFO", None,
+              {"portfolio_id": portfolio_id, "from_ts": from_ts, "to_ts": to_ts,
+               "effective_from_ts": effective_from_ts, "profile_id": profile_id}, None, sim_run_id, run_id)
+
+    signals = _execute(
+        conn,
+        """
+        select s.TS, s.SYMBOL, s.MARKET_TYPE, s.SCORE, eb.BAR_INDEX, eb.CLOSE, xb.BAR_INDEX
+          from MIP.MART.V_PORTFOLIO_SIGNALS s
+          join MIP.MART.V_BAR_INDEX eb
+            on eb.SYMBOL = s.SYMBOL and eb.MARKET_TYPE = s.MARKET_TYPE
+           and eb.INTERVAL_MINUTES = s.INTERVAL_MINUTES and eb.TS = s.TS
+          join MIP.MART.V_BAR_INDEX xb
+            on xb.SYMBOL = s.SYMBOL and xb.MARKET_TYPE = s.MARKET_TYPE
+           and xb.INTERVAL_MINUTES = s.INTERVAL_MINUTES and xb.BAR_INDEX = eb.BAR_INDEX + s.HORIZON_BARS
+         where s.INTERVAL_MINUTES = 1440 and s.TS between ? and ? and xb.TS <= ?
+         order by s.TS, s.SCORE desc
+        """,
+        [effective_from_ts, to_ts, to_ts],
+    ).fetchall()
+    signals_by_ts: dict = {}
+    for sig in signals:
+        signals_by_ts.setdefault(sig[0], []).append(sig)
+
+    closes: dict = {}
+    for ts, symbol, market_type, close in _execute(
+        conn,
+        """
+        select TS, SYMBOL, MARKET_TYPE, CLOSE from MIP.MART.V_BAR_INDEX
+         where INTERVAL_MINUTES = 1440 and TS between ? and ?
+        """,
+        [effective_from_ts, to_ts],
+    ).fetchall():
+        closes[(ts, symbol, market_type)] = close
+    spine = _execute(
+        conn,
+        """
+        select TS, min(BAR_INDEX) from MIP.MART.V_BAR_INDEX
+         where INTERVAL_MINUTES = 1440 and TS between ? and ?
+         group by TS order by TS
+        """,
+        [effective_from_ts, to_ts],
+    ).fetchall()
+
+    cash = float(starting_cash)
+    peak = cash
+    blocked = False
+    block_reason = None
+    positions: list[dict] = []
+    trades: list[tuple] = []
+    position_rows: list[tuple] = []
+    daily: list[tuple] = []
+    prev_total = None
+    buy_mult = 1 + (slippage_bps + spread_bps / 2) / 10000
+    sell_mult = 1 - (slippage_bps + spread_bps / 2) / 10000
+
+    for bar_ts, bar_index in spine:
+        for pos in [p for p in positions if p["hold_until_index"] <= bar_index]:
+            price = closes.get((bar_ts, pos["symbol"], pos["market_type"]))
+            if price is None:
+                continue
+            exec_price = price * sell_mult
+            notional = exec_price * pos["quantity"]
+            fee = max(min_fee, abs(notional) * fee_bps / 10000)
+            cash += notional - fee
+            trades.append((portfolio_id, sim_run_id, pos["symbol"], pos["market_type"], bar_ts, "SELL",
+                           exec_price, pos["quantity"], notional, notional - fee - pos["cost_basis"], cash,
+                           pos["score"]))
+            positions.remove(pos)
+
+        equity_value = sum(
+            p["quantity"] * closes.get((bar_ts, p["symbol"], p["market_type"]), 0) for p in positions
+        )
+        total = cash + equity_value
+        peak = max(peak, total)
+        drawdown = (peak - total) / peak if peak else None
+        if not blocked and bust_pct > 0 and total <= float(starting_cash) * bust_pct:
+            blocked, block_reason = True, "BUST_EQUITY"
+        elif not blocked and dd_stop > 0 and drawdown is not None and drawdown >= dd_stop:
+            blocked, block_reason = True, "DRAWDOWN_STOP"
+        max_position_value = total * max_position_pct
+
+        if not blocked:
+            for _, symbol, market_type, score, entry_index, entry_price, hold_until in signals_by_ts.get(bar_ts, []):
+                if len(positions) >= max_positions:
+                    break
+                if any(p["symbol"] == symbol and p["market_type"] == market_type for p in positions):
+                    continue
+                qty = min(max_position_value, cash) / entry_price if entry_price else 0
+                exec_price = entry_price * buy_mult
+                notional = qty * exec_price
+                fee = max(min_fee, abs(notional) * fee_bps / 10000)
+                total_cost = notional + fee
+                if qty <= 0 or total_cost > cash:
+                    continue
+                cash -= total_cost
+                positions.append({"symbol": symbol, "market_type": market_type, "quantity": qty,
+                                  "cost_basis": total_cost, "score": score, "hold_until_index": hold_until})
+                trades.append((portfolio_id, sim_run_id, symbol, market_type, bar_ts, "BUY", exec_price, qty,
+                               notional, None, cash, score))
+                position_rows.append((portfolio_id, sim_run_id, symbol, market_type, bar_ts, exec_price, qty,
+                                      total_cost, score, entry_index, hold_until))
+
+        equity_value = sum(
+            p["quantity"] * closes.get((bar_ts, p["symbol"], p["market_type"]), 0) for p in positions
+        )
+        total = cash + equity_value
+        peak = max(peak, total)
+        daily.append((portfolio_id, sim_run_id, bar_ts, cash, equity_value, total, len(positions),
+                       0 if prev_total is None else total - prev_total,
+                       None if not prev_total else (total - prev_total) / prev_total,
+                       peak, (peak - total) / peak if peak else None,
+                       "BUST" if block_reason == "BUST_EQUITY" else "ACTIVE"))
+        prev_total = total
+
+    trade_columns = ["PORTFOLIO_ID", "RUN_ID", "SYMBOL", "MARKET_TYPE", "TRADE_TS", "SIDE", "PRICE",
+                     "QUANTITY", "NOTIONAL", "REALIZED_PNL", "CASH_AFTER", "SCORE", "INTERVAL_MINUTES"]
+    _insert_rows(conn, "MIP.APP.PORTFOLIO_TRADES", trade_columns, [t + (1440,) for t in trades])
+    position_columns = ["PORTFOLIO_ID", "RUN_ID", "SYMBOL", "MARKET_TYPE", "ENTRY_TS", "ENTRY_PRICE", "QUANTITY",
+                        "COST_BASIS", "ENTRY_SCORE", "ENTRY_INDEX", "HOLD_UNTIL_INDEX", "INTERVAL_MINUTES"]
+    _insert_rows(conn, "MIP.APP.PORTFOLIO_POSITIONS", position_columns, [p + (1440,) for p in position_rows])
+    daily_columns = ["PORTFOLIO_ID", "RUN_ID", "TS", "CASH", "EQUITY_VALUE", "TOTAL_EQUITY", "OPEN_POSITIONS",
+                     "DAILY_PNL", "DAILY_RETURN", "PEAK_EQUITY", "DRAWDOWN", "STATUS"]
+    _insert_rows(conn, "MIP.APP.PORTFOLIO_DAILY", daily_columns, daily)
+    final_equity = daily[-1][5] if daily else float(starting_cash)
+    max_drawdown = max((d[10] or 0 for d in daily), default=0)
+    _execute(
+        conn,
+        """
+        update MIP.APP.PORTFOLIO
+           set LAST_SIMULATION_RUN_ID = ?, LAST_SIMULATED_AT = current_timestamp,
+               FINAL_EQUITY = ?, TOTAL_RETURN = ?, MAX_DRAWDOWN = ?,
+               WIN_DAYS = ?, LOSS_DAYS = ?, UPDATED_AT = current_timestamp
+         where PORTFOLIO_ID = ?
+        """,
+        [sim_run_id, final_equity, final_equity / float(starting_cash) - 1, max_drawdown,
+         sum(1 for d in daily if (d[7] or 0) > 0), sum(1 for d in daily if (d[7] or 0) < 0), portfolio_id],
+    )
+    result = {
+        "status": "SUCCESS",
+        "run_id": sim_run_id,
+        "portfolio_id": portfolio_id,
+        "trade_count": len(trades),
+        "position_count": len(position_rows),
+        "daily_count": len(daily),
+        "final_equity": final_equity,
+        "max_drawdown": max_drawdown,
+        "entries_blocked": blocked,
+        "block_reason": block_reason,
+    }
+    log_event(conn, "PORTFOLIO_SIM", "SUCCESS", "INFO", len(trades), result, None, sim_run_id, run_id)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Morning brief (186_sp_write_morning_brief.sql, content subset of V_MORNING_BRIEF_JSON)
+# ---------------------------------------------------------------------------
+
+def write_morning_brief(conn, portfolio_id, as_of_ts, run_id, agent_name="MORNING_BRIEF") -> dict:
+    """SP_WRITE_MORNING_BRIEF: one brief per (portfolio, as_of_ts, run_id, agent_name), attribution overwritten."""
+    latest = _execute(
+        conn,
+        """
+        select TOTAL_EQUITY, DRAWDOWN, OPEN_POSITIONS, STATUS
+          from MIP.APP.PORTFOLIO_DAILY
+         where PORTFOLIO_ID = ?
+         order by TS desc, CREATED_AT desc
+         limit 1
+        """,
+        [portfolio_id],
+    ).fetchone()
+    trusted = _execute(
+        conn,
+        """
+        select s.SYMBOL, s.MARKET_TYPE, s.INTERVAL_MINUTES, s.PATTERN_ID, s.HORIZON_BARS, s.SCORE,
+               t.AVG_RETURN, t.N_SUCCESS, t.COVERAGE_RATE
+          from MIP.MART.V_PORTFOLIO_SIGNALS s
+          join MIP.MART.V_TRUSTED_SIGNALS t
+            on t.PATTERN_ID = s.PATTERN_ID and t.MARKET_TYPE = s.MARKET_TYPE
+           and t.INTERVAL_MINUTES = s.INTERVAL_MINUTES and t.HORIZON_BARS = s.HORIZON_BARS
+         where s.TS::date = ?::date
+         order by s.SCORE desc
+         limit 20
+        """,
+        [as_of_ts],
+    ).fetchall()
+    brief = {
+        "as_of_ts": as_of_ts,
+        "attribution": {"pipeline_run_id": run_id},
+        "risk": {
+            "latest": {
+                "risk_status": "OK" if not latest or latest[3] == "ACTIVE" else latest[3],
+                "total_equity": latest[0] if latest else None,
+                "drawdown": latest[1] if latest else None,
+                "open_positions": latest[2] if latest else 0,
+            }
+        },
+        "proposals": {"summary": {"proposed": 0, "approved": 0, "rejected": 0, "executed": 0},
+                      "executed_trades": []},
+        "signals": {
+            "trusted_now": [
+                {"symbol": r[0], "market_type": r[1], "interval_minutes": r[2], "pattern_id": r[3],
+                 "horizon_bars": r[4], "score": r[5], "trust_label": "TRUSTED",
+                 "reason": {"avg_return": r[6], "n_success": r[7], "coverage_rate": r[8]}}
+                for r in trusted
+            ]
+        },
+    }
+    _execute(
+        conn,
+        """
+        delete from MIP.AGENT_OUT.MORNING_BRIEF
+         where PORTFOLIO_ID = ? and AS_OF_TS = ? and RUN_ID = ? and AGENT_NAME = ?
+        """,
+        [portfolio_id, as_of_ts, run_id, agent_name],
+    )
+    _execute(
+        conn,
+        """
+        insert into MIP.AGENT_OUT.MORNING_BRIEF (
+            AS_OF_TS, PORTFOLIO_ID, RUN_ID, BRIEF, PIPELINE_RUN_ID, AGENT_NAME, STATUS, CREATED_AT
+        ) values (?, ?, ?, ?, ?, ?, 'NEW', current_timestamp)
+        """,
+        [as_of_ts, portfolio_id, run_id, _json(brief), run_id, agent_name],
+    )
+    return {"status": "SUCCESS", "portfolio_id": portfolio_id, "trusted_signal_count": len(trusted)}
+
+
+# ---------------------------------------------------------------------------
+# Per-run trust snapshot (147a_sp_pipeline_classify_signals.sql)
+# ---------------------------------------------------------------------------
+
+def classify_signals(conn, run_id) -> dict:
+    """
+    SP_PIPELINE_CLASSIFY_SIGNALS: snapshot V_TRUSTED_SIGNAL_CLASSIFICATION for today's recommendations under run_id.
+    V_SIGNALS_ELIGIBLE_TODAY reads the latest snapshot per recommendation.
+    """
+    started = _now()
+    _execute(conn, "delete from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION where RUN_ID = ?", [run_id])
+    _execute(
+        conn,
+        """
+        insert into MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION (
+            RUN_ID, RECOMMENDATION_ID, SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS, PATTERN_ID, GENERATED_AT,
+            TRUST_LABEL, RECOMMENDED_ACTION, GATING_REASON, CLASSIFIED_AT
+        )
+        select ?, RECOMMENDATION_ID, SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS, PATTERN_ID, GENERATED_AT,
+               TRUST_LABEL, RECOMMENDED_ACTION, GATING_REASON, ?
+          from MIP.APP.V_TRUSTED_SIGNAL_CLASSIFICATION
+         where GENERATED_AT::date = current_date
+        """,
+        [run_id, started],
+    )
+    classified, trusted, eligible = _execute(
+        conn,
+        """
+        select count(*),
+               count_if(TRUST_LABEL = 'TRUSTED'),
+               count_if(TRUST_LABEL = 'TRUSTED' and RECOMMENDED_ACTION = 'ENABLE')
+          from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION
+         where RUN_ID = ?
+        """,
+        [run_id],
+    ).fetchone()
+    return {"status": "SUCCESS", "run_id": run_id, "classified_count": classified,
+            "trusted_count": trusted, "eligible_count": eligible}
+
+
+# ---------------------------------------------------------------------------
+# /today insights (148a_sp_pipeline_refresh_today_insights.sql)
+# ---------------------------------------------------------------------------
+
+# training_status.py DEFAULT_MIN_SIGNALS / MAX_HORIZONS (/today never read TRAINING_GATE_PARAMS)
+_INSIGHT_MIN_SIGNALS = 40
+_INSIGHT_MAX_HORIZONS = 5
+
+
+def refresh_today_insights(conn, as_of_ts, run_id) -> dict:
+    """
+    SP_PIPELINE_REFRESH_TODAY_INSIGHTS: replace TODAY_INSIGHTS with this run's ranked candidates.
+    Candidates are the 1440 recommendations at the as-of bar, standing in for V_SIGNALS_ELIGIBLE_TODAY.
+    """
+    min_signals, max_horizons = _INSIGHT_MIN_SIGNALS, _INSIGHT_MAX_HORIZONS
+    candidates = _scalar(
+        conn,
+        """
+        select count(*) from (
+            select distinct SYMBOL, MARKET_TYPE, PATTERN_ID
+              from MIP.APP.RECOMMENDATION_LOG
+             where INTERVAL_MINUTES = 1440 and TS::date = ?::date
+        )
+        """,
+        [as_of_ts],
+    )
+    _execute(conn, "delete from MIP.APP.TODAY_INSIGHTS")
+    _execute(
+        conn,
+        f"""
+        insert into MIP.APP.TODAY_INSIGHTS (
+            RUN_ID, AS_OF_TS, INSIGHT_RANK, SYMBOL, MARKET_TYPE, PATTERN_ID, INTERVAL_MINUTES,
+            RECS_TOTAL, OUTCOMES_TOTAL, HORIZONS_COVERED, MATURITY_SCORE, MATURITY_STAGE, REASONS,
+            MEAN_H5, PCT_POSITIVE_H5, TODAY_SCORE, PERFORMANCE_SUMMARY
+        )
+        with candidates as (
+            select distinct SYMBOL, MARKET_TYPE, PATTERN_ID
+              from MIP.APP.RECOMMENDATION_LOG
+             where INTERVAL_MINUTES = 1440 and TS::date = ?::date
+        ),
+        recs as (
+            select r.RECOMMENDATION_ID, r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID
+              from MIP.APP.RECOMMENDATION_LOG r
+              join candidates c
+                on c.SYMBOL = r.SYMBOL and c.MARKET_TYPE = r.MARKET_TYPE and c.PATTERN_ID = r.PATTERN_ID
+             where r.INTERVAL_MINUTES = 1440
+        ),
+        training as (
+            select r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID,
+                   count(distinct r.RECOMMENDATION_ID) as RECS_TOTAL,
+                   count(o.RECOMMENDATION_ID) as OUTCOMES_TOTAL,
+                   count(distinct o.HORIZON_BARS) as HORIZONS_COVERED
+              from recs r
+              left join MIP.APP.RECOMMENDATION_OUTCOMES o on o.RECOMMENDATION_ID = r.RECOMMENDATION_ID
+             group by r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID
+        ),
+        perf as (
+            select r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID, o.HORIZON_BARS,
+                   count(*) as N_OUTCOMES,
+                   avg(o.REALIZED_RETURN) as MEAN_OUTCOME,
+                   count_if(o.REALIZED_RETURN > 0) / count(*) as PCT_POSITIVE
+              from recs r
+              join MIP.APP.RECOMMENDATION_OUTCOMES o on o.RECOMMENDATION_ID = r.RECOMMENDATION_ID
+             where o.EVAL_STATUS = 'SUCCESS' and o.REALIZED_RETURN is not null
+             group by r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID, o.HORIZON_BARS
+        ),
+        perf_agg as (
+            select MARKET_TYPE, SYMBOL, PATTERN_ID,
+                   arg_max(MEAN_OUTCOME, iff(HORIZON_BARS = 5, -1, HORIZON_BARS)) as MEAN_H5,
+                   arg_max(PCT_POSITIVE, iff(HORIZON_BARS = 5, -1, HORIZON_BARS)) as PCT_POSITIVE_H5,
+                   json_group_object(
+                       cast(HORIZON_BARS as varchar),
+                       json_object('mean_outcome', MEAN_OUTCOME, 'pct_positive', PCT_POSITIVE,
+                                   'n_outcomes', N_OUTCOMES)
+                   ) as PERFORMANCE_SUMMARY
+              from perf
+             group by MARKET_TYPE, SYMBOL, PATTERN_ID
+        ),
+        scored as (
+            select t.*,
+                   least(1, case when t.RECS_TOTAL > 0
+                                 then t.OUTCOMES_TOTAL / (t.RECS_TOTAL * {max_horizons}) else 0 end) as COVERAGE_RATIO,
+                   least(100, greatest(0,
+                       30 * least(1, t.RECS_TOTAL / {min_signals})
+                       + 40 * COVERAGE_RATIO
+                       + 30 * t.HORIZONS_COVERED / {max_horizons}
+                   )) as TOTAL_SCORE,
+                   case
+                       when TOTAL_SCORE < 25 then 'INSUFFICIENT'
+                       when TOTAL_SCORE < 50 then 'WARMING_UP'
+                       when TOTAL_SCORE < 75 then 'LEARNING'
+                       else 'CONFIDENT'
+                   end as MATURITY_STAGE,
+                   round(TOTAL_SCORE, 1) as MATURITY_SCORE,
+                   coalesce(p.MEAN_H5, 0) as MEAN_H5,
+                   coalesce(p.PCT_POSITIVE_H5, 0) as PCT_POSITIVE_H5,
+                   coalesce(p.PERFORMANCE_SUMMARY, json_object()) as PERFORMANCE_SUMMARY
+              from training t
+              left join perf_agg p
+                on p.MARKET_TYPE = t.MARKET_TYPE and p.SYMBOL = t.SYMBOL and p.PATTERN_ID = t.PATTERN_ID
+        ),
+        ranked as (
+            select s.*,
+                   round(0.5 * MATURITY_SCORE / 100 + 0.3 * greatest(0, MEAN_H5) * 10 + 0.2 * PCT_POSITIVE_H5, 3)
+                       as TODAY_SCORE
+              from scored s
+             where MATURITY_STAGE <> 'INSUFFICIENT' and RECS_TOTAL >= {max(1, min_signals // 2)}
+        )
+        select ?, ?::timestamp,
+               row_number() over (order by TODAY_SCORE desc, MATURITY_SCORE desc, SYMBOL, PATTERN_ID),
+               SYMBOL, MARKET_TYPE, PATTERN_ID, 1440,
+               RECS_TOTAL, OUTCOMES_TOTAL, HORIZONS_COVERED, MATURITY_SCORE, MATURITY_STAGE,
+               json_array(
+                   case when RECS_TOTAL < {min_signals}
+                        then 'Not enough recommendations yet; more data will improve the score.'
+                        else 'Enough recommendations to start judging quality.' end,
+                   case when COVERAGE_RATIO < 0.5 then 'Many recommendations are still waiting for outcome data.'
+                        when COVERAGE_RATIO < 1 then 'Most recommendations have been evaluated; some are still pending.'
+                        else 'All recommendations have outcome data for the horizons evaluated.' end,
+                   case when HORIZONS_COVERED < {max_horizons}
+                        then 'Outcome data is available for ' || HORIZONS_COVERED || ' of {max_horizons}'
+                             || ' time windows; more windows will strengthen the score.'
+                        else 'All time windows have outcome data.' end,
+                   case MATURITY_STAGE
+                        when 'WARMING_UP' then 'Overall: data is building; confidence is growing.'
+                        when 'LEARNING' then 'Overall: enough data to learn from; score is meaningful.'
+                        else 'Overall: strong data coverage and outcome completeness.' end
+               ),
+               MEAN_H5, PCT_POSITIVE_H5, TODAY_SCORE, PERFORMANCE_SUMMARY
+          from ranked
+        """,
+        [as_of_ts, run_id, as_of_ts],
+    )
+    insights = _scalar(conn, "select count(*) from MIP.APP.TODAY_INSIGHTS")
+    return {"status": "SUCCESS", "run_id": run_id, "as_of_ts": as_of_ts,
+            "candidate_count": candidates, "insight_count": insights}
+
+
+# ---------------------------------------------------------------------------
+# Materialized trust/KPI layer (146a_sp_pipeline_refresh_kpi_layer.sql)
+# ---------------------------------------------------------------------------
+
+_QUANTILES_JOIN = """
+    left join MIP.MART.V_OUTCOME_QUANTILES q
+      on q.PATTERN_ID = v.PATTERN_ID and q.MARKET_TYPE = v.MARKET_TYPE
+     and q.INTERVAL_MINUTES = v.INTERVAL_MINUTES and q.HORIZON_BARS = v.HORIZON_BARS
+"""
+
+# (table, select from its *_LIVE view with medians taken from the merged sketches, incremental on dirty groups?)
+_KPI_LAYER = (
+    ("MIP.MART.KPI_SIGNAL_OUTCOME",
+     "select v.* replace (q.MEDIAN_RETURN as MEDIAN_RETURN), q.P10_RETURN, q.P90_RETURN "
+     "from MIP.MART.V_SIGNAL_OUTCOME_KPIS_LIVE v" + _QUANTILES_JOIN, True),
+    ("MIP.MART.KPI_SCORE_CALIBRATION", "select v.* from MIP.MART.V_SCORE_CALIBRATION_LIVE v", True),
+    ("MIP.MART.KPI_REC_TRAINING",
+     "select v.* replace (q.MEDIAN_RETURN as MEDIAN_RETURN) from MIP.MART.REC_TRAINING_KPIS_LIVE v" + _QUANTILES_JOIN,
+     False),
+    ("MIP.MART.KPI_PATTERN_SCORECARD",
+     """
+     select v.* replace (q.MEDIAN_FORWARD_RETURN as MEDIAN_FORWARD_RETURN)
+       from MIP.APP.V_PATTERN_SCORECARD_LIVE v
+       left join (
+           select PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES,
+                  approx_percentile_estimate(approx_percentile_combine(RETURN_SKETCH), 0.5) as MEDIAN_FORWARD_RETURN
+             from MIP.MART.KPI_OUTCOME_SKETCH
+            where HORIZON_BARS = 5 and ENTRY_DATE >= dateadd(day, -90, current_date())
+            group by PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES
+       ) q
+         on q.PATTERN_ID = v.PATTERN_ID and q.MARKET_TYPE = v.MARKET_TYPE and q.INTERVAL_MINUTES = v.INTERVAL_MINUTES
+     """, False),
+)
+_KPI_GROUP = "PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS"
+
+
+def refresh_kpi_layer(conn, run_id, full_refresh=False) -> dict:
+    """
+    SP_PIPELINE_REFRESH_KPI_LAYER: recompute the KPI_* tables behind the trust/KPI views.
+    Quantile sketches are rebuilt for (group, entry day) pairs with outcomes calculated after the stored watermark;
+    signal-outcome and calibration groups are recomputed only when they have such days; training KPIs and the
+    pattern scorecard (clock-relative windows) are rebuilt every run. Medians and p10/p90 come from the sketches.
+    """
+    started = _now()
+    watermark = _scalar(
+        conn, "select max(OUTCOMES_WATERMARK) from MIP.MART.KPI_LAYER_REFRESH_STATE where STATE_KEY = 'KPI_LAYER'"
+    )
+    full_refresh = bool(full_refresh) or watermark is None
+    new_watermark = _scalar(conn, "select max(CALCULATED_AT) from MIP.APP.RECOMMENDATION_OUTCOMES")
+    dirty_days_sql = """
+        select distinct r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES, o.HORIZON_BARS, o.ENTRY_TS::date as ENTRY_DATE
+          from MIP.APP.RECOMMENDATION_OUTCOMES o
+          join MIP.APP.RECOMMENDATION_LOG r on r.RECOMMENDATION_ID = o.RECOMMENDATION_ID
+         where ? or o.CALCULATED_AT > ?
+    """
+    dirty_params = [full_refresh, full_refresh, watermark]
+    dirty_days, dirty_groups = _execute(
+        conn, f"select count(*), count(distinct ({_KPI_GROUP})) from ({dirty_days_sql})", dirty_params[1:]
+    ).fetchone()
+
+    _execute(
+        conn,
+        f"delete from MIP.MART.KPI_OUTCOME_SKETCH where ? or ({_KPI_GROUP}, ENTRY_DATE) in ({dirty_days_sql})",
+        dirty_params,
+    )
+    sketch_rows = _scalar(
+        conn,
+        f"""
+        insert into MIP.MART.KPI_OUTCOME_SKETCH (
+            PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, ENTRY_DATE, N_SUCCESS,
+            RETURN_SKETCH, SCORE_SKETCH, RUN_ID, REFRESHED_AT
+        )
+        select r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES, o.HORIZON_BARS, o.ENTRY_TS::date, count(*),
+               approx_percentile_accumulate(o.REALIZED_RETURN), approx_percentile_accumulate(r.SCORE), ?, ?
+          from MIP.APP.RECOMMENDATION_OUTCOMES o
+          join MIP.APP.RECOMMENDATION_LOG r on r.RECOMMENDATION_ID = o.RECOMMENDATION_ID
+         where o.EVAL_STATUS = 'SUCCESS' and o.REALIZED_RETURN is not null
+           and (? or (r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES, o.HORIZON_BARS, o.ENTRY_TS::date)
+                     in ({dirty_days_sql}))
+         group by r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES, o.HORIZON_BARS, o.ENTRY_TS::date
+        """,
+        [run_id, started] + dirty_params,
+    )
+
+    counts = {}
+    for table, select_sql, incremental in _KPI_LAYER:
+        if incremental:
+            dirty = f"? or ({_KPI_GROUP}) in (select {_KPI_GROUP} from ({dirty_days_sql}))"
+            _execute(conn, f"delete from {table} where {dirty}", dirty_params)
+            select_sql = f"select * from ({select_sql}) where {dirty}"
+            params = dirty_params
+        else:
+            _execute(conn, f"delete from {table}")
+            params = []
+        # DuckDB answers an insert with its row count.
+        counts[table] = _scalar(
+            conn,
+            f"insert into {table} by name select *, ? as RUN_ID, ? as REFRESHED_AT from ({select_sql})",
+            [run_id, started] + params,
+        )
+    _execute(
+        conn,
+        """
+        insert into MIP.MART.KPI_LAYER_REFRESH_STATE (
+            STATE_KEY, RUN_ID, OUTCOMES_WATERMARK, DIRTY_GROUPS, DIRTY_DAYS, FULL_REFRESH, REFRESHED_AT
+        ) values ('KPI_LAYER', ?, ?, ?, ?, ?, ?)
+        on conflict (STATE_KEY) do update set
+            RUN_ID = excluded.RUN_ID,
+            OUTCOMES_WATERMARK = coalesce(excluded.OUTCOMES_WATERMARK, KPI_LAYER_REFRESH_STATE.OUTCOMES_WATERMARK),
+            DIRTY_GROUPS = excluded.DIRTY_GROUPS,
+            DIRTY_DAYS = excluded.DIRTY_DAYS,
+            FULL_REFRESH = excluded.FULL_REFRESH,
+            REFRESHED_AT = excluded.REFRESHED_AT
+        """,
+        [run_id, new_watermark, dirty_groups, dirty_days, full_refresh, started],
+    )
+    signal, calibration, training, scorecard = (counts[t] for t, _, _ in _KPI_LAYER)
+    return {"status": "SUCCESS", "run_id": run_id, "full_refresh": full_refresh,
+            "watermark_before": watermark, "watermark_after": new_watermark,
+            "dirty_groups": dirty_groups, "dirty_days": dirty_days, "sketch_rows": sketch_rows,
+            "signal_outcome_rows": signal, "score_calibration_rows": calibration,
+            "rec_training_rows": training, "pattern_scorecard_rows": scorecard,
+            "rows": signal + calibration + training + scorecard}
+
+
+# ---------------------------------------------------------------------------
+# Agent proposals + paper execution (189a_sp_agent_propose_and_execute.sql)
+# ---------------------------------------------------------------------------
+
+def propose_and_execute(conn, run_id, portfolio_id=None, propose=True, validate=True) -> dict:
+    """
+    SP_AGENT_PROPOSE_AND_EXECUTE: one set-based propose/validate/execute pass for every ACTIVE portfolio
+    (or portfolio_id). Candidates, open positions and per-portfolio limits are staged once; selection, validation,
+    caps and execution are one statement each, so the statement count does not grow with the portfolio count.
+    """
+    started = _now()
+    target_weight = 0.05
+    # One cursor = one DuckDB session, so the TMP_ tables below are visible to every statement.
+    cur = conn.cursor()
+    cur.execute(
+        """
+        select BAR_INDEX from MIP.MART.V_BAR_INDEX
+        qualify row_number() over (partition by TS order by BAR_INDEX) = 1
+         order by TS desc limit 1
+        """
+    )
+    row = cur.fetchone()
+    bar_index = row[0] if row else 0
+    cur.execute(
+        """
+        create or replace temp table TMP_AGENT_CANDIDATES as
+        select s.*, iff(s.MARKET_TYPE = 'FX', 'FX', 'STOCK') as MARKET_TYPE_GROUP,
+               row_number() over (partition by s.SYMBOL order by s.SCORE desc, s.RECOMMENDATION_ID) as DEDUP_RN
+          from MIP.MART.V_TRUSTED_SIGNALS_LATEST_TS s
+         where s.RUN_ID = ?
+        """,
+        [run_id],
+    )
+    cur.execute("select count(*) from MIP.MART.V_SIGNALS_LATEST_TS where RUN_ID = ?", [run_id])
+    raw_count = cur.fetchone()[0]
+    cur.execute(
+        """
+        select count(*),
+               count_if(DEDUP_RN = 1 and MARKET_TYPE_GROUP = 'STOCK'),
+               count_if(DEDUP_RN = 1 and MARKET_TYPE_GROUP = 'FX')
+          from TMP_AGENT_CANDIDATES
+        """
+    )
+    trusted_count, available_stock, available_fx = cur.fetchone()
+    portfolio_filter = "p.PORTFOLIO_ID = %(portfolio_id)s" if portfolio_id is not None else "p.STATUS = 'ACTIVE'"
+    portfolio_params = {"portfolio_id": portfolio_id} if portfolio_id is not None else {}
+    cur.execute(
+        f"""
+        create or replace temp table TMP_AGENT_OPEN_POSITIONS as
+        select op.PORTFOLIO_ID, op.SYMBOL, op.MARKET_TYPE,
+               count(*) as OPEN_POSITIONS,
+               count_if(op.CURRENT_BAR_INDEX = %(bar_index)s) as OPEN_POSITIONS_CURRENT
+          from MIP.MART.V_PORTFOLIO_OPEN_POSITIONS_CANONICAL op
+          join MIP.APP.PORTFOLIO p on p.PORTFOLIO_ID = op.PORTFOLIO_ID
+         where {portfolio_filter}
+         group by op.PORTFOLIO_ID, op.SYMBOL, op.MARKET_TYPE
+        """,
+        {"bar_index": bar_index, **portfolio_params},
+    )
+    cur.execute(
+        f"""
+        create or replace temp table TMP_AGENT_PORTFOLIO_STATE as
+        with portfolios as (
+            select p.PORTFOLIO_ID, p.PROFILE_ID, p.STARTING_CASH,
+                   coalesce(prof.MAX_POSITIONS, 5) as MAX_POSITIONS, prof.MAX_POSITION_PCT
+              from MIP.APP.PORTFOLIO p
+              left join MIP.APP.PORTFOLIO_PROFILE prof on prof.PROFILE_ID = p.PROFILE_ID
+             where {portfolio_filter}
+        ),
+        open_counts as (
+            select PORTFOLIO_ID, sum(OPEN_POSITIONS) as OPEN_POSITIONS_ALL,
+                   sum(OPEN_POSITIONS_CURRENT) as OPEN_POSITIONS
+              from TMP_AGENT_OPEN_POSITIONS group by PORTFOLIO_ID
+        ),
+        held as (
+            select op.PORTFOLIO_ID, count(distinct c.SYMBOL) as HELD_CANDIDATES
+              from TMP_AGENT_OPEN_POSITIONS op
+              join TMP_AGENT_CANDIDATES c on c.SYMBOL = op.SYMBOL and c.DEDUP_RN = 1
+             where op.OPEN_POSITIONS_CURRENT > 0
+             group by op.PORTFOLIO_ID
+        ),
+        risk as (
+            select PORTFOLIO_ID, coalesce(bool_or(ENTRIES_BLOCKED), false) as ENTRIES_BLOCKED,
+                   max(STOP_REASON) as STOP_REASON, max(ALLOWED_ACTIONS) as ALLOWED_ACTIONS
+              from MIP.MART.V_PORTFOLIO_RISK_STATE
+             where PORTFOLIO_ID in (select PORTFOLIO_ID from portfolios)
+             group by PORTFOLIO_ID
+        ),
+        equity as (
+            select PORTFOLIO_ID, TOTAL_EQUITY from MIP.APP.PORTFOLIO_DAILY
+             where PORTFOLIO_ID in (select PORTFOLIO_ID from portfolios)
+            qualify row_number() over (partition by PORTFOLIO_ID order by TS desc) = 1
+        ),
+        capacity as (
+            select p.*,
+                   coalesce(o.OPEN_POSITIONS, 0) as OPEN_POSITIONS,
+                   coalesce(o.OPEN_POSITIONS_ALL, 0) as OPEN_POSITIONS_ALL,
+                   greatest(p.MAX_POSITIONS - coalesce(o.OPEN_POSITIONS, 0), 0) as REMAINING_CAPACITY,
+                   coalesce(h.HELD_CANDIDATES, 0) as HELD_CANDIDATES,
+                   coalesce(r.ENTRIES_BLOCKED, false) as ENTRIES_BLOCKED,
+                   r.STOP_REASON, r.ALLOWED_ACTIONS,
+                   coalesce(e.TOTAL_EQUITY, p.STARTING_CASH) as TOTAL_EQUITY
+              from portfolios p
+              left join open_counts o on o.PORTFOLIO_ID = p.PORTFOLIO_ID
+              left join held h on h.PORTFOLIO_ID = p.PORTFOLIO_ID
+              left join risk r on r.PORTFOLIO_ID = p.PORTFOLIO_ID
+              left join equity e on e.PORTFOLIO_ID = p.PORTFOLIO_ID
+        )
+        select c.PORTFOLIO_ID, c.PROFILE_ID, c.MAX_POSITIONS,
+               coalesce(c.MAX_POSITION_PCT, 0.05) as PROPOSAL_MAX_POSITION_PCT,
+               coalesce(c.MAX_POSITION_PCT, 1.0) as MAX_POSITION_PCT,
+               c.OPEN_POSITIONS, c.OPEN_POSITIONS_ALL, c.REMAINING_CAPACITY,
+               c.ENTRIES_BLOCKED, c.STOP_REASON, c.ALLOWED_ACTIONS, c.TOTAL_EQUITY,
+               case when %(stock)s = 0 and %(fx)s > 0 then 0
+                    when %(fx)s = 0 and %(stock)s > 0 then c.REMAINING_CAPACITY
+                    else ceil(c.REMAINING_CAPACITY * 0.6)::integer end as MAX_NEW_STOCK,
+               case when %(stock)s = 0 and %(fx)s > 0 then c.REMAINING_CAPACITY
+                    when %(fx)s = 0 and %(stock)s > 0 then 0
+                    else c.REMAINING_CAPACITY - ceil(c.REMAINING_CAPACITY * 0.6)::integer end as MAX_NEW_FX,
+               iff(c.HELD_CANDIDATES < %(stock)s + %(fx)s, c.HELD_CANDIDATES, 0) as SKIPPED_HELD_COUNT,
+               case when c.PROFILE_ID is null or c.MAX_POSITIONS <= 0 then 'ERROR'
+                    when c.ENTRIES_BLOCKED then 'SKIP_ENTRIES_BLOCKED'
+                    when %(trusted)s = 0 then 'NO_ELIGIBLE_SIGNALS'
+                    when c.REMAINING_CAPACITY = 0 then 'NO_CAPACITY'
+                    else 'SUCCESS' end as PROPOSE_STATUS,
+               case when c.PROFILE_ID is null then 'Portfolio not found'
+                    when c.MAX_POSITIONS <= 0 then 'Invalid max positions configuration' end as ERROR_MESSAGE
+          from capacity c
+        """,
+        {"stock": available_stock, "fx": available_fx, "trusted": trusted_count, **portfolio_params},
+    )
+
+    if propose:
+        cur.execute(
+            """
+            insert into MIP.AGENT_OUT.ORDER_PROPOSALS (
+                RUN_ID_VARCHAR, PORTFOLIO_ID, SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, SIDE, TARGET_WEIGHT,
+                RECOMMENDATION_ID, SIGNAL_TS, SIGNAL_PATTERN_ID, SIGNAL_INTERVAL_MINUTES, SIGNAL_RUN_ID,
+                SIGNAL_SNAPSHOT, SOURCE_SIGNALS, RATIONALE, STATUS
+            )
+            with prioritized as (
+                select st.PORTFOLIO_ID as PF_ID, st.MAX_POSITIONS, st.OPEN_POSITIONS, st.REMAINING_CAPACITY,
+                       st.PROPOSAL_MAX_POSITION_PCT, st.MAX_NEW_STOCK, st.MAX_NEW_FX, c.*,
+                       iff(coalesce(op.OPEN_POSITIONS_CURRENT, 0) > 0, 1, 0) as HELD_PRIORITY
+                  from TMP_AGENT_PORTFOLIO_STATE st
+                  join TMP_AGENT_CANDIDATES c on c.DEDUP_RN = 1
+                  left join (
+                      select PORTFOLIO_ID, SYMBOL, sum(OPEN_POSITIONS_CURRENT) as OPEN_POSITIONS_CURRENT
+                        from TMP_AGENT_OPEN_POSITIONS group by PORTFOLIO_ID, SYMBOL
+                  ) op on op.PORTFOLIO_ID = st.PORTFOLIO_ID and op.SYMBOL = c.SYMBOL
+                 where st.PROPOSE_STATUS = 'SUCCESS'
+            ),
+            ranked as (
+                select p.*,
+                       row_number() over (partition by PF_ID
+                                          order by HELD_PRIORITY, SCORE desc, RECOMMENDATION_ID) as OVERALL_RANK,
+                       row_number() over (partition by PF_ID, MARKET_TYPE_GROUP
+                                          order by HELD_PRIORITY, SCORE desc, RECOMMENDATION_ID) as TYPE_RANK
+                  from prioritized p
+            ),
+            quota_flagged as (
+                select r.*, r.TYPE_RANK <= iff(r.MARKET_TYPE_GROUP = 'STOCK', r.MAX_NEW_STOCK, r.MAX_NEW_FX) as IN_QUOTA
+                  from ranked r
+            ),
+            primary_flagged as (
+                select q.*,
+                       q.IN_QUOTA and row_number() over (partition by PF_ID, IN_QUOTA order by OVERALL_RANK)
+                           <= q.REMAINING_CAPACITY as IS_PRIMARY
+                  from quota_flagged q
+            ),
+            backfill_ranked as (
+                select b.*,
+                       count_if(IS_PRIMARY) over (partition by PF_ID) as PRIMARY_COUNT,
+                       row_number() over (partition by PF_ID, IS_PRIMARY order by OVERALL_RANK) as GROUP_RANK
+                  from primary_flagged b
+            ),
+            final_ranked as (
+                select f.*, row_number() over (partition by PF_ID order by OVERALL_RANK) as SELECTION_RANK
+                  from backfill_ranked f
+                 where IS_PRIMARY or GROUP_RANK <= greatest(REMAINING_CAPACITY - PRIMARY_COUNT, 0)
+            )
+            select %(run_id)s, s.PF_ID, s.SYMBOL, s.MARKET_TYPE, s.INTERVAL_MINUTES, 'BUY', %(target_weight)s,
+                   s.RECOMMENDATION_ID, s.SIGNAL_TS, s.PATTERN_ID, s.INTERVAL_MINUTES, s.RUN_ID, s.DETAILS,
+                   json_object('recommendation_id', s.RECOMMENDATION_ID, 'pattern_id', s.PATTERN_ID,
+                               'ts', s.SIGNAL_TS, 'score', s.SCORE, 'interval_minutes', s.INTERVAL_MINUTES,
+                               'run_id', s.RUN_ID, 'trust_label', 'TRUSTED', 'recommended_action', 'ENABLE',
+                               'held_priority', s.HELD_PRIORITY, 'market_type_group', s.MARKET_TYPE_GROUP,
+                               'trust_reason', s.TRUST_REASON),
+                   json_object('strategy', 'diversified_capacity_aware_top_n', 'max_positions', s.MAX_POSITIONS,
+                               'open_positions', s.OPEN_POSITIONS, 'remaining_capacity', s.REMAINING_CAPACITY,
+                               'max_position_pct', s.PROPOSAL_MAX_POSITION_PCT,
+                               'market_type_quota', json_object('STOCK', s.MAX_NEW_STOCK, 'FX', s.MAX_NEW_FX),
+                               'selection_rank', s.SELECTION_RANK),
+                   'PROPOSED'
+              from final_ranked s
+             where s.SELECTION_RANK <= s.REMAINING_CAPACITY
+               and not exists (
+                   select 1 from MIP.AGENT_OUT.ORDER_PROPOSALS t
+                    where t.PORTFOLIO_ID = s.PF_ID and t.RUN_ID_VARCHAR = %(run_id)s
+                      and t.RECOMMENDATION_ID = s.RECOMMENDATION_ID
+               )
+            """,
+            {"run_id": run_id, "target_weight": target_weight},
+        )
+
+    proposal_counts = """
+        select PORTFOLIO_ID,
+               count_if(PROPOSED_AT >= %(started)s) as INSERTED,
+               count_if(STATUS = 'PROPOSED' and MARKET_TYPE <> 'FX') as SELECTED_STOCK,
+               count_if(STATUS = 'PROPOSED' and MARKET_TYPE = 'FX') as SELECTED_FX,
+               count_if(STATUS = 'PROPOSED' and MARKET_TYPE = 'ETF') as SELECTED_ETF
+          from MIP.AGENT_OUT.ORDER_PROPOSALS
+         where RUN_ID_VARCHAR = %(run_id)s
+         group by PORTFOLIO_ID
+    """
+    cur.execute(
+        f"""
+        create or replace temp table TMP_AGENT_PROPOSAL_COUNTS as
+        select st.PORTFOLIO_ID,
+               iff(%(propose)s, coalesce(n.INSERTED, 0), 0) as PROPOSAL_INSERTED,
+               coalesce(n.SELECTED_STOCK, 0) as SELECTED_STOCK,
+               coalesce(n.SELECTED_FX, 0) as SELECTED_FX,
+               coalesce(n.SELECTED_ETF, 0) as SELECTED_ETF
+          from TMP_AGENT_PORTFOLIO_STATE st
+          left join ({proposal_counts}) n on n.PORTFOLIO_ID = st.PORTFOLIO_ID
+        """,
+        {"run_id": run_id, "started": started, "propose": propose},
+    )
+    if propose:
+        cur.execute(
+            """
+            insert into MIP.APP.MIP_AUDIT_LOG (
+                EVENT_TS, RUN_ID, PARENT_RUN_ID, EVENT_TYPE, EVENT_NAME, STATUS, ROWS_AFFECTED, DETAILS
+            )
+            select current_timestamp, %(run_id)s, %(run_id)s, 'AGENT', 'SP_AGENT_PROPOSE_TRADES',
+                   iff(st.PROPOSE_STATUS = 'SKIP_ENTRIES_BLOCKED', 'SKIP_ENTRIES_BLOCKED', 'INFO'),
+                   n.PROPOSAL_INSERTED,
+                   json_object('portfolio_id', st.PORTFOLIO_ID, 'entries_blocked', st.ENTRIES_BLOCKED,
+                               'stop_reason', st.STOP_REASON, 'allowed_actions', st.ALLOWED_ACTIONS,
+                               'max_positions', st.MAX_POSITIONS, 'open_positions', st.OPEN_POSITIONS,
+                               'remaining_capacity', st.REMAINING_CAPACITY, 'candidate_count', %(trusted)s,
+                               'proposed_count', least(st.REMAINING_CAPACITY,
+                                                       iff(st.PROPOSE_STATUS = 'SUCCESS',
+                                                           n.SELECTED_STOCK + n.SELECTED_FX, %(trusted)s)),
+                               'candidate_count_raw', %(raw)s, 'candidate_count_trusted', %(trusted)s,
+                               'trusted_rejected_count', greatest(%(raw)s - %(trusted)s, 0),
+                               'skipped_held_count', iff(st.PROPOSE_STATUS = 'SUCCESS',
+                                                         st.SKIPPED_HELD_COUNT, null))
+              from TMP_AGENT_PORTFOLIO_STATE st
+              join TMP_AGENT_PROPOSAL_COUNTS n on n.PORTFOLIO_ID = st.PORTFOLIO_ID
+             where st.PROPOSE_STATUS <> 'ERROR'
+            """,
+            {"run_id": run_id, "trusted": trusted_count, "raw": raw_count},
+        )
+
+    validation = {}
+    if validate:
+        # Validation reads trust from V_SIGNALS_ELIGIBLE_TODAY; classify the run first if nothing has yet.
+        cur.execute("select count(*) from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION where RUN_ID = ?", [run_id])
+        if cur.fetchone()[0] == 0:
+            classify_signals(conn, run_id)
+        validation = _validate_and_execute(conn, cur, run_id, started, portfolio_id)
+
+    cur.execute(
+        """
+        select st.PORTFOLIO_ID, st.PROFILE_ID, st.PROPOSE_STATUS, st.ERROR_MESSAGE, st.MAX_POSITIONS,
+               st.OPEN_POSITIONS, st.REMAINING_CAPACITY, st.ENTRIES_BLOCKED, st.STOP_REASON, st.ALLOWED_ACTIONS,
+               st.MAX_NEW_STOCK, st.MAX_NEW_FX, st.SKIPPED_HELD_COUNT,
+               n.PROPOSAL_INSERTED, n.SELECTED_STOCK, n.SELECTED_FX, n.SELECTED_ETF
+          from TMP_AGENT_PORTFOLIO_STATE st
+          join TMP_AGENT_PROPOSAL_COUNTS n on n.PORTFOLIO_ID = st.PORTFOLIO_ID
+         order by st.PORTFOLIO_ID
+        """
+    )
+    results = []
+    for (pid, profile_id, status, message, max_positions, open_positions, capacity, blocked, stop_reason,
+         allowed, max_stock, max_fx, skipped_held, inserted, sel_stock, sel_fx, sel_etf) in cur.fetchall():
+        if status == "ERROR":
+            proposal = {"status": "ERROR", "message": message, "portfolio_id": pid}
+        else:
+            proposal = {
+                "status": status, "run_id": run_id, "portfolio_id": pid, "entries_blocked": blocked,
+                "stop_reason": stop_reason, "allowed_actions": allowed, "max_positions": max_positions,
+                "open_positions": open_positions, "remaining_capacity": capacity,
+                "proposal_candidates": trusted_count,
+                "proposal_selected": min(capacity, sel_stock + sel_fx if status == "SUCCESS" else trusted_count),
+                "proposal_inserted": inserted, "target_weight": target_weight,
+            }
+            if status == "SUCCESS":
+                proposal.update({"market_type_quota": {"STOCK": max_stock, "FX": max_fx},
+                                 "picked_by_market_type": {"STOCK": sel_stock, "FX": sel_fx, "ETF": sel_etf},
+                                 "skipped_held_count": skipped_held})
+        if profile_id is None:
+            validated = {"status": "ERROR", "message": "Portfolio not found", "portfolio_id": pid}
+        else:
+            validated = {"status": "SUCCESS", "run_id": run_id, "portfolio_id": pid,
+                         "entries_blocked": blocked, "stop_reason": stop_reason, "allowed_actions": allowed,
+                         **validation.get(pid, {"proposal_count": 0, "approved_count": 0, "rejected_count": 0,
+                                                "executed_count": 0, "buy_proposals_blocked": 0})}
+        results.append({"portfolio_id": pid, "proposal_result": proposal, "validation_result": validated})
+    return {
+        "status": "SUCCESS",
+        "run_id": run_id,
+        "portfolio_count": len(results),
+        "candidate_count_raw": raw_count,
+        "candidate_count_trusted": trusted_count,
+        "proposal_inserted": sum(r["proposal_result"].get("proposal_inserted", 0) for r in results),
+        "approved_count": sum(r["validation_result"].get("approved_count", 0) for r in results),
+        "rejected_count": sum(r["validation_result"].get("rejected_count", 0) for r in results),
+        "executed_count": sum(r["validation_result"].get("executed_count", 0) for r in results),
+        "results": results,
+    }
+
+
+def _validate_and_execute(conn, cur, run_id, started, portfolio_id=None) -> dict:
+    """Validation half of SP_AGENT_PROPOSE_AND_EXECUTE over the TMP_AGENT_* tables; {portfolio_id: counts}."""
+    params = {"run_id": run_id}
+    # CRIT-001: entry gate - BUY proposals of blocked portfolios are rejected before validation.
+    cur.execute(
+        """
+        create or replace temp table TMP_AGENT_GATE_REJECTS as
+        select p.PROPOSAL_ID, p.PORTFOLIO_ID, st.STOP_REASON
+          from MIP.AGENT_OUT.ORDER_PROPOSALS p
+          join TMP_AGENT_PORTFOLIO_STATE st on st.PORTFOLIO_ID = p.PORTFOLIO_ID
+         where st.ENTRIES_BLOCKED and st.PROFILE_ID is not null
+           and p.RUN_ID_VARCHAR = %(run_id)s and p.STATUS in ('PROPOSED', 'APPROVED') and p.SIDE = 'BUY'
+        """,
+        params,
+    )
+    cur.execute(
+        """
+        update MIP.AGENT_OUT.ORDER_PROPOSALS as p
+           set STATUS = 'REJECTED',
+               VALIDATION_ERRORS = to_json(list_filter(['ENTRY_GATE_BLOCKED', g.STOP_REASON], x -> x is not null)),
+               APPROVED_AT = null
+          from TMP_AGENT_GATE_REJECTS g
+         where p.PROPOSAL_ID = g.PROPOSAL_ID
+        """
+    )
+    cur.execute(
+        """
+        insert into MIP.APP.MIP_AUDIT_LOG (
+            EVENT_TS, RUN_ID, PARENT_RUN_ID, EVENT_TYPE, EVENT_NAME, STATUS, ROWS_AFFECTED, DETAILS
+        )
+        select current_timestamp, %(run_id)s, %(run_id)s, 'AGENT', 'SP_VALIDATE_AND_EXECUTE_PROPOSALS',
+               'ENTRY_GATE_BLOCKED', count(*),
+               json_object('entries_blocked', true, 'stop_reason', max(st.STOP_REASON),
+                           'allowed_actions', max(st.ALLOWED_ACTIONS), 'buy_proposals_rejected', count(*),
+                           'portfolio_id', g.PORTFOLIO_ID)
+          from TMP_AGENT_GATE_REJECTS g
+          join TMP_AGENT_PORTFOLIO_STATE st on st.PORTFOLIO_ID = g.PORTFOLIO_ID
+         group by g.PORTFOLIO_ID
+        """,
+        params,
+    )
+    cur.execute(
+        """
+        create or replace temp table TMP_PROPOSAL_VALIDATION as
+        with proposals as (
+            select p.*, row_number() over (partition by p.PORTFOLIO_ID order by p.PROPOSED_AT, p.PROPOSAL_ID)
+                        as PROPOSAL_RANK
+              from MIP.AGENT_OUT.ORDER_PROPOSALS p
+              join TMP_AGENT_PORTFOLIO_STATE st on st.PORTFOLIO_ID = p.PORTFOLIO_ID and st.PROFILE_ID is not null
+             where p.RUN_ID_VARCHAR = %(run_id)s and p.STATUS = 'PROPOSED'
+        ),
+        latest_prices as (
+            select b.SYMBOL, b.MARKET_TYPE, b.CLOSE
+              from MIP.MART.MARKET_BARS b
+              join (select distinct SYMBOL, MARKET_TYPE from proposals) s
+                on s.SYMBOL = b.SYMBOL and s.MARKET_TYPE = b.MARKET_TYPE
+             where b.INTERVAL_MINUTES = 1440
+            qualify row_number() over (partition by b.SYMBOL, b.MARKET_TYPE order by b.TS desc) = 1
+        ),
+        proposal_dupes as (
+            select PORTFOLIO_ID, SYMBOL, MARKET_TYPE, count(*) as PROPOSAL_COUNT, count(distinct SIDE) as SIDE_COUNT
+              from proposals group by PORTFOLIO_ID, SYMBOL, MARKET_TYPE
+        )
+        select p.PROPOSAL_ID, p.PORTFOLIO_ID, p.SIDE, lp.CLOSE as LATEST_PRICE,
+               list_filter([
+                   iff(st.ENTRIES_BLOCKED and p.SIDE = 'BUY', 'ENTRY_GATE_BLOCKED', null),
+                   iff(st.ENTRIES_BLOCKED and p.SIDE = 'BUY', st.STOP_REASON, null),
+                   iff(p.RECOMMENDATION_ID is null, 'MISSING_RECOMMENDATION_ID', null),
+                   iff(p.RECOMMENDATION_ID is not null and v.RECOMMENDATION_ID is null, 'NO_SIGNAL_MATCH', null),
+                   iff(v.RECOMMENDATION_ID is not null and not v.IS_ELIGIBLE, 'INELIGIBLE_SIGNAL', null),
+                   iff(p.TARGET_WEIGHT > st.MAX_POSITION_PCT, 'EXCEEDS_MAX_POSITION_PCT', null),
+                   iff(p.PROPOSAL_RANK > st.MAX_POSITIONS, 'EXCEEDS_MAX_POSITIONS', null),
+                   iff(p.SIDE = 'BUY' and coalesce(op.OPEN_POSITIONS, 0) > 0, 'ALREADY_OPEN_POSITION', null),
+                   iff(p.SIDE = 'SELL' and coalesce(op.OPEN_POSITIONS, 0) = 0, 'NO_OPEN_POSITION', null),
+                   iff(coalesce(pd.PROPOSAL_COUNT, 0) > 1, 'DUPLICATE_SYMBOL_PROPOSAL', null),
+                   iff(coalesce(pd.SIDE_COUNT, 0) > 1, 'CONFLICTING_SIDE_PROPOSALS', null),
+                   iff(lp.CLOSE is null, 'MISSING_PRICE', null)
+               ], x -> x is not null) as VALIDATION_ERRORS
+          from proposals p
+          join TMP_AGENT_PORTFOLIO_STATE st on st.PORTFOLIO_ID = p.PORTFOLIO_ID
+          left join MIP.APP.V_SIGNALS_ELIGIBLE_TODAY v on v.RECOMMENDATION_ID = p.RECOMMENDATION_ID
+          left join TMP_AGENT_OPEN_POSITIONS op
+            on op.PORTFOLIO_ID = p.PORTFOLIO_ID and op.SYMBOL = p.SYMBOL and op.MARKET_TYPE = p.MARKET_TYPE
+          left join proposal_dupes pd
+            on pd.PORTFOLIO_ID = p.PORTFOLIO_ID and pd.SYMBOL = p.SYMBOL and pd.MARKET_TYPE = p.MARKET_TYPE
+          left join latest_prices lp on lp.SYMBOL = p.SYMBOL and lp.MARKET_TYPE = p.MARKET_TYPE
+        """,
+        params,
+    )
+    cur.execute(
+        """
+        update MIP.AGENT_OUT.ORDER_PROPOSALS as p
+           set STATUS = iff(len(v.VALIDATION_ERRORS) > 0, 'REJECTED', 'APPROVED'),
+               APPROVED_AT = iff(len(v.VALIDATION_ERRORS) > 0, p.APPROVED_AT, current_timestamp),
+               VALIDATION_ERRORS = iff(len(v.VALIDATION_ERRORS) > 0, to_json(v.VALIDATION_ERRORS), null)
+          from TMP_PROPOSAL_VALIDATION v
+         where p.PROPOSAL_ID = v.PROPOSAL_ID
+        """
+    )
+    # Phase 3.6: total exposure (1% tolerance) and position-count caps over each portfolio's approved BUYs.
+    cur.execute(
+        """
+        create or replace temp table TMP_AGENT_CAP_REJECTS as
+        with counts as (
+            select PORTFOLIO_ID, count_if(len(VALIDATION_ERRORS) = 0) as APPROVED_COUNT
+              from TMP_PROPOSAL_VALIDATION group by PORTFOLIO_ID
+        ),
+        approved_buys as (
+            select p.PROPOSAL_ID, p.PORTFOLIO_ID,
+                   sum(p.TARGET_WEIGHT) over (partition by p.PORTFOLIO_ID) > st.MAX_POSITION_PCT * 1.01
+                       as EXPOSURE_EXCEEDED,
+                   st.OPEN_POSITIONS_ALL + coalesce(c.APPROVED_COUNT, 0) > st.MAX_POSITIONS as POSITIONS_EXCEEDED,
+                   greatest(st.MAX_POSITIONS - st.OPEN_POSITIONS_ALL, 0) as POSITION_SLOTS,
+                   row_number() over (partition by p.PORTFOLIO_ID order by p.PROPOSED_AT desc, p.PROPOSAL_ID desc)
+                       as RECENCY_RANK
+              from MIP.AGENT_OUT.ORDER_PROPOSALS p
+              join TMP_AGENT_PORTFOLIO_STATE st on st.PORTFOLIO_ID = p.PORTFOLIO_ID
+              left join counts c on c.PORTFOLIO_ID = p.PORTFOLIO_ID
+             where p.RUN_ID_VARCHAR = %(run_id)s and p.STATUS = 'APPROVED' and p.SIDE = 'BUY'
+        )
+        select * from (
+            select PROPOSAL_ID, PORTFOLIO_ID,
+                   list_filter([
+                       iff(EXPOSURE_EXCEEDED, 'TOTAL_EXPOSURE_EXCEEDS_LIMIT', null),
+                       iff(POSITIONS_EXCEEDED and RECENCY_RANK > POSITION_SLOTS, 'EXCEEDS_MAX_POSITIONS', null)
+                   ], x -> x is not null) as REASONS
+              from approved_buys
+        ) where len(REASONS) > 0
+        """,
+        params,
+    )
+    cur.execute(
+        """
+        update MIP.AGENT_OUT.ORDER_PROPOSALS as p
+           set STATUS = 'REJECTED', VALIDATION_ERRORS = to_json(r.REASONS), APPROVED_AT = null
+          from TMP_AGENT_CAP_REJECTS r
+         where p.PROPOSAL_ID = r.PROPOSAL_ID
+        """
+    )
+    cur.execute(
+        """
+        insert into MIP.APP.MIP_AUDIT_LOG (
+            EVENT_TS, RUN_ID, PARENT_RUN_ID, EVENT_TYPE, EVENT_NAME, STATUS, ROWS_AFFECTED, DETAILS
+        )
+        select current_timestamp, %(run_id)s, %(run_id)s, 'AGENT', 'SP_VALIDATE_AND_EXECUTE_PROPOSALS',
+               iff(r.REASON = 'TOTAL_EXPOSURE_EXCEEDS_LIMIT', 'TOTAL_EXPOSURE_EXCEEDED', 'POSITION_COUNT_EXCEEDED'),
+               count(*),
+               json_object('portfolio_id', r.PORTFOLIO_ID, 'open_positions', max(st.OPEN_POSITIONS_ALL),
+                           'max_positions', max(st.MAX_POSITIONS), 'max_position_pct', max(st.MAX_POSITION_PCT))
+          from (select PORTFOLIO_ID, unnest(REASONS) as REASON from TMP_AGENT_CAP_REJECTS) r
+          join TMP_AGENT_PORTFOLIO_STATE st on st.PORTFOLIO_ID = r.PORTFOLIO_ID
+         group by r.PORTFOLIO_ID, r.REASON
+        """,
+        params,
+    )
+    # Execution prices with the equity, entry gate and latest price validation staged per portfolio, so the
+    # fills cannot drift from what was approved and one portfolio's risk state never gates another's trades.
+    cur.execute(
+        """
+        select pr.PROPOSAL_ID, pr.PORTFOLIO_ID, pr.SYMBOL, pr.MARKET_TYPE, pr.SIDE, pr.TARGET_WEIGHT,
+               v.LATEST_PRICE, st.TOTAL_EQUITY,
+               try_cast(json_extract_string(pr.SOURCE_SIGNALS, '$.score') as double),
+               exists (select 1 from MIP.APP.PORTFOLIO_TRADES t
+                        where t.PORTFOLIO_ID = pr.PORTFOLIO_ID and t.PROPOSAL_ID = pr.PROPOSAL_ID)
+          from MIP.AGENT_OUT.ORDER_PROPOSALS pr
+          join TMP_PROPOSAL_VALIDATION v on v.PROPOSAL_ID = pr.PROPOSAL_ID
+          join TMP_AGENT_PORTFOLIO_STATE st on st.PORTFOLIO_ID = pr.PORTFOLIO_ID
+         where pr.RUN_ID_VARCHAR = %(run_id)s and pr.STATUS = 'APPROVED'
+           and not (st.ENTRIES_BLOCKED and pr.SIDE = 'BUY')
+         order by pr.PROPOSAL_ID
+        """,
+        params,
+    )
+    _record_fills(conn, cur, run_id, cur.fetchall())
+    cur.execute(
+        """
+        select st.PORTFOLIO_ID,
+               (select count(*) from TMP_PROPOSAL_VALIDATION v where v.PORTFOLIO_ID = st.PORTFOLIO_ID),
+               (select count(*) from TMP_PROPOSAL_VALIDATION v
+                 where v.PORTFOLIO_ID = st.PORTFOLIO_ID and len(v.VALIDATION_ERRORS) = 0),
+               (select count(*) from MIP.AGENT_OUT.ORDER_PROPOSALS p
+                 where p.PORTFOLIO_ID = st.PORTFOLIO_ID and p.RUN_ID_VARCHAR = %(run_id)s
+                   and p.STATUS = 'EXECUTED' and p.EXECUTED_AT >= %(started)s),
+               (select count(*) from TMP_AGENT_GATE_REJECTS g where g.PORTFOLIO_ID = st.PORTFOLIO_ID)
+          from TMP_AGENT_PORTFOLIO_STATE st
+        """,
+        {"run_id": run_id, "started": started},
+    )
+    return {
+        pid: {"proposal_count": total, "approved_count": approved, "rejected_count": total - approved,
+              "executed_count": executed, "buy_proposals_blocked": blocked}
+        for pid, total, approved, executed, blocked in cur.fetchall()
+    }
+
+
+def _record_fills(conn, cur, run_id, rows) -> dict:
+    """
+    Price proposal rows (PROPOSAL_ID, PORTFOLIO_ID, SYMBOL, MARKET_TYPE, SIDE, TARGET_WEIGHT, MID_PRICE,
+    TOTAL_EQUITY, SCORE, HAS_TRADE) with execution.simulate_fills in one array pass, bulk-insert the new trades
+    into PORTFOLIO_TRADES and mark the proposals EXECUTED.
+    """
+    proposal_ids, portfolio_ids, symbols, market_types, sides, weights, prices, equities, scores, traded = (
+        list(col) for col in zip(*rows)
+    ) if rows else ([] for _ in range(10))
+    fills = simulate_fills(
+        sides, prices, weights, equities,
+        slippage_bps=_config_number(conn, "SLIPPAGE_BPS", 2),
+        fee_bps=_config_number(conn, "FEE_BPS", 1),
+        min_fee=_config_number(conn, "MIN_FEE", 0),
+        spread_bps=_config_number(conn, "SPREAD_BPS", 0),
+    )
+    trade_ts = _now()
+    new = [i for i in range(len(rows)) if fills["FILLED"][i] and not traded[i]]
+    trade_count = _insert_rows(
+        conn,
+        "MIP.APP.PORTFOLIO_TRADES",
+        ["PROPOSAL_ID", "PORTFOLIO_ID", "RUN_ID", "SYMBOL", "MARKET_TYPE", "INTERVAL_MINUTES", "TRADE_TS", "SIDE",
+         "PRICE", "QUANTITY", "NOTIONAL", "REALIZED_PNL", "CASH_AFTER", "SCORE"],
+        [(proposal_ids[i], portfolio_ids[i], run_id, symbols[i], market_types[i], 1440, trade_ts, sides[i],
+          float(fills["PRICE"][i]), float(fills["QUANTITY"][i]), float(fills["NOTIONAL"][i]), None,
+          float(fills["CASH_AFTER"][i]), scores[i]) for i in new],
+    )
+    # Always one statement, so the pass stays constant-size; an empty list updates nothing.
+    cur.execute(
+        """
+        update MIP.AGENT_OUT.ORDER_PROPOSALS
+           set STATUS = 'EXECUTED', EXECUTED_AT = ?
+         where list_contains(?, PROPOSAL_ID) and STATUS = 'APPROVED'
+        """,
+        [trade_ts, proposal_ids],
+    )
+    return {
+        "status": "SUCCESS",
+        "run_id": run_id,
+        "executed_count": len(rows),
+        "trade_count": trade_count,
+        "notional": float(sum(fills["NOTIONAL"][i] for i in new)),
+        "fees": float(sum(fills["FEE"][i] for i in new)),
+    }
+
+
+def execute_proposals(conn, run_id, portfolio_id=None) -> dict:
+    """
+    Standalone execution of every APPROVED proposal of run_id (or of portfolio_id), e.g. fixture proposals
+    written outside the agent pass; the pass itself prices from its staged validation state instead.
+    Equity, entry gate and latest price are read per portfolio here. Proposals that already have a trade are
+    skipped (idempotent on PORTFOLIO_ID, PROPOSAL_ID); BUYs of entry-blocked portfolios stay APPROVED.
+    """
+    portfolio_filter = "and p.PORTFOLIO_ID = ?" if portfolio_id is not None else ""
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        with proposals as (
+            select pr.*, p.STARTING_CASH
+              from MIP.AGENT_OUT.ORDER_PROPOSALS pr
+              join MIP.APP.PORTFOLIO p on p.PORTFOLIO_ID = pr.PORTFOLIO_ID
+             where pr.RUN_ID_VARCHAR = ? and pr.STATUS = 'APPROVED' and p.PROFILE_ID is not null
+               {portfolio_filter}
+        ),
+        equity as (
+            select PORTFOLIO_ID, TOTAL_EQUITY from MIP.APP.PORTFOLIO_DAILY
+             where PORTFOLIO_ID in (select PORTFOLIO_ID from proposals)
+            qualify row_number() over (partition by PORTFOLIO_ID order by TS desc) = 1
+        ),
+        risk as (
+            select PORTFOLIO_ID, coalesce(bool_or(ENTRIES_BLOCKED), false) as ENTRIES_BLOCKED
+              from MIP.MART.V_PORTFOLIO_RISK_STATE
+             where PORTFOLIO_ID in (select PORTFOLIO_ID from proposals)
+             group by PORTFOLIO_ID
+        ),
+        latest_prices as (
+            select b.SYMBOL, b.MARKET_TYPE, b.CLOSE
+              from MIP.MART.MARKET_BARS b
+              join (select distinct SYMBOL, MARKET_TYPE from proposals) s
+                on s.SYMBOL = b.SYMBOL and s.MARKET_TYPE = b.MARKET_TYPE
+             where b.INTERVAL_MINUTES = 1440
+            qualify row_number() over (partition by b.SYMBOL, b.MARKET_TYPE order by b.TS desc) = 1
+        )
+        select pr.PROPOSAL_ID, pr.PORTFOLIO_ID, pr.SYMBOL, pr.MARKET_TYPE, pr.SIDE, pr.TARGET_WEIGHT,
+               lp.CLOSE, coalesce(e.TOTAL_EQUITY, pr.STARTING_CASH),
+               try_cast(json_extract_string(pr.SOURCE_SIGNALS, '$.score') as double),
+               exists (select 1 from MIP.APP.PORTFOLIO_TRADES t
+                        where t.PORTFOLIO_ID = pr.PORTFOLIO_ID and t.PROPOSAL_ID = pr.PROPOSAL_ID)
+          from proposals pr
+          left join equity e on e.PORTFOLIO_ID = pr.PORTFOLIO_ID
+          left join risk r on r.PORTFOLIO_ID = pr.PORTFOLIO_ID
+          left join latest_prices lp on lp.SYMBOL = pr.SYMBOL and lp.MARKET_TYPE = pr.MARKET_TYPE
+         where not (coalesce(r.ENTRIES_BLOCKED, false) and pr.SIDE = 'BUY')
+         order by pr.PROPOSAL_ID
+        """,
+        [run_id] + ([portfolio_id] if portfolio_id is not None else []),
+    )
+    return _record_fills(conn, cur, run_id, cur.fetchall())
+
+
+# ---------------------------------------------------------------------------
+# Orchestration (145_sp_run_daily_pipeline.sql)
+# ---------------------------------------------------------------------------
+
+def _step(conn, run_id, event_name, step_name, fn, rows_key=None, timings=None, **extra):
+    started = _now()
+    clock = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as exc:
+        audit_log_step(conn, run_id, event_name, "FAIL", None,
+                       {"step_name": step_name, "scope": "AGG", "scope_key": None,
+                        "started_at": started, "completed_at": _now(), **extra}, str(exc))
+        raise
+    rows = result.get(rows_key) if isinstance(result, dict) and rows_key else None
+    if timings is not None:
+        timings[event_name] = {"seconds": round(time.perf_counter() - clock, 6), "rows": rows}
+    audit_log_step(conn, run_id, event_name, "SUCCESS", rows,
+                   {"step_name": step_name, "scope": "AGG", "scope_key": None,
+                    "started_at": started, "completed_at": _now(), **extra})
+    return result
+
+
+def _optional_step(conn, run_id, event_name, step_name, fn, **kwargs):
+    """_step for steps the run can continue without: 145 records their FAIL in the summary and moves on."""
+    try:
+        return _step(conn, run_id, event_name, step_name, fn, **kwargs)
+    except Exception as exc:
+        return {"status": "FAIL", "error": str(exc)}
+
+
+def run_daily_pipeline(conn, to_ts=None, from_ts=None, run_id=None, market_types=None) -> dict:
+    """
+    SP_RUN_DAILY_PIPELINE without ingestion/agents:
+    returns -> recs -> evaluation -> KPI layer -> portfolios -> trust classification -> insights -> briefs.
+    """
+    run_id = run_id or str(uuid.uuid4())
+    to_ts = to_ts or _scalar(conn, "select max(TS) from MIP.MART.MARKET_BARS")
+    if to_ts is None:
+        raise ValueError("MARKET_BARS is empty; load fixtures before running the pipeline")
+    from_ts = from_ts or to_ts - timedelta(days=90)
+    timings = {}
+    log_event(conn, "PIPELINE", "SP_RUN_DAILY_PIPELINE", "START", None,
+              {"from_ts": from_ts, "requested_to_ts": to_ts}, None, run_id)
+    try:
+        _step(conn, run_id, "RETURNS_REFRESH", "returns_refresh",
+              lambda: {"rows": _scalar(conn, "select count(*) from MIP.MART.MARKET_RETURNS where TS <= ?", [to_ts])},
+              rows_key="rows", timings=timings)
+        market_types = market_types or [
+            r[0] for r in _execute(
+                conn,
+                """
+                select distinct MARKET_TYPE from MIP.APP.INGEST_UNIVERSE
+                 where coalesce(IS_ENABLED, true) and INTERVAL_MINUTES = 1440
+                union
+                select distinct MARKET_TYPE from MIP.MART.MARKET_BARS where INTERVAL_MINUTES = 1440
+                order by 1
+                """,
+            ).fetchall()
+        ]
+
+        def _recs():
+            results = [generate_momentum_recs(conn, mt, 1440, run_id, to_ts=to_ts) for mt in market_types]
+            return {"rows_delta": sum(r["inserted_count"] for r in results), "results": results}
+
+        recs = _step(conn, run_id, "RECOMMENDATIONS", "recommendations", _recs, rows_key="rows_delta", timings=timings,
+                     market_type_count=len(market_types))
+        evaluation = _step(conn, run_id, "EVALUATION", "evaluation",
+                           lambda: evaluate_recommendations(conn, from_ts, to_ts, run_id=run_id),
+                           rows_key="rows_delta", timings=timings)
+        kpi_layer = _optional_step(conn, run_id, "KPI_LAYER_REFRESH", "kpi_layer_refresh",
+                                   lambda: refresh_kpi_layer(conn, run_id),
+                                   rows_key="rows", timings=timings)
+        portfolio_ids = [
+            r[0] for r in _execute(
+                conn, "select PORTFOLIO_ID from MIP.APP.PORTFOLIO where STATUS = 'ACTIVE' order by PORTFOLIO_ID"
+            ).fetchall()
+        ]
+
+        def _portfolios():
+            results = [run_portfolio_simulation(conn, pid, from_ts, to_ts, run_id) for pid in portfolio_ids]
+            return {"trade_count": sum(r.get("trade_count", 0) for r in results), "results": results}
+
+        portfolios = _step(conn, run_id, "PORTFOLIO_SIMULATION", "portfolio_simulation", _portfolios,
+                           rows_key="trade_count", timings=timings, portfolio_count=len(portfolio_ids))
+        trust = _optional_step(conn, run_id, "TRUST_CLASSIFICATION", "trust_classification",
+                               lambda: classify_signals(conn, run_id),
+                               rows_key="classified_count", timings=timings)
+        insights = _optional_step(conn, run_id, "TODAY_INSIGHTS", "today_insights",
+                                  lambda: refresh_today_insights(conn, to_ts, run_id),
+                                  rows_key="insight_count", timings=timings)
+        briefs = _step(conn, run_id, "MORNING_BRIEF", "morning_brief",
+                       lambda: {"count": len([write_morning_brief(conn, pid, to_ts, run_id) for pid in portfolio_ids])},
+                       rows_key="count", timings=timings)
+    except Exception as exc:
+        log_event(conn, "PIPELINE", "SP_RUN_DAILY_PIPELINE", "FAIL", None,
+                  {"from_ts": from_ts, "to_ts": to_ts}, str(exc), run_id)
+        raise
+    summary = {
+        "status": "SUCCESS",
+        "run_id": run_id,
+        "from_ts": from_ts,
+        "to_ts": to_ts,
+        "recommendations": recs,
+        "evaluation": evaluation,
+        "kpi_layer": kpi_layer,
+        "portfolios": portfolios,
+        "trust_classification": trust,
+        "today_insights": insights,
+        "briefs": briefs,
+        "step_timings": timings,
+    }
+    log_event(conn, "PIPELINE", "SP_RUN_DAILY_PIPELINE", "SUCCESS", recs["rows_delta"],
+              {"from_ts": from_ts, "to_ts": to_ts, "effective_to_ts": to_ts,
+               "portfolio_count": len(portfolio_ids)}, None, run_id)
+    return summary
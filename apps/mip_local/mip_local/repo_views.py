@@ -0,0 +1,89 @@
+"""
+Load the MART/APP view definitions from MIP/SQL into the local database.
+Statements are taken verbatim from the deploy scripts (SQL/mart, SQL/app, SQL/views), translated with
+backend.translate_sql and created in dependency order by retrying until no more views resolve.
+Views that still fail (Snowflake-only features such as FLATTEN) are reported and skipped; views in
+LOCAL_OVERRIDES keep the DuckDB definition from schema.VIEWS.
+"""
+import re
+from pathlib import Path
+
+from .backend import translate_sql
+from .schema import VIEWS
+
+DEFAULT_SQL_ROOT = Path(__file__).resolve().parents[3] / "SQL"
+SQL_DIRS = ("mart", "app", "views/mart", "views/app")
+
+# MARKET_RETURNS in Snowflake routes replay sessions to MART.MARKET_RETURNS_SNAPSHOT via the query tag;
+# the local backend has no session tags, so it keeps the plain deduped/lag view.
+LOCAL_OVERRIDES = ("MART.MARKET_RETURNS",)
+
+_CREATE_VIEW = re.compile(r"create\s+or\s+replace\s+(?:secure\s+)?view\s+([\w.]+)", re.IGNORECASE)
+
+
+def split_statements(text: str) -> list[str]:
+    """Split a deploy script on ';' outside string literals, $$ blocks and -- comments."""
+    statements, buf = [], []
+    i, in_quote, in_dollar = 0, False, False
+    while i < len(text):
+        if not in_quote and text.startswith("$$", i):
+            in_dollar = not in_dollar
+            buf.append("$$")
+            i += 2
+            continue
+        if not in_quote and not in_dollar and text.startswith("--", i):
+            end = text.find("\n", i)
+            i = len(text) if end < 0 else end
+            continue
+        ch = text[i]
+        if ch == "'" and not in_dollar:
+            in_quote = not in_quote
+        if ch == ";" and not in_quote and not in_dollar:
+            statements.append("".join(buf).strip())
+            buf = []
+        else:
+            buf.append(ch)
+        i += 1
+    tail = "".join(buf).strip()
+    if tail:
+        statements.append(tail)
+    return [s for s in statements if s]
+
+
+def collect_views(sql_root: str | Path = DEFAULT_SQL_ROOT) -> dict[str, str]:
+    """{MIP.SCHEMA.VIEW: create statement}; later scripts win, as when deployed in order."""
+    views = {}
+    root = Path(sql_root)
+    for sub in SQL_DIRS:
+        for path in sorted((root / sub).glob("*.sql")):
+            for statement in split_statements(path.read_text(encoding="utf-8")):
+                m = _CREATE_VIEW.match(statement)
+                if m:
+                    views[m.group(1).upper()] = statement
+    return views
+
+
+def load_repo_views(db, sql_root: str | Path = DEFAULT_SQL_ROOT) -> dict:
+    """Create every translatable repo view; returns {"loaded": [...], "failed": {name: error}}."""
+    if not Path(sql_root).is_dir():
+        return {"loaded": [], "failed": {}}
+    pending = {
+        name: sql for name, sql in collect_views(sql_root).items()
+        if name.removeprefix("MIP.") not in LOCAL_OVERRIDES
+    }
+    loaded, errors = [], {}
+    progress = True
+    while pending and progress:
+        progress = False
+        for name, sql in list(pending.items()):
+            try:
+                db.execute(translate_sql(sql))
+            except Exception as exc:
+                errors[name] = str(exc).splitlines()[0]
+                continue
+            loaded.append(name)
+            del pending[name]
+            progress = True
+    for name in LOCAL_OVERRIDES:
+        db.execute(VIEWS[name])
+    return {"loaded": loaded, "failed": {name: errors[name] for name in pending}}
@@ -0,0 +1,714 @@
+"""
+DuckDB DDL for the local MIP backend.
+Mirrors the Snowflake objects in MIP/SQL (same database.schema.table names and column names) so
+pipeline code and the UI API can run the same queries. Types are the closest DuckDB equivalents:
+VARIANT -> JSON, NUMBER(p,s) -> DECIMAL/DOUBLE, autoincrement/identity -> sequences.
+"""
+
+SCHEMAS = ("APP", "MART", "AGENT_OUT")
+
+# Snowflake type names and functions used by the API/pipeline SQL that DuckDB lacks.
+COMPAT_TYPES = (
+    ("TIMESTAMP_NTZ", "TIMESTAMP"),
+    ("NUMBER", "DOUBLE"),
+)
+
+COMPAT_MACROS = (
+    "create or replace macro iff(c, a, b) as case when c then a else b end",
+    "create or replace macro get_path(v, p) as json_extract_string(v, '$.' || p)",
+    "create or replace macro try_to_number(v) as try_cast(v as double)",
+    "create or replace macro to_varchar(v) as cast(v as varchar), (v, fmt) as cast(v as varchar)",
+    "create or replace macro to_date(v) as cast(v as date)",
+    "create or replace macro to_timestamp_ntz(v) as cast(v as timestamp)",
+    "create or replace macro try_to_timestamp_ntz(v) as try_cast(v as timestamp)",
+    "create or replace macro parse_json(v) as json(v)",
+    "create or replace macro try_parse_json(v) as try_cast(v as json)",
+    "create or replace macro nvl(a, b) as coalesce(a, b)",
+    "create or replace macro zeroifnull(v) as coalesce(v, 0)",
+    "create or replace macro div0(a, b) as case when b = 0 then 0 else a / b end",
+    "create or replace macro array_size(v) as json_array_length(v)",
+    "create or replace macro current_query_tag() as ''",
+    "create or replace macro uuid_string() as cast(uuid() as varchar)",
+    # backend.translate_sql quotes the date part: dateadd(day, n, ts) -> dateadd('day', n, ts)
+    "create or replace macro dateadd(p, n, ts) as ts + cast(n || ' ' || p as interval)",
+    # APPROX_PERCENTILE_* (t-digest states) stand-in: the "sketch" is the list of values, so estimates are exact.
+    "create or replace macro approx_percentile_accumulate(x) as list(x) filter (where x is not null)",
+    "create or replace macro approx_percentile_combine(s) as flatten(list(s))",
+    "create or replace macro approx_percentile_estimate(s, q) as list_aggregate(s, 'quantile_cont', q)",
+)
+
+SEQUENCES = (
+    "MIP.APP.SEQ_PATTERN_ID",
+    "MIP.APP.SEQ_RECOMMENDATION_ID",
+    "MIP.APP.SEQ_PORTFOLIO_PROFILE_ID",
+    "MIP.APP.SEQ_PORTFOLIO_ID",
+    "MIP.APP.SEQ_EPISODE_ID",
+    "MIP.APP.SEQ_TRADE_ID",
+    "MIP.AGENT_OUT.SEQ_BRIEF_ID",
+    "MIP.AGENT_OUT.SEQ_PROPOSAL_ID",
+)
+
+TABLES = {
+    "MART.MARKET_BARS": """
+        create table if not exists MIP.MART.MARKET_BARS (
+            TS               TIMESTAMP,
+            SYMBOL           VARCHAR,
+            SOURCE           VARCHAR,
+            MARKET_TYPE      VARCHAR,
+            INTERVAL_MINUTES INTEGER,
+            OPEN             DOUBLE,
+            HIGH             DOUBLE,
+            LOW              DOUBLE,
+            CLOSE            DOUBLE,
+            VOLUME           DOUBLE,
+            INGESTED_AT      TIMESTAMP
+        )
+    """,
+    "APP.APP_CONFIG": """
+        create table if not exists MIP.APP.APP_CONFIG (
+            CONFIG_KEY   VARCHAR primary key,
+            CONFIG_VALUE VARCHAR,
+            DESCRIPTION  VARCHAR,
+            UPDATED_AT   TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.INGEST_UNIVERSE": """
+        create table if not exists MIP.APP.INGEST_UNIVERSE (
+            SYMBOL           VARCHAR not null,
+            MARKET_TYPE      VARCHAR not null,
+            INTERVAL_MINUTES INTEGER not null,
+            IS_ENABLED       BOOLEAN default true,
+            PRIORITY         INTEGER default 0,
+            CREATED_AT       TIMESTAMP default current_timestamp,
+            NOTES            VARCHAR,
+            primary key (SYMBOL, MARKET_TYPE, INTERVAL_MINUTES)
+        )
+    """,
+    "APP.PATTERN_DEFINITION": """
+        create table if not exists MIP.APP.PATTERN_DEFINITION (
+            PATTERN_ID       BIGINT default nextval('MIP.APP.SEQ_PATTERN_ID') primary key,
+            NAME             VARCHAR not null unique,
+            DESCRIPTION      VARCHAR,
+            PARAMS_JSON      JSON,
+            ENABLED          BOOLEAN default true,
+            IS_ACTIVE        VARCHAR default 'Y',
+            LAST_TRADE_COUNT INTEGER,
+            LAST_HIT_RATE    DOUBLE,
+            LAST_AVG_RETURN  DOUBLE,
+            PATTERN_SCORE    DOUBLE,
+            CREATED_AT       TIMESTAMP default current_timestamp,
+            UPDATED_AT       TIMESTAMP
+        )
+    """,
+    "APP.RECOMMENDATION_LOG": """
+        create table if not exists MIP.APP.RECOMMENDATION_LOG (
+            RECOMMENDATION_ID BIGINT default nextval('MIP.APP.SEQ_RECOMMENDATION_ID') primary key,
+            PATTERN_ID        BIGINT not null,
+            SYMBOL            VARCHAR not null,
+            MARKET_TYPE       VARCHAR not null,
+            INTERVAL_MINUTES  INTEGER not null,
+            TS                TIMESTAMP not null,
+            GENERATED_AT      TIMESTAMP default current_timestamp,
+            SCORE             DOUBLE,
+            DETAILS           JSON
+        )
+    """,
+    "APP.RECOMMENDATION_OUTCOMES": """
+        create table if not exists MIP.APP.RECOMMENDATION_OUTCOMES (
+            RECOMMENDATION_ID    BIGINT not null,
+            HORIZON_BARS         INTEGER not null,
+            ENTRY_TS             TIMESTAMP not null,
+            EXIT_TS              TIMESTAMP,
+            ENTRY_PRICE          DOUBLE,
+            EXIT_PRICE           DOUBLE,
+            REALIZED_RETURN      DOUBLE,
+            DIRECTION            VARCHAR,
+            HIT_FLAG             BOOLEAN,
+            HIT_RULE             VARCHAR,
+            MIN_RETURN_THRESHOLD DOUBLE,
+            EVAL_STATUS          VARCHAR,
+            CALCULATED_AT        TIMESTAMP default current_timestamp,
+            primary key (RECOMMENDATION_ID, HORIZON_BARS)
+        )
+    """,
+    "APP.RECOMMENDATION_OUTCOME_STATS": """
+        create table if not exists MIP.APP.RECOMMENDATION_OUTCOME_STATS (
+            STATS_KEY          VARCHAR primary key,
+            TOTAL_OUTCOMES     BIGINT,
+            LAST_CALCULATED_AT TIMESTAMP,
+            LAST_BATCH_ROWS    BIGINT,
+            PREV_CALCULATED_AT TIMESTAMP,
+            UPDATED_AT         TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.TODAY_INSIGHTS": """
+        create table if not exists MIP.APP.TODAY_INSIGHTS (
+            RUN_ID              VARCHAR not null,
+            AS_OF_TS            TIMESTAMP,
+            INSIGHT_RANK        INTEGER primary key,
+            SYMBOL              VARCHAR not null,
+            MARKET_TYPE         VARCHAR not null,
+            PATTERN_ID          BIGINT not null,
+            INTERVAL_MINUTES    INTEGER not null,
+            RECS_TOTAL          BIGINT,
+            OUTCOMES_TOTAL      BIGINT,
+            HORIZONS_COVERED    BIGINT,
+            MATURITY_SCORE      DOUBLE,
+            MATURITY_STAGE      VARCHAR,
+            REASONS             JSON,
+            MEAN_H5             DOUBLE,
+            PCT_POSITIVE_H5     DOUBLE,
+            TODAY_SCORE         DOUBLE,
+            PERFORMANCE_SUMMARY JSON,
+            CREATED_AT          TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.TRUSTED_SIGNAL_CLASSIFICATION": """
+        create table if not exists MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION (
+            RUN_ID             VARCHAR not null,
+            RECOMMENDATION_ID  BIGINT not null,
+            SYMBOL             VARCHAR not null,
+            MARKET_TYPE        VARCHAR not null,
+            INTERVAL_MINUTES   INTEGER not null,
+            TS                 TIMESTAMP not null,
+            PATTERN_ID         BIGINT not null,
+            GENERATED_AT       TIMESTAMP,
+            TRUST_LABEL        VARCHAR,
+            RECOMMENDED_ACTION VARCHAR,
+            GATING_REASON      JSON,
+            CLASSIFIED_AT      TIMESTAMP default current_timestamp,
+            primary key (RUN_ID, RECOMMENDATION_ID)
+        )
+    """,
+    # Materialized trust/KPI layer (MIP/SQL/mart/015); refreshed by pipeline.refresh_kpi_layer.
+    "MART.KPI_SIGNAL_OUTCOME": """
+        create table if not exists MIP.MART.KPI_SIGNAL_OUTCOME (
+            PATTERN_ID                BIGINT not null,
+            MARKET_TYPE               VARCHAR not null,
+            INTERVAL_MINUTES          INTEGER not null,
+            HORIZON_BARS              INTEGER not null,
+            N_TOTAL                   BIGINT,
+            N_SUCCESS                 BIGINT,
+            N_PENDING                 BIGINT,
+            COVERAGE_RATE             DOUBLE,
+            AVG_RETURN                DOUBLE,
+            MEDIAN_RETURN             DOUBLE,
+            P10_RETURN                DOUBLE,
+            P90_RETURN                DOUBLE,
+            STDDEV_RETURN             DOUBLE,
+            MIN_RETURN                DOUBLE,
+            MAX_RETURN                DOUBLE,
+            HIT_RATE                  DOUBLE,
+            AVG_WIN                   DOUBLE,
+            AVG_LOSS                  DOUBLE,
+            SCORE_RETURN_CORR         DOUBLE,
+            OLDEST_NOT_READY_ENTRY_TS TIMESTAMP,
+            NEWEST_NOT_READY_ENTRY_TS TIMESTAMP,
+            LATEST_MATURED_ENTRY_TS   TIMESTAMP,
+            RUN_ID                    VARCHAR,
+            REFRESHED_AT              TIMESTAMP default current_timestamp,
+            primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS)
+        )
+    """,
+    "MART.KPI_SCORE_CALIBRATION": """
+        create table if not exists MIP.MART.KPI_SCORE_CALIBRATION (
+            PATTERN_ID       BIGINT not null,
+            MARKET_TYPE      VARCHAR not null,
+            INTERVAL_MINUTES INTEGER not null,
+            HORIZON_BARS     INTEGER not null,
+            SCORE_DECILE     INTEGER not null,
+            N                BIGINT,
+            AVG_RETURN       DOUBLE,
+            MEDIAN_RETURN    DOUBLE,
+            HIT_RATE         DOUBLE,
+            SCORE_MIN        DOUBLE,
+            SCORE_MAX        DOUBLE,
+            RUN_ID           VARCHAR,
+            REFRESHED_AT     TIMESTAMP default current_timestamp,
+            primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, SCORE_DECILE)
+        )
+    """,
+    "MART.KPI_REC_TRAINING": """
+        create table if not exists MIP.MART.KPI_REC_TRAINING (
+            PATTERN_ID        BIGINT not null,
+            MARKET_TYPE       VARCHAR not null,
+            INTERVAL_MINUTES  INTEGER not null,
+            HORIZON_BARS      INTEGER not null,
+            N                 BIGINT,
+            HIT_RATE          DOUBLE,
+            AVG_RETURN        DOUBLE,
+            MEDIAN_RETURN     DOUBLE,
+            AVG_WIN           DOUBLE,
+            AVG_LOSS          DOUBLE,
+            EXPECTANCY        DOUBLE,
+            RETURN_STDDEV     DOUBLE,
+            MAX_LOSS_STREAK   BIGINT,
+            N_30D             BIGINT,
+            HIT_RATE_30D      DOUBLE,
+            AVG_RETURN_30D    DOUBLE,
+            MEDIAN_RETURN_30D DOUBLE,
+            AVG_WIN_30D       DOUBLE,
+            AVG_LOSS_30D      DOUBLE,
+            EXPECTANCY_30D    DOUBLE,
+            RETURN_STDDEV_30D DOUBLE,
+            N_90D             BIGINT,
+            HIT_RATE_90D      DOUBLE,
+            AVG_RETURN_90D    DOUBLE,
+            MEDIAN_RETURN_90D DOUBLE,
+            AVG_WIN_90D       DOUBLE,
+            AVG_LOSS_90D      DOUBLE,
+            EXPECTANCY_90D    DOUBLE,
+            RETURN_STDDEV_90D DOUBLE,
+            RUN_ID            VARCHAR,
+            REFRESHED_AT      TIMESTAMP default current_timestamp,
+            primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS)
+        )
+    """,
+    "MART.KPI_PATTERN_SCORECARD": """
+        create table if not exists MIP.MART.KPI_PATTERN_SCORECARD (
+            PATTERN_ID            BIGINT not null,
+            MARKET_TYPE           VARCHAR not null,
+            INTERVAL_MINUTES      INTEGER not null,
+            SAMPLE_COUNT          BIGINT,
+            HIT_RATE              DOUBLE,
+            AVG_FORWARD_RETURN    DOUBLE,
+            MEDIAN_FORWARD_RETURN DOUBLE,
+            MIN_FORWARD_RETURN    DOUBLE,
+            MAX_FORWARD_RETURN    DOUBLE,
+            LAST_SIGNAL_DATE      DATE,
+            PATTERN_STATUS        VARCHAR,
+            RUN_ID                VARCHAR,
+            REFRESHED_AT          TIMESTAMP default current_timestamp,
+            primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES)
+        )
+    """,
+    "MART.KPI_OUTCOME_SKETCH": """
+        create table if not exists MIP.MART.KPI_OUTCOME_SKETCH (
+            PATTERN_ID       BIGINT not null,
+            MARKET_TYPE      VARCHAR not null,
+            INTERVAL_MINUTES INTEGER not null,
+            HORIZON_BARS     INTEGER not null,
+            ENTRY_DATE       DATE not null,
+            N_SUCCESS        BIGINT,
+            RETURN_SKETCH    DOUBLE[],
+            SCORE_SKETCH     DOUBLE[],
+            RUN_ID           VARCHAR,
+            REFRESHED_AT     TIMESTAMP default current_timestamp,
+            primary key (PATTERN_ID, MARKET_TYPE, INTERVAL_MINUTES, HORIZON_BARS, ENTRY_DATE)
+        )
+    """,
+    "MART.KPI_LAYER_REFRESH_STATE": """
+        create table if not exists MIP.MART.KPI_LAYER_REFRESH_STATE (
+            STATE_KEY          VARCHAR primary key,
+            RUN_ID             VARCHAR,
+            OUTCOMES_WATERMARK TIMESTAMP,
+            DIRTY_GROUPS       BIGINT,
+            DIRTY_DAYS         BIGINT,
+            FULL_REFRESH       BOOLEAN,
+            REFRESHED_AT       TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.MIP_AUDIT_LOG": """
+        create table if not exists MIP.APP.MIP_AUDIT_LOG (
+            EVENT_TS          TIMESTAMP default current_timestamp,
+            RUN_ID            VARCHAR,
+            PARENT_RUN_ID     VARCHAR,
+            EVENT_TYPE        VARCHAR default 'GENERAL',
+            EVENT_NAME        VARCHAR,
+            STATUS            VARCHAR default 'INFO',
+            ROWS_AFFECTED     BIGINT,
+            DETAILS           JSON,
+            ERROR_MESSAGE     VARCHAR,
+            INVOKED_BY_USER   VARCHAR default 'LOCAL',
+            INVOKED_BY_ROLE   VARCHAR default 'LOCAL',
+            INVOKED_WAREHOUSE VARCHAR,
+            QUERY_ID          VARCHAR,
+            SESSION_ID        VARCHAR
+        )
+    """,
+    "APP.PIPELINE_RUN": """
+        create table if not exists MIP.APP.PIPELINE_RUN (
+            RUN_ID           VARCHAR primary key,
+            EVENT_TYPE       VARCHAR,
+            STARTED_AT       TIMESTAMP,
+            COMPLETED_AT     TIMESTAMP,
+            STATUS           VARCHAR,
+            ROWS_AFFECTED    BIGINT,
+            DURATION_SECONDS DOUBLE,
+            DETAILS          JSON,
+            ERROR_MESSAGE    VARCHAR,
+            UPDATED_AT       TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.MIP_AUDIT_LOG_ARCHIVE": """
+        create table if not exists MIP.APP.MIP_AUDIT_LOG_ARCHIVE (
+            EVENT_TS          TIMESTAMP,
+            RUN_ID            VARCHAR,
+            PARENT_RUN_ID     VARCHAR,
+            EVENT_TYPE        VARCHAR,
+            EVENT_NAME        VARCHAR,
+            STATUS            VARCHAR,
+            ROWS_AFFECTED     BIGINT,
+            DETAILS           JSON,
+            ERROR_MESSAGE     VARCHAR,
+            INVOKED_BY_USER   VARCHAR,
+            INVOKED_BY_ROLE   VARCHAR,
+            INVOKED_WAREHOUSE VARCHAR,
+            QUERY_ID          VARCHAR,
+            SESSION_ID        VARCHAR,
+            ARCHIVED_AT       TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.MIP_AUDIT_LOG_ROLLUP": """
+        create table if not exists MIP.APP.MIP_AUDIT_LOG_ROLLUP (
+            ROOT_RUN_ID       VARCHAR not null,
+            EVENT_TYPE        VARCHAR not null,
+            EVENT_NAME        VARCHAR not null,
+            SCOPE             VARCHAR not null,
+            STATUS            VARCHAR not null,
+            EVENT_COUNT       BIGINT,
+            SCOPE_KEY_COUNT   BIGINT,
+            ROWS_AFFECTED_SUM BIGINT,
+            ERROR_COUNT       BIGINT,
+            FIRST_EVENT_TS    TIMESTAMP,
+            LAST_EVENT_TS     TIMESTAMP,
+            SAMPLE_ERROR      VARCHAR,
+            ROLLED_UP_AT      TIMESTAMP default current_timestamp,
+            primary key (ROOT_RUN_ID, EVENT_TYPE, EVENT_NAME, SCOPE, STATUS)
+        )
+    """,
+    "APP.AUDIT_LOG_RETENTION_STATE": """
+        create table if not exists MIP.APP.AUDIT_LOG_RETENTION_STATE (
+            RETENTION_RUN_ID VARCHAR primary key,
+            ROLLED_UP_BEFORE TIMESTAMP,
+            ARCHIVED_BEFORE  TIMESTAMP,
+            ROLLED_UP_EVENTS BIGINT,
+            ARCHIVED_EVENTS  BIGINT,
+            CREATED_AT       TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.PORTFOLIO_PROFILE": """
+        create table if not exists MIP.APP.PORTFOLIO_PROFILE (
+            PROFILE_ID        BIGINT default nextval('MIP.APP.SEQ_PORTFOLIO_PROFILE_ID') primary key,
+            NAME              VARCHAR not null unique,
+            MAX_POSITIONS     INTEGER,
+            MAX_POSITION_PCT  DOUBLE,
+            BUST_EQUITY_PCT   DOUBLE,
+            BUST_ACTION       VARCHAR default 'ALLOW_EXITS_ONLY',
+            DRAWDOWN_STOP_PCT DOUBLE,
+            DESCRIPTION       VARCHAR,
+            CREATED_AT        TIMESTAMP default current_timestamp,
+            CRYSTALLIZE_ENABLED BOOLEAN default false,
+            PROFIT_TARGET_PCT DOUBLE,
+            CRYSTALLIZE_MODE  VARCHAR,
+            COOLDOWN_DAYS     INTEGER,
+            MAX_EPISODE_DAYS  INTEGER,
+            TAKE_PROFIT_ON    VARCHAR default 'EOD'
+        )
+    """,
+    "APP.PORTFOLIO": """
+        create table if not exists MIP.APP.PORTFOLIO (
+            PORTFOLIO_ID           BIGINT default nextval('MIP.APP.SEQ_PORTFOLIO_ID') primary key,
+            PROFILE_ID             BIGINT,
+            NAME                   VARCHAR not null,
+            BASE_CURRENCY          VARCHAR default 'USD',
+            STARTING_CASH          DOUBLE not null,
+            LAST_SIMULATION_RUN_ID VARCHAR,
+            LAST_SIMULATED_AT      TIMESTAMP,
+            FINAL_EQUITY           DOUBLE,
+            TOTAL_RETURN           DOUBLE,
+            MAX_DRAWDOWN           DOUBLE,
+            WIN_DAYS               INTEGER,
+            LOSS_DAYS              INTEGER,
+            STATUS                 VARCHAR default 'ACTIVE',
+            BUST_AT                TIMESTAMP,
+            COOLDOWN_UNTIL_TS      TIMESTAMP,
+            NOTES                  VARCHAR,
+            CREATED_AT             TIMESTAMP default current_timestamp,
+            UPDATED_AT             TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.PORTFOLIO_EPISODE": """
+        create table if not exists MIP.APP.PORTFOLIO_EPISODE (
+            PORTFOLIO_ID BIGINT not null,
+            EPISODE_ID   BIGINT default nextval('MIP.APP.SEQ_EPISODE_ID') primary key,
+            PROFILE_ID   BIGINT not null,
+            START_TS     TIMESTAMP not null,
+            END_TS       TIMESTAMP,
+            STATUS       VARCHAR not null,
+            END_REASON   VARCHAR,
+            CREATED_AT   TIMESTAMP default current_timestamp,
+            START_EQUITY DOUBLE
+        )
+    """,
+    "APP.PORTFOLIO_EPISODE_RESULTS": """
+        create table if not exists MIP.APP.PORTFOLIO_EPISODE_RESULTS (
+            PORTFOLIO_ID        BIGINT not null,
+            EPISODE_ID          BIGINT not null,
+            START_EQUITY        DOUBLE not null,
+            END_EQUITY          DOUBLE not null,
+            REALIZED_PNL        DOUBLE,
+            RETURN_PCT          DOUBLE,
+            MAX_DRAWDOWN_PCT    DOUBLE,
+            TRADES_COUNT        INTEGER,
+            WIN_DAYS            INTEGER,
+            LOSS_DAYS           INTEGER,
+            DISTRIBUTION_AMOUNT DOUBLE,
+            DISTRIBUTION_MODE   VARCHAR,
+            ENDED_REASON        VARCHAR,
+            ENDED_AT_TS         TIMESTAMP,
+            UPDATED_AT          TIMESTAMP default current_timestamp,
+            primary key (PORTFOLIO_ID, EPISODE_ID)
+        )
+    """,
+    "APP.TRAINING_GATE_PARAMS": """
+        create table if not exists MIP.APP.TRAINING_GATE_PARAMS (
+            PARAM_SET             VARCHAR not null,
+            MIN_SIGNALS           INTEGER not null,
+            MIN_SIGNALS_BOOTSTRAP INTEGER default 5,
+            MIN_HIT_RATE          DOUBLE not null,
+            MIN_AVG_RETURN        DOUBLE not null,
+            IS_ACTIVE             BOOLEAN not null default true
+        )
+    """,
+    "APP.REPLAY_CONTEXT": """
+        create table if not exists MIP.APP.REPLAY_CONTEXT (
+            RUN_ID          VARCHAR primary key,
+            REPLAY_BATCH_ID VARCHAR not null,
+            EFFECTIVE_TO_TS TIMESTAMP not null,
+            CREATED_AT      TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.RUN_SCOPE_OVERRIDE": """
+        create table if not exists MIP.APP.RUN_SCOPE_OVERRIDE (
+            RUN_ID          VARCHAR primary key,
+            EFFECTIVE_TO_TS TIMESTAMP not null,
+            CREATED_AT      TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.PORTFOLIO_POSITIONS": """
+        create table if not exists MIP.APP.PORTFOLIO_POSITIONS (
+            PORTFOLIO_ID     BIGINT not null,
+            RUN_ID           VARCHAR not null,
+            SYMBOL           VARCHAR not null,
+            MARKET_TYPE      VARCHAR not null,
+            INTERVAL_MINUTES INTEGER not null,
+            ENTRY_TS         TIMESTAMP not null,
+            ENTRY_PRICE      DOUBLE not null,
+            QUANTITY         DOUBLE not null,
+            COST_BASIS       DOUBLE not null,
+            ENTRY_SCORE      DOUBLE,
+            ENTRY_INDEX      BIGINT not null,
+            HOLD_UNTIL_INDEX BIGINT not null,
+            CREATED_AT       TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.PORTFOLIO_TRADES": """
+        create table if not exists MIP.APP.PORTFOLIO_TRADES (
+            TRADE_ID         BIGINT default nextval('MIP.APP.SEQ_TRADE_ID') primary key,
+            PROPOSAL_ID      BIGINT,
+            PORTFOLIO_ID     BIGINT not null,
+            RUN_ID           VARCHAR not null,
+            SYMBOL           VARCHAR not null,
+            MARKET_TYPE      VARCHAR not null,
+            INTERVAL_MINUTES INTEGER not null,
+            TRADE_TS         TIMESTAMP not null,
+            SIDE             VARCHAR not null,
+            PRICE            DOUBLE not null,
+            QUANTITY         DOUBLE not null,
+            NOTIONAL         DOUBLE not null,
+            REALIZED_PNL     DOUBLE,
+            CASH_AFTER       DOUBLE not null,
+            SCORE            DOUBLE,
+            CREATED_AT       TIMESTAMP default current_timestamp
+        )
+    """,
+    "APP.PORTFOLIO_DAILY": """
+        create table if not exists MIP.APP.PORTFOLIO_DAILY (
+            PORTFOLIO_ID   BIGINT not null,
+            RUN_ID         VARCHAR not null,
+            TS             TIMESTAMP not null,
+            CASH           DOUBLE not null,
+            EQUITY_VALUE   DOUBLE not null,
+            TOTAL_EQUITY   DOUBLE not null,
+            OPEN_POSITIONS INTEGER not null,
+            DAILY_PNL      DOUBLE,
+            DAILY_RETURN   DOUBLE,
+            PEAK_EQUITY    DOUBLE,
+            DRAWDOWN       DOUBLE,
+            STATUS         VARCHAR default 'ACTIVE',
+            CREATED_AT     TIMESTAMP default current_timestamp,
+            primary key (PORTFOLIO_ID, RUN_ID, TS)
+        )
+    """,
+    "AGENT_OUT.MORNING_BRIEF": """
+        create table if not exists MIP.AGENT_OUT.MORNING_BRIEF (
+            BRIEF_ID        BIGINT default nextval('MIP.AGENT_OUT.SEQ_BRIEF_ID') primary key,
+            AS_OF_TS        TIMESTAMP default current_timestamp,
+            PORTFOLIO_ID    BIGINT not null,
+            RUN_ID          VARCHAR,
+            BRIEF           JSON not null,
+            PIPELINE_RUN_ID VARCHAR,
+            AGENT_NAME      VARCHAR,
+            STATUS          VARCHAR,
+            BRIEF_JSON      JSON,
+            CREATED_AT      TIMESTAMP,
+            SIGNAL_RUN_ID   VARCHAR
+        )
+    """,
+    "AGENT_OUT.ORDER_PROPOSALS": """
+        create table if not exists MIP.AGENT_OUT.ORDER_PROPOSALS (
+            PROPOSAL_ID             BIGINT default nextval('MIP.AGENT_OUT.SEQ_PROPOSAL_ID') primary key,
+            RUN_ID                  VARCHAR,
+            RUN_ID_VARCHAR          VARCHAR,
+            PORTFOLIO_ID            BIGINT,
+            PROPOSED_AT             TIMESTAMP default current_timestamp,
+            SYMBOL                  VARCHAR,
+            MARKET_TYPE             VARCHAR,
+            INTERVAL_MINUTES        INTEGER,
+            SIDE                    VARCHAR,
+            TARGET_WEIGHT           DOUBLE,
+            RECOMMENDATION_ID       BIGINT,
+            SIGNAL_TS               TIMESTAMP,
+            SIGNAL_PATTERN_ID       BIGINT,
+            SIGNAL_INTERVAL_MINUTES INTEGER,
+            SIGNAL_RUN_ID           VARCHAR,
+            SIGNAL_SNAPSHOT         JSON,
+            SOURCE_SIGNALS          JSON,
+            RATIONALE               JSON,
+            STATUS                  VARCHAR default 'PROPOSED',
+            VALIDATION_ERRORS       JSON,
+            APPROVED_AT             TIMESTAMP,
+            EXECUTED_AT             TIMESTAMP
+        )
+    """,
+}
+
+# Views follow MIP/SQL/mart (010, 030, 040); only the subset the local pipeline reads.
+VIEWS = {
+    "MART.MARKET_RETURNS": """
+        create or replace view MIP.MART.MARKET_RETURNS as
+        with deduped as (
+            select *
+              from MIP.MART.MARKET_BARS
+            qualify row_number() over (
+                partition by MARKET_TYPE, SYMBOL, INTERVAL_MINUTES, TS
+                order by INGESTED_AT desc, SOURCE desc
+            ) = 1
+        ),
+        ordered as (
+            select
+                d.*,
+                lag(CLOSE) over (
+                    partition by SYMBOL, MARKET_TYPE, INTERVAL_MINUTES
+                    order by TS
+                ) as PREV_CLOSE
+            from deduped d
+        )
+        select
+            TS, SYMBOL, SOURCE, MARKET_TYPE, INTERVAL_MINUTES,
+            OPEN, HIGH, LOW, CLOSE, VOLUME, INGESTED_AT, PREV_CLOSE,
+            case when PREV_CLOSE is not null and PREV_CLOSE <> 0
+                 then (CLOSE - PREV_CLOSE) / PREV_CLOSE end as RETURN_SIMPLE,
+            case when PREV_CLOSE is not null and PREV_CLOSE > 0 and CLOSE > 0
+                 then ln(CLOSE / PREV_CLOSE) end as RETURN_LOG
+        from ordered
+    """,
+    "MART.V_BAR_INDEX": """
+        create or replace view MIP.MART.V_BAR_INDEX as
+        select
+            SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS, CLOSE,
+            row_number() over (
+                partition by SYMBOL, MARKET_TYPE, INTERVAL_MINUTES
+                order by TS
+            ) as BAR_INDEX
+        from MIP.MART.MARKET_BARS
+        where INTERVAL_MINUTES = 1440
+    """,
+    "MART.REC_OUTCOME_COVERAGE": """
+        create or replace view MIP.MART.REC_OUTCOME_COVERAGE as
+        select
+            r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES, o.HORIZON_BARS,
+            count(*) as N_TOTAL,
+            count_if(o.EVAL_STATUS = 'SUCCESS') as N_SUCCESS,
+            count_if(o.EVAL_STATUS = 'SUCCESS') / nullif(count(*), 0) as COVERAGE_RATE
+        from MIP.APP.RECOMMENDATION_OUTCOMES o
+        join MIP.APP.RECOMMENDATION_LOG r
+          on r.RECOMMENDATION_ID = o.RECOMMENDATION_ID
+        group by 1, 2, 3, 4
+    """,
+    "MART.REC_OUTCOME_PERF": """
+        create or replace view MIP.MART.REC_OUTCOME_PERF as
+        select
+            r.PATTERN_ID, r.MARKET_TYPE, r.INTERVAL_MINUTES, o.HORIZON_BARS,
+            count(*) as N,
+            avg(o.REALIZED_RETURN) as AVG_RETURN,
+            median(o.REALIZED_RETURN) as MEDIAN_RETURN,
+            stddev_samp(o.REALIZED_RETURN) as STDDEV_RETURN,
+            avg(case when o.HIT_FLAG then 1 else 0 end) as HIT_RATE
+        from MIP.APP.RECOMMENDATION_OUTCOMES o
+        join MIP.APP.RECOMMENDATION_LOG r
+          on r.RECOMMENDATION_ID = o.RECOMMENDATION_ID
+        where o.EVAL_STATUS = 'SUCCESS'
+          and o.REALIZED_RETURN is not null
+        group by 1, 2, 3, 4
+    """,
+    "MART.V_TRUSTED_SIGNALS": """
+        create or replace view MIP.MART.V_TRUSTED_SIGNALS as
+        select
+            c.PATTERN_ID, c.MARKET_TYPE, c.INTERVAL_MINUTES, c.HORIZON_BARS,
+            c.N_SUCCESS, c.COVERAGE_RATE, p.AVG_RETURN,
+            (c.N_SUCCESS >= 20 and c.COVERAGE_RATE >= 0.6 and p.AVG_RETURN > 0) as IS_TRUSTED
+        from MIP.MART.REC_OUTCOME_COVERAGE c
+        join MIP.MART.REC_OUTCOME_PERF p
+          on p.PATTERN_ID = c.PATTERN_ID
+         and p.MARKET_TYPE = c.MARKET_TYPE
+         and p.INTERVAL_MINUTES = c.INTERVAL_MINUTES
+         and p.HORIZON_BARS = c.HORIZON_BARS
+    """,
+    "MART.V_PORTFOLIO_SIGNALS": """
+        create or replace view MIP.MART.V_PORTFOLIO_SIGNALS as
+        select
+            rl.RECOMMENDATION_ID, rl.TS, rl.SYMBOL, rl.MARKET_TYPE, rl.INTERVAL_MINUTES,
+            rl.PATTERN_ID, rl.SCORE, ts.HORIZON_BARS
+        from MIP.APP.RECOMMENDATION_LOG rl
+        join MIP.MART.V_TRUSTED_SIGNALS ts
+          on ts.PATTERN_ID = rl.PATTERN_ID
+         and ts.MARKET_TYPE = rl.MARKET_TYPE
+         and ts.INTERVAL_MINUTES = rl.INTERVAL_MINUTES
+        where rl.INTERVAL_MINUTES = 1440
+          and ts.IS_TRUSTED
+        qualify row_number() over (
+            partition by rl.RECOMMENDATION_ID, ts.HORIZON_BARS
+            order by rl.TS desc
+        ) = 1
+    """,
+}
+
+
+def create_schema(conn) -> None:
+    """Create schemas, compat types/macros, sequences, tables and views (idempotent)."""
+    for schema in SCHEMAS:
+        conn.execute(f"create schema if not exists MIP.{schema}")
+    for name, base in COMPAT_TYPES:
+        exists = conn.execute(
+            "select count(*) from duckdb_types() where upper(type_name) = ?", [name]
+        ).fetchone()[0]
+        if not exists:
+            conn.execute(f"create type {name} as {base}")
+    for macro in COMPAT_MACROS:
+        conn.execute(macro)
+    for seq in SEQUENCES:
+        conn.execute(f"create sequence if not exists {seq}")
+    for ddl in TABLES.values():
+        conn.execute(ddl)
+    for ddl in VIEWS.values():
+        conn.execute(ddl)
+    # 161_app_training_gate_params.sql default row
+    conn.execute(
+        """
+        insert into MIP.APP.TRAINING_GATE_PARAMS
+        select 'DEFAULT', 40, 5, 0.55, 0.0005, true
+        where not exists (select 1 from MIP.APP.TRAINING_GATE_PARAMS where PARAM_SET = 'DEFAULT')
+        """
+    )
@@ -0,0 +1,127 @@
+"""
+Synthetic market generator for the local backend.
+Daily (1440) bars for N symbols over M years of weekdays, split across STOCK / ETF / FX, generated
+set-based in DuckDB: each bar's log return is a hash-seeded normal draw (Box-Muller), so the output is
+deterministic for a given seed and independent of thread scheduling. Also seeds INGEST_UNIVERSE, one
+momentum pattern per market type and paper portfolios so run_daily_pipeline has work to do.
+"""
+import json
+from datetime import date, timedelta
+
+# Share of symbols per market type and per-type drift / daily volatility of log returns.
+DEFAULT_MIX = {"STOCK": 0.7, "ETF": 0.2, "FX": 0.1}
+_PROFILES = {
+    "STOCK": {"drift": 0.0004, "vol": 0.020, "price": 100.0, "volume": 2_000_000},
+    "ETF": {"drift": 0.0003, "vol": 0.012, "price": 250.0, "volume": 5_000_000},
+    "FX": {"drift": 0.0000, "vol": 0.006, "price": 1.2, "volume": 0},
+}
+_SYMBOL_PREFIX = {"STOCK": "SYN", "ETF": "ETF", "FX": "FX"}
+
+
+def _split(n_symbols: int, mix: dict) -> dict:
+    counts = {mt: int(n_symbols * share) for mt, share in mix.items()}
+    # Remainder goes to the largest bucket so the total is exactly n_symbols.
+    largest = max(mix, key=mix.get)
+    counts[largest] += n_symbols - sum(counts.values())
+    return {mt: n for mt, n in counts.items() if n > 0}
+
+
+def generate_market(conn, n_symbols: int, years: float = 1.0, end_date: date | None = None,
+                    mix: dict | None = None, seed: int = 0, portfolios: int = 1) -> dict:
+    """Insert synthetic bars + universe/patterns/portfolios; returns {"bars": n, "symbols": {...}, ...}."""
+    end_date = end_date or date(2025, 12, 31)
+    start_date = end_date - timedelta(days=int(round(365 * years)))
+    counts = _split(n_symbols, mix or DEFAULT_MIX)
+    cur = conn.cursor()
+    offset = 0
+    for market_type, count in counts.items():
+        profile = _PROFILES[market_type]
+        cur.execute(
+            f"""
+            insert into MIP.MART.MARKET_BARS (
+                TS, SYMBOL, SOURCE, MARKET_TYPE, INTERVAL_MINUTES,
+                OPEN, HIGH, LOW, CLOSE, VOLUME, INGESTED_AT
+            )
+            with syms as (
+                select i as SID from range({offset}, {offset + count}) t(i)
+            ),
+            days as (
+                select d::timestamp as TS
+                  from range(?::date, ?::date + 1, interval 1 day) t(d)
+                 where isodow(d) <= 5
+            ),
+            draws as (
+                select
+                    s.SID, d.TS,
+                    greatest((hash(s.SID, d.TS, {seed}, 1) % 1000000000) / 1e9, 1e-12) as U1,
+                    (hash(s.SID, d.TS, {seed}, 2) % 1000000000) / 1e9 as U2,
+                    (hash(s.SID, d.TS, {seed}, 3) % 1000000000) / 1e9 as U3,
+                    (hash(s.SID, {seed}, 4) % 1000000000) / 1e9 as SYMBOL_U
+                  from syms s cross join days d
+            ),
+            walk as (
+                select
+                    SID, TS, U3,
+                    {profile["price"]} * (0.5 + SYMBOL_U) * exp(sum(
+                        {profile["drift"]} + {profile["vol"]} * sqrt(-2 * ln(U1)) * cos(2 * pi() * U2)
+                    ) over (partition by SID order by TS)) as CLOSE
+                  from draws
+            )
+            select
+                TS,
+                '{_SYMBOL_PREFIX[market_type]}' || lpad(cast(SID as varchar), 6, '0'),
+                'SYNTHETIC',
+                '{market_type}',
+                1440,
+                CLOSE * (1 + {profile["vol"]} * (U3 - 0.5)),
+                CLOSE * (1 + {profile["vol"]} * U3),
+                CLOSE * (1 - {profile["vol"]} * (1 - U3)),
+                CLOSE,
+                {profile["volume"]} * (0.5 + U3),
+                TS + interval 1 day
+            from walk
+            """,
+            [start_date, end_date],
+        )
+        cur.execute(
+            f"""
+            insert or ignore into MIP.APP.INGEST_UNIVERSE (SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, IS_ENABLED, PRIORITY)
+            select '{_SYMBOL_PREFIX[market_type]}' || lpad(cast(i as varchar), 6, '0'), '{market_type}', 1440, true, 0
+              from range({offset}, {offset + count}) t(i)
+            """
+        )
+        cur.execute(
+            """
+            insert or ignore into MIP.APP.PATTERN_DEFINITION (NAME, DESCRIPTION, PARAMS_JSON)
+            values (?, 'Synthetic benchmark momentum pattern', ?)
+            """,
+            [f"MOMENTUM_{market_type}", json.dumps({
+                "market_type": market_type, "interval_minutes": 1440, "fast_window": 20, "slow_window": 3,
+                "lookback_days": 1, "min_return": 0.002, "min_zscore": 1.0,
+            })],
+        )
+        offset += count
+    cur.execute(
+        """
+        insert or ignore into MIP.APP.PORTFOLIO_PROFILE (NAME, MAX_POSITIONS, MAX_POSITION_PCT, DRAWDOWN_STOP_PCT)
+        values ('SYNTHETIC_BALANCED', 10, 0.08, 0.15)
+        """
+    )
+    cur.execute("select count(*) from MIP.APP.PORTFOLIO")
+    existing = cur.fetchone()[0]
+    for i in range(existing, portfolios):
+        cur.execute(
+            """
+            insert into MIP.APP.PORTFOLIO (PROFILE_ID, NAME, STARTING_CASH)
+            select PROFILE_ID, ?, 100000 from MIP.APP.PORTFOLIO_PROFILE where NAME = 'SYNTHETIC_BALANCED'
+            """,
+            [f"SYNTHETIC_{i + 1}"],
+        )
+    cur.execute("select count(*) from MIP.MART.MARKET_BARS where SOURCE = 'SYNTHETIC'")
+    return {
+        "bars": cur.fetchone()[0],
+        "symbols": counts,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "seed": seed,
+    }
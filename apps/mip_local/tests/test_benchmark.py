@@ -0,0 +1,65 @@
+"""
+Synthetic market generator and benchmark harness at toy scale (no API endpoints).
+Skipped when duckdb is not installed.
+"""
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import duckdb  # noqa: F401
+except ImportError:  # pragma: no cover
+    duckdb = None
+
+if duckdb is not None:
+    import mip_local
+    from mip_local.benchmark import bench_scale, compare
+
+
+@unittest.skipIf(duckdb is None, "duckdb not installed")
+class TestSyntheticMarket(unittest.TestCase):
+    def tearDown(self):
+        mip_local.reset()
+
+    def _bars(self, seed):
+        mip_local.reset()
+        conn = mip_local.connect()
+        result = mip_local.generate_market(conn, 10, years=0.25, seed=seed)
+        cur = conn.cursor()
+        cur.execute("select SYMBOL, TS, CLOSE from MIP.MART.MARKET_BARS order by SYMBOL, TS")
+        return result, cur.fetchall()
+
+    def test_split_and_determinism(self):
+        result, bars = self._bars(seed=1)
+        self.assertEqual(result["symbols"], {"STOCK": 7, "ETF": 2, "FX": 1})
+        self.assertEqual(result["bars"], len(bars))
+        self.assertTrue(all(close > 0 for _, _, close in bars))
+        self.assertEqual(self._bars(seed=1)[1], bars)
+        self.assertNotEqual(self._bars(seed=2)[1], bars)
+
+
+@unittest.skipIf(duckdb is None, "duckdb not installed")
+class TestBenchmark(unittest.TestCase):
+    def test_bench_scale_reports_every_stage(self):
+        result = bench_scale(20, years=0.5, days=2, endpoints=False)
+        self.assertEqual(result["pipeline"]["runs"], 2)
+        self.assertEqual(
+            set(result["pipeline"]["stages"]),
+            {"RETURNS_REFRESH", "RECOMMENDATIONS", "EVALUATION", "KPI_LAYER_REFRESH", "PORTFOLIO_SIMULATION",
+             "TRUST_CLASSIFICATION", "TODAY_INSIGHTS", "MORNING_BRIEF"},
+        )
+        self.assertGreater(result["pipeline"]["stages"]["RETURNS_REFRESH"]["rows"], 0)
+
+    def test_compare_flags_regressions(self):
+        def result(seconds):
+            return {"scales": {"100": {"generate_seconds": 1.0, "pipeline": {"median_run_seconds": seconds}}}}
+
+        rows = {r["metric"]: r for r in compare(result(1.0), result(2.0))}
+        self.assertTrue(rows["100/pipeline/median_run"]["regression"])
+        self.assertFalse(rows["100/generate"]["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
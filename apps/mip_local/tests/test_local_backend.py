@@ -0,0 +1,562 @@
+"""
+Local backend tests: SQL translation, pipeline port end-to-end on generated bars, Parquet fixture round trip.
+Skipped when duckdb is not installed.
+"""
+import json
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import duckdb  # noqa: F401
+except ImportError:  # pragma: no cover
+    duckdb = None
+
+if duckdb is not None:
+    import mip_local
+    from mip_local.backend import translate_sql
+
+# The scorer the pre-TODAY_INSIGHTS /today used, to check SP_PIPELINE_REFRESH_TODAY_INSIGHTS against it.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "mip_ui_api"))
+from app.training_status import DEFAULT_MIN_SIGNALS, apply_scoring_to_rows  # noqa: E402
+
+START = datetime(2025, 1, 1)
+
+
+def _seed(conn, symbols=12, days=120):
+    rnd = random.Random(7)
+    rows = []
+    for s in range(symbols):
+        price = 100.0
+        for d in range(days):
+            price *= 1 + rnd.gauss(0.002, 0.02)
+            rows.append((START + timedelta(days=d), f"S{s:03d}", "TEST", "STOCK", 1440,
+                         price, price * 1.01, price * 0.99, price, 1e6, START))
+    cur = conn.cursor()
+    cur.executemany("insert into MIP.MART.MARKET_BARS values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    cur.execute(
+        "insert into MIP.APP.PATTERN_DEFINITION (NAME, PARAMS_JSON) values ('MOMENTUM_DEMO', %s)",
+        [json.dumps({"fast_window": 5, "slow_window": 2, "min_return": 0.0, "min_zscore": 0.0})],
+    )
+    cur.execute("insert into MIP.APP.PORTFOLIO_PROFILE (NAME, MAX_POSITIONS, MAX_POSITION_PCT) values ('P', 5, 0.1)")
+    cur.execute("insert into MIP.APP.PORTFOLIO (PROFILE_ID, NAME, STARTING_CASH) values (1, 'demo', 100000)")
+
+
+@unittest.skipIf(duckdb is None, "duckdb not installed")
+class TestTranslateSql(unittest.TestCase):
+    def test_params_and_variant_paths(self):
+        sql = translate_sql("select mb.BRIEF:as_of_ts::varchar, DETAILS:\"step_name\"::string from t where a = %s")
+        self.assertIn("json_extract_string(mb.BRIEF, '$.as_of_ts')::varchar", sql)
+        self.assertIn("json_extract_string(DETAILS, '$.step_name')::string", sql)
+        self.assertTrue(sql.endswith("a = ?"))
+
+    def test_string_literals_untouched(self):
+        self.assertEqual(translate_sql("select 'a:b %s' as x"), "select 'a:b %s' as x")
+
+    def test_dateadd_and_within_group(self):
+        sql = translate_sql(
+            "select array_agg(x) within group (order by x desc), dateadd(day, -3, current_timestamp()) from t"
+        )
+        self.assertIn("array_agg(x order by x desc)", sql)
+        self.assertIn("dateadd('day', -3, current_timestamp)", sql)
+
+    def test_pyformat_named_params(self):
+        self.assertEqual(translate_sql("where a = %(market_type)s"), "where a = $market_type")
+
+
+@unittest.skipIf(duckdb is None, "duckdb not installed")
+class TestLocalPipeline(unittest.TestCase):
+    def setUp(self):
+        mip_local.reset()
+        self.conn = mip_local.connect()
+        _seed(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        mip_local.reset()
+
+    def _count(self, table):
+        cur = self.conn.cursor()
+        cur.execute(f"select count(*) from {table}")
+        return cur.fetchone()[0]
+
+    def test_daily_pipeline_writes_every_stage(self):
+        for d in range(60, 90):
+            result = mip_local.run_daily_pipeline(self.conn, to_ts=START + timedelta(days=d))
+        self.assertEqual(result["status"], "SUCCESS")
+        self.assertGreater(self._count("MIP.APP.RECOMMENDATION_LOG"), 0)
+        self.assertGreater(self._count("MIP.APP.RECOMMENDATION_OUTCOMES"), 0)
+        self.assertGreater(self._count("MIP.APP.PORTFOLIO_DAILY"), 0)
+        self.assertEqual(self._count("MIP.AGENT_OUT.MORNING_BRIEF"), 30)
+        cur = self.conn.cursor()
+        cur.execute(
+            "select count(*) from MIP.APP.MIP_AUDIT_LOG where EVENT_TYPE = 'PIPELINE' and STATUS = 'SUCCESS'"
+        )
+        self.assertEqual(cur.fetchone()[0], 30)
+        cur.execute("select count(*), count_if(STATUS = 'SUCCESS' and COMPLETED_AT >= STARTED_AT) from MIP.APP.PIPELINE_RUN")
+        self.assertEqual(cur.fetchone(), (30, 30))
+        cur.execute("select TOTAL_OUTCOMES, LAST_CALCULATED_AT, LAST_BATCH_ROWS from MIP.APP.RECOMMENDATION_OUTCOME_STATS")
+        total, last_calc, batch_rows = cur.fetchone()
+        self.assertEqual(total, self._count("MIP.APP.RECOMMENDATION_OUTCOMES"))
+        cur.execute("select max(CALCULATED_AT), count_if(CALCULATED_AT = (select max(CALCULATED_AT) "
+                    "from MIP.APP.RECOMMENDATION_OUTCOMES)) from MIP.APP.RECOMMENDATION_OUTCOMES")
+        self.assertEqual(cur.fetchone(), (last_calc, batch_rows))
+        self.assertEqual(result["today_insights"]["insight_count"], self._count("MIP.APP.TODAY_INSIGHTS"))
+        # /runs/{id}/profile's scoped query matches the full-history view for the profiled run.
+        from app.routers.runs import PREV_AVG_RUNS, PROFILE_SQL
+        cur.execute(PROFILE_SQL, (result["run_id"], PREV_AVG_RUNS + 1))
+        scoped = [r for r in cur.fetchall() if r[0] == result["run_id"]]
+        cur.execute("select * from MIP.MART.V_PIPELINE_STEP_PROFILE where PIPELINE_RUN_ID = %s "
+                    "order by STARTED_AT nulls last", (result["run_id"],))
+        self.assertEqual(scoped, cur.fetchall())
+        self.assertTrue(all(r[15] is not None for r in scoped))
+
+    def test_insights_failure_does_not_abort_the_run(self):
+        self.conn.cursor().execute("drop table MIP.APP.TODAY_INSIGHTS")
+        result = mip_local.run_daily_pipeline(self.conn, to_ts=START + timedelta(days=80))
+        self.assertEqual((result["status"], result["today_insights"]["status"]), ("SUCCESS", "FAIL"))
+        self.assertEqual(self._count("MIP.AGENT_OUT.MORNING_BRIEF"), 1)
+        cur = self.conn.cursor()
+        cur.execute("select STATUS from MIP.APP.MIP_AUDIT_LOG where EVENT_NAME = 'TODAY_INSIGHTS'")
+        self.assertEqual(cur.fetchall(), [("FAIL",)])
+
+    def test_audit_log_retention_rolls_up_and_archives(self):
+        run_id = mip_local.run_daily_pipeline(self.conn, to_ts=START + timedelta(days=80))["run_id"]
+        for key in ("STOCK", "FX"):
+            mip_local.pipeline.audit_log_step(self.conn, run_id, "RECOMMENDATIONS", "SUCCESS", 5,
+                                              {"step_name": "recommendations", "scope": "MARKET_TYPE",
+                                               "scope_key": key})
+        total = self._count("MIP.APP.MIP_AUDIT_LOG")
+        cur = self.conn.cursor()
+        cur.execute("update MIP.APP.MIP_AUDIT_LOG set EVENT_TS = EVENT_TS - interval 100 day")
+
+        result = mip_local.audit_log_retention(self.conn, 30, 90)
+        self.assertEqual(result["detail_events"], 2)
+        self.assertEqual(result["archived_events"], total - 2)
+        self.assertEqual(self._count("MIP.APP.MIP_AUDIT_LOG_ARCHIVE"), total - 2)
+        cur.execute("select EVENT_COUNT, SCOPE_KEY_COUNT, ROWS_AFFECTED_SUM from MIP.APP.MIP_AUDIT_LOG_ROLLUP "
+                    "where ROOT_RUN_ID = ?", [run_id])
+        self.assertEqual(cur.fetchall(), [(2, 2, 10)])
+        cur.execute("select count(*) from MIP.APP.MIP_AUDIT_LOG where EVENT_NAME <> 'SP_AUDIT_LOG_RETENTION'")
+        self.assertEqual(cur.fetchone()[0], 0)
+        self.assertEqual(self._count("MIP.APP.PIPELINE_RUN"), 1)
+
+    def test_today_insights_rank_mature_candidates(self):
+        as_of = START + timedelta(days=100)
+        cur = self.conn.cursor()
+        # (symbol, recs, horizons evaluated per rec): S000 is mature, S001 has no outcomes, S002 has too few recs.
+        for symbol, recs, horizons in (("S000", 25, (1, 3, 5, 10, 20)), ("S001", 25, ()), ("S002", 5, (5,))):
+            for i in range(recs):
+                cur.execute(
+                    "insert into MIP.APP.RECOMMENDATION_LOG (PATTERN_ID, SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS) "
+                    "values (1, ?, 'STOCK', 1440, ?) returning RECOMMENDATION_ID",
+                    [symbol, as_of - timedelta(days=i)],
+                )
+                rec_id = cur.fetchone()[0]
+                for h in horizons:
+                    cur.execute(
+                        "insert into MIP.APP.RECOMMENDATION_OUTCOMES (RECOMMENDATION_ID, HORIZON_BARS, ENTRY_TS, "
+                        "REALIZED_RETURN, EVAL_STATUS) values (?, ?, ?, ?, 'SUCCESS')",
+                        [rec_id, h, as_of, 0.01 if i % 5 else -0.01],
+                    )
+        result = mip_local.refresh_today_insights(self.conn, as_of, "run-1")
+        self.assertEqual((result["candidate_count"], result["insight_count"]), (3, 1))
+        cur.execute("select RUN_ID, INSIGHT_RANK, SYMBOL, MATURITY_SCORE, MATURITY_STAGE, MEAN_H5, PCT_POSITIVE_H5, "
+                    "TODAY_SCORE, REASONS, PERFORMANCE_SUMMARY from MIP.APP.TODAY_INSIGHTS")
+        run_id, rank, symbol, score, stage, mean_h5, pct_h5, today_score, reasons, perf = cur.fetchone()
+        self.assertEqual((run_id, rank, symbol, score, stage), ("run-1", 1, "S000", 88.8, "CONFIDENT"))
+        self.assertAlmostEqual(mean_h5, 0.006)
+        self.assertAlmostEqual(pct_h5, 0.8)
+        self.assertAlmostEqual(today_score, round(0.5 * 0.888 + 0.3 * 0.06 + 0.2 * 0.8, 3))
+        self.assertEqual(json.loads(reasons)[0], "Not enough recommendations yet; more data will improve the score.")
+        self.assertEqual(sorted(json.loads(perf), key=int), ["1", "3", "5", "10", "20"])
+
+    def test_today_insights_match_the_old_today_endpoint(self):
+        as_of = START + timedelta(days=100)
+        cur = self.conn.cursor()
+        # The old /today scored with DEFAULT_MIN_SIGNALS regardless of the /training gate row.
+        cur.execute("update MIP.APP.TRAINING_GATE_PARAMS set MIN_SIGNALS = 30")
+        pairs = (("S000", 45, (1, 3, 5, 10, 20)), ("S001", 35, (1, 3, 5)), ("S002", 20, (5, 10)), ("S003", 18, (5,)))
+        for symbol, recs, horizons in pairs:
+            for i in range(recs):
+                cur.execute(
+                    "insert into MIP.APP.RECOMMENDATION_LOG (PATTERN_ID, SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TS) "
+                    "values (1, ?, 'STOCK', 1440, ?) returning RECOMMENDATION_ID",
+                    [symbol, as_of - timedelta(days=i)],
+                )
+                rec_id = cur.fetchone()[0]
+                for h in horizons[:1 + i % len(horizons)]:
+                    cur.execute(
+                        "insert into MIP.APP.RECOMMENDATION_OUTCOMES (RECOMMENDATION_ID, HORIZON_BARS, ENTRY_TS, "
+                        "REALIZED_RETURN, EVAL_STATUS) values (?, ?, ?, 0.01, 'SUCCESS')",
+                        [rec_id, h, as_of],
+                    )
+        mip_local.refresh_today_insights(self.conn, as_of, "run-1")
+        cur.execute("select SYMBOL, MATURITY_SCORE, MATURITY_STAGE, REASONS from MIP.APP.TODAY_INSIGHTS order by SYMBOL")
+        actual = [(symbol, score, stage, json.loads(reasons)) for symbol, score, stage, reasons in cur.fetchall()]
+
+        # Old /today insight filter: apply_scoring_to_rows(min_signals=DEFAULT_MIN_SIGNALS), drop INSUFFICIENT and
+        # pairs with fewer than max(1, DEFAULT_MIN_SIGNALS // 2) recommendations.
+        cur.execute("""
+            select r.SYMBOL as symbol, count(distinct r.RECOMMENDATION_ID) as recs_total,
+                   count(o.RECOMMENDATION_ID) as outcomes_total, count(distinct o.HORIZON_BARS) as horizons_covered
+              from MIP.APP.RECOMMENDATION_LOG r
+              left join MIP.APP.RECOMMENDATION_OUTCOMES o on o.RECOMMENDATION_ID = r.RECOMMENDATION_ID
+             group by r.SYMBOL
+        """)
+        cols = [d[0].lower() for d in cur.description]
+        scored = apply_scoring_to_rows([dict(zip(cols, row)) for row in cur.fetchall()], min_signals=DEFAULT_MIN_SIGNALS)
+        expected = sorted(
+            (r["symbol"], r["maturity_score"], r["maturity_stage"], r["reasons"]) for r in scored
+            if r["maturity_stage"] != "INSUFFICIENT" and r["recs_total"] >= max(1, DEFAULT_MIN_SIGNALS // 2)
+        )
+        self.assertEqual([r[0] for r in expected], ["S000", "S001", "S002"])
+        self.assertEqual(actual, expected)
+
+    def test_kpi_layer_refreshes_only_dirty_groups(self):
+        for d in range(60, 80):
+            mip_local.generate_momentum_recs(self.conn, "STOCK", 1440, to_ts=START + timedelta(days=d))
+        mip_local.evaluate_recommendations(self.conn, START, START + timedelta(days=100))
+        first = mip_local.refresh_kpi_layer(self.conn, "run-1")
+        self.assertTrue(first["full_refresh"])
+        self.assertGreater(first["signal_outcome_rows"], 0)
+        cur = self.conn.cursor()
+        # The local sketch stand-in is exact, so sketch medians match the _LIVE views' median().
+        for view in ("MIP.MART.V_SIGNAL_OUTCOME_KPIS", "MIP.MART.V_SCORE_CALIBRATION", "MIP.MART.REC_TRAINING_KPIS",
+                     "MIP.APP.V_PATTERN_SCORECARD"):
+            cur.execute(f"select count(*) from (select * from {view}_LIVE except all "
+                        f"select columns(c -> c not in ('P10_RETURN', 'P90_RETURN')) from {view})")
+            self.assertEqual(cur.fetchone()[0], 0, view)
+        cur.execute("select count(*), count_if(P10_RETURN <= MEDIAN_RETURN and MEDIAN_RETURN <= P90_RETURN), "
+                    "max(MEDIAN_RANK_ERROR * N_SUCCESS) from MIP.MART.V_OUTCOME_QUANTILE_ERROR")
+        groups, ordered, median_rank_error = cur.fetchone()
+        self.assertEqual(groups, ordered)
+        self.assertLessEqual(median_rank_error, 1)
+        cur.execute("select json_array_length(SCORE_DECILE_BOUNDARIES) from MIP.MART.V_OUTCOME_QUANTILES limit 1")
+        self.assertEqual(cur.fetchone()[0], 9)
+
+        second = mip_local.refresh_kpi_layer(self.conn, "run-2")
+        self.assertEqual((second["full_refresh"], second["dirty_groups"], second["signal_outcome_rows"]), (False, 0, 0))
+        self.assertEqual(second["rec_training_rows"], first["rec_training_rows"])
+
+        cur.execute("select PATTERN_ID, HORIZON_BARS from MIP.MART.V_SIGNAL_OUTCOME_KPIS order by all limit 1")
+        pattern_id, horizon = cur.fetchone()
+        cur.execute(
+            "update MIP.APP.RECOMMENDATION_OUTCOMES set REALIZED_RETURN = 0.5, CALCULATED_AT = current_timestamp "
+            "where HORIZON_BARS = ? and EVAL_STATUS = 'SUCCESS' and RECOMMENDATION_ID = (select min(RECOMMENDATION_ID) "
+            "from MIP.APP.RECOMMENDATION_LOG where PATTERN_ID = ?)",
+            [horizon, pattern_id],
+        )
+        third = mip_local.refresh_kpi_layer(self.conn, "run-3")
+        self.assertEqual((third["dirty_groups"], third["dirty_days"], third["sketch_rows"]), (1, 1, 1))
+        self.assertEqual(third["signal_outcome_rows"], 1)
+        cur.execute("select count(*) from (select * from MIP.MART.V_SIGNAL_OUTCOME_KPIS_LIVE except all "
+                    "select * exclude (P10_RETURN, P90_RETURN) from MIP.MART.V_SIGNAL_OUTCOME_KPIS)")
+        self.assertEqual(cur.fetchone()[0], 0)
+        cur.execute("select count(*) from MIP.MART.KPI_SIGNAL_OUTCOME where RUN_ID = 'run-3'")
+        self.assertEqual(cur.fetchone()[0], 1)
+
+    def test_trust_snapshot_feeds_eligible_signals(self):
+        mip_local.run_daily_pipeline(self.conn, to_ts=START + timedelta(days=80), run_id="run-1")
+        cur = self.conn.cursor()
+        cur.execute("select count(*) from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY where TRUST_LABEL is null")
+        self.assertEqual(cur.fetchone()[0], 0)
+        cur.execute("select count(*) from MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION where RUN_ID = 'run-1'")
+        classified = cur.fetchone()[0]
+        self.assertGreater(classified, 0)
+        self.assertEqual(classified, self._count("MIP.APP.V_SIGNALS_ELIGIBLE_TODAY"))
+        cur.execute(
+            "select count(*) from (select RECOMMENDATION_ID, TRUST_LABEL, RECOMMENDED_ACTION "
+            "from MIP.APP.V_TRUSTED_SIGNAL_CLASSIFICATION where GENERATED_AT::date = current_date except all "
+            "select RECOMMENDATION_ID, TRUST_LABEL, RECOMMENDED_ACTION from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY)"
+        )
+        self.assertEqual(cur.fetchone()[0], 0)
+
+        # A re-run replaces its own snapshot; the view follows the latest run.
+        self.assertEqual(mip_local.classify_signals(self.conn, "run-1")["classified_count"], classified)
+        mip_local.classify_signals(self.conn, "run-2")
+        cur.execute("select count(*), count_if(CLASSIFICATION_RUN_ID = 'run-2') from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY")
+        self.assertEqual(cur.fetchone(), (classified, classified))
+        self.assertEqual(self._count("MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION"), 2 * classified)
+
+    def test_agent_pass_is_set_based_across_portfolios(self):
+        cur = self.conn.cursor()
+        cur.execute("update MIP.APP.TRAINING_GATE_PARAMS set MIN_SIGNALS = 1, MIN_SIGNALS_BOOTSTRAP = 1, "
+                    "MIN_HIT_RATE = 0, MIN_AVG_RETURN = -1")
+        for i in range(5):
+            cur.execute("insert into MIP.APP.PORTFOLIO (PROFILE_ID, NAME, STARTING_CASH) values (1, %s, 50000)",
+                        [f"extra-{i}"])
+        for d in range(95, 120):
+            mip_local.run_daily_pipeline(self.conn, to_ts=START + timedelta(days=d))
+        cur.execute("select max(RUN_ID) from MIP.MART.V_TRUSTED_SIGNALS_LATEST_TS")
+        signal_run_id = cur.fetchone()[0]
+        self.assertIsNotNone(signal_run_id)
+        # As in SP_RUN_DAILY_PIPELINE, the run is classified before its agent pass.
+        mip_local.classify_signals(self.conn, signal_run_id)
+
+        statements = []
+        conn = self.conn
+
+        class _Counting:
+            def cursor(self):
+                inner = conn.cursor()
+
+                class _Cursor:
+                    def execute(self, sql, params=None):
+                        statements.append(sql)
+                        return inner.execute(sql, params)
+
+                    def __getattr__(self, name):
+                        return getattr(inner, name)
+
+                return _Cursor()
+
+        single = mip_local.propose_and_execute(_Counting(), signal_run_id, portfolio_id=1)
+        single_statements, statements[:] = len(statements), []
+        batch = mip_local.propose_and_execute(_Counting(), signal_run_id)
+        self.assertEqual(len(statements), single_statements)
+        self.assertEqual((single["portfolio_count"], batch["portfolio_count"]), (1, 6))
+        self.assertGreater(batch["proposal_inserted"], 0)
+
+        cur.execute(
+            "select p.PORTFOLIO_ID, count(*), count_if(p.STATUS = 'EXECUTED') from MIP.AGENT_OUT.ORDER_PROPOSALS p "
+            "group by p.PORTFOLIO_ID"
+        )
+        capacity = {r["portfolio_id"]: r["proposal_result"]["remaining_capacity"] for r in batch["results"]}
+        for portfolio_id, proposed, executed in cur.fetchall():
+            self.assertLessEqual(proposed, capacity[portfolio_id])
+        cur.execute("select count(*) from MIP.AGENT_OUT.ORDER_PROPOSALS where STATUS = 'EXECUTED'")
+        executed = cur.fetchone()[0]
+        self.assertEqual(self._count("MIP.APP.PORTFOLIO_TRADES where PROPOSAL_ID is not null"), executed)
+
+        # Re-running the pass for the same signals proposes and trades nothing new.
+        again = mip_local.propose_and_execute(self.conn, signal_run_id)
+        self.assertEqual((again["proposal_inserted"], again["executed_count"]), (0, 0))
+        self.assertEqual(self._count("MIP.APP.PORTFOLIO_TRADES where PROPOSAL_ID is not null"), executed)
+
+    def test_agent_pass_classifies_unclassified_runs(self):
+        # Replay order: recommendations, evaluation and KPI refresh for a run nothing has classified yet.
+        cur = self.conn.cursor()
+        cur.execute("update MIP.APP.TRAINING_GATE_PARAMS set MIN_SIGNALS = 1, MIN_SIGNALS_BOOTSTRAP = 1, "
+                    "MIN_HIT_RATE = 0, MIN_AVG_RETURN = -1")
+        for d in range(95, 119):
+            mip_local.run_daily_pipeline(self.conn, to_ts=START + timedelta(days=d))
+        to_ts = START + timedelta(days=119)
+        mip_local.generate_momentum_recs(self.conn, "STOCK", 1440, "replay-day", to_ts=to_ts)
+        mip_local.evaluate_recommendations(self.conn, to_ts - timedelta(days=90), to_ts, run_id="replay-day")
+        mip_local.refresh_kpi_layer(self.conn, "replay-day")
+        cur.execute("select max(RUN_ID) from MIP.MART.V_TRUSTED_SIGNALS_LATEST_TS")
+        run_id = cur.fetchone()[0]
+        self.assertEqual(self._count(f"MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION where RUN_ID = '{run_id}'"), 0)
+
+        result = mip_local.propose_and_execute(self.conn, run_id)
+        self.assertGreater(result["proposal_inserted"], 0)
+        self.assertGreater(result["approved_count"], 0)
+        self.assertGreater(self._count(f"MIP.APP.TRUSTED_SIGNAL_CLASSIFICATION where RUN_ID = '{run_id}'"), 0)
+        cur.execute("select count(*) from MIP.AGENT_OUT.ORDER_PROPOSALS where RUN_ID_VARCHAR = ? "
+                    "and VALIDATION_ERRORS like '%INELIGIBLE_SIGNAL%'", [run_id])
+        self.assertEqual(cur.fetchone()[0], 0)
+
+    def test_agent_pass_executes_at_validated_prices(self):
+        cur = self.conn.cursor()
+        cur.execute("update MIP.APP.TRAINING_GATE_PARAMS set MIN_SIGNALS = 1, MIN_SIGNALS_BOOTSTRAP = 1, "
+                    "MIN_HIT_RATE = 0, MIN_AVG_RETURN = -1")
+        for d in range(95, 119):
+            mip_local.run_daily_pipeline(self.conn, to_ts=START + timedelta(days=d))
+        cur.execute("select max(RUN_ID) from MIP.MART.V_TRUSTED_SIGNALS_LATEST_TS")
+        run_id = cur.fetchone()[0]
+        mip_local.classify_signals(self.conn, run_id)
+        cur.execute("select SYMBOL, CLOSE from MIP.MART.MARKET_BARS where INTERVAL_MINUTES = 1440 "
+                    "qualify row_number() over (partition by SYMBOL order by TS desc) = 1")
+        validated_close = dict(cur.fetchall())
+        conn = self.conn
+
+        # A bar landing between validation and execution must not reprice the approved proposals.
+        class _LateBar:
+            def cursor(self):
+                inner = conn.cursor()
+
+                class _Cursor:
+                    def execute(self, sql, params=None):
+                        if "MIP_AUDIT_LOG" in sql and "TMP_AGENT_CAP_REJECTS" in sql:  # last validation write
+                            conn.cursor().execute(
+                                "insert into MIP.MART.MARKET_BARS select TS + interval 1 day, SYMBOL, SOURCE, "
+                                "MARKET_TYPE, INTERVAL_MINUTES, OPEN, HIGH, LOW, CLOSE * 2, VOLUME, INGESTED_AT "
+                                "from MIP.MART.MARKET_BARS where TS = (select max(TS) from MIP.MART.MARKET_BARS)"
+                            )
+                        return inner.execute(sql, params)
+
+                    def __getattr__(self, name):
+                        return getattr(inner, name)
+
+                return _Cursor()
+
+        result = mip_local.propose_and_execute(_LateBar(), run_id)
+        self.assertGreater(result["executed_count"], 0)
+        cur.execute("select SYMBOL, PRICE from MIP.APP.PORTFOLIO_TRADES where PROPOSAL_ID is not null")
+        trades = cur.fetchall()
+        self.assertEqual(len(trades), result["executed_count"])
+        for symbol, price in trades:
+            self.assertAlmostEqual(price, validated_close[symbol] * (1 + 2 / 10000), msg=symbol)
+
+    def test_execution_engine_prices_fixture_arrays(self):
+        fills = mip_local.simulate_fills(
+            ["BUY", "SELL", "BUY", "BUY"], [100.0, 50.0, None, 10.0], [0.1, 0.05, 0.1, 0.0001],
+            [100000.0, 100000.0, 100000.0, 100000.0], slippage_bps=2, fee_bps=1, min_fee=5, spread_bps=4,
+        )
+        self.assertEqual(fills["FILLED"].tolist(), [True, True, False, True])
+        self.assertAlmostEqual(fills["PRICE"][0], 100 * (1 + 4 / 10000))
+        self.assertAlmostEqual(fills["PRICE"][1], 50 * (1 - 4 / 10000))
+        self.assertAlmostEqual(fills["QUANTITY"][0], 10000 / (100 * 1.0004))
+        self.assertAlmostEqual(fills["FEE"][0], 5.0)  # 1 bp of 10,000 is below MIN_FEE
+        self.assertAlmostEqual(fills["CASH_AFTER"][0], 100000 - 10005)
+        self.assertAlmostEqual(fills["CASH_AFTER"][1], 100000 + 5000 - 5)
+        self.assertAlmostEqual(fills["FEE"][3], 5.0)
+
+    def test_execute_proposals_bulk_inserts_fixture_proposals(self):
+        cur = self.conn.cursor()
+        cur.execute("insert into MIP.APP.APP_CONFIG (CONFIG_KEY, CONFIG_VALUE) values ('SPREAD_BPS', '4')")
+        rows = [("fixture", 1, f"S{i:03d}", "STOCK", 1440, "BUY", 0.05, "APPROVED",
+                 json.dumps({"score": 0.01 * i})) for i in range(4)]
+        rows.append(("fixture", 1, "MISSING", "STOCK", 1440, "BUY", 0.05, "APPROVED", "{}"))
+        rows.append(("fixture", 1, "S005", "STOCK", 1440, "BUY", 0.05, "REJECTED", "{}"))
+        cur.executemany(
+            "insert into MIP.AGENT_OUT.ORDER_PROPOSALS (RUN_ID_VARCHAR, PORTFOLIO_ID, SYMBOL, MARKET_TYPE, "
+            "INTERVAL_MINUTES, SIDE, TARGET_WEIGHT, STATUS, SOURCE_SIGNALS) values (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        first = mip_local.execute_proposals(self.conn, "fixture")
+        self.assertEqual((first["executed_count"], first["trade_count"]), (5, 4))
+        self.assertAlmostEqual(first["notional"], 4 * 100000 * 0.05)
+        cur.execute(
+            "select t.PRICE, b.CLOSE, t.NOTIONAL, t.CASH_AFTER, t.SCORE from MIP.APP.PORTFOLIO_TRADES t "
+            "join MIP.MART.MARKET_BARS b on b.SYMBOL = t.SYMBOL and b.TS = %s where t.SYMBOL = 'S002'",
+            [START + timedelta(days=119)],
+        )
+        price, close, notional, cash_after, score = cur.fetchone()
+        self.assertAlmostEqual(price, close * (1 + 4 / 10000))
+        self.assertAlmostEqual(cash_after, 100000 - notional * (1 + 1 / 10000))
+        self.assertAlmostEqual(score, 0.02)
+        cur.execute("select STATUS, count(*) from MIP.AGENT_OUT.ORDER_PROPOSALS group by STATUS")
+        self.assertEqual(dict(cur.fetchall()), {"EXECUTED": 5, "REJECTED": 1})
+
+        # A proposal put back to APPROVED after its trade was written is not traded twice.
+        cur.execute("update MIP.AGENT_OUT.ORDER_PROPOSALS set STATUS = 'APPROVED' where SYMBOL = 'S000'")
+        again = mip_local.execute_proposals(self.conn, "fixture")
+        self.assertEqual((again["executed_count"], again["trade_count"]), (1, 0))
+        self.assertEqual(self._count("MIP.APP.PORTFOLIO_TRADES"), 4)
+
+    def test_recommendations_are_idempotent(self):
+        to_ts = START + timedelta(days=80)
+        first = mip_local.generate_momentum_recs(self.conn, "STOCK", 1440, to_ts=to_ts)
+        second = mip_local.generate_momentum_recs(self.conn, "STOCK", 1440, to_ts=to_ts)
+        self.assertEqual(second["inserted_count"], 0)
+        self.assertEqual(first["rows_after"], second["rows_after"])
+
+    def test_evaluation_statuses(self):
+        for d in range(60, 70):
+            mip_local.generate_momentum_recs(self.conn, "STOCK", 1440, to_ts=START + timedelta(days=d))
+        mip_local.evaluate_recommendations(self.conn, START, START + timedelta(days=200))
+        cur = self.conn.cursor()
+        cur.execute("select distinct EVAL_STATUS from MIP.APP.RECOMMENDATION_OUTCOMES")
+        statuses = {r[0] for r in cur.fetchall()}
+        self.assertTrue(statuses <= {"SUCCESS", "INSUFFICIENT_FUTURE_DATA", "FAILED_NO_ENTRY_BAR"})
+        self.assertIn("SUCCESS", statuses)
+
+    def test_repo_views_load(self):
+        report = mip_local.view_report()
+        self.assertIn("MIP.MART.V_PORTFOLIO_RISK_GATE", report["loaded"])
+        self.assertIn("MIP.APP.V_SIGNALS_ELIGIBLE_TODAY", report["loaded"])
+        for view in ("MIP.MART.V_SIGNAL_OUTCOME_KPIS", "MIP.MART.V_SCORE_CALIBRATION", "MIP.MART.REC_TRAINING_KPIS",
+                     "MIP.APP.V_PATTERN_SCORECARD"):
+            self.assertIn(view, report["loaded"])
+            self.assertIn(view + "_LIVE", report["loaded"])
+        for view in ("MIP.MART.V_TRUST_METRICS", "MIP.MART.V_OUTCOME_QUANTILES", "MIP.MART.V_OUTCOME_QUANTILE_ERROR"):
+            self.assertIn(view, report["loaded"])
+
+
+@unittest.skipIf(duckdb is None, "duckdb not installed")
+class TestFixtures(unittest.TestCase):
+    def tearDown(self):
+        mip_local.reset()
+
+    def test_round_trip(self):
+        mip_local.reset()
+        conn = mip_local.connect()
+        _seed(conn, symbols=3, days=30)
+        with tempfile.TemporaryDirectory() as tmp:
+            written = mip_local.export_fixtures(mip_local.open_database(), tmp)
+            self.assertEqual(written["MART.MARKET_BARS"], 90)
+            self.assertTrue((Path(tmp) / "MART.MARKET_BARS.parquet").exists())
+            mip_local.reset()
+            db_path = str(Path(tmp) / "copy.duckdb")
+            copy = mip_local.connect(db_path, tmp)
+            cur = copy.cursor()
+            cur.execute("select count(*) from MIP.MART.MARKET_BARS")
+            self.assertEqual(cur.fetchone()[0], 90)
+            # Sequences continue after loaded ids
+            cur.execute("insert into MIP.APP.PORTFOLIO (PROFILE_ID, NAME, STARTING_CASH) values (1, 'second', 1)")
+            cur.execute("select max(PORTFOLIO_ID) from MIP.APP.PORTFOLIO")
+            self.assertEqual(cur.fetchone()[0], 2)
+            copy.close()
+            mip_local.reset(db_path)
+
+
+
+@unittest.skipIf(duckdb is None, "duckdb not installed")
+class TestBarStore(unittest.TestCase):
+    def tearDown(self):
+        mip_local.reset()
+
+    def test_export_and_mmap_views(self):
+        import numpy as np
+
+        mip_local.reset()
+        conn = mip_local.connect()
+        _seed(conn, symbols=3, days=30)
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = mip_local.export_bar_store(mip_local.open_database(), Path(tmp) / "bars")
+            self.assertEqual(manifest["partitions"][0]["rows"], 90)
+            store = mip_local.BarStore(Path(tmp) / "bars")
+            self.assertEqual(store.partitions(), [("STOCK", 1440)])
+            self.assertEqual(store.symbols("STOCK"), ["S000", "S001", "S002"])
+
+            bars = store.bars("S001", "STOCK")
+            self.assertEqual(len(bars["TS"]), 30)
+            self.assertTrue(np.isnan(bars["RETURN_SIMPLE"][0]))
+            self.assertAlmostEqual(bars["RETURN_SIMPLE"][1], bars["CLOSE"][1] / bars["CLOSE"][0] - 1)
+            # Views into the mapped column, not copies
+            self.assertTrue(np.shares_memory(bars["CLOSE"], store.column("STOCK", 1440, "CLOSE")))
+
+            window = store.bars("S001", "STOCK", start="2025-01-10", end=datetime(2025, 1, 19))
+            self.assertEqual(len(window["CLOSE"]), 10)
+            self.assertEqual(str(window["TS"][0])[:10], "2025-01-10")
+            self.assertEqual(len(store.bars("NOPE", "STOCK")["CLOSE"]), 0)
+            self.assertEqual(sum(len(b["TS"]) for _, b in store.scan("STOCK", columns=("TS",))), 90)
+
+    def test_export_only_replaces_a_bar_store(self):
+        mip_local.reset()
+        conn = mip_local.connect()
+        _seed(conn, symbols=2, days=10)
+        db = mip_local.open_database()
+        with tempfile.TemporaryDirectory() as tmp:
+            keep = Path(tmp) / "work"
+            keep.mkdir()
+            (keep / "notes.txt").write_text("keep me", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                mip_local.export_bar_store(db, keep)
+            self.assertEqual((keep / "notes.txt").read_text(encoding="utf-8"), "keep me")
+
+            bars = Path(tmp) / "bars"
+            mip_local.export_bar_store(db, bars)
+            manifest = mip_local.export_bar_store(db, bars)
+            self.assertEqual(manifest["partitions"][0]["rows"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -29,3 +29,46 @@ def get_snowflake_config():
 def training_debug_enabled() -> bool:
     """True if GET /training/status/debug is allowed (dev-only). Set ENABLE_TRAINING_DEBUG=1."""
     return (os.getenv("ENABLE_TRAINING_DEBUG") or "").strip().lower() in ("1", "true", "yes")
+
+
+def get_db_backend() -> str:
+    """'snowflake' (default) or 'local' (DuckDB stand-in from apps/mip_local). Set MIP_DB_BACKEND=local."""
+    backend = (os.getenv("MIP_DB_BACKEND") or "snowflake").strip().lower()
+    return backend if backend in ("snowflake", "local") else "snowflake"
+
+
+def get_local_db_config():
+    """Local backend: MIP_LOCAL_DB_PATH (DuckDB file, default in-memory) and MIP_LOCAL_FIXTURES_DIR (Parquet)."""
+    return {
+        "path": os.getenv("MIP_LOCAL_DB_PATH") or None,
+        "fixtures_dir": os.getenv("MIP_LOCAL_FIXTURES_DIR") or None,
+    }
+
+
+def get_live_stream_config():
+    """
+    GET /live/stream watcher intervals (seconds): MIP_LIVE_POLL_SECONDS between probes when idle (default 15),
+    MIP_LIVE_RUNNING_POLL_SECONDS while a pipeline run is in progress (default 3),
+    MIP_LIVE_HEARTBEAT_SECONDS between keep-alive comments (default 20).
+    """
+    def _seconds(name, default):
+        try:
+            value = float(os.getenv(name) or default)
+        except ValueError:
+            value = default
+        return max(value, 0.5)
+
+    return {
+        "poll_seconds": _seconds("MIP_LIVE_POLL_SECONDS", 15),
+        "running_poll_seconds": _seconds("MIP_LIVE_RUNNING_POLL_SECONDS", 3),
+        "heartbeat_seconds": _seconds("MIP_LIVE_HEARTBEAT_SECONDS", 20),
+    }
+
+
+def get_status_probe_seconds() -> float:
+    """GET /status background probe interval in seconds: MIP_STATUS_PROBE_SECONDS (default 30, min 1)."""
+    try:
+        value = float(os.getenv("MIP_STATUS_PROBE_SECONDS") or 30)
+    except ValueError:
+        value = 30.0
+    return max(value, 1.0)
@@ -1,6 +1,15 @@
+import re
+import sys
+import time
+from pathlib import Path
+
 import snowflake.connector
 
-from app.config import get_snowflake_config
+from app.config import get_db_backend, get_local_db_config, get_snowflake_config
+from app.metrics import QueryRecord, record_query
+
+# apps/mip_local (DuckDB stand-in); imported only when MIP_DB_BACKEND=local.
+_MIP_LOCAL_DIR = Path(__file__).resolve().parent.parent.parent / "mip_local"
 
 
 class SnowflakeAuthError(Exception):
@@ -11,7 +20,129 @@ class SnowflakeAuthError(Exception):
         self.original = original
 
 
+def _get_local_connection():
+    """DuckDB-backed connection with the same cursor surface (MIP_DB_BACKEND=local)."""
+    if str(_MIP_LOCAL_DIR) not in sys.path:
+        sys.path.insert(0, str(_MIP_LOCAL_DIR))
+    import mip_local
+
+    cfg = get_local_db_config()
+    return mip_local.connect(cfg["path"], cfg["fixtures_dir"])
+
+
+_FROM_OBJECT = re.compile(r"\b(?:from|join)\s+((?:[A-Za-z_]\w*\.){0,2}[A-Za-z_]\w*)", re.IGNORECASE)
+
+
+def query_label(sql: str) -> str:
+    """
+    Stable label for a statement: calling router function + first object read, e.g.
+    'today.get_today/V_PORTFOLIO_RISK_GATE'. CTE names resolve to the first real MIP object.
+    """
+    caller = "unknown"
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module != __name__:
+            caller = f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+            break
+        frame = frame.f_back
+    objects = [m.group(1) for m in _FROM_OBJECT.finditer(sql or "")]
+    qualified = [o for o in objects if o.count(".") == 2]
+    target = (qualified or objects or ["?"])[0].rsplit(".", 1)[-1].upper()
+    return f"{caller}/{target}"
+
+
+def _row_bytes(row) -> int:
+    """Approximate payload size of a fetched row (strings/bytes by length, scalars as 8 bytes)."""
+    if row is None:
+        return 0
+    values = row.values() if isinstance(row, dict) else row
+    return sum(len(v) if isinstance(v, (str, bytes)) else 8 for v in values if v is not None)
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy that times execute + fetch of each statement and reports label, duration, rows,
+    approximate bytes and Snowflake query id to app.metrics for the current request.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._record: QueryRecord | None = None
+
+    def execute(self, sql, params=None):
+        self._record = QueryRecord(label=query_label(sql))
+        record_query(self._record)
+        started = time.perf_counter()
+        try:
+            if params is None:
+                self._cursor.execute(sql)
+            else:
+                self._cursor.execute(sql, params)
+        except Exception:
+            self._record.error = True
+            raise
+        finally:
+            self._record.duration_seconds += time.perf_counter() - started
+        self._record.query_id = getattr(self._cursor, "sfqid", None)
+        return self
+
+    def _timed_fetch(self, fetch, single, *args):
+        started = time.perf_counter()
+        result = fetch(*args)
+        if self._record is not None:
+            self._record.duration_seconds += time.perf_counter() - started
+            rows = [r for r in ([result] if single else (result or [])) if r is not None]
+            self._record.rows += len(rows)
+            self._record.bytes += sum(_row_bytes(r) for r in rows)
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(self._cursor.fetchone, True)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(self._cursor.fetchmany, False, *(() if size is None else (size,)))
+
+    def fetchall(self):
+        return self._timed_fetch(self._cursor.fetchall, False)
+
+    def fetch_pandas_all(self):
+        started = time.perf_counter()
+        df = self._cursor.fetch_pandas_all()
+        if self._record is not None:
+            self._record.duration_seconds += time.perf_counter() - started
+            self._record.rows += len(df)
+            self._record.bytes += int(df.memory_usage(deep=False).sum())
+        return df
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are InstrumentedCursor."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
 def get_connection():
+    """Read-only connection (Snowflake, or DuckDB when MIP_DB_BACKEND=local) with per-statement timing."""
+    if get_db_backend() == "local":
+        return InstrumentedConnection(_get_local_connection())
+    return InstrumentedConnection(_get_snowflake_connection())
+
+
+def _get_snowflake_connection():
     """Read-only Snowflake connection from env. No writes from this API."""
     cfg = get_snowflake_config()
     base_params = {
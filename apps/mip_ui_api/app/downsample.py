@@ -0,0 +1,53 @@
+"""
+Server-side downsampling for chart series (episode equity / drawdown / regime / trades per day).
+Series are lists of point dicts in time order. Reductions keep the first and last points and are index-based, so
+bucket widths stay proportional to the number of underlying days (the regime strip sizes segments by count).
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+
+def _buckets(n: int, count: int) -> list[tuple[int, int]]:
+    """count contiguous [start, end) index ranges covering range(n)."""
+    count = max(1, min(count, n))
+    return [(n * i // count, n * (i + 1) // count) for i in range(count)]
+
+
+def minmax_downsample(points: list[dict], budget: int, value_key: str) -> list[dict]:
+    """
+    At most budget points: first, last, and the min and max of value_key in each interior bucket
+    (emitted in time order), so peaks and troughs survive any reduction.
+    """
+    if budget <= 0 or len(points) <= budget:
+        return list(points)
+    if budget < 4:
+        return [points[0], points[-1]][:budget]
+    interior = points[1:-1]
+    keep = []
+    for start, end in _buckets(len(interior), (budget - 2) // 2):
+        idx = [i for i in range(start, end) if interior[i].get(value_key) is not None]
+        if not idx:
+            keep.append(start)
+            continue
+        lo = min(idx, key=lambda i: interior[i][value_key])
+        hi = max(idx, key=lambda i: interior[i][value_key])
+        keep.extend(sorted({lo, hi}))
+    return [points[0]] + [interior[i] for i in keep] + [points[-1]]
+
+
+def bucket_reduce(points: list[dict], budget: int, reduce: Callable[[list[dict]], dict]) -> list[dict]:
+    """At most budget points: reduce(bucket) per contiguous bucket; the point is stamped with the bucket's first ts."""
+    if budget <= 0 or len(points) <= budget:
+        return list(points)
+    return [{**reduce(points[start:end]), "ts": points[start]["ts"]} for start, end in _buckets(len(points), budget)]
+
+
+def sum_bucket(key: str) -> Callable[[list[dict]], dict]:
+    return lambda bucket: {key: sum(p.get(key) or 0 for p in bucket)}
+
+
+def worst_bucket(key: str, order: tuple[str, ...]) -> Callable[[list[dict]], dict]:
+    """Most severe state in the bucket (order: least to most severe); unknown states rank lowest."""
+    rank = {state: i for i, state in enumerate(order)}
+    return lambda bucket: {key: max((p.get(key) for p in bucket), key=lambda s: rank.get(s, -1))}
@@ -0,0 +1,107 @@
+"""
+Background health prober behind GET /status.
+CachedProbe runs probe() on a daemon thread at a fixed interval and keeps the last result, so status checks
+from every header banner and load balancer are served from memory: they cannot open connections of their own or
+queue up behind a slow warehouse resume. The thread starts on the first get(); a first caller waits at most
+first_wait_seconds for the initial probe. Like the /live watcher, it stops (and closes its connection) once
+idle_intervals probe intervals pass without a get(), so an idle UI does not keep the warehouse awake; the next
+get() restarts it. With connect, one connection is opened lazily and reused across probes (probe(conn)); it is
+dropped and reopened after a failed probe.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class CachedProbe:
+    def __init__(self, probe, interval_seconds: float, first_wait_seconds: float = 10.0, idle_intervals: int = 10,
+                 connect=None, on_error=None):
+        self.probe = probe
+        self.interval_seconds = interval_seconds
+        self.first_wait_seconds = first_wait_seconds
+        self.idle_intervals = idle_intervals
+        self.connect = connect
+        self.on_error = on_error
+        self._conn = None
+        self._last_get_mono = time.monotonic()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._result: dict | None = None
+        self._checked_at: datetime | None = None
+        self._checked_mono: float | None = None
+        self._probe_seconds: float | None = None
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            self._last_get_mono = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mip-status-prober", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self.refresh()
+            time.sleep(self.interval_seconds)
+            with self._lock:
+                if time.monotonic() - self._last_get_mono >= self.idle_intervals * self.interval_seconds:
+                    # No readers: stop probing. The last result stays cached (and turns stale), so the next
+                    # get() answers from it at once while the restarted prober refreshes it.
+                    self._close()
+                    self._thread = None
+                    return
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def is_running(self) -> bool:
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def refresh(self) -> dict:
+        """Run the probe once (on the prober thread; callable directly in tests) and cache its result."""
+        started = time.monotonic()
+        try:
+            if self.connect is None:
+                result = self.probe()
+            else:
+                if self._conn is None:
+                    self._conn = self.connect()
+                result = self.probe(self._conn)
+        except Exception as exc:  # keeps the thread alive; a broken connection is reopened next time
+            self._close()
+            if self.on_error is not None:
+                result = self.on_error(exc)
+            else:
+                result = {"snowflake_ok": False, "snowflake_message": f"Health probe failed: {type(exc).__name__}"}
+        with self._lock:
+            self._result = result
+            self._checked_at = datetime.now(timezone.utc)
+            self._checked_mono = time.monotonic()
+            self._probe_seconds = time.monotonic() - started
+        self._ready.set()
+        return result
+
+    def get(self) -> tuple[dict | None, dict]:
+        """(last probe result or None while the first probe is pending, cache metadata)."""
+        self._ensure_started()
+        self._ready.wait(self.first_wait_seconds)
+        with self._lock:
+            result = self._result
+            checked_at, checked_mono, probe_seconds = self._checked_at, self._checked_mono, self._probe_seconds
+        age = time.monotonic() - checked_mono if checked_mono is not None else None
+        return result, {
+            "checked_at": checked_at.isoformat() if checked_at else None,
+            "cache_age_seconds": round(age, 3) if age is not None else None,
+            "probe_seconds": round(probe_seconds, 3) if probe_seconds is not None else None,
+            "probe_interval_seconds": self.interval_seconds,
+            # A probe stuck behind a slow warehouse shows up as a growing age rather than slow /status calls.
+            "stale": age is None or age > 3 * self.interval_seconds,
+        }
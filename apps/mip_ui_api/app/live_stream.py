@@ -0,0 +1,300 @@
+"""
+Push channel behind GET /live/stream (server-sent events).
+One LiveWatcher per API process runs a background thread while at least one browser is subscribed. Each tick
+is one cheap probe on a long-lived connection (latest PIPELINE_RUN row, latest MORNING_BRIEF id, outcome stats
+timestamp); only when the probe changes does the watcher re-read the /live/metrics payload, once per subscribed
+portfolio, and fan it out. While a run is in progress it polls faster and streams the run's PIPELINE_STEP
+events as they land. Warehouse load is one probe per interval regardless of how many dashboards are open.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from datetime import datetime, timezone
+
+from app.config import get_live_stream_config
+from app.db import get_connection, fetch_all, serialize_row, SnowflakeAuthError
+
+PROBE_SQL = """
+select
+    r.RUN_ID,
+    r.STATUS,
+    r.STARTED_AT,
+    r.COMPLETED_AT,
+    (select max(BRIEF_ID) from MIP.AGENT_OUT.MORNING_BRIEF) as LAST_BRIEF_ID,
+    (select LAST_CALCULATED_AT from MIP.APP.RECOMMENDATION_OUTCOME_STATS where STATS_KEY = 'ALL') as OUTCOMES_AT
+from (select 1 as ONE) d
+left join (
+    select RUN_ID, STATUS, STARTED_AT, COMPLETED_AT
+    from MIP.APP.PIPELINE_RUN
+    where EVENT_TYPE = 'PIPELINE'
+    order by coalesce(COMPLETED_AT, STARTED_AT) desc
+    limit 1
+) r on 1 = 1
+"""
+
+RUN_STEPS_SQL = """
+select
+    RUN_ID,
+    EVENT_TS,
+    EVENT_NAME,
+    STATUS,
+    ROWS_AFFECTED,
+    ERROR_MESSAGE,
+    DETAILS
+from MIP.APP.MIP_AUDIT_LOG
+where PARENT_RUN_ID = %s
+  and EVENT_TYPE = 'PIPELINE_STEP'
+  and EVENT_TS >= %s
+order by EVENT_TS
+"""
+
+# Per-subscriber buffer; a slow browser drops events (the next metrics event carries the full state again).
+QUEUE_SIZE = 100
+
+
+def format_sse(event: str, data) -> str:
+    """One server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def probe_state(row: dict | None) -> dict:
+    """PROBE_SQL row -> the fields the watcher diffs between ticks."""
+    row = row or {}
+    return {
+        "run_id": row.get("RUN_ID"),
+        "run_status": row.get("STATUS"),
+        "started_at": row.get("STARTED_AT"),
+        "completed_at": row.get("COMPLETED_AT"),
+        "brief_id": row.get("LAST_BRIEF_ID"),
+        "outcomes_at": row.get("OUTCOMES_AT"),
+    }
+
+
+def diff_state(prev: dict | None, cur: dict) -> dict:
+    """Which event families a probe change triggers: run (start/finish), metrics (anything visible moved)."""
+    if prev is None:
+        return {"run": cur["run_id"] is not None, "metrics": True}
+    run_changed = (prev["run_id"], prev["run_status"]) != (cur["run_id"], cur["run_status"])
+    return {
+        "run": run_changed,
+        "metrics": run_changed or prev != cur,
+    }
+
+
+def step_event(run_id: str, row: dict) -> dict:
+    details = row.get("DETAILS")
+    if isinstance(details, str):
+        try:
+            details = json.loads(details) if details else {}
+        except ValueError:
+            details = {}
+    details = details or {}
+    return serialize_row({
+        "run_id": run_id,
+        "event_ts": row.get("EVENT_TS"),
+        "event_name": row.get("EVENT_NAME"),
+        "step_name": details.get("step_name"),
+        "scope": details.get("scope"),
+        "scope_key": details.get("scope_key"),
+        "status": row.get("STATUS"),
+        "rows_affected": row.get("ROWS_AFFECTED"),
+        "error_message": row.get("ERROR_MESSAGE"),
+    })
+
+
+class Subscription:
+    """One SSE client: an asyncio queue fed from the watcher thread."""
+
+    def __init__(self, portfolio_id: int, loop: asyncio.AbstractEventLoop, heartbeat_seconds: float):
+        self.portfolio_id = portfolio_id
+        self.loop = loop
+        self.heartbeat_seconds = heartbeat_seconds
+        self.queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+
+    def push(self, chunk: str) -> None:
+        """Thread-safe enqueue (called from the watcher thread)."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, chunk)
+        except RuntimeError:
+            pass  # event loop closed; unsubscribe follows
+
+    def _put(self, chunk: str) -> None:
+        try:
+            self.queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            pass
+
+    async def stream(self):
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self.queue.get(), self.heartbeat_seconds)
+            except asyncio.TimeoutError:
+                chunk = ": keepalive\n\n"
+            yield chunk
+
+
+class LiveWatcher:
+    """
+    collect_metrics(conn, portfolio_id) -> dict and latest_success(conn) -> dict are the /live/metrics and
+    /status readers; connect defaults to app.db.get_connection.
+    """
+
+    def __init__(self, collect_metrics, latest_success, connect=get_connection, config: dict | None = None):
+        self.collect_metrics = collect_metrics
+        self.latest_success = latest_success
+        self.connect = connect
+        self.config = config or get_live_stream_config()
+        self._subs: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._conn = None
+        self._state: dict | None = None
+        self._status: dict | None = None
+        self._metrics: dict[int, dict] = {}
+        self._seen_steps: set[str] = set()
+        self._steps_run_id: str | None = None
+
+    # --- subscribers (event loop side)
+
+    def subscribe(self, portfolio_id: int) -> Subscription:
+        sub = Subscription(portfolio_id, asyncio.get_running_loop(), self.config["heartbeat_seconds"])
+        with self._lock:
+            self._subs.add(sub)
+            status, metrics = self._status, self._metrics.get(portfolio_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mip-live-watcher", daemon=True)
+                self._thread.start()
+        if status is not None:
+            sub.push(format_sse("status", status))
+        if metrics is not None:
+            sub.push(format_sse("metrics", metrics))
+        else:
+            self._wake.set()  # first subscriber for this portfolio: probe now
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+            if not self._subs:
+                self._wake.set()
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subs)
+
+    # --- watcher thread
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._subs:
+                    self._close()
+                    self._thread = None
+                    return
+            # Clear before probing: a wake-up set while tick() runs then survives into the wait below.
+            self._wake.clear()
+            self.tick()
+            running = self._state is not None and self._state["run_status"] == "RUNNING"
+            self._wake.wait(self.config["running_poll_seconds"] if running else self.config["poll_seconds"])
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+        self._state = None
+        self._metrics = {}
+
+    def _broadcast(self, event: str, data, portfolio_id: int | None = None) -> None:
+        chunk = format_sse(event, data)
+        with self._lock:
+            subs = [s for s in self._subs if portfolio_id is None or s.portfolio_id == portfolio_id]
+        for sub in subs:
+            sub.push(chunk)
+
+    def _set_status(self, status: dict) -> list[tuple[str, dict]]:
+        if status == self._status:
+            return []
+        self._status = status
+        self._broadcast("status", status)
+        return [("status", status)]
+
+    def tick(self) -> list[tuple[str, dict]]:
+        """One probe; publishes and returns the (event, payload) pairs it produced."""
+        published = []
+        try:
+            if self._conn is None:
+                self._conn = self.connect()
+            cur = self._conn.cursor()
+            cur.execute(PROBE_SQL)
+            rows = fetch_all(cur)
+            state = probe_state(rows[0] if rows else None)
+        except Exception as exc:
+            self._close()
+            message = str(exc) if isinstance(exc, SnowflakeAuthError) else "Connection failed"
+            return self._set_status({
+                "snowflake_ok": False,
+                "snowflake_message": message,
+                "latest_success_run_id": None,
+                "latest_success_ts": None,
+            })
+
+        prev_state = self._state
+        changes = diff_state(prev_state, state)
+        self._state = state
+        try:
+            if changes["run"] or self._status is None or not self._status.get("snowflake_ok"):
+                published += self._set_status({"snowflake_ok": True, "snowflake_message": None,
+                                               **self.latest_success(self._conn)})
+            if changes["run"] and state["run_id"] is not None:
+                run = serialize_row({
+                    "run_id": state["run_id"],
+                    "status": state["run_status"],
+                    "started_at": state["started_at"],
+                    "completed_at": state["completed_at"],
+                })
+                self._broadcast("run", run)
+                published.append(("run", run))
+            # Steps while running, plus one sweep when the run finishes (last steps land just before the end).
+            was_running = prev_state is not None and prev_state["run_status"] == "RUNNING"
+            if state["run_id"] is not None and (state["run_status"] == "RUNNING" or was_running):
+                published += self._publish_steps(state)
+            with self._lock:
+                portfolio_ids = {s.portfolio_id for s in self._subs}
+            refresh = portfolio_ids if changes["metrics"] else portfolio_ids - self._metrics.keys()
+            for portfolio_id in sorted(refresh):
+                metrics = {
+                    "api_ok": True,
+                    "snowflake_ok": True,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                    **self.collect_metrics(self._conn, portfolio_id),
+                }
+                self._metrics[portfolio_id] = metrics
+                self._broadcast("metrics", metrics, portfolio_id)
+                published.append(("metrics", metrics))
+        except Exception:
+            # Keep the last good payloads; force a full refresh on the next tick.
+            self._close()
+        return published
+
+    def _publish_steps(self, state: dict) -> list[tuple[str, dict]]:
+        if state["run_id"] != self._steps_run_id:
+            self._steps_run_id = state["run_id"]
+            self._seen_steps = set()
+        cur = self._conn.cursor()
+        cur.execute(RUN_STEPS_SQL, (state["run_id"], state["started_at"]))
+        published = []
+        for row in fetch_all(cur):
+            if row.get("RUN_ID") in self._seen_steps:
+                continue
+            self._seen_steps.add(row.get("RUN_ID"))
+            step = step_event(state["run_id"], row)
+            self._broadcast("step", step)
+            published.append(("step", step))
+        return published
@@ -1,6 +1,10 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.metrics import current_queries, observe_request, render_prometheus, server_timing
 from app.routers import runs, portfolios, briefs, training, performance, status, today, live, signals
 
 app = FastAPI(
@@ -13,8 +17,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+
+@app.middleware("http")
+async def query_timing(request: Request, call_next):
+    """Collect per-statement timings (app/db.py) for the request; emit Server-Timing and /metrics samples."""
+    queries = []
+    token = current_queries.set(queries)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        current_queries.reset(token)
+        elapsed = time.perf_counter() - started
+        route = request.scope.get("route")
+        # Route template keeps label cardinality bounded (/runs/{run_id}, not one series per run).
+        endpoint = getattr(route, "path", None) or "unmatched"
+        if endpoint != "/metrics":
+            observe_request(endpoint, request.method, status, elapsed, queries)
+    response.headers["Server-Timing"] = server_timing(elapsed, queries)
+    return response
+
 app.include_router(status.router)
 app.include_router(runs.router)
 app.include_router(portfolios.router)
@@ -29,3 +56,9 @@ app.include_router(signals.router)
 @app.get("/")
 def root():
     return {"service": "MIP UI API", "read_only": True}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text format: request and per-query latency histograms, rows/bytes fetched."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,155 @@
+"""
+Request/query metrics for the UI API.
+app/db.py records one QueryRecord per executed statement into the current request's list (a
+ContextVar set by the middleware in app/main.py); the middleware turns the list into a Server-Timing
+header and feeds the process-wide histograms rendered by GET /metrics in Prometheus text format.
+In-process only (no prometheus_client dependency); counters reset when the worker restarts.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+# Seconds; Prometheus-style cumulative buckets (+Inf is implicit).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Per-query Server-Timing entries are capped so the header stays small on chatty endpoints.
+MAX_SERVER_TIMING_QUERIES = 20
+
+
+@dataclass
+class QueryRecord:
+    label: str
+    duration_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    query_id: str | None = None
+    error: bool = False
+
+
+current_queries: ContextVar[list[QueryRecord] | None] = ContextVar("mip_current_queries", default=None)
+
+
+def record_query(record: QueryRecord) -> None:
+    """Attach record to the current request (no-op outside a request, e.g. background jobs)."""
+    queries = current_queries.get()
+    if queries is not None:
+        queries.append(record)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(labels, [0] * (len(self.buckets) + 2))
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            base = _label_str(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{{{_label_str(self.label_names, labels)}}} {value:g}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names: tuple[str, ...], values: tuple) -> str:
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+REQUEST_LATENCY = Histogram(
+    "mip_api_request_duration_seconds", "UI API request latency by endpoint.", ("endpoint", "method")
+)
+REQUESTS = Counter("mip_api_requests_total", "UI API requests by endpoint and status.", ("endpoint", "method", "status"))
+QUERY_LATENCY = Histogram(
+    "mip_api_query_duration_seconds", "SQL statement latency (execute + fetch) by endpoint and query label.",
+    ("endpoint", "query"),
+)
+QUERY_ROWS = Counter("mip_api_query_rows_total", "Rows fetched by endpoint and query label.", ("endpoint", "query"))
+QUERY_BYTES = Counter(
+    "mip_api_query_bytes_total", "Approximate bytes fetched by endpoint and query label.", ("endpoint", "query")
+)
+QUERY_ERRORS = Counter("mip_api_query_errors_total", "Failed SQL statements by endpoint and query label.",
+                       ("endpoint", "query"))
+_ALL = (REQUEST_LATENCY, REQUESTS, QUERY_LATENCY, QUERY_ROWS, QUERY_BYTES, QUERY_ERRORS)
+
+
+def observe_request(endpoint: str, method: str, status: int, duration: float, queries: list[QueryRecord]) -> None:
+    REQUEST_LATENCY.observe(duration, endpoint, method)
+    REQUESTS.inc(1, endpoint, method, str(status))
+    for q in queries:
+        QUERY_LATENCY.observe(q.duration_seconds, endpoint, q.label)
+        QUERY_ROWS.inc(q.rows, endpoint, q.label)
+        QUERY_BYTES.inc(q.bytes, endpoint, q.label)
+        if q.error:
+            QUERY_ERRORS.inc(1, endpoint, q.label)
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in _ALL:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+_TOKEN_UNSAFE = re.compile(r"[^A-Za-z0-9!#$%&'*+\-.^_`|~]")
+
+
+def server_timing(total_seconds: float, queries: list[QueryRecord]) -> str:
+    """Server-Timing header value: total, db (sum of statements) and one entry per statement."""
+    db_seconds = sum(q.duration_seconds for q in queries)
+    parts = [
+        f"total;dur={total_seconds * 1000:.1f}",
+        f'db;dur={db_seconds * 1000:.1f};desc="{len(queries)} queries"',
+    ]
+    for i, q in enumerate(queries[:MAX_SERVER_TIMING_QUERIES], start=1):
+        desc = f"{q.label} rows={q.rows} bytes={q.bytes}"
+        if q.query_id:
+            desc += f" qid={q.query_id}"
+        parts.append(f'q{i}_{_TOKEN_UNSAFE.sub("_", q.label)};dur={q.duration_seconds * 1000:.1f};desc="{_escape(desc)}"')
+    return ", ".join(parts)
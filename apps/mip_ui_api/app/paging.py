@@ -0,0 +1,23 @@
+"""
+Opaque keyset cursors for paged list endpoints (/signals, episode trades).
+A cursor is the url-safe base64 of a small JSON object holding the sort key of the last row returned.
+"""
+from __future__ import annotations
+
+import base64
+import json
+
+from fastapi import HTTPException
+
+
+def encode_cursor(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload, default=str).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: tuple[str, ...]) -> dict:
+    """Payload dict with every key in keys; 400 on anything malformed."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {k: payload[k] for k in keys}
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
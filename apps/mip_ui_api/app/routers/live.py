@@ -1,34 +1,114 @@
 """
 GET /live/metrics — lightweight live metrics for header and Suggestions.
+GET /live/stream — the same metrics pushed over server-sent events, plus pipeline progress (app/live_stream.py).
 Read-only. Returns api_ok, snowflake_ok, updated_at, last_run, last_brief, outcomes.
 """
-import json
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
 
-from app.config import get_snowflake_config
 from app.db import get_connection, fetch_all, serialize_row, SnowflakeAuthError
+from app.live_stream import LiveWatcher
+from app.routers.runs import RUNS_SQL, _run_from_summary_row
+from app.routers.status import _get_latest_pipeline_run
 
 router = APIRouter(prefix="/live", tags=["live"])
 
+BRIEF_SQL = """
+select
+  mb.PORTFOLIO_ID as portfolio_id,
+  coalesce(
+    try_cast(mb.BRIEF:as_of_ts::varchar as timestamp_ntz),
+    try_cast(get_path(mb.BRIEF, 'attribution.as_of_ts')::varchar as timestamp_ntz),
+    mb.AS_OF_TS
+  ) as as_of_ts,
+  coalesce(
+    get_path(mb.BRIEF, 'attribution.pipeline_run_id')::varchar,
+    mb.PIPELINE_RUN_ID
+  ) as pipeline_run_id,
+  mb.AGENT_NAME as agent_name
+from MIP.AGENT_OUT.MORNING_BRIEF mb
+where mb.PORTFOLIO_ID = %s and coalesce(mb.AGENT_NAME, '') = 'MORNING_BRIEF'
+order by mb.AS_OF_TS desc
+limit 1
+"""
+
+OUTCOME_STATS_SQL = """
+select TOTAL_OUTCOMES, LAST_CALCULATED_AT, LAST_BATCH_ROWS, PREV_CALCULATED_AT
+from MIP.APP.RECOMMENDATION_OUTCOME_STATS
+where STATS_KEY = 'ALL'
+"""
+
+OUTCOMES_SINCE_SQL = """
+select count(*) as cnt from MIP.APP.RECOMMENDATION_OUTCOMES
+where CALCULATED_AT > %s
+"""
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, "isoformat") else (str(value) if value else None)
+
+
+def _outcomes_from_stats(stats_row, last_run_completed_at) -> dict:
+    """
+    outcomes block from a RECOMMENDATION_OUTCOME_STATS row (TOTAL, LAST_CALCULATED_AT, LAST_BATCH_ROWS,
+    PREV_CALCULATED_AT). Every outcome written by one evaluation shares its CALCULATED_AT, so since_last_run is
+    0 or LAST_BATCH_ROWS unless two evaluations ran after the last run; then it is None (caller counts).
+    """
+    outcomes = {"total": 0, "last_calculated_at": None, "since_last_run": 0}
+    if not stats_row:
+        return outcomes
+    total, last_calc, batch_rows, prev_calc = stats_row
+    outcomes["total"] = int(total) if total is not None else 0
+    outcomes["last_calculated_at"] = _iso(last_calc)
+    if last_run_completed_at is None or last_calc is None or last_calc <= last_run_completed_at:
+        return outcomes
+    if prev_calc is None or prev_calc <= last_run_completed_at:
+        outcomes["since_last_run"] = int(batch_rows or 0)
+    else:
+        outcomes["since_last_run"] = None
+    return outcomes
+
+
+def collect_live_metrics(conn, portfolio_id: int) -> dict:
+    """last_run, last_brief and outcomes on an open connection (shared by /live/metrics and the stream watcher)."""
+    cur = conn.cursor()
+
+    # --- Last run: same source as /runs (PIPELINE_RUN summary), most recent by completion
+    last_run = None
+    cur.execute(RUNS_SQL, (1,))
+    run_rows = fetch_all(cur)
+    if run_rows:
+        last_run = serialize_row(_run_from_summary_row(run_rows[0]))
+
+    # --- Last brief: same as /briefs/latest
+    last_brief = {"found": False}
+    cur.execute(BRIEF_SQL, (portfolio_id,))
+    brief_row = cur.fetchone()
+    if brief_row:
+        cols = [d[0] for d in cur.description]
+        last_brief = serialize_row(dict(zip(cols, brief_row)))
+        last_brief["found"] = True
+
+    # --- Outcomes: one-row counters maintained by SP_EVALUATE_RECOMMENDATIONS
+    cur.execute(OUTCOME_STATS_SQL)
+    stats_row = cur.fetchone()
+    last_run_completed_at = None
+    if run_rows:
+        last_run_completed_at = run_rows[0].get("COMPLETED_AT") or run_rows[0].get("STARTED_AT")
+    outcomes = _outcomes_from_stats(stats_row, last_run_completed_at)
+    if outcomes["since_last_run"] is None:
+        # More than one evaluation finished after the last run (manual re-evaluation): count exactly.
+        cur.execute(OUTCOMES_SINCE_SQL, (last_run_completed_at,))
+        since_row = cur.fetchone()
+        outcomes["since_last_run"] = int(since_row[0]) if since_row and since_row[0] is not None else 0
 
-def _summary_hint_from_status_and_details(status: str | None, details: dict | None) -> str | None:
-    """Derive a short summary hint for the run (same as runs router)."""
-    if not status:
-        return None
-    s = (status or "").upper()
-    if s == "SKIPPED_NO_NEW_BARS":
-        return "No new bars"
-    if s == "SKIP_RATE_LIMIT":
-        return "Rate limit"
-    if s == "SUCCESS_WITH_SKIPS":
-        return "Success with skips"
-    if s == "FAIL":
-        return "Failed"
-    if s == "SUCCESS":
-        return None
-    return None
+    return {"last_run": last_run, "last_brief": last_brief, "outcomes": outcomes}
+
+
+# One watcher per API process, started by the first /live/stream subscriber.
+watcher = LiveWatcher(collect_live_metrics, _get_latest_pipeline_run)
 
 
 @router.get("/metrics")
@@ -38,153 +118,62 @@ def get_live_metrics(portfolio_id: int = Query(1, description="Portfolio ID for
     Returns: api_ok, snowflake_ok, updated_at, last_run, last_brief, outcomes.
     last_brief uses found: false when no brief exists for portfolio_id.
     outcomes.since_last_run = count of outcomes with CALCULATED_AT > last_run.completed_at (or null/0 when no run).
+    outcomes come from the RECOMMENDATION_OUTCOME_STATS point lookup, not from scanning RECOMMENDATION_OUTCOMES.
     """
-    updated_at = datetime.now(timezone.utc).isoformat()
-    api_ok = True
-    snowflake_ok = False
-    last_run = None
-    last_brief = {"found": False}
-    outcomes = {"total": 0, "last_calculated_at": None, "since_last_run": None}
+    result = {
+        "api_ok": True,
+        "snowflake_ok": False,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "last_run": None,
+        "last_brief": {"found": False},
+        "outcomes": {"total": 0, "last_calculated_at": None, "since_last_run": None},
+    }
 
     try:
         conn = get_connection()
-        snowflake_ok = True
     except SnowflakeAuthError:
-        pass
+        return result
     except Exception:
-        pass
-
-    if not snowflake_ok:
-        return {
-            "api_ok": api_ok,
-            "snowflake_ok": snowflake_ok,
-            "updated_at": updated_at,
-            "last_run": last_run,
-            "last_brief": last_brief,
-            "outcomes": outcomes,
-        }
+        return result
 
     try:
-        cur = conn.cursor()
-
-        # --- Last run: same logic as /runs (MIP_AUDIT_LOG, PIPELINE, SP_RUN_DAILY_PIPELINE), most recent by completion
-        runs_sql = """
-        select EVENT_TS, RUN_ID, STATUS, DETAILS
-        from MIP.APP.MIP_AUDIT_LOG
-        where EVENT_TYPE = 'PIPELINE' and EVENT_NAME = 'SP_RUN_DAILY_PIPELINE'
-        order by EVENT_TS desc
-        limit 200
-        """
-        cur.execute(runs_sql)
-        run_rows = fetch_all(cur)
-        runs_by_id = {}
-        for r in run_rows:
-            run_id = r.get("RUN_ID")
-            if not run_id:
-                continue
-            ts = r.get("EVENT_TS")
-            status = r.get("STATUS") or ""
-            details = r.get("DETAILS")
-            if isinstance(details, str):
-                try:
-                    details = json.loads(details) if details else {}
-                except Exception:
-                    details = {}
-            if run_id not in runs_by_id:
-                runs_by_id[run_id] = {"started_at": ts, "completed_at": ts, "status": status, "details": details}
-            else:
-                run = runs_by_id[run_id]
-                if ts:
-                    if run["started_at"] is None or (ts < run["started_at"]):
-                        run["started_at"] = ts
-                    if run["completed_at"] is None or (ts > run["completed_at"]):
-                        run["completed_at"] = ts
-                        run["status"] = status
-                        run["details"] = details
-        run_list = [
-            {
-                "run_id": rid,
-                "started_at": r["started_at"].isoformat() if hasattr(r["started_at"], "isoformat") else r["started_at"],
-                "completed_at": r["completed_at"].isoformat() if hasattr(r["completed_at"], "isoformat") else r["completed_at"],
-                "status": r["status"] if r["status"] != "START" else "RUNNING",
-                "summary_hint": _summary_hint_from_status_and_details(r["status"], r.get("details")),
-            }
-            for rid, r in runs_by_id.items()
-        ]
-        run_list.sort(key=lambda x: (x["completed_at"] or x["started_at"] or ""), reverse=True)
-        if run_list:
-            last_run = serialize_row(run_list[0])
-
-        # --- Last brief: same as /briefs/latest
-        brief_sql = """
-        select
-          mb.PORTFOLIO_ID as portfolio_id,
-          coalesce(
-            try_cast(mb.BRIEF:as_of_ts::varchar as timestamp_ntz),
-            try_cast(get_path(mb.BRIEF, 'attribution.as_of_ts')::varchar as timestamp_ntz),
-            mb.AS_OF_TS
-          ) as as_of_ts,
-          coalesce(
-            get_path(mb.BRIEF, 'attribution.pipeline_run_id')::varchar,
-            mb.PIPELINE_RUN_ID
-          ) as pipeline_run_id,
-          mb.AGENT_NAME as agent_name
-        from MIP.AGENT_OUT.MORNING_BRIEF mb
-        where mb.PORTFOLIO_ID = %s and coalesce(mb.AGENT_NAME, '') = 'MORNING_BRIEF'
-        order by mb.AS_OF_TS desc
-        limit 1
-        """
-        cur.execute(brief_sql, (portfolio_id,))
-        brief_row = cur.fetchone()
-        if brief_row:
-            cols = [d[0] for d in cur.description]
-            last_brief = serialize_row(dict(zip(cols, brief_row)))
-            last_brief["found"] = True
-        else:
-            last_brief = {"found": False}
-
-        # --- Outcomes: total, max(CALCULATED_AT), and since_last_run
-        outcomes_sql = """
-        select count(*) as total, max(CALCULATED_AT) as last_calculated_at
-        from MIP.APP.RECOMMENDATION_OUTCOMES
-        """
-        cur.execute(outcomes_sql)
-        out_row = cur.fetchone()
-        if out_row:
-            outcomes["total"] = int(out_row[0]) if out_row[0] is not None else 0
-            lca = out_row[1]
-            outcomes["last_calculated_at"] = lca.isoformat() if hasattr(lca, "isoformat") else (str(lca) if lca else None)
-
-        last_run_completed_at = None
-        if last_run and last_run.get("completed_at"):
-            last_run_completed_at = last_run["completed_at"]
-
-        if last_run_completed_at is not None:
-            # Count outcomes where CALCULATED_AT > last_run.completed_at
-            # last_run_completed_at is already ISO string from serialize_row
-            since_sql = """
-            select count(*) as cnt from MIP.APP.RECOMMENDATION_OUTCOMES
-            where CALCULATED_AT > %s
-            """
-            cur.execute(since_sql, (last_run_completed_at,))
-            since_row = cur.fetchone()
-            outcomes["since_last_run"] = int(since_row[0]) if since_row and since_row[0] is not None else 0
-        else:
-            outcomes["since_last_run"] = 0
-
-        conn.close()
+        result.update(collect_live_metrics(conn, portfolio_id))
+        result["snowflake_ok"] = True
     except Exception:
-        snowflake_ok = False
+        pass
+    finally:
         try:
             conn.close()
         except Exception:
             pass
+    return result
 
-    return {
-        "api_ok": api_ok,
-        "snowflake_ok": snowflake_ok,
-        "updated_at": updated_at,
-        "last_run": last_run,
-        "last_brief": last_brief,
-        "outcomes": outcomes,
-    }
+
+@router.get("/stream")
+async def stream_live(request: Request, portfolio_id: int = Query(1, description="Portfolio ID for latest brief")):
+    """
+    Server-sent events. One background watcher per API process polls PIPELINE_RUN / MORNING_BRIEF /
+    RECOMMENDATION_OUTCOME_STATS on a single connection and pushes to every subscriber, so warehouse load does
+    not grow with the number of open dashboards. Events:
+      metrics  — same payload as GET /live/metrics (sent on connect and whenever it changes)
+      status   — {snowflake_ok, snowflake_message, latest_success_run_id, latest_success_ts}
+      run      — pipeline run started / finished ({run_id, status, started_at, completed_at})
+      step     — per-step progress while SP_RUN_DAILY_PIPELINE runs ({run_id, event_name, step_name, status, ...})
+    A comment line is sent every heartbeat interval so proxies keep the connection open.
+    """
+    subscription = watcher.subscribe(portfolio_id)
+
+    async def events():
+        try:
+            async for chunk in subscription.stream():
+                if await request.is_disconnected():
+                    break
+                yield chunk
+        finally:
+            watcher.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
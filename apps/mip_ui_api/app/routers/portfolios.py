@@ -2,10 +2,18 @@ from datetime import date
 
 from fastapi import APIRouter, HTTPException, Query
 
+from app import paging
 from app.db import get_connection, fetch_all, serialize_rows, serialize_row
+from app.downsample import bucket_reduce, minmax_downsample, sum_bucket, worst_bucket
 
 router = APIRouter(prefix="/portfolios", tags=["portfolios"])
 
+# Chart point budget for episode/timeline series; long episodes are min/max downsampled to this.
+DEFAULT_SERIES_POINTS = 500
+GATE_SEVERITY = ("SAFE", "CAUTION", "STOPPED")
+# Upper bound on ids per /portfolios/batch call (keeps the IN lists and the response bounded).
+MAX_BATCH_PORTFOLIOS = 50
+
 
 @router.get("")
 def list_portfolios():
@@ -56,6 +64,173 @@ def list_portfolios():
         conn.close()
 
 
+def parse_portfolio_ids(ids: str) -> list[int]:
+    """Comma-separated portfolio ids -> unique ints in request order; 400 on junk or more than MAX_BATCH_PORTFOLIOS."""
+    out: list[int] = []
+    for part in ids.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            pid = int(part)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid portfolio id: {part!r}")
+        if pid not in out:
+            out.append(pid)
+    if not out:
+        raise HTTPException(status_code=400, detail="ids must list at least one portfolio id")
+    if len(out) > MAX_BATCH_PORTFOLIOS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PORTFOLIOS} portfolio ids per batch")
+    return out
+
+
+def _rows_by_portfolio(cur, sql: str, portfolio_ids: list[int], optional: bool = True) -> dict[int, list[dict]]:
+    """
+    Run a `PORTFOLIO_ID in ({ids})` query and group serialized rows by PORTFOLIO_ID.
+    Optional reads (MART views) return {} on failure, as the single-portfolio snapshot does.
+    """
+    try:
+        cur.execute(sql.format(ids=_in_list(portfolio_ids)), list(portfolio_ids))
+        rows = serialize_rows(fetch_all(cur))
+    except Exception:
+        if not optional:
+            raise
+        return {}
+    grouped: dict[int, list[dict]] = {}
+    for row in rows:
+        grouped.setdefault(row.get("PORTFOLIO_ID"), []).append(row)
+    return grouped
+
+
+@router.get("/batch")
+def get_portfolios_batch(
+    ids: str = Query(..., description="Comma-separated portfolio ids"),
+    include_episodes: bool = True,
+):
+    """
+    Snapshot summaries (cash/exposure, KPIs, risk gate, trade totals, active episode) and episode summaries for many
+    portfolios. Every query is set-based over all requested ids, so cost does not grow with one round trip per
+    portfolio or per episode. Unknown ids are listed in `missing`.
+    """
+    portfolio_ids = parse_portfolio_ids(ids)
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        headers = _rows_by_portfolio(
+            cur,
+            """
+            select PORTFOLIO_ID, NAME, STATUS, PROFILE_ID, STARTING_CASH, LAST_SIMULATION_RUN_ID, LAST_SIMULATED_AT
+            from MIP.APP.PORTFOLIO
+            where PORTFOLIO_ID in ({ids})
+            """,
+            portfolio_ids,
+            optional=False,
+        )
+        found = [pid for pid in portfolio_ids if pid in headers]
+        if not found:
+            return {"portfolios": [], "missing": portfolio_ids}
+
+        # Latest daily / KPI row of each portfolio's last simulation run (any run when it has none)
+        latest_daily = _rows_by_portfolio(
+            cur,
+            """
+            select d.PORTFOLIO_ID, d.RUN_ID, d.TS, d.CASH, d.EQUITY_VALUE, d.TOTAL_EQUITY
+            from MIP.APP.PORTFOLIO_DAILY d
+            join MIP.APP.PORTFOLIO p on p.PORTFOLIO_ID = d.PORTFOLIO_ID
+            where d.PORTFOLIO_ID in ({ids})
+              and (p.LAST_SIMULATION_RUN_ID is null or d.RUN_ID = p.LAST_SIMULATION_RUN_ID)
+            qualify row_number() over (partition by d.PORTFOLIO_ID order by d.TS desc) = 1
+            """,
+            found,
+            optional=False,
+        )
+        latest_kpis = _rows_by_portfolio(
+            cur,
+            """
+            select k.*
+            from MIP.MART.V_PORTFOLIO_RUN_KPIS k
+            join MIP.APP.PORTFOLIO p on p.PORTFOLIO_ID = k.PORTFOLIO_ID
+            where k.PORTFOLIO_ID in ({ids})
+              and (p.LAST_SIMULATION_RUN_ID is null or k.RUN_ID = p.LAST_SIMULATION_RUN_ID)
+            qualify row_number() over (partition by k.PORTFOLIO_ID order by k.TO_TS desc) = 1
+            """,
+            found,
+        )
+        trade_totals = _rows_by_portfolio(
+            cur,
+            """
+            select PORTFOLIO_ID, count(*) as TRADES_TOTAL, max(TRADE_TS) as LAST_TRADE_TS
+            from MIP.APP.PORTFOLIO_TRADES
+            where PORTFOLIO_ID in ({ids})
+            group by PORTFOLIO_ID
+            """,
+            found,
+            optional=False,
+        )
+        open_positions = _rows_by_portfolio(
+            cur,
+            """
+            select PORTFOLIO_ID, count(*) as OPEN_POSITIONS, max(AS_OF_TS) as AS_OF_TS
+            from MIP.MART.V_PORTFOLIO_OPEN_POSITIONS_CANONICAL
+            where PORTFOLIO_ID in ({ids})
+            group by PORTFOLIO_ID
+            """,
+            found,
+        )
+        risk_gate = _rows_by_portfolio(
+            cur, "select * from MIP.MART.V_PORTFOLIO_RISK_GATE where PORTFOLIO_ID in ({ids})", found
+        )
+        risk_state = _rows_by_portfolio(
+            cur, "select * from MIP.MART.V_PORTFOLIO_RISK_STATE where PORTFOLIO_ID in ({ids})", found
+        )
+        active_episodes = _rows_by_portfolio(
+            cur,
+            """
+            select PORTFOLIO_ID, EPISODE_ID, PROFILE_ID, START_TS, 'ACTIVE' as STATUS
+            from MIP.APP.V_PORTFOLIO_ACTIVE_EPISODE
+            where PORTFOLIO_ID in ({ids})
+            """,
+            found,
+        )
+        episodes = _episode_summaries(cur, found) if include_episodes else {}
+
+        results = []
+        for pid in found:
+            trades = _first(trade_totals.get(pid, [])) or {}
+            positions = _first(open_positions.get(pid, [])) or {}
+            snapshot_ts = positions.get("AS_OF_TS")
+            active = _first(active_episodes.get(pid, []))
+            entry = {
+                "portfolio_id": pid,
+                "portfolio": _first(headers[pid]),
+                "snapshot": {
+                    "run_id": headers[pid][0].get("LAST_SIMULATION_RUN_ID"),
+                    "cash_and_exposure": _cash_and_exposure(
+                        _first(latest_daily.get(pid, [])), _first(latest_kpis.get(pid, [])), snapshot_ts
+                    ),
+                    "kpis": _first(latest_kpis.get(pid, [])),
+                    "risk_gate": _normalize_risk_gate(
+                        _first(risk_gate.get(pid, [])), _first(risk_state.get(pid, []))
+                    ),
+                    "open_positions_count": int(positions.get("OPEN_POSITIONS") or 0),
+                    "trades_total": int(trades.get("TRADES_TOTAL") or 0),
+                    "last_trade_ts": trades.get("LAST_TRADE_TS"),
+                    "snapshot_ts": snapshot_ts,
+                    "active_episode": (
+                        {"episode_id": active.get("EPISODE_ID"), "profile_id": active.get("PROFILE_ID"),
+                         "start_ts": active.get("START_TS"), "status": "ACTIVE"}
+                        if active else None
+                    ),
+                },
+            }
+            if include_episodes:
+                entry["episodes"] = episodes.get(pid, [])
+            results.append(entry)
+        return {"portfolios": results, "missing": [pid for pid in portfolio_ids if pid not in headers]}
+    finally:
+        conn.close()
+
+
 @router.get("/{portfolio_id}")
 def get_portfolio(portfolio_id: int):
     """Portfolio header: all columns from MIP.APP.PORTFOLIO."""
@@ -289,6 +464,31 @@ def _normalize_risk_gate(risk_gate_row: dict | None, risk_state_row: dict | None
     }
 
 
+def _cash_and_exposure(latest_daily: dict | None, latest_kpi: dict | None, snapshot_ts=None) -> dict | None:
+    """Cash / exposure / total equity card from the latest daily row, else the latest KPI row's final equity."""
+    if latest_daily:
+        cash = latest_daily.get("CASH") or latest_daily.get("cash")
+        equity_value = latest_daily.get("EQUITY_VALUE") or latest_daily.get("equity_value")
+        total_equity = latest_daily.get("TOTAL_EQUITY") or latest_daily.get("total_equity")
+        return {
+            "cash": cash,
+            "exposure": equity_value,
+            "total_equity": total_equity,
+            "as_of_ts": latest_daily.get("TS") or latest_daily.get("ts"),
+        }
+    if latest_kpi:
+        fe = latest_kpi.get("FINAL_EQUITY") or latest_kpi.get("final_equity")
+        return {
+            "cash": None,
+            "exposure": None,
+            "total_equity": fe,
+            "as_of_ts": snapshot_ts or latest_kpi.get("TO_TS") or latest_kpi.get("to_ts"),
+        }
+    if snapshot_ts is not None:
+        return {"cash": None, "exposure": None, "total_equity": None, "as_of_ts": snapshot_ts}
+    return None
+
+
 def _format_pct(value) -> str | None:
     """Format a decimal fraction as percentage string (e.g. 0.1 -> '10%')."""
     if value is None:
@@ -636,29 +836,7 @@ def get_portfolio_snapshot(
         # --- Operator-clarity cards ---
         latest_daily = _first(daily)
 
-        cash_and_exposure = None
-        if latest_daily:
-            cash = latest_daily.get("CASH") or latest_daily.get("cash")
-            equity_value = latest_daily.get("EQUITY_VALUE") or latest_daily.get("equity_value")
-            total_equity = latest_daily.get("TOTAL_EQUITY") or latest_daily.get("total_equity")
-            cash_and_exposure = {
-                "cash": cash,
-                "exposure": equity_value,
-                "total_equity": total_equity,
-                "as_of_ts": latest_daily.get("TS") or latest_daily.get("ts"),
-            }
-        else:
-            latest_kpi = _first(kpis)
-            if latest_kpi:
-                fe = latest_kpi.get("FINAL_EQUITY") or latest_kpi.get("final_equity")
-                cash_and_exposure = {
-                    "cash": None,
-                    "exposure": None,
-                    "total_equity": fe,
-                    "as_of_ts": snapshot_ts or latest_kpi.get("TO_TS") or latest_kpi.get("to_ts"),
-                }
-            elif snapshot_ts is not None:
-                cash_and_exposure = {"cash": None, "exposure": None, "total_equity": None, "as_of_ts": snapshot_ts}
+        cash_and_exposure = _cash_and_exposure(latest_daily, _first(kpis), snapshot_ts)
 
         risk_gate_status = {
             "entries_blocked": not risk_gate_normalized["entries_allowed"],
@@ -726,6 +904,150 @@ def get_portfolio_snapshot(
         conn.close()
 
 
+def _in_list(values: list) -> str:
+    """Placeholder list for `col in (...)` with one %s per value."""
+    return ", ".join(["%s"] * len(values))
+
+
+def _episode_summaries(cur, portfolio_ids: list[int]) -> dict[int, list[dict]]:
+    """
+    Episodes per portfolio (most recent first) with summary stats, set-based over all portfolio_ids.
+    Persisted PORTFOLIO_EPISODE_RESULTS win; episodes without a result row are filled from one grouped
+    PORTFOLIO_DAILY query and one grouped PORTFOLIO_TRADES query, whatever the number of episodes.
+    """
+    by_portfolio: dict[int, list[dict]] = {pid: [] for pid in portfolio_ids}
+    if not portfolio_ids:
+        return by_portfolio
+    cur.execute(
+        f"""
+        select e.EPISODE_ID, e.PORTFOLIO_ID, e.PROFILE_ID, e.START_TS, e.END_TS, e.STATUS, e.END_REASON, e.CREATED_AT,
+               e.START_EQUITY,
+               p.NAME as PROFILE_NAME,
+               r.END_EQUITY as RESULT_END_EQUITY, r.REALIZED_PNL, r.RETURN_PCT, r.MAX_DRAWDOWN_PCT,
+               r.TRADES_COUNT, r.WIN_DAYS, r.LOSS_DAYS,
+               r.DISTRIBUTION_AMOUNT, r.DISTRIBUTION_MODE, r.ENDED_AT_TS,
+               pf.STARTING_CASH as PORTFOLIO_STARTING_CASH
+        from MIP.APP.PORTFOLIO_EPISODE e
+        left join MIP.APP.PORTFOLIO_PROFILE p on p.PROFILE_ID = e.PROFILE_ID
+        left join MIP.APP.PORTFOLIO_EPISODE_RESULTS r
+          on r.PORTFOLIO_ID = e.PORTFOLIO_ID and r.EPISODE_ID = e.EPISODE_ID
+        left join MIP.APP.PORTFOLIO pf on pf.PORTFOLIO_ID = e.PORTFOLIO_ID
+        where e.PORTFOLIO_ID in ({_in_list(portfolio_ids)})
+        order by e.PORTFOLIO_ID, e.START_TS desc
+        """,
+        list(portfolio_ids),
+    )
+    rows = fetch_all(cur)
+
+    # Fallback: compute from daily/trades when no results row, for all such episodes at once
+    fallback_keys = [
+        (row["PORTFOLIO_ID"], row["EPISODE_ID"])
+        for row in rows
+        if row.get("RETURN_PCT") is None and row.get("START_TS") is not None
+    ]
+    daily_stats: dict[tuple, dict] = {}
+    trade_counts: dict[tuple, int] = {}
+    if fallback_keys:
+        key_list = ", ".join(["(%s, %s)"] * len(fallback_keys))
+        key_params = [v for key in fallback_keys for v in key]
+        episodes_cte = f"""
+            with eps as (
+                select PORTFOLIO_ID, EPISODE_ID, START_TS, END_TS
+                from MIP.APP.PORTFOLIO_EPISODE
+                where (PORTFOLIO_ID, EPISODE_ID) in ({key_list})
+            )
+        """
+        try:
+            cur.execute(
+                episodes_cte
+                + """
+                select
+                    PORTFOLIO_ID, EPISODE_ID,
+                    max_by(TOTAL_EQUITY, TS) as final_equity,
+                    max(DRAWDOWN) as max_drawdown,
+                    count_if((TOTAL_EQUITY - PREV_TOTAL_EQUITY) > 0) as win_days,
+                    count_if((TOTAL_EQUITY - PREV_TOTAL_EQUITY) < 0) as loss_days
+                from (
+                    select eps.PORTFOLIO_ID, eps.EPISODE_ID, d.TS, d.TOTAL_EQUITY, d.DRAWDOWN,
+                        lag(d.TOTAL_EQUITY) over (
+                            partition by eps.PORTFOLIO_ID, eps.EPISODE_ID order by d.TS
+                        ) as PREV_TOTAL_EQUITY
+                    from eps
+                    join MIP.APP.PORTFOLIO_DAILY d
+                      on d.PORTFOLIO_ID = eps.PORTFOLIO_ID
+                     and d.TS >= eps.START_TS and (eps.END_TS is null or d.TS <= eps.END_TS)
+                )
+                group by PORTFOLIO_ID, EPISODE_ID
+                """,
+                key_params,
+            )
+            for d in fetch_all(cur):
+                daily_stats[(d["PORTFOLIO_ID"], d["EPISODE_ID"])] = d
+            cur.execute(
+                episodes_cte
+                + """
+                select eps.PORTFOLIO_ID, eps.EPISODE_ID, count(t.PORTFOLIO_ID) as TRADES_COUNT
+                from eps
+                left join MIP.APP.PORTFOLIO_TRADES t
+                  on t.PORTFOLIO_ID = eps.PORTFOLIO_ID
+                 and t.TRADE_TS >= eps.START_TS and (eps.END_TS is null or t.TRADE_TS <= eps.END_TS)
+                group by eps.PORTFOLIO_ID, eps.EPISODE_ID
+                """,
+                key_params,
+            )
+            for t in fetch_all(cur):
+                trade_counts[(t["PORTFOLIO_ID"], t["EPISODE_ID"])] = int(t["TRADES_COUNT"] or 0)
+        except Exception:
+            daily_stats, trade_counts = {}, {}
+            fallback_keys = []
+
+    fallback_set = set(fallback_keys)
+    for row in rows:
+        start_ts = row.get("START_TS")
+        end_ts = row.get("END_TS")
+        ep = {**row}
+        ep.pop("PORTFOLIO_STARTING_CASH", None)
+        if start_ts and hasattr(start_ts, "isoformat"):
+            ep["start_ts"] = start_ts.isoformat()
+        if end_ts and hasattr(end_ts, "isoformat"):
+            ep["end_ts"] = end_ts.isoformat()
+        # Prefer persisted results; map to response shape
+        if row.get("RETURN_PCT") is not None:
+            ep["total_return"] = float(row["RETURN_PCT"]) if row.get("RETURN_PCT") is not None else None
+            ep["max_drawdown"] = float(row["MAX_DRAWDOWN_PCT"]) if row.get("MAX_DRAWDOWN_PCT") is not None else None
+            ep["win_days"] = int(row["WIN_DAYS"]) if row.get("WIN_DAYS") is not None else None
+            ep["loss_days"] = int(row["LOSS_DAYS"]) if row.get("LOSS_DAYS") is not None else None
+            ep["trades_count"] = int(row["TRADES_COUNT"]) if row.get("TRADES_COUNT") is not None else None
+            ep["start_equity"] = float(row["START_EQUITY"]) if row.get("START_EQUITY") is not None else None
+        else:
+            ep["total_return"] = None
+            ep["max_drawdown"] = None
+            ep["win_days"] = None
+            ep["loss_days"] = None
+            ep["trades_count"] = None
+            ep["start_equity"] = float(row["START_EQUITY"]) if row.get("START_EQUITY") is not None else None
+        ep["distribution_amount"] = float(row["DISTRIBUTION_AMOUNT"]) if row.get("DISTRIBUTION_AMOUNT") is not None else None
+        ep["distribution_mode"] = row.get("DISTRIBUTION_MODE")
+
+        key = (row["PORTFOLIO_ID"], row["EPISODE_ID"])
+        if key in fallback_set:
+            d = daily_stats.get(key, {})
+            start_cash = ep.get("start_equity")
+            if start_cash is None and row.get("PORTFOLIO_STARTING_CASH") is not None:
+                start_cash = float(row["PORTFOLIO_STARTING_CASH"])
+                ep["start_equity"] = start_cash
+            final_equity = d.get("FINAL_EQUITY")
+            if start_cash and final_equity and start_cash != 0:
+                ep["total_return"] = (float(final_equity) / start_cash) - 1
+            ep["max_drawdown"] = d.get("MAX_DRAWDOWN")
+            ep["win_days"] = int(d.get("WIN_DAYS") or 0)
+            ep["loss_days"] = int(d.get("LOSS_DAYS") or 0)
+            ep["trades_count"] = trade_counts.get(key, 0)
+
+        by_portfolio.setdefault(row["PORTFOLIO_ID"], []).append(serialize_row(ep))
+    return by_portfolio
+
+
 @router.get("/{portfolio_id}/episodes")
 def get_portfolio_episodes(portfolio_id: int):
     """
@@ -734,115 +1056,20 @@ def get_portfolio_episodes(portfolio_id: int):
     """
     conn = get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            select e.EPISODE_ID, e.PORTFOLIO_ID, e.PROFILE_ID, e.START_TS, e.END_TS, e.STATUS, e.END_REASON, e.CREATED_AT,
-                   e.START_EQUITY,
-                   p.NAME as PROFILE_NAME,
-                   r.END_EQUITY as RESULT_END_EQUITY, r.REALIZED_PNL, r.RETURN_PCT, r.MAX_DRAWDOWN_PCT,
-                   r.TRADES_COUNT, r.WIN_DAYS, r.LOSS_DAYS,
-                   r.DISTRIBUTION_AMOUNT, r.DISTRIBUTION_MODE, r.ENDED_AT_TS
-            from MIP.APP.PORTFOLIO_EPISODE e
-            left join MIP.APP.PORTFOLIO_PROFILE p on p.PROFILE_ID = e.PROFILE_ID
-            left join MIP.APP.PORTFOLIO_EPISODE_RESULTS r
-              on r.PORTFOLIO_ID = e.PORTFOLIO_ID and r.EPISODE_ID = e.EPISODE_ID
-            where e.PORTFOLIO_ID = %s
-            order by e.START_TS desc
-            """,
-            (portfolio_id,),
-        )
-        rows = fetch_all(cur)
-        if not rows:
-            return []
-        episodes = []
-        for row in rows:
-            start_ts = row.get("START_TS")
-            end_ts = row.get("END_TS")
-            ep = {**row}
-            if start_ts and hasattr(start_ts, "isoformat"):
-                ep["start_ts"] = start_ts.isoformat()
-            if end_ts and hasattr(end_ts, "isoformat"):
-                ep["end_ts"] = end_ts.isoformat()
-            # Prefer persisted results; map to response shape
-            if row.get("RETURN_PCT") is not None:
-                ep["total_return"] = float(row["RETURN_PCT"]) if row.get("RETURN_PCT") is not None else None
-                ep["max_drawdown"] = float(row["MAX_DRAWDOWN_PCT"]) if row.get("MAX_DRAWDOWN_PCT") is not None else None
-                ep["win_days"] = int(row["WIN_DAYS"]) if row.get("WIN_DAYS") is not None else None
-                ep["loss_days"] = int(row["LOSS_DAYS"]) if row.get("LOSS_DAYS") is not None else None
-                ep["trades_count"] = int(row["TRADES_COUNT"]) if row.get("TRADES_COUNT") is not None else None
-                ep["start_equity"] = float(row["START_EQUITY"]) if row.get("START_EQUITY") is not None else None
-            else:
-                ep["total_return"] = None
-                ep["max_drawdown"] = None
-                ep["win_days"] = None
-                ep["loss_days"] = None
-                ep["trades_count"] = None
-                ep["start_equity"] = float(row["START_EQUITY"]) if row.get("START_EQUITY") is not None else None
-            ep["distribution_amount"] = float(row["DISTRIBUTION_AMOUNT"]) if row.get("DISTRIBUTION_AMOUNT") is not None else None
-            ep["distribution_mode"] = row.get("DISTRIBUTION_MODE")
-
-            # Fallback: compute from daily/trades when no results row
-            if ep.get("total_return") is None and start_ts is not None:
-                try:
-                    cur.execute(
-                        """
-                        select
-                            max_by(TOTAL_EQUITY, TS) as final_equity,
-                            max(DRAWDOWN) as max_drawdown,
-                            count_if((TOTAL_EQUITY - PREV_TOTAL_EQUITY) > 0) as win_days,
-                            count_if((TOTAL_EQUITY - PREV_TOTAL_EQUITY) < 0) as loss_days
-                        from (
-                            select TS, TOTAL_EQUITY, DRAWDOWN,
-                                lag(TOTAL_EQUITY) over (order by TS) as PREV_TOTAL_EQUITY
-                            from MIP.APP.PORTFOLIO_DAILY
-                            where PORTFOLIO_ID = %s and TS >= %s and (%s is null or TS <= %s)
-                        )
-                        """,
-                        (portfolio_id, start_ts, end_ts, end_ts),
-                    )
-                    daily_row = cur.fetchone()
-                    if daily_row and cur.description:
-                        cols = [d[0] for d in cur.description]
-                        d = dict(zip(cols, daily_row))
-                        start_cash = ep.get("start_equity")
-                        if start_cash is None:
-                            cur.execute(
-                                "select STARTING_CASH from MIP.APP.PORTFOLIO where PORTFOLIO_ID = %s",
-                                (portfolio_id,),
-                            )
-                            sc = cur.fetchone()
-                            start_cash = float(sc[0]) if sc and sc[0] is not None else None
-                            ep["start_equity"] = start_cash
-                        final_equity = d.get("FINAL_EQUITY")
-                        if start_cash and final_equity and start_cash != 0:
-                            ep["total_return"] = (float(final_equity) / start_cash) - 1
-                        ep["max_drawdown"] = d.get("MAX_DRAWDOWN")
-                        ep["win_days"] = int(d["WIN_DAYS"]) if d.get("WIN_DAYS") is not None else None
-                        ep["loss_days"] = int(d["LOSS_DAYS"]) if d.get("LOSS_DAYS") is not None else None
-                    cur.execute(
-                        """
-                        select count(*) from MIP.APP.PORTFOLIO_TRADES
-                        where PORTFOLIO_ID = %s and TRADE_TS >= %s and (%s is null or TRADE_TS <= %s)
-                        """,
-                        (portfolio_id, start_ts, end_ts, end_ts),
-                    )
-                    tc = cur.fetchone()
-                    ep["trades_count"] = int(tc[0]) if tc and tc[0] is not None else 0
-                except Exception:
-                    pass
-
-            episodes.append(serialize_row(ep))
-        return episodes
+        return _episode_summaries(conn.cursor(), [portfolio_id])[portfolio_id]
     finally:
         conn.close()
 
 
 @router.get("/{portfolio_id}/timeline")
-def get_portfolio_timeline(portfolio_id: int):
+def get_portfolio_timeline(
+    portfolio_id: int,
+    points: int = Query(DEFAULT_SERIES_POINTS, ge=20, le=5000, description="Max points per cumulative series"),
+):
     """
     Cumulative evolution timeline: per-episode results and cumulative series for charts.
-    Returns total_paid_out_amount (sum of distribution_amount), per_episode list, and cumulative_series.
+    Returns total_paid_out_amount (sum of distribution_amount), per_episode list, and cumulative_series
+    (downsampled to at most points, keeping min/max per bucket).
     """
     conn = get_connection()
     try:
@@ -904,19 +1131,26 @@ def get_portfolio_timeline(portfolio_id: int):
 
         return {
             "per_episode": per_episode,
-            "cumulative_series": cumulative_series,
+            "cumulative_series": minmax_downsample(cumulative_series, points, "cum_realized_pnl"),
             "total_paid_out_amount": total_paid_out,
-            "total_paid_out_series": total_paid_out_series,
+            "total_paid_out_series": minmax_downsample(total_paid_out_series, points, "cum_distributed_amount"),
         }
     finally:
         conn.close()
 
 
 @router.get("/{portfolio_id}/episodes/{episode_id}")
-def get_episode_detail(portfolio_id: int, episode_id: int):
+def get_episode_detail(
+    portfolio_id: int,
+    episode_id: int,
+    points: int = Query(DEFAULT_SERIES_POINTS, ge=20, le=5000, description="Max points per chart series"),
+):
     """
     Episode analytics for the timeline card: equity series, drawdown series,
     trades per day, regime strip, thresholds, and events.
+    Series longer than points are downsampled (equity/drawdown keep each bucket's min and max, the regime strip
+    keeps the worst gate state, trades per day are summed); summary stats use the full series.
+    Individual trades: GET /portfolios/{portfolio_id}/episodes/{episode_id}/trades.
     """
     conn = get_connection()
     try:
@@ -1069,10 +1303,11 @@ def get_episode_detail(portfolio_id: int, episode_id: int):
             "end_ts": end_ts_str,
             "status": ep.get("STATUS"),
             "end_reason": ep.get("END_REASON"),
-            "equity_series": equity_series,
-            "drawdown_series": drawdown_series,
-            "trades_per_day": trades_per_day,
-            "regime_per_day": regime_per_day,
+            "equity_series": minmax_downsample(equity_series, points, "equity"),
+            "drawdown_series": minmax_downsample(drawdown_series, points, "drawdown_pct"),
+            "trades_per_day": bucket_reduce(trades_per_day, points, sum_bucket("trades_count")),
+            "regime_per_day": bucket_reduce(regime_per_day, points, worst_bucket("gate_state", GATE_SEVERITY)),
+            "series_points": {"daily": len(daily_rows), "max_points": points},
             "thresholds": thresholds,
             "events": events,
             "start_equity": start_equity,
@@ -1086,3 +1321,66 @@ def get_episode_detail(portfolio_id: int, episode_id: int):
         })
     finally:
         conn.close()
+
+
+@router.get("/{portfolio_id}/episodes/{episode_id}/trades")
+def get_episode_trades(
+    portfolio_id: int,
+    episode_id: int,
+    limit: int = Query(100, ge=1, le=500, description="Max trades per page"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+):
+    """
+    Trades inside an episode window, newest first, keyset-paginated on (TRADE_TS, TRADE_ID).
+    Follow next_cursor until it is null.
+    """
+    after = paging.decode_cursor(cursor, ("ts", "id")) if cursor else None
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            select START_TS, END_TS
+            from MIP.APP.PORTFOLIO_EPISODE
+            where PORTFOLIO_ID = %s and EPISODE_ID = %s
+            """,
+            (portfolio_id, episode_id),
+        )
+        row = cur.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Episode not found")
+        start_ts, end_ts = row[0], row[1]
+
+        sql = """
+            select TRADE_ID, PROPOSAL_ID, RUN_ID, SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, TRADE_TS, SIDE,
+                   PRICE, QUANTITY, NOTIONAL, REALIZED_PNL, CASH_AFTER, SCORE
+            from MIP.APP.PORTFOLIO_TRADES
+            where PORTFOLIO_ID = %s and TRADE_TS >= %s and (%s is null or TRADE_TS <= %s)
+        """
+        params = [portfolio_id, start_ts, end_ts, end_ts]
+        if after is not None:
+            sql += """
+              and (TRADE_TS < to_timestamp_ntz(%s) or (TRADE_TS = to_timestamp_ntz(%s) and TRADE_ID < %s))
+            """
+            params += [after["ts"], after["ts"], after["id"]]
+        sql += f"""
+            order by TRADE_TS desc, TRADE_ID desc
+            limit {int(limit) + 1}
+        """
+        cur.execute(sql, tuple(params))
+        rows = fetch_all(cur)
+    finally:
+        conn.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = serialize_row(rows[-1])
+        next_cursor = paging.encode_cursor({"ts": last["TRADE_TS"], "id": last["TRADE_ID"]})
+    return {
+        "episode_id": episode_id,
+        "trades": serialize_rows(rows),
+        "count": len(rows),
+        "next_cursor": next_cursor,
+    }
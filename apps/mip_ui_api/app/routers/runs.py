@@ -1,8 +1,9 @@
 import json
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 
 from app.audit_interpreter import interpret_timeline
 from app.db import get_connection, fetch_all, serialize_row, serialize_rows
+from app.run_profile import build_profile
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
@@ -25,102 +26,269 @@ def _summary_hint_from_status_and_details(status: str | None, details: dict | No
     return None
 
 
+RUNS_SQL = """
+select
+    RUN_ID,
+    STARTED_AT,
+    COMPLETED_AT,
+    STATUS,
+    DETAILS
+from MIP.APP.PIPELINE_RUN
+where EVENT_TYPE = 'PIPELINE'
+order by coalesce(COMPLETED_AT, STARTED_AT) desc
+limit %s
+"""
+
+
+def _run_from_summary_row(r: dict) -> dict:
+    """PIPELINE_RUN row -> runs list entry (run_id, started_at, completed_at, status, summary_hint)."""
+    details = r.get("DETAILS")
+    if isinstance(details, str):
+        try:
+            details = json.loads(details) if details else {}
+        except Exception:
+            details = {}
+    status = r.get("STATUS") or "RUNNING"
+    started_at = r.get("STARTED_AT")
+    # Running runs have no COMPLETED_AT yet; report the start (same as the old START-only grouping).
+    completed_at = r.get("COMPLETED_AT") or started_at
+    return {
+        "run_id": r.get("RUN_ID"),
+        "started_at": started_at.isoformat() if hasattr(started_at, "isoformat") else started_at,
+        "completed_at": completed_at.isoformat() if hasattr(completed_at, "isoformat") else completed_at,
+        "status": status,
+        "summary_hint": _summary_hint_from_status_and_details(status, details),
+    }
+
+
 @router.get("")
 def list_runs(limit: int = 50):
-    """Recent pipeline runs from MIP_AUDIT_LOG. Returns run_id, started_at, completed_at, status, summary_hint."""
-    sql = """
-    select
-        EVENT_TS,
-        RUN_ID,
-        STATUS,
-        ROWS_AFFECTED,
-        DETAILS
-    from MIP.APP.MIP_AUDIT_LOG
-    where EVENT_TYPE = 'PIPELINE'
-      and EVENT_NAME = 'SP_RUN_DAILY_PIPELINE'
-    order by EVENT_TS desc
-    limit %s
-    """
+    """Recent pipeline runs from MIP.APP.PIPELINE_RUN (one row per run, maintained by SP_LOG_EVENT)."""
     conn = get_connection()
     try:
         cur = conn.cursor()
-        cur.execute(sql, (limit * 2,))  # fetch extra so we get START + END per run
+        cur.execute(RUNS_SQL, (limit,))
         rows = fetch_all(cur)
     finally:
         conn.close()
+    return [serialize_row(_run_from_summary_row(r)) for r in rows]
 
-    # Group by RUN_ID: one row per run with started_at = min(ts), completed_at = max(ts), status from completion row
-    runs_by_id: dict = {}
-    for r in rows:
-        run_id = r.get("RUN_ID")
-        if not run_id:
-            continue
-        ts = r.get("EVENT_TS")
-        status = r.get("STATUS") or ""
-        details = r.get("DETAILS")
-        if isinstance(details, str):
-            try:
-                details = json.loads(details) if details else {}
-            except Exception:
-                details = {}
-        if run_id not in runs_by_id:
-            runs_by_id[run_id] = {"started_at": ts, "completed_at": ts, "status": status, "details": details}
-        else:
-            run = runs_by_id[run_id]
-            if ts:
-                if run["started_at"] is None or (ts < run["started_at"]):
-                    run["started_at"] = ts
-                if run["completed_at"] is None or (ts > run["completed_at"]):
-                    run["completed_at"] = ts
-                    run["status"] = status
-                    run["details"] = details
-
-    # Build list: take completion status (prefer non-START), summary_hint
-    out = []
-    for run_id, run in runs_by_id.items():
-        started_at = run["started_at"]
-        completed_at = run["completed_at"]
-        status = run["status"] if run["status"] != "START" else "RUNNING"
-        summary_hint = _summary_hint_from_status_and_details(status, run.get("details"))
-        out.append({
-            "run_id": run_id,
-            "started_at": started_at.isoformat() if hasattr(started_at, "isoformat") else started_at,
-            "completed_at": completed_at.isoformat() if hasattr(completed_at, "isoformat") else completed_at,
-            "status": status,
-            "summary_hint": summary_hint,
-        })
-    out.sort(key=lambda x: (x["completed_at"] or x["started_at"] or ""), reverse=True)
-    out = out[:limit]
-    return [serialize_row(r) for r in out]
+
+RUN_WINDOW_SQL = """
+select
+    dateadd(minute, -5, STARTED_AT),
+    dateadd(hour, 1, coalesce(COMPLETED_AT, current_timestamp())),
+    (select max(ROLLED_UP_BEFORE) from MIP.APP.AUDIT_LOG_RETENTION_STATE),
+    (select max(ARCHIVED_BEFORE) from MIP.APP.AUDIT_LOG_RETENTION_STATE)
+from MIP.APP.PIPELINE_RUN
+where RUN_ID = %s
+"""
+
+RUN_TIMELINE_COLUMNS = """
+    EVENT_TS,
+    EVENT_TYPE,
+    EVENT_NAME,
+    STATUS,
+    ROWS_AFFECTED,
+    ERROR_MESSAGE,
+    DETAILS
+"""
+
+RUN_TIMELINE_FILTER = """
+where (RUN_ID = %s or PARENT_RUN_ID = %s)
+"""
+
+RUN_TIMELINE_WINDOW = """
+  and EVENT_TS between %s and %s
+"""
+
+RUN_ROLLUP_SQL = """
+select
+    EVENT_TYPE,
+    EVENT_NAME,
+    SCOPE,
+    STATUS,
+    EVENT_COUNT,
+    SCOPE_KEY_COUNT,
+    ROWS_AFFECTED_SUM,
+    ERROR_COUNT,
+    FIRST_EVENT_TS,
+    LAST_EVENT_TS,
+    SAMPLE_ERROR
+from MIP.APP.MIP_AUDIT_LOG_ROLLUP
+where ROOT_RUN_ID = %s
+order by FIRST_EVENT_TS, EVENT_NAME, SCOPE
+"""
+
+
+def _timeline_sql(windowed: bool, archived: bool) -> str:
+    """Timeline over MIP_AUDIT_LOG, plus MIP_AUDIT_LOG_ARCHIVE for runs older than the archive watermark."""
+    where = RUN_TIMELINE_FILTER + (RUN_TIMELINE_WINDOW if windowed else "")
+    sql = "select" + RUN_TIMELINE_COLUMNS + "from MIP.APP.MIP_AUDIT_LOG" + where
+    if archived:
+        sql += "union all\nselect" + RUN_TIMELINE_COLUMNS + "from MIP.APP.MIP_AUDIT_LOG_ARCHIVE" + where
+    return sql + "order by EVENT_TS"
 
 
 @router.get("/{run_id}")
 def get_run(run_id: str):
-    """All audit events for the run (ordered by EVENT_TS) + interpreted narrative (interpreted_narrative, sections, etc.)."""
-    sql = """
-    select
-        EVENT_TS,
-        EVENT_TYPE,
-        EVENT_NAME,
-        STATUS,
-        ROWS_AFFECTED,
-        ERROR_MESSAGE,
-        DETAILS
-    from MIP.APP.MIP_AUDIT_LOG
-    where RUN_ID = %s
-       or PARENT_RUN_ID = %s
-    order by EVENT_TS
+    """
+    All audit events for the run (ordered by EVENT_TS) + interpreted narrative (interpreted_narrative, sections, etc.).
+    Runs older than the retention watermarks (SP_AUDIT_LOG_RETENTION) are read from the archive too and carry
+    their rolled-up per-scope step events in `rollups`; `archived` is true when the archive was read.
     """
     conn = get_connection()
     try:
         cur = conn.cursor()
-        cur.execute(sql, (run_id, run_id))
-        rows = fetch_all(cur)
+        # Bound the scan by the run's window from PIPELINE_RUN so the clustered audit log can prune;
+        # ids not in PIPELINE_RUN (step/agent run ids) fall back to the unbounded lookup.
+        cur.execute(RUN_WINDOW_SQL, (run_id,))
+        window = cur.fetchone()
+        if window and window[0] is not None:
+            rolled_up_before, archived_before = window[2], window[3]
+            archived = archived_before is not None and window[0] < archived_before
+            params = (run_id, run_id, window[0], window[1])
+            cur.execute(_timeline_sql(True, archived), params * 2 if archived else params)
+            rows = fetch_all(cur)
+        else:
+            rolled_up_before = None
+            archived = False
+            cur.execute(_timeline_sql(False, False), (run_id, run_id))
+            rows = fetch_all(cur)
+            if not rows:
+                # Unknown to the live log: the id may belong to an archived step/agent event.
+                archived = True
+                cur.execute(_timeline_sql(False, True), (run_id, run_id) * 2)
+                rows = fetch_all(cur)
         if not rows:
             raise HTTPException(status_code=404, detail="Run not found")
+        rollups = []
+        if archived or (rolled_up_before is not None and window[0] < rolled_up_before):
+            cur.execute(RUN_ROLLUP_SQL, (run_id,))
+            rollups = serialize_rows(fetch_all(cur))
         serialized = serialize_rows(rows)
         interpreted = interpret_timeline(rows)
         interpreted["timeline"] = serialized
+        interpreted["rollups"] = rollups
+        interpreted["archived"] = archived
         return interpreted
     finally:
         conn.close()
+
+
+# MART.V_PIPELINE_STEP_PROFILE restricted to the profiled run and the runs of the same kind (live vs replay) before
+# it, before any window runs: the view's windows span the whole audit log, so filtering the view by run id would
+# still evaluate them over every run. Params: run id, number of runs (profiled run included).
+PROFILE_SQL = """
+with target as (
+    select EVENT_TYPE = 'REPLAY' as IS_REPLAY, STARTED_AT
+    from MIP.APP.PIPELINE_RUN
+    where RUN_ID = %s
+),
+runs as (
+    select
+        r.RUN_ID as PIPELINE_RUN_ID,
+        r.EVENT_TYPE = 'REPLAY' as IS_REPLAY,
+        r.STARTED_AT as RUN_STARTED_AT,
+        r.COMPLETED_AT as RUN_COMPLETED_AT,
+        r.STATUS as RUN_STATUS
+    from MIP.APP.PIPELINE_RUN r
+    join target t
+      on (r.EVENT_TYPE = 'REPLAY') = t.IS_REPLAY
+     and r.STARTED_AT <= t.STARTED_AT
+    qualify row_number() over (order by r.STARTED_AT desc) <= %s
+),
+steps as (
+    select
+        PARENT_RUN_ID as PIPELINE_RUN_ID,
+        EVENT_NAME,
+        DETAILS:"step_name"::string as STEP_NAME,
+        STATUS as STEP_STATUS,
+        ROWS_AFFECTED,
+        try_to_timestamp_ntz(DETAILS:"started_at"::string) as STARTED_AT,
+        coalesce(try_to_timestamp_ntz(DETAILS:"completed_at"::string), EVENT_TS) as COMPLETED_AT
+    from MIP.APP.MIP_AUDIT_LOG
+    where PARENT_RUN_ID in (select PIPELINE_RUN_ID from runs)
+      and EVENT_TYPE in ('PIPELINE_STEP', 'REPLAY')
+      and DETAILS:"step_name"::string is not null
+      and coalesce(DETAILS:"scope"::string, 'AGG') = 'AGG'
+      and STATUS <> 'START'
+    qualify row_number() over (
+        partition by PARENT_RUN_ID, EVENT_NAME, DETAILS:"step_name"::string
+        order by EVENT_TS desc
+    ) = 1
+),
+profiled as (
+    select
+        r.PIPELINE_RUN_ID,
+        r.IS_REPLAY,
+        r.RUN_STARTED_AT,
+        r.RUN_COMPLETED_AT,
+        r.RUN_STATUS,
+        datediff(millisecond, r.RUN_STARTED_AT, r.RUN_COMPLETED_AT) / 1000.0 as RUN_DURATION_SECONDS,
+        s.EVENT_NAME,
+        s.STEP_NAME,
+        s.STEP_STATUS,
+        s.STARTED_AT,
+        s.COMPLETED_AT,
+        datediff(millisecond, s.STARTED_AT, s.COMPLETED_AT) / 1000.0 as DURATION_SECONDS,
+        s.ROWS_AFFECTED
+    from runs r
+    left join steps s
+      on s.PIPELINE_RUN_ID = r.PIPELINE_RUN_ID
+)
+select
+    PIPELINE_RUN_ID,
+    IS_REPLAY,
+    RUN_STARTED_AT,
+    RUN_COMPLETED_AT,
+    RUN_STATUS,
+    RUN_DURATION_SECONDS,
+    EVENT_NAME,
+    STEP_NAME,
+    STEP_STATUS,
+    STARTED_AT,
+    COMPLETED_AT,
+    DURATION_SECONDS,
+    ROWS_AFFECTED,
+    iff(DURATION_SECONDS > 0, ROWS_AFFECTED / DURATION_SECONDS, null) as ROWS_PER_SEC,
+    iff(RUN_DURATION_SECONDS > 0, DURATION_SECONDS / RUN_DURATION_SECONDS, null) as SHARE_OF_RUN,
+    avg(DURATION_SECONDS) over (
+        partition by EVENT_NAME, STEP_NAME
+        order by RUN_STARTED_AT
+        rows between 10 preceding and 1 preceding
+    ) as PREV_AVG_DURATION_SECONDS,
+    DURATION_SECONDS / nullif(avg(DURATION_SECONDS) over (
+        partition by EVENT_NAME, STEP_NAME
+        order by RUN_STARTED_AT
+        rows between 10 preceding and 1 preceding
+    ), 0) as DURATION_VS_PREV_AVG
+from profiled
+order by RUN_STARTED_AT, STARTED_AT nulls last
+"""
+
+# PREV_AVG_DURATION_SECONDS averages the 10 preceding runs, so the profiled run needs at least that many before it.
+PREV_AVG_RUNS = 10
+
+
+@router.get("/{run_id}/profile")
+def get_run_profile(run_id: str, history: int = Query(10, ge=1, le=100, description="Runs in the trend window")):
+    """
+    Per-step duration, rows/sec and share of run time (MART.V_PIPELINE_STEP_PROFILE), steps that regressed
+    against their average over the previous runs, and per-step trends across the last `history` runs.
+    """
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(PROFILE_SQL, (run_id, max(history, PREV_AVG_RUNS + 1)))
+        rows = fetch_all(cur)
+        run_rows = [r for r in rows if r.get("PIPELINE_RUN_ID") == run_id]
+        if not run_rows:
+            raise HTTPException(status_code=404, detail="Run not found")
+        # Rows are ordered by run start, so the trend window is the last `history` distinct runs.
+        run_ids = list(dict.fromkeys(r.get("PIPELINE_RUN_ID") for r in rows))
+        recent = set(run_ids[-history:])
+        history_rows = [r for r in rows if r.get("PIPELINE_RUN_ID") in recent and r.get("STEP_NAME") is not None]
+        return build_profile(run_id, run_rows, history_rows)
+    finally:
+        conn.close()
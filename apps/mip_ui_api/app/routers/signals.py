@@ -2,197 +2,160 @@
 Signals Explorer endpoint: GET /signals
 Returns actual signal/recommendation rows with filters.
 Used by Morning Brief deep-links for opportunity drill-down.
+The primary filters and every applicable fallback tier run as one query that tags each row with the tier it
+matched and keeps the best tier. Pages are keyset-paginated on (signal_ts, score, recommendation_id) through an
+opaque cursor, and fields= limits the returned columns.
 """
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
 
+from app import paging
 from app.db import get_connection, fetch_all, serialize_row
 
 router = APIRouter(prefix="/signals", tags=["signals"])
 
+# Response field -> V_SIGNALS_ELIGIBLE_TODAY expression.
+SIGNAL_COLUMNS = {
+    "RECOMMENDATION_ID": "s.RECOMMENDATION_ID",
+    "RUN_ID": "s.RUN_ID",
+    "SIGNAL_TS": "s.TS",
+    "SYMBOL": "s.SYMBOL",
+    "MARKET_TYPE": "s.MARKET_TYPE",
+    "INTERVAL_MINUTES": "s.INTERVAL_MINUTES",
+    "PATTERN_ID": "s.PATTERN_ID",
+    "SCORE": "s.SCORE",
+    "DETAILS": "s.DETAILS",
+    "TRUST_LABEL": "s.TRUST_LABEL",
+    "RECOMMENDED_ACTION": "s.RECOMMENDED_ACTION",
+    "IS_ELIGIBLE": "s.IS_ELIGIBLE",
+    "GATING_REASON": "s.GATING_REASON",
+}
+
+# Null scores sort last; the recommendation id makes the order total so pages never overlap.
+SORT_SCORE_SQL = "coalesce(s.SCORE, -1e300)"
+KEYSET_SQL = """
+  and (SIGNAL_TS < to_timestamp_ntz(%s)
+       or (SIGNAL_TS = to_timestamp_ntz(%s)
+           and (SORT_SCORE < %s or (SORT_SCORE = %s and RECOMMENDATION_ID < %s))))"""
+
 
 def _serialize_rows(rows):
     return [serialize_row(r) for r in rows] if rows else []
 
 
-@router.get("")
-def get_signals(
-    symbol: Optional[str] = Query(None, description="Filter by symbol (e.g., AAPL)"),
-    market_type: Optional[str] = Query(None, description="Filter by market type (STOCK, FX)"),
-    pattern_id: Optional[str] = Query(None, description="Filter by pattern ID"),
-    horizon_bars: Optional[int] = Query(None, description="Filter by horizon bars"),
-    run_id: Optional[str] = Query(None, description="Filter by pipeline run ID"),
-    as_of_ts: Optional[str] = Query(None, description="Filter by as-of timestamp (ISO format)"),
-    trust_label: Optional[str] = Query(None, description="Filter by trust label (TRUSTED, WATCH, UNTRUSTED)"),
-    limit: int = Query(100, ge=1, le=500, description="Max rows to return"),
-    include_fallback: bool = Query(True, description="Include fallback results if primary query returns 0"),
-):
+def parse_fields(fields: Optional[str]) -> list[str]:
+    """fields=symbol,score,... -> response columns (case-insensitive); all columns when omitted."""
+    if not fields:
+        return list(SIGNAL_COLUMNS)
+    requested = [f.strip().upper() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in SIGNAL_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(SIGNAL_COLUMNS).lower()}",
+        )
+    return list(dict.fromkeys(requested))
+
+
+def encode_cursor(tier: int, row: dict) -> str:
+    return paging.encode_cursor({
+        "tier": tier,
+        "ts": serialize_row({"ts": row["SIGNAL_TS"]})["ts"],
+        "score": float(row["SORT_SCORE"]),
+        "id": row["RECOMMENDATION_ID"],
+    })
+
+
+def decode_cursor(cursor: str) -> dict:
+    payload = paging.decode_cursor(cursor, ("tier", "ts", "score", "id"))
+    try:
+        return {**payload, "tier": int(payload["tier"]), "score": float(payload["score"])}
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def signal_tiers(
+    symbol: Optional[str] = None,
+    market_type: Optional[str] = None,
+    pattern_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+    as_of_ts: Optional[str] = None,
+    trust_label: Optional[str] = None,
+    include_fallback: bool = True,
+) -> list[dict]:
     """
-    Signal Explorer: Fetch actual signal/recommendation rows with flexible filters.
-    
-    Primary source: V_SIGNALS_ELIGIBLE_TODAY joined with trust info.
-    Fallback sources (when primary returns 0):
+    Primary filters plus the fallback tiers that apply, best first:
     1. Drop run_id filter, keep other filters
     2. Drop as_of_ts filter, use 7-day window
     3. Show all recent signals for symbol
     """
-    conn = get_connection()
-    try:
-        cur = conn.cursor()
-        
-        # Build primary query with all filters
-        primary_result = _query_signals(
-            cur, 
-            symbol=symbol,
-            market_type=market_type,
-            pattern_id=pattern_id,
-            horizon_bars=horizon_bars,
-            run_id=run_id,
-            as_of_ts=as_of_ts,
-            trust_label=trust_label,
-            limit=limit,
-        )
-        
-        if primary_result["count"] > 0 or not include_fallback:
-            return {
-                "signals": primary_result["rows"],
-                "count": primary_result["count"],
-                "query_type": "primary",
-                "filters_applied": primary_result["filters"],
-                "fallback_used": False,
-                "fallback_reason": None,
-            }
-        
-        # Fallback 1: Drop run_id filter
-        if run_id:
-            fallback1 = _query_signals(
-                cur,
-                symbol=symbol,
-                market_type=market_type,
-                pattern_id=pattern_id,
-                horizon_bars=horizon_bars,
-                run_id=None,  # Drop run_id
-                as_of_ts=as_of_ts,
-                trust_label=trust_label,
-                limit=limit,
-            )
-            if fallback1["count"] > 0:
-                return {
-                    "signals": fallback1["rows"],
-                    "count": fallback1["count"],
-                    "query_type": "fallback_no_run_id",
-                    "filters_applied": fallback1["filters"],
-                    "fallback_used": True,
-                    "fallback_reason": f"No signals matched run_id={run_id}. Showing signals without run filter.",
-                }
-        
-        # Fallback 2: Use 7-day window instead of exact as_of_ts
-        if as_of_ts:
-            fallback2 = _query_signals(
-                cur,
-                symbol=symbol,
-                market_type=market_type,
-                pattern_id=pattern_id,
-                horizon_bars=horizon_bars,
-                run_id=None,
-                as_of_ts=None,  # Drop as_of_ts
-                trust_label=trust_label,
-                limit=limit,
-                days_window=7,
-            )
-            if fallback2["count"] > 0:
-                return {
-                    "signals": fallback2["rows"],
-                    "count": fallback2["count"],
-                    "query_type": "fallback_7day_window",
-                    "filters_applied": fallback2["filters"],
-                    "fallback_used": True,
-                    "fallback_reason": f"No signals matched as_of_ts={as_of_ts}. Showing signals from last 7 days.",
-                }
-        
-        # Fallback 3: Show all recent signals for symbol (drop most filters)
-        if symbol:
-            fallback3 = _query_signals(
-                cur,
-                symbol=symbol,
-                market_type=market_type,
-                pattern_id=None,  # Drop pattern_id
-                horizon_bars=None,
-                run_id=None,
-                as_of_ts=None,
-                trust_label=None,
-                limit=limit,
-                days_window=30,
-            )
-            if fallback3["count"] > 0:
-                return {
-                    "signals": fallback3["rows"],
-                    "count": fallback3["count"],
-                    "query_type": "fallback_symbol_only",
-                    "filters_applied": fallback3["filters"],
-                    "fallback_used": True,
-                    "fallback_reason": f"No exact matches. Showing all recent signals for {symbol}.",
-                }
-        
-        # No results even with fallback
-        return {
-            "signals": [],
-            "count": 0,
-            "query_type": "no_results",
-            "filters_applied": {
-                "symbol": symbol,
-                "market_type": market_type,
-                "pattern_id": pattern_id,
-            },
-            "fallback_used": True,
-            "fallback_reason": "No signals found matching any criteria. Try clearing filters or check if the brief is stale.",
-        }
-        
-    finally:
-        conn.close()
+    tiers = [{
+        "query_type": "primary",
+        "filters": dict(symbol=symbol, market_type=market_type, pattern_id=pattern_id, run_id=run_id,
+                        as_of_ts=as_of_ts, trust_label=trust_label),
+        "fallback_reason": None,
+    }]
+    if not include_fallback:
+        return tiers
+    if run_id:
+        tiers.append({
+            "query_type": "fallback_no_run_id",
+            "filters": dict(symbol=symbol, market_type=market_type, pattern_id=pattern_id,
+                            as_of_ts=as_of_ts, trust_label=trust_label),
+            "fallback_reason": f"No signals matched run_id={run_id}. Showing signals without run filter.",
+        })
+    if as_of_ts:
+        tiers.append({
+            "query_type": "fallback_7day_window",
+            "filters": dict(symbol=symbol, market_type=market_type, pattern_id=pattern_id,
+                            trust_label=trust_label, days_window=7),
+            "fallback_reason": f"No signals matched as_of_ts={as_of_ts}. Showing signals from last 7 days.",
+        })
+    if symbol:
+        tiers.append({
+            "query_type": "fallback_symbol_only",
+            "filters": dict(symbol=symbol, market_type=market_type, days_window=30),
+            "fallback_reason": f"No exact matches. Showing all recent signals for {symbol}.",
+        })
+    return tiers
 
 
-def _query_signals(
-    cur,
+def _build_conditions(
     symbol: Optional[str] = None,
     market_type: Optional[str] = None,
     pattern_id: Optional[str] = None,
-    horizon_bars: Optional[int] = None,
     run_id: Optional[str] = None,
     as_of_ts: Optional[str] = None,
     trust_label: Optional[str] = None,
-    limit: int = 100,
     days_window: Optional[int] = None,
-) -> dict:
-    """Execute signal query with given filters."""
-    
-    # Build WHERE conditions
+) -> tuple[str, list, dict]:
+    """One tier's filters -> (SQL predicate, params, filters_applied)."""
     conditions = ["s.INTERVAL_MINUTES = 1440"]  # Daily signals only
     params = []
     filters_applied = {}
-    
+
     if symbol:
         conditions.append("s.SYMBOL = %s")
         params.append(symbol.upper())
         filters_applied["symbol"] = symbol.upper()
-    
+
     if market_type:
         conditions.append("s.MARKET_TYPE = %s")
         params.append(market_type.upper())
         filters_applied["market_type"] = market_type.upper()
-    
+
     if pattern_id:
         conditions.append("s.PATTERN_ID = %s")
         params.append(pattern_id)
         filters_applied["pattern_id"] = pattern_id
-    
+
     if run_id:
         conditions.append("s.RUN_ID = %s")
         params.append(run_id)
         filters_applied["run_id"] = run_id
-    
+
     if as_of_ts:
         # Parse and use exact date
         try:
@@ -202,47 +165,136 @@ def _query_signals(
             filters_applied["as_of_ts"] = as_of_ts
         except ValueError:
             pass
-    
+
     if days_window:
-        conditions.append(f"s.TS >= dateadd(day, -{days_window}, current_timestamp())")
+        conditions.append(f"s.TS >= dateadd(day, -{int(days_window)}, current_timestamp())")
         filters_applied["days_window"] = days_window
-    
+
     if trust_label:
         conditions.append("s.TRUST_LABEL = %s")
         params.append(trust_label.upper())
         filters_applied["trust_label"] = trust_label.upper()
-    
-    where_clause = " AND ".join(conditions)
-    
-    # Query with trust info
+
+    return "(" + " and ".join(conditions) + ")", params, filters_applied
+
+
+def build_signals_query(tiers: list[dict], columns: list[str], limit: int,
+                        after: Optional[dict] = None) -> tuple[str, list]:
+    """
+    One statement over all tiers: MATCH_TIER is the index of the first tier a row satisfies, and only rows
+    of the best matching tier are kept. after (a decoded cursor) continues that tier's keyset order.
+    Fetches limit + 1 rows so the caller can tell whether another page exists.
+    """
+    built = [_build_conditions(**t["filters"]) for t in tiers]
+    select_cols = list(dict.fromkeys(columns + ["SIGNAL_TS", "RECOMMENDATION_ID"]))
+    case_sql = "case " + " ".join(f"when {cond} then {i}" for i, (cond, _, _) in enumerate(built)) + " end"
+    params = [p for _, tier_params, _ in built for p in tier_params] * 2
     sql = f"""
-    select
-        s.RECOMMENDATION_ID,
-        s.RUN_ID,
-        s.TS as signal_ts,
-        s.SYMBOL,
-        s.MARKET_TYPE,
-        s.INTERVAL_MINUTES,
-        s.PATTERN_ID,
-        s.SCORE,
-        s.DETAILS,
-        s.TRUST_LABEL,
-        s.RECOMMENDED_ACTION,
-        s.IS_ELIGIBLE,
-        s.GATING_REASON
-    from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY s
-    where {where_clause}
-    order by s.TS desc, s.SCORE desc
-    limit {limit}
+    with matched as (
+        select
+            {", ".join(f"{SIGNAL_COLUMNS[c]} as {c}" for c in select_cols)},
+            {SORT_SCORE_SQL} as SORT_SCORE,
+            {case_sql} as MATCH_TIER
+        from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY s
+        where {" or ".join(cond for cond, _, _ in built)}
+    )
+    select *
+    from matched
+    where MATCH_TIER = (select min(MATCH_TIER) from matched)"""
+    if after is not None:
+        sql += KEYSET_SQL
+        params += [after["ts"], after["ts"], after["score"], after["score"], after["id"]]
+    sql += f"""
+    order by SIGNAL_TS desc, SORT_SCORE desc, RECOMMENDATION_ID desc
+    limit {int(limit) + 1}
+    """
+    return sql, params
+
+
+@router.get("")
+def get_signals(
+    symbol: Optional[str] = Query(None, description="Filter by symbol (e.g., AAPL)"),
+    market_type: Optional[str] = Query(None, description="Filter by market type (STOCK, FX)"),
+    pattern_id: Optional[str] = Query(None, description="Filter by pattern ID"),
+    horizon_bars: Optional[int] = Query(None, description="Filter by horizon bars"),
+    run_id: Optional[str] = Query(None, description="Filter by pipeline run ID"),
+    as_of_ts: Optional[str] = Query(None, description="Filter by as-of timestamp (ISO format)"),
+    trust_label: Optional[str] = Query(None, description="Filter by trust label (TRUSTED, WATCH, UNTRUSTED)"),
+    limit: int = Query(100, ge=1, le=500, description="Max rows to return"),
+    include_fallback: bool = Query(True, description="Include fallback results if primary query returns 0"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (default: all)"),
+):
     """
-    
-    cur.execute(sql, tuple(params))
-    rows = fetch_all(cur)
-    
+    Signal Explorer: Fetch actual signal/recommendation rows with flexible filters.
+
+    Primary source: V_SIGNALS_ELIGIBLE_TODAY; trust columns come from the per-run TRUSTED_SIGNAL_CLASSIFICATION snapshot.
+    Fallback tiers (used when the primary filters match nothing) are evaluated in the same query;
+    see signal_tiers. Follow-up pages pass cursor=next_cursor and stay on the tier of the first page.
+    """
+    columns = parse_fields(fields)
+    tiers = signal_tiers(symbol, market_type, pattern_id, run_id, as_of_ts, trust_label, include_fallback)
+    after = decode_cursor(cursor) if cursor else None
+    tier_offset = 0
+    if after is not None:
+        if after["tier"] >= len(tiers):
+            raise HTTPException(status_code=400, detail="Cursor does not match these filters")
+        tier_offset = after["tier"]
+        tiers = tiers[tier_offset:tier_offset + 1]
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        sql, params = build_signals_query(tiers, columns, limit, after)
+        cur.execute(sql, tuple(params))
+        rows = fetch_all(cur)
+    finally:
+        conn.close()
+
+    if not rows:
+        if after is not None:
+            tier = tiers[0]
+            return {
+                "signals": [],
+                "count": 0,
+                "query_type": tier["query_type"],
+                "filters_applied": _build_conditions(**tier["filters"])[2],
+                "fallback_used": tier_offset > 0,
+                "fallback_reason": tier["fallback_reason"],
+                "next_cursor": None,
+            }
+        return {
+            "signals": [],
+            "count": 0,
+            "query_type": "no_results" if include_fallback else "primary",
+            "filters_applied": {
+                "symbol": symbol,
+                "market_type": market_type,
+                "pattern_id": pattern_id,
+            } if include_fallback else _build_conditions(**tiers[0]["filters"])[2],
+            "fallback_used": include_fallback,
+            "fallback_reason": (
+                "No signals found matching any criteria. Try clearing filters or check if the brief is stale."
+                if include_fallback else None
+            ),
+            "next_cursor": None,
+        }
+
+    tier_index = int(rows[0]["MATCH_TIER"])
+    tier = tiers[tier_index]
+    absolute_tier = tier_offset + tier_index
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(absolute_tier, rows[-1]) if has_more else None
+    signals = _serialize_rows([{c: r[c] for c in columns} for r in rows])
     return {
-        "rows": _serialize_rows(rows),
-        "count": len(rows),
-        "filters": filters_applied,
+        "signals": signals,
+        "count": len(signals),
+        "query_type": tier["query_type"],
+        "filters_applied": _build_conditions(**tier["filters"])[2],
+        "fallback_used": absolute_tier > 0,
+        "fallback_reason": tier["fallback_reason"],
+        "next_cursor": next_cursor,
     }
 
 
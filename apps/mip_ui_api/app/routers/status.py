@@ -1,14 +1,16 @@
 """
 System status / health endpoint. Read-only.
 Returns API health, Snowflake reachability, env info, and latest pipeline run info.
+Reachability and latest run come from a background prober (app/health.py), refreshed every MIP_STATUS_PROBE_SECONDS.
 Never exposes secrets (passwords, keys, passphrases).
 """
 from datetime import datetime, timezone
 
 from fastapi import APIRouter
 
-from app.config import get_snowflake_config
+from app.config import get_snowflake_config, get_status_probe_seconds
 from app.db import get_connection, SnowflakeAuthError, serialize_row
+from app.health import CachedProbe
 
 router = APIRouter(tags=["status"])
 
@@ -44,48 +46,56 @@ def _get_latest_pipeline_run(conn):
     }
 
 
+def probe_status(conn) -> dict:
+    """One health probe on the prober's reused connection: SELECT 1, latest pipeline run. Not run per request."""
+    cur = conn.cursor()
+    cur.execute("SELECT 1")
+    cur.fetchone()
+    return {"snowflake_ok": True, "snowflake_message": None, **_get_latest_pipeline_run(conn)}
+
+
+def probe_error(exc: Exception) -> dict:
+    """Unhealthy result for a failed probe; only auth errors carry their (secret-free) message."""
+    return {
+        "snowflake_ok": False,
+        "snowflake_message": str(exc) if isinstance(exc, SnowflakeAuthError) else "Connection failed",
+        "latest_success_run_id": None,
+        "latest_success_ts": None,
+    }
+
+
+prober = CachedProbe(probe_status, get_status_probe_seconds(), connect=get_connection, on_error=probe_error)
+
+
 @router.get("/status")
 def get_status():
     """
-    Health/status: api_ok, snowflake_ok, auth_method, warehouse/database/schema, 
+    Health/status: api_ok, snowflake_ok, auth_method, warehouse/database/schema,
     latest_success_run_id, latest_success_ts, timestamp.
     Used by the UI to show a header banner (green/yellow/red) and freshness badges.
+    Served from the background prober's cache (no Snowflake call per request); checked_at / cache_age_seconds /
+    stale describe how old the cached health is.
     """
     cfg = get_snowflake_config()
-    auth_method = cfg.get("auth_method") or "password"
-    warehouse = cfg.get("warehouse")
-    database = cfg.get("database")
-    schema = cfg.get("schema")
-
-    snowflake_ok = False
-    snowflake_message = None
-    latest_run_info = {"latest_success_run_id": None, "latest_success_ts": None}
-    
-    try:
-        conn = get_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute("SELECT 1")
-            cur.fetchone()
-            snowflake_ok = True
-            # Fetch latest pipeline run info
-            latest_run_info = _get_latest_pipeline_run(conn)
-        finally:
-            conn.close()
-    except SnowflakeAuthError as e:
-        snowflake_message = str(e)
-    except Exception:
-        snowflake_message = "Connection failed"
+    result, cache = prober.get()
+    if result is None:
+        result = {
+            "snowflake_ok": False,
+            "snowflake_message": "Health check pending",
+            "latest_success_run_id": None,
+            "latest_success_ts": None,
+        }
 
     return {
         "api_ok": True,
-        "snowflake_ok": snowflake_ok,
-        "auth_method": auth_method,
-        "warehouse": warehouse if warehouse else None,
-        "database": database if database else None,
-        "schema": schema if schema else None,
-        "snowflake_message": snowflake_message,
-        "latest_success_run_id": latest_run_info.get("latest_success_run_id"),
-        "latest_success_ts": latest_run_info.get("latest_success_ts"),
+        "snowflake_ok": result.get("snowflake_ok", False),
+        "auth_method": cfg.get("auth_method") or "password",
+        "warehouse": cfg.get("warehouse") or None,
+        "database": cfg.get("database") or None,
+        "schema": cfg.get("schema") or None,
+        "snowflake_message": result.get("snowflake_message"),
+        "latest_success_run_id": result.get("latest_success_run_id"),
+        "latest_success_ts": result.get("latest_success_ts"),
         "timestamp": datetime.now(timezone.utc).isoformat(),
+        **cache,
     }
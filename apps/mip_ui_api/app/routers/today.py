@@ -1,42 +1,77 @@
 """
 Today composition endpoint: GET /today?portfolio_id=...
 Single JSON with status, portfolio (risk state/gate, KPIs, run events), brief, insights (ranked candidates).
-Read-only; never writes to Snowflake.
+Insights are precomputed per pipeline run into MIP.APP.TODAY_INSIGHTS (SP_PIPELINE_REFRESH_TODAY_INSIGHTS);
+status comes from the /status prober cache. Read-only; never writes to Snowflake.
 """
+import json
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Query
 
-from app.config import get_snowflake_config
-from app.db import get_connection, fetch_all, SnowflakeAuthError
-from app.training_status import apply_scoring_to_rows, _get_int, DEFAULT_MIN_SIGNALS
+from app.db import get_connection, fetch_all
+from app.routers.status import prober
 
 router = APIRouter(tags=["today"])
 
+INSIGHTS_LIMIT = 10
+
+INSIGHTS_SQL = """
+select
+    RUN_ID, AS_OF_TS, INSIGHT_RANK, SYMBOL, MARKET_TYPE, PATTERN_ID,
+    MATURITY_SCORE, MATURITY_STAGE, REASONS, MEAN_H5, PCT_POSITIVE_H5, TODAY_SCORE, PERFORMANCE_SUMMARY
+from MIP.APP.TODAY_INSIGHTS
+order by INSIGHT_RANK
+limit %s
+"""
+
 
 def _get_status():
-    """Reuse /status logic: api_ok, snowflake_ok, message."""
-    cfg = get_snowflake_config()
-    snowflake_ok = False
-    snowflake_message = None
-    try:
-        conn = get_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute("SELECT 1")
-            cur.fetchone()
-            snowflake_ok = True
-        finally:
-            conn.close()
-    except SnowflakeAuthError as e:
-        snowflake_message = str(e)
-    except Exception:
-        snowflake_message = "Connection failed"
+    """Cached /status result: api_ok, snowflake_ok, message."""
+    result, cache = prober.get()
+    snowflake_ok = bool(result and result.get("snowflake_ok"))
+    if result is None:
+        message = "Health check pending"
+    else:
+        message = "OK" if snowflake_ok else result.get("snowflake_message")
     return {
         "api_ok": True,
         "snowflake_ok": snowflake_ok,
-        "message": snowflake_message if not snowflake_ok else "OK",
+        "message": message,
         "timestamp": datetime.now(timezone.utc).isoformat(),
+        "checked_at": cache["checked_at"],
+    }
+
+
+def _json_value(value):
+    """VARIANT columns arrive as JSON text from Snowflake and DuckDB."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def insight_from_row(row: dict) -> dict:
+    """TODAY_INSIGHTS row -> /today insight item."""
+    maturity_score = float(row.get("MATURITY_SCORE") or 0)
+    mean_h5 = float(row.get("MEAN_H5") or 0)
+    pct_pos_h5 = float(row.get("PCT_POSITIVE_H5") or 0)
+    performance = _json_value(row.get("PERFORMANCE_SUMMARY")) or {}
+    return {
+        "symbol": row.get("SYMBOL"),
+        "market_type": row.get("MARKET_TYPE"),
+        "pattern_id": row.get("PATTERN_ID"),
+        "maturity_stage": row.get("MATURITY_STAGE"),
+        "maturity_score": round(maturity_score, 1),
+        "reasons": _json_value(row.get("REASONS")) or [],
+        "performance_summary": {int(h): perf for h, perf in performance.items()},
+        "why_this_is_here": (
+            f"Ranked by data maturity (score {maturity_score:.0f}) and outcome history. "
+            f"At 5-bar horizon: mean return {mean_h5 * 100:.2f}%, positive {pct_pos_h5 * 100:.0f}% of the time."
+        ),
+        "today_score": round(float(row.get("TODAY_SCORE") or 0), 3),
     }
 
 
@@ -66,12 +101,13 @@ def _serialize_rows(rows):
 def get_today(portfolio_id: int | None = Query(None, description="Portfolio ID for portfolio/brief sections")):
     """
     Composed view: status, portfolio (risk state/gate, KPIs, run events), latest brief, today's insights (ranked candidates).
-    Read-only.
+    insights_run identifies the pipeline run that built the insights snapshot. Read-only.
     """
     status = _get_status()
     portfolio = None
     brief = None
     insights = []
+    insights_run = None
 
     if not status["snowflake_ok"]:
         return {
@@ -79,16 +115,28 @@ def get_today(portfolio_id: int | None = Query(None, description="Portfolio ID f
             "portfolio": portfolio,
             "brief": brief,
             "insights": insights,
+            "insights_run": insights_run,
         }
 
     try:
         conn = get_connection()
     except Exception:
-        return {"status": status, "portfolio": portfolio, "brief": brief, "insights": insights}
+        return {"status": status, "portfolio": portfolio, "brief": brief, "insights": insights,
+                "insights_run": insights_run}
 
     try:
         cur = conn.cursor()
 
+        # --- Insights: latest pipeline run's ranked snapshot ---
+        cur.execute(INSIGHTS_SQL, (INSIGHTS_LIMIT,))
+        insight_rows = fetch_all(cur)
+        insights = [insight_from_row(r) for r in insight_rows]
+        if insight_rows:
+            insights_run = _serialize_row({
+                "run_id": insight_rows[0].get("RUN_ID"),
+                "as_of_ts": insight_rows[0].get("AS_OF_TS"),
+            })
+
         # --- Portfolio: risk state, risk gate, KPIs, run events ---
         if portfolio_id is not None:
             cur.execute(
@@ -158,149 +206,6 @@ def get_today(portfolio_id: int | None = Query(None, description="Portfolio ID f
             else:
                 brief = None
 
-        # --- Insights: distinct candidates from V_SIGNALS_ELIGIBLE_TODAY (1440), enrich with training + performance ---
-        cur.execute(
-            """
-            select distinct SYMBOL, MARKET_TYPE, PATTERN_ID
-            from MIP.APP.V_SIGNALS_ELIGIBLE_TODAY
-            where INTERVAL_MINUTES = 1440
-            """
-        )
-        candidate_rows = fetch_all(cur)
-        if not candidate_rows:
-            insights = []
-        else:
-            # Training status (all rows for 1440)
-            cur.execute(
-                """
-                with recs as (
-                  select r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID, r.INTERVAL_MINUTES,
-                    count(*) as recs_total, max(r.TS) as as_of_ts
-                  from MIP.APP.RECOMMENDATION_LOG r
-                  where r.INTERVAL_MINUTES = 1440
-                  group by r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID, r.INTERVAL_MINUTES
-                ),
-                outcomes_agg as (
-                  select r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID, r.INTERVAL_MINUTES,
-                    count(*) as outcomes_total, count(distinct o.HORIZON_BARS) as horizons_covered,
-                    avg(case when o.HORIZON_BARS = 1 and o.EVAL_STATUS = 'SUCCESS' then o.REALIZED_RETURN end) as avg_outcome_h1,
-                    avg(case when o.HORIZON_BARS = 3 and o.EVAL_STATUS = 'SUCCESS' then o.REALIZED_RETURN end) as avg_outcome_h3,
-                    avg(case when o.HORIZON_BARS = 5 and o.EVAL_STATUS = 'SUCCESS' then o.REALIZED_RETURN end) as avg_outcome_h5,
-                    avg(case when o.HORIZON_BARS = 10 and o.EVAL_STATUS = 'SUCCESS' then o.REALIZED_RETURN end) as avg_outcome_h10,
-                    avg(case when o.HORIZON_BARS = 20 and o.EVAL_STATUS = 'SUCCESS' then o.REALIZED_RETURN end) as avg_outcome_h20
-                  from MIP.APP.RECOMMENDATION_LOG r
-                  join MIP.APP.RECOMMENDATION_OUTCOMES o on o.RECOMMENDATION_ID = r.RECOMMENDATION_ID
-                  where r.INTERVAL_MINUTES = 1440
-                  group by r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID, r.INTERVAL_MINUTES
-                )
-                select recs.MARKET_TYPE as market_type, recs.SYMBOL as symbol, recs.PATTERN_ID as pattern_id,
-                  recs.recs_total as recs_total, coalesce(o.outcomes_total, 0) as outcomes_total,
-                  coalesce(o.horizons_covered, 0) as horizons_covered,
-                  o.avg_outcome_h1 as avg_outcome_h1, o.avg_outcome_h3 as avg_outcome_h3,
-                  o.avg_outcome_h5 as avg_outcome_h5, o.avg_outcome_h10 as avg_outcome_h10, o.avg_outcome_h20 as avg_outcome_h20
-                from recs
-                left join outcomes_agg o on o.MARKET_TYPE = recs.MARKET_TYPE and o.SYMBOL = recs.SYMBOL and o.PATTERN_ID = recs.PATTERN_ID
-                """
-            )
-            training_rows = fetch_all(cur)
-            scored_training = apply_scoring_to_rows(training_rows, min_signals=DEFAULT_MIN_SIGNALS)
-            training_by_key = {}
-            for r in scored_training:
-                key = (
-                    r.get("MARKET_TYPE") or r.get("market_type"),
-                    r.get("SYMBOL") or r.get("symbol"),
-                    r.get("PATTERN_ID") or r.get("pattern_id"),
-                )
-                training_by_key[key] = r
-
-            # Performance by horizon (all pairs)
-            cur.execute(
-                """
-                select r.MARKET_TYPE as market_type, r.SYMBOL as symbol, r.PATTERN_ID as pattern_id,
-                  o.HORIZON_BARS as horizon_bars, count(*) as n_outcomes,
-                  avg(o.REALIZED_RETURN) as mean_outcome,
-                  sum(case when o.REALIZED_RETURN > 0 then 1 else 0 end)::float / nullif(count(*), 0) as pct_positive
-                from MIP.APP.RECOMMENDATION_LOG r
-                join MIP.APP.RECOMMENDATION_OUTCOMES o on o.RECOMMENDATION_ID = r.RECOMMENDATION_ID
-                where r.INTERVAL_MINUTES = 1440 and o.EVAL_STATUS = 'SUCCESS' and o.REALIZED_RETURN is not null
-                group by r.MARKET_TYPE, r.SYMBOL, r.PATTERN_ID, o.HORIZON_BARS
-                """
-            )
-            perf_rows = fetch_all(cur)
-            perf_by_key = {}
-            for r in perf_rows:
-                key = (r.get("market_type") or r.get("MARKET_TYPE"), r.get("symbol") or r.get("SYMBOL"), r.get("pattern_id") or r.get("PATTERN_ID"))
-                if key not in perf_by_key:
-                    perf_by_key[key] = []
-                perf_by_key[key].append({
-                    "horizon_bars": r.get("horizon_bars") or r.get("HORIZON_BARS"),
-                    "n_outcomes": r.get("n_outcomes") or r.get("N_OUTCOMES"),
-                    "mean_outcome": float(r.get("mean_outcome") or r.get("MEAN_OUTCOME")) if r.get("mean_outcome") is not None or r.get("MEAN_OUTCOME") is not None else None,
-                    "pct_positive": float(r.get("pct_positive") or r.get("PCT_POSITIVE")) if r.get("pct_positive") is not None or r.get("PCT_POSITIVE") is not None else None,
-                })
-
-            # Build insights: filter maturity_stage != INSUFFICIENT, score = w1*maturity + w2*mean_h5 + w3*pct_pos_h5, top 10
-            w1, w2, w3 = 0.5, 0.3, 0.2
-            min_recs = max(1, DEFAULT_MIN_SIGNALS // 2)
-
-            list_insights = []
-            for r in candidate_rows:
-                sym = r.get("SYMBOL") or r.get("symbol")
-                mt = r.get("MARKET_TYPE") or r.get("market_type")
-                pid = r.get("PATTERN_ID") or r.get("pattern_id")
-                key = (mt, sym, pid)
-                tr = training_by_key.get(key)
-                if tr is None:
-                    continue
-                maturity_stage = tr.get("maturity_stage") or tr.get("MATURITY_STAGE")
-                if maturity_stage == "INSUFFICIENT":
-                    continue
-                recs_total = _get_int(tr, "recs_total")
-                if recs_total < min_recs:
-                    continue
-                maturity_score = float(tr.get("maturity_score") or tr.get("MATURITY_SCORE") or 0)
-                reasons = tr.get("reasons") or []
-                avg_h5 = tr.get("avg_outcome_h5") or tr.get("AVG_OUTCOME_H5")
-                if avg_h5 is not None:
-                    try:
-                        avg_h5 = float(avg_h5)
-                    except (TypeError, ValueError):
-                        avg_h5 = 0.0
-                else:
-                    avg_h5 = 0.0
-                perf_list = perf_by_key.get(key, [])
-                mean_h5 = None
-                pct_pos_h5 = None
-                for p in perf_list:
-                    if (p.get("horizon_bars") or 0) == 5:
-                        mean_h5 = p.get("mean_outcome")
-                        pct_pos_h5 = p.get("pct_positive")
-                        break
-                if mean_h5 is None and perf_list:
-                    mean_h5 = perf_list[0].get("mean_outcome")
-                    pct_pos_h5 = perf_list[0].get("pct_positive")
-                mean_h5 = float(mean_h5) if mean_h5 is not None else 0.0
-                pct_pos_h5 = float(pct_pos_h5) if pct_pos_h5 is not None else 0.0
-                today_score = (w1 * maturity_score / 100.0) + (w2 * max(0, mean_h5) * 10) + (w3 * pct_pos_h5)
-                performance_summary = {h.get("horizon_bars"): {"mean_outcome": h.get("mean_outcome"), "pct_positive": h.get("pct_positive"), "n_outcomes": h.get("n_outcomes")} for h in perf_list}
-                why = (
-                    f"Ranked by data maturity (score {maturity_score:.0f}) and outcome history. "
-                    f"At 5-bar horizon: mean return {mean_h5 * 100:.2f}%, positive {pct_pos_h5 * 100:.0f}% of the time."
-                )
-                list_insights.append({
-                    "symbol": sym,
-                    "market_type": mt,
-                    "pattern_id": pid,
-                    "maturity_stage": maturity_stage,
-                    "maturity_score": round(maturity_score, 1),
-                    "reasons": reasons,
-                    "performance_summary": performance_summary,
-                    "why_this_is_here": why,
-                    "today_score": round(today_score, 3),
-                })
-            list_insights.sort(key=lambda x: (-x["today_score"], -x["maturity_score"]))
-            insights = list_insights[:10]
-
     except Exception:
         pass
     finally:
@@ -311,4 +216,5 @@ def get_today(portfolio_id: int | None = Query(None, description="Portfolio ID f
         "portfolio": portfolio,
         "brief": brief,
         "insights": insights,
+        "insights_run": insights_run,
     }
@@ -0,0 +1,107 @@
+"""
+Run profile: per-step duration, rows/sec and share of run time for one pipeline run, plus per-step
+trend series over the preceding runs. Input rows have the MIP.MART.V_PIPELINE_STEP_PROFILE shape; the
+shaping here is pure Python so it can be unit tested without Snowflake.
+"""
+from __future__ import annotations
+
+from statistics import median
+from typing import Any
+
+# A step is flagged as regressed when it is this much slower than its average over the previous runs
+# and the slowdown is at least MIN_REGRESSION_SECONDS (keeps sub-second noise out).
+REGRESSION_RATIO = 1.5
+MIN_REGRESSION_SECONDS = 1.0
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _num(value: Any) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_regressed(duration: float | None, prev_avg: float | None) -> bool:
+    if duration is None or not prev_avg:
+        return False
+    return duration >= prev_avg * REGRESSION_RATIO and duration - prev_avg >= MIN_REGRESSION_SECONDS
+
+
+def build_step(row: dict) -> dict:
+    duration = _num(row.get("DURATION_SECONDS"))
+    prev_avg = _num(row.get("PREV_AVG_DURATION_SECONDS"))
+    return {
+        "event_name": row.get("EVENT_NAME"),
+        "step_name": row.get("STEP_NAME"),
+        "status": row.get("STEP_STATUS"),
+        "started_at": _iso(row.get("STARTED_AT")),
+        "completed_at": _iso(row.get("COMPLETED_AT")),
+        "duration_seconds": duration,
+        "rows_affected": row.get("ROWS_AFFECTED"),
+        "rows_per_sec": _num(row.get("ROWS_PER_SEC")),
+        "share_of_run": _num(row.get("SHARE_OF_RUN")),
+        "prev_avg_duration_seconds": prev_avg,
+        "duration_vs_prev_avg": _num(row.get("DURATION_VS_PREV_AVG")),
+        "regressed": _is_regressed(duration, prev_avg),
+    }
+
+
+def build_trends(history_rows: list[dict]) -> list[dict]:
+    """One series per step (in first-seen order): points oldest -> newest, median and latest/median ratio."""
+    series: dict[str, dict] = {}
+    for row in history_rows:
+        step_name = row.get("STEP_NAME")
+        if not step_name:
+            continue
+        entry = series.setdefault(step_name, {"step_name": step_name, "event_name": row.get("EVENT_NAME"), "points": []})
+        entry["points"].append({
+            "run_id": row.get("PIPELINE_RUN_ID"),
+            "run_started_at": _iso(row.get("RUN_STARTED_AT")),
+            "status": row.get("STEP_STATUS"),
+            "duration_seconds": _num(row.get("DURATION_SECONDS")),
+            "rows_per_sec": _num(row.get("ROWS_PER_SEC")),
+            "share_of_run": _num(row.get("SHARE_OF_RUN")),
+        })
+    out = []
+    for entry in series.values():
+        durations = [p["duration_seconds"] for p in entry["points"] if p["duration_seconds"] is not None]
+        med = median(durations) if durations else None
+        latest = durations[-1] if durations else None
+        entry["median_duration_seconds"] = med
+        entry["latest_vs_median"] = (latest / med) if latest is not None and med else None
+        out.append(entry)
+    return out
+
+
+def build_profile(run_id: str, run_rows: list[dict], history_rows: list[dict] | None = None) -> dict:
+    """
+    run_rows: view rows for run_id (one per step; a run without step events has one row with null STEP_NAME).
+    history_rows: view rows for the last N runs up to and including run_id, ordered by RUN_STARTED_AT.
+    """
+    head = run_rows[0] if run_rows else {}
+    steps = [build_step(r) for r in run_rows if r.get("STEP_NAME")]
+    run_duration = _num(head.get("RUN_DURATION_SECONDS"))
+    steps_total = sum(s["duration_seconds"] or 0.0 for s in steps)
+    timed = [s for s in steps if s["duration_seconds"] is not None]
+    slowest = max(timed, key=lambda s: s["duration_seconds"]) if timed else None
+    return {
+        "run_id": run_id,
+        "status": head.get("RUN_STATUS"),
+        "is_replay": bool(head.get("IS_REPLAY")),
+        "started_at": _iso(head.get("RUN_STARTED_AT")),
+        "completed_at": _iso(head.get("RUN_COMPLETED_AT")),
+        "duration_seconds": run_duration,
+        "steps_total_seconds": steps_total,
+        # Time inside the run not covered by AGG steps (orchestration, skipped/unlogged work).
+        "unaccounted_seconds": (run_duration - steps_total) if run_duration is not None else None,
+        "slowest_step": slowest["step_name"] if slowest else None,
+        "regressed_steps": [s["step_name"] for s in steps if s["regressed"]],
+        "steps": steps,
+        "trends": build_trends(history_rows or []),
+    }
@@ -0,0 +1,56 @@
+"""
+Unit tests for chart series downsampling (app/downsample.py). No Snowflake needed.
+"""
+import math
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.downsample import bucket_reduce, minmax_downsample, sum_bucket, worst_bucket
+
+
+def _series(n):
+    return [{"ts": f"d{i:05d}", "equity": 100 + 10 * math.sin(i / 50)} for i in range(n)]
+
+
+class TestMinMaxDownsample(unittest.TestCase):
+    def test_short_series_untouched(self):
+        series = _series(50)
+        self.assertEqual(minmax_downsample(series, 100, "equity"), series)
+
+    def test_budget_and_extremes(self):
+        series = _series(5000)
+        series[1234]["equity"] = 500.0  # spike
+        series[4321]["equity"] = -50.0  # crash
+        out = minmax_downsample(series, 200, "equity")
+        self.assertLessEqual(len(out), 200)
+        self.assertEqual((out[0], out[-1]), (series[0], series[-1]))
+        self.assertIn(series[1234], out)
+        self.assertIn(series[4321], out)
+        self.assertEqual([p["ts"] for p in out], sorted(p["ts"] for p in out))
+
+    def test_missing_values(self):
+        series = [{"ts": i, "drawdown_pct": None} for i in range(100)]
+        self.assertLessEqual(len(minmax_downsample(series, 20, "drawdown_pct")), 20)
+
+
+class TestBucketReduce(unittest.TestCase):
+    def test_trades_sum_is_preserved(self):
+        series = [{"ts": i, "trades_count": i % 3} for i in range(1000)]
+        out = bucket_reduce(series, 100, sum_bucket("trades_count"))
+        self.assertEqual(len(out), 100)
+        self.assertEqual(sum(p["trades_count"] for p in out), sum(p["trades_count"] for p in series))
+        self.assertEqual(out[1]["ts"], 10)
+
+    def test_regime_keeps_worst_state(self):
+        series = [{"ts": i, "gate_state": "SAFE"} for i in range(1000)]
+        series[505]["gate_state"] = "STOPPED"
+        out = bucket_reduce(series, 100, worst_bucket("gate_state", ("SAFE", "CAUTION", "STOPPED")))
+        self.assertEqual([p["gate_state"] for p in out].count("STOPPED"), 1)
+        self.assertEqual(out[50]["gate_state"], "STOPPED")
+
+
+if __name__ == "__main__":
+    unittest.main()
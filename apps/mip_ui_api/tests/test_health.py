@@ -0,0 +1,120 @@
+"""
+Unit tests for the cached /status prober (app/health.py). No Snowflake needed.
+"""
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.health import CachedProbe
+
+
+class TestCachedProbe(unittest.TestCase):
+    def test_requests_share_one_probe(self):
+        calls = []
+
+        def probe():
+            calls.append(1)
+            return {"snowflake_ok": True}
+
+        cached = CachedProbe(probe, interval_seconds=60)
+        for _ in range(20):
+            result, cache = cached.get()
+            self.assertEqual(result, {"snowflake_ok": True})
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(cache["stale"])
+        self.assertIsNotNone(cache["checked_at"])
+        self.assertGreaterEqual(cache["cache_age_seconds"], 0)
+
+    def test_slow_first_probe_does_not_block_callers(self):
+        release = threading.Event()
+
+        def probe():
+            release.wait(5)
+            return {"snowflake_ok": True}
+
+        cached = CachedProbe(probe, interval_seconds=60, first_wait_seconds=0.05)
+        result, cache = cached.get()
+        self.assertIsNone(result)
+        self.assertTrue(cache["stale"])
+        self.assertIsNone(cache["cache_age_seconds"])
+        release.set()
+
+    def test_probe_exception_is_cached_as_unhealthy(self):
+        def probe():
+            raise TimeoutError("warehouse resume")
+
+        cached = CachedProbe(probe, interval_seconds=60)
+        result = cached.refresh()
+        self.assertFalse(result["snowflake_ok"])
+        self.assertIn("TimeoutError", result["snowflake_message"])
+
+    def test_prober_stops_when_idle_and_restarts_on_demand(self):
+        calls = []
+        slow, release = threading.Event(), threading.Event()
+
+        def probe():
+            calls.append(1)
+            if slow.is_set():
+                release.wait(5)  # a slow warehouse after the restart
+            return {"snowflake_ok": True, "call": len(calls)}
+
+        cached = CachedProbe(probe, interval_seconds=0.02, idle_intervals=2, first_wait_seconds=5)
+        cached.get()
+        deadline = time.monotonic() + 5
+        while cached.is_running() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(cached.is_running())
+        idle_calls = len(calls)
+        time.sleep(0.1)
+        self.assertEqual(len(calls), idle_calls)
+        slow.set()
+        # The restart does not block readers: they get the cached result, flagged stale.
+        started = time.monotonic()
+        result, meta = cached.get()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(result["call"], idle_calls)
+        self.assertTrue(meta["stale"])
+        self.assertTrue(cached.is_running())
+        release.set()
+        deadline = time.monotonic() + 5
+        while len(calls) == idle_calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertGreater(len(calls), idle_calls)
+
+    def test_connection_is_reused_and_reopened_after_failure(self):
+        opened, closed = [], []
+
+        class Conn:
+            def close(self):
+                closed.append(self)
+
+        def connect():
+            opened.append(Conn())
+            return opened[-1]
+
+        fail = [False]
+
+        def probe(conn):
+            if fail[0]:
+                raise ConnectionError("gone")
+            return {"snowflake_ok": True, "conn": id(conn)}
+
+        cached = CachedProbe(probe, interval_seconds=60, connect=connect,
+                             on_error=lambda exc: {"snowflake_ok": False, "snowflake_message": "Connection failed"})
+        first, second = cached.refresh(), cached.refresh()
+        self.assertEqual(len(opened), 1)
+        self.assertEqual(first["conn"], second["conn"])
+        fail[0] = True
+        self.assertEqual(cached.refresh()["snowflake_message"], "Connection failed")
+        self.assertEqual(closed, opened)
+        fail[0] = False
+        cached.refresh()
+        self.assertEqual(len(opened), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Unit tests for the /live/metrics outcomes block derived from RECOMMENDATION_OUTCOME_STATS. No Snowflake needed.
+"""
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.routers.live import _outcomes_from_stats
+
+RUN_DONE = datetime(2025, 3, 4, 7, 30)
+
+
+class TestOutcomesFromStats(unittest.TestCase):
+    def test_no_stats_row(self):
+        self.assertEqual(
+            _outcomes_from_stats(None, RUN_DONE),
+            {"total": 0, "last_calculated_at": None, "since_last_run": 0},
+        )
+
+    def test_evaluated_inside_last_run(self):
+        row = (1200, datetime(2025, 3, 4, 7, 20), 300, datetime(2025, 3, 3, 7, 20))
+        out = _outcomes_from_stats(row, RUN_DONE)
+        self.assertEqual(out["total"], 1200)
+        self.assertEqual(out["last_calculated_at"], "2025-03-04T07:20:00")
+        self.assertEqual(out["since_last_run"], 0)
+
+    def test_one_evaluation_after_last_run(self):
+        row = (1250, datetime(2025, 3, 4, 9, 0), 80, datetime(2025, 3, 4, 7, 20))
+        self.assertEqual(_outcomes_from_stats(row, RUN_DONE)["since_last_run"], 80)
+
+    def test_two_evaluations_after_last_run_need_exact_count(self):
+        row = (1250, datetime(2025, 3, 4, 9, 0), 80, datetime(2025, 3, 4, 8, 0))
+        self.assertIsNone(_outcomes_from_stats(row, RUN_DONE)["since_last_run"])
+
+    def test_no_run_yet(self):
+        row = (10, datetime(2025, 3, 4, 9, 0), 10, None)
+        self.assertEqual(_outcomes_from_stats(row, None)["since_last_run"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
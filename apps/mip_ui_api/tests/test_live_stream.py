@@ -0,0 +1,171 @@
+"""
+Unit tests for the /live/stream watcher (probe diffing, step progress, reconnect). No Snowflake needed:
+the watcher runs tick() against a scripted fake connection.
+"""
+import threading
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.live_stream import LiveWatcher, diff_state, format_sse, probe_state
+
+T0 = datetime(2025, 3, 4, 7, 0)
+PROBE_COLS = ("RUN_ID", "STATUS", "STARTED_AT", "COMPLETED_AT", "LAST_BRIEF_ID", "OUTCOMES_AT")
+STEP_COLS = ("RUN_ID", "EVENT_TS", "EVENT_NAME", "STATUS", "ROWS_AFFECTED", "ERROR_MESSAGE", "DETAILS")
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.description = None
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.db.executed.append(sql)
+        if "RECOMMENDATION_OUTCOME_STATS" in sql:
+            cols, rows = PROBE_COLS, [self.db.probe]
+        else:
+            cols, rows = STEP_COLS, list(self.db.steps)
+        self.description = [(c,) for c in cols]
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeConn:
+    def __init__(self):
+        self.probe = (None, None, None, None, None, None)
+        self.steps = []
+        self.executed = []
+        self.fail = False
+
+    def cursor(self):
+        if self.fail:
+            raise RuntimeError("warehouse suspended")
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+class FakeSubscription:
+    def __init__(self, portfolio_id):
+        self.portfolio_id = portfolio_id
+        self.pushed = []
+
+    def push(self, chunk):
+        self.pushed.append(chunk)
+
+
+class TestProbeDiff(unittest.TestCase):
+    def test_first_probe_publishes_everything(self):
+        state = probe_state({"RUN_ID": "r1", "STATUS": "SUCCESS"})
+        self.assertEqual(diff_state(None, state), {"run": True, "metrics": True})
+
+    def test_brief_only_change_refreshes_metrics(self):
+        a = probe_state({"RUN_ID": "r1", "STATUS": "SUCCESS", "LAST_BRIEF_ID": 1})
+        b = probe_state({"RUN_ID": "r1", "STATUS": "SUCCESS", "LAST_BRIEF_ID": 2})
+        self.assertEqual(diff_state(a, b), {"run": False, "metrics": True})
+        self.assertEqual(diff_state(b, b), {"run": False, "metrics": False})
+
+    def test_format_sse(self):
+        self.assertEqual(format_sse("run", {"a": 1}), 'event: run\ndata: {"a": 1}\n\n')
+
+
+class TestWatcherTick(unittest.TestCase):
+    def setUp(self):
+        self.conn = FakeConn()
+        self.metrics_calls = []
+
+        def collect(conn, portfolio_id):
+            self.metrics_calls.append(portfolio_id)
+            return {"last_run": None, "last_brief": {"found": False}, "outcomes": {}}
+
+        self.watcher = LiveWatcher(
+            collect,
+            lambda conn: {"latest_success_run_id": None, "latest_success_ts": None},
+            connect=lambda: self.conn,
+            config={"poll_seconds": 15, "running_poll_seconds": 3, "heartbeat_seconds": 20},
+        )
+
+    def _events(self, published):
+        return [event for event, _ in published]
+
+    def test_idle_probe_is_one_statement(self):
+        self.conn.probe = ("r1", "SUCCESS", T0, T0, 7, T0)
+        self.assertEqual(self._events(self.watcher.tick()), ["status", "run"])
+        self.conn.executed.clear()
+        self.assertEqual(self.watcher.tick(), [])
+        self.assertEqual(len(self.conn.executed), 1)
+
+    def test_step_progress_while_running(self):
+        self.conn.probe = ("r2", "RUNNING", T0, None, 7, T0)
+        self.conn.steps = [("s1", T0, "RETURNS_REFRESH", "SUCCESS", 10, None, '{"step_name": "returns_refresh"}')]
+        published = self.watcher.tick()
+        self.assertEqual(self._events(published), ["status", "run", "step"])
+        self.assertEqual(published[-1][1]["step_name"], "returns_refresh")
+
+        self.conn.steps.append(("s2", T0, "RECOMMENDATIONS", "SUCCESS", 4, None, "{}"))
+        self.assertEqual(self._events(self.watcher.tick()), ["step"])
+
+        # Run finishes: run event plus a final step sweep; status is unchanged so it is not re-sent.
+        self.conn.probe = ("r2", "SUCCESS", T0, T0, 8, T0)
+        self.conn.steps.append(("s3", T0, "MORNING_BRIEF", "SUCCESS", 1, None, "{}"))
+        self.assertEqual(self._events(self.watcher.tick()), ["run", "step"])
+
+    def test_metrics_fan_out_once_per_portfolio(self):
+        subs = [FakeSubscription(1), FakeSubscription(1), FakeSubscription(2)]
+        self.watcher._subs.update(subs)
+        self.conn.probe = ("r1", "SUCCESS", T0, T0, 7, T0)
+        self.watcher.tick()
+        self.assertEqual(self.metrics_calls, [1, 2])
+        self.assertTrue(all(any(c.startswith("event: metrics") for c in s.pushed) for s in subs))
+        self.watcher.tick()
+        self.assertEqual(self.metrics_calls, [1, 2])
+        self.conn.probe = ("r1", "SUCCESS", T0, T0, 8, T0)  # new brief
+        self.watcher.tick()
+        self.assertEqual(self.metrics_calls, [1, 2, 1, 2])
+
+    def test_connection_failure_reports_status_and_recovers(self):
+        self.conn.fail = True
+        published = self.watcher.tick()
+        self.assertEqual(self._events(published), ["status"])
+        self.assertFalse(published[0][1]["snowflake_ok"])
+        self.conn.fail = False
+        self.conn.probe = ("r1", "SUCCESS", T0, T0, 7, T0)
+        published = self.watcher.tick()
+        self.assertEqual(self._events(published), ["status", "run"])
+        self.assertTrue(published[0][1]["snowflake_ok"])
+
+    def test_wake_during_tick_is_not_lost(self):
+        sub = FakeSubscription(1)
+        self.watcher._subs.add(sub)
+        ticks = []
+        second_tick = threading.Event()
+
+        def tick():
+            ticks.append(len(ticks))
+            if len(ticks) == 1:
+                self.watcher._wake.set()  # e.g. a new subscriber arriving mid-probe
+            else:
+                with self.watcher._lock:
+                    self.watcher._subs.clear()
+                second_tick.set()
+            return []
+
+        self.watcher.tick = tick
+        thread = threading.Thread(target=self.watcher._run, daemon=True)
+        thread.start()
+        # poll_seconds is 15: the second probe only comes this fast if the wake-up was kept.
+        self.assertTrue(second_tick.wait(2))
+        self.watcher._wake.set()
+        thread.join(2)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Unit tests for /portfolios/batch id parsing and set-based episode summaries. No Snowflake needed:
+episode summaries run against a scripted fake cursor that records every statement.
+"""
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import HTTPException
+
+from app.routers.portfolios import MAX_BATCH_PORTFOLIOS, _episode_summaries, parse_portfolio_ids
+
+EPISODE_COLS = (
+    "EPISODE_ID", "PORTFOLIO_ID", "PROFILE_ID", "START_TS", "END_TS", "STATUS", "RETURN_PCT", "START_EQUITY",
+    "PORTFOLIO_STARTING_CASH",
+)
+
+
+class FakeCursor:
+    def __init__(self, episodes):
+        self.episodes = episodes
+        self.executed = []
+        self.description = None
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if "PORTFOLIO_DAILY" in sql:
+            cols = ("PORTFOLIO_ID", "EPISODE_ID", "FINAL_EQUITY", "MAX_DRAWDOWN", "WIN_DAYS", "LOSS_DAYS")
+            rows = [(e[1], e[0], 110.0, 0.05, 3, 2) for e in self.episodes if e[6] is None]
+        elif "PORTFOLIO_TRADES" in sql:
+            cols = ("PORTFOLIO_ID", "EPISODE_ID", "TRADES_COUNT")
+            rows = [(e[1], e[0], 7) for e in self.episodes if e[6] is None]
+        else:
+            cols, rows = EPISODE_COLS, self.episodes
+        self.description = [(c,) for c in cols]
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+def _episode(pid, eid, return_pct=None):
+    return (eid, pid, 1, datetime(2025, 1, eid), None, "ACTIVE", return_pct, None, 100.0)
+
+
+class TestParsePortfolioIds(unittest.TestCase):
+    def test_dedupes_in_order(self):
+        self.assertEqual(parse_portfolio_ids("3, 1,3,,2"), [3, 1, 2])
+
+    def test_rejects_junk_and_oversized(self):
+        for ids in ("", "1,x", ",".join(str(i) for i in range(MAX_BATCH_PORTFOLIOS + 1))):
+            with self.assertRaises(HTTPException) as ctx:
+                parse_portfolio_ids(ids)
+            self.assertEqual(ctx.exception.status_code, 400)
+
+
+class TestEpisodeSummaries(unittest.TestCase):
+    def test_query_count_does_not_grow_with_episodes(self):
+        episodes = [_episode(pid, eid) for pid in (1, 2, 3) for eid in range(1, 9)]
+        cur = FakeCursor(episodes)
+        out = _episode_summaries(cur, [1, 2, 3, 4])
+        self.assertEqual(len(cur.executed), 3)
+        self.assertEqual(sorted(out), [1, 2, 3, 4])
+        self.assertEqual(out[4], [])
+        ep = out[2][0]
+        self.assertAlmostEqual(ep["total_return"], 0.1)
+        self.assertEqual((ep["win_days"], ep["loss_days"], ep["trades_count"]), (3, 2, 7))
+        self.assertEqual(ep["start_equity"], 100.0)
+        self.assertNotIn("PORTFOLIO_STARTING_CASH", ep)
+        for sql, params in cur.executed:
+            self.assertEqual(sql.count("%s"), len(params))
+
+    def test_persisted_results_skip_fallback(self):
+        cur = FakeCursor([_episode(1, 1, return_pct=0.2)])
+        out = _episode_summaries(cur, [1])
+        self.assertEqual(len(cur.executed), 1)
+        self.assertEqual(out[1][0]["total_return"], 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
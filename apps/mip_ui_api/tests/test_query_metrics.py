@@ -0,0 +1,92 @@
+"""
+Pure-Python unit tests for query instrumentation (app/db.py InstrumentedCursor, app/metrics.py).
+Uses a fake cursor; no Snowflake needed.
+"""
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db import InstrumentedConnection, query_label
+from app.metrics import Histogram, QueryRecord, current_queries, server_timing
+
+
+class _FakeCursor:
+    sfqid = "01b2-fake"
+    description = [("A",), ("B",)]
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def execute(self, sql, params=None):
+        return self
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return _FakeCursor(self.rows)
+
+    def close(self):
+        pass
+
+
+class TestQueryLabel(unittest.TestCase):
+    def test_caller_and_first_qualified_object(self):
+        sql = "with x as (select 1 from dual) select * from x join MIP.MART.V_PORTFOLIO_RISK_GATE g on true"
+        self.assertEqual(query_label(sql), "test_query_metrics.test_caller_and_first_qualified_object/V_PORTFOLIO_RISK_GATE")
+
+    def test_no_from_clause(self):
+        self.assertTrue(query_label("select current_timestamp()").endswith("/?"))
+
+
+class TestInstrumentedCursor(unittest.TestCase):
+    def test_records_rows_bytes_and_query_id(self):
+        queries = []
+        token = current_queries.set(queries)
+        try:
+            cur = InstrumentedConnection(_FakeConnection([(1, "abcd"), (2, None)])).cursor()
+            cur.execute("select A, B from MIP.APP.PORTFOLIO where A = %s", (1,))
+            self.assertEqual(len(cur.fetchall()), 2)
+            self.assertEqual(cur.description, _FakeCursor.description)
+        finally:
+            current_queries.reset(token)
+        self.assertEqual(len(queries), 1)
+        q = queries[0]
+        self.assertTrue(q.label.endswith("/PORTFOLIO"))
+        self.assertEqual((q.rows, q.bytes, q.query_id), (2, 8 + 4 + 8, "01b2-fake"))
+
+    def test_outside_request_is_noop(self):
+        cur = InstrumentedConnection(_FakeConnection([(1,)])).cursor()
+        self.assertEqual(cur.execute("select 1").fetchone(), (1,))
+
+
+class TestRendering(unittest.TestCase):
+    def test_server_timing_header(self):
+        header = server_timing(0.25, [QueryRecord("today.get_today/V_X", 0.1, 3, 120, "qid1")])
+        self.assertTrue(header.startswith("total;dur=250.0, db;dur=100.0;desc=\"1 queries\""))
+        self.assertIn("q1_today.get_today_V_X;dur=100.0", header)
+        self.assertIn("qid=qid1", header)
+
+    def test_histogram_is_cumulative(self):
+        h = Histogram("t_seconds", "test", ("endpoint",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 5.0):
+            h.observe(v, "/x")
+        lines = h.render()
+        self.assertIn('t_seconds_bucket{endpoint="/x",le="0.1"} 1', lines)
+        self.assertIn('t_seconds_bucket{endpoint="/x",le="1.0"} 2', lines)
+        self.assertIn('t_seconds_bucket{endpoint="/x",le="+Inf"} 3', lines)
+        self.assertIn('t_seconds_count{endpoint="/x"} 3', lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
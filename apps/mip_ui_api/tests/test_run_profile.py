@@ -0,0 +1,77 @@
+"""
+Pure-Python unit tests for the run profile shaping (GET /runs/{run_id}/profile). No Snowflake needed.
+"""
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.run_profile import build_profile, build_trends, MIN_REGRESSION_SECONDS, REGRESSION_RATIO
+
+
+def _row(step, duration, rows=None, run_id="r1", prev_avg=None, share=None, started=None):
+    return {
+        "PIPELINE_RUN_ID": run_id,
+        "IS_REPLAY": False,
+        "RUN_STARTED_AT": started or datetime(2025, 1, 2, 6, 0),
+        "RUN_COMPLETED_AT": datetime(2025, 1, 2, 6, 1),
+        "RUN_STATUS": "SUCCESS",
+        "RUN_DURATION_SECONDS": 60.0,
+        "EVENT_NAME": step.upper() if step else None,
+        "STEP_NAME": step,
+        "STEP_STATUS": "SUCCESS" if step else None,
+        "DURATION_SECONDS": duration,
+        "ROWS_AFFECTED": rows,
+        "ROWS_PER_SEC": (rows / duration) if rows is not None and duration else None,
+        "SHARE_OF_RUN": share,
+        "PREV_AVG_DURATION_SECONDS": prev_avg,
+    }
+
+
+class TestBuildProfile(unittest.TestCase):
+    def test_steps_totals_and_slowest(self):
+        profile = build_profile("r1", [_row("returns_refresh", 5.0, 1000), _row("recommendations", 40.0, 20)])
+        self.assertEqual(profile["status"], "SUCCESS")
+        self.assertEqual(profile["slowest_step"], "recommendations")
+        self.assertEqual(profile["steps_total_seconds"], 45.0)
+        self.assertEqual(profile["unaccounted_seconds"], 15.0)
+        self.assertEqual(profile["steps"][0]["rows_per_sec"], 200.0)
+
+    def test_run_without_steps(self):
+        profile = build_profile("r1", [_row(None, None)])
+        self.assertEqual(profile["steps"], [])
+        self.assertIsNone(profile["slowest_step"])
+
+    def test_regression_needs_ratio_and_absolute_slowdown(self):
+        slow = _row("evaluation", 10.0, prev_avg=4.0)
+        noisy = _row("morning_brief", 0.3, prev_avg=0.1)
+        profile = build_profile("r1", [slow, noisy])
+        self.assertEqual(profile["regressed_steps"], ["evaluation"])
+
+    def test_regression_boundary_on_absolute_slowdown(self):
+        prev_avg = MIN_REGRESSION_SECONDS
+        just_under = prev_avg + MIN_REGRESSION_SECONDS - 0.01
+        at_minimum = prev_avg + MIN_REGRESSION_SECONDS
+        self.assertGreaterEqual(just_under, prev_avg * REGRESSION_RATIO)
+        profile = build_profile("r1", [_row("under", just_under, prev_avg=prev_avg),
+                                       _row("at_min", at_minimum, prev_avg=prev_avg)])
+        self.assertEqual(profile["regressed_steps"], ["at_min"])
+
+
+class TestBuildTrends(unittest.TestCase):
+    def test_series_per_step_with_median(self):
+        history = [
+            _row("evaluation", d, run_id=f"r{i}", started=datetime(2025, 1, i + 1))
+            for i, d in enumerate([2.0, 4.0, 3.0, 9.0])
+        ]
+        trends = build_trends(history)
+        self.assertEqual(len(trends), 1)
+        self.assertEqual([p["run_id"] for p in trends[0]["points"]], ["r0", "r1", "r2", "r3"])
+        self.assertEqual(trends[0]["median_duration_seconds"], 3.5)
+        self.assertAlmostEqual(trends[0]["latest_vs_median"], 9.0 / 3.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Unit tests for the /signals single-query tiers, keyset cursor and field projection. No Snowflake needed.
+"""
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import HTTPException
+
+from app.routers.signals import (
+    build_signals_query,
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+    signal_tiers,
+)
+
+
+class TestSignalTiers(unittest.TestCase):
+    def test_fallbacks_follow_filters(self):
+        tiers = signal_tiers(symbol="aapl", run_id="r1", as_of_ts="2025-03-04T00:00:00")
+        self.assertEqual(
+            [t["query_type"] for t in tiers],
+            ["primary", "fallback_no_run_id", "fallback_7day_window", "fallback_symbol_only"],
+        )
+        self.assertEqual(tiers[3]["filters"], {"symbol": "aapl", "market_type": None, "days_window": 30})
+
+    def test_no_fallback(self):
+        self.assertEqual(len(signal_tiers(symbol="AAPL", run_id="r1", include_fallback=False)), 1)
+
+
+class TestSignalsQuery(unittest.TestCase):
+    def test_all_tiers_in_one_statement(self):
+        tiers = signal_tiers(symbol="AAPL", run_id="r1")
+        sql, params = build_signals_query(tiers, ["SYMBOL", "SCORE"], 50)
+        self.assertEqual(sql.count("%s"), len(params))
+        # Each tier's params appear once in the CASE and once in the WHERE.
+        self.assertEqual(params, ["AAPL", "r1", "AAPL", "AAPL"] * 2)
+        self.assertIn("when", sql)
+        self.assertIn("limit 51", sql)
+        self.assertEqual(sql.count("V_SIGNALS_ELIGIBLE_TODAY"), 1)
+
+    def test_keyset_continuation(self):
+        after = {"tier": 0, "ts": "2025-03-04T00:00:00", "score": 1.5, "id": 42}
+        sql, params = build_signals_query(signal_tiers(), ["SYMBOL"], 10, after)
+        self.assertEqual(sql.count("%s"), len(params))
+        self.assertEqual(params[-5:], ["2025-03-04T00:00:00", "2025-03-04T00:00:00", 1.5, 1.5, 42])
+
+    def test_cursor_round_trip(self):
+        row = {"SIGNAL_TS": datetime(2025, 3, 4), "SORT_SCORE": 0.25, "RECOMMENDATION_ID": 7}
+        self.assertEqual(
+            decode_cursor(encode_cursor(2, row)),
+            {"tier": 2, "ts": "2025-03-04T00:00:00", "score": 0.25, "id": 7},
+        )
+        with self.assertRaises(HTTPException):
+            decode_cursor("not-a-cursor")
+
+
+class TestParseFields(unittest.TestCase):
+    def test_projection(self):
+        self.assertEqual(parse_fields("symbol, Score,symbol"), ["SYMBOL", "SCORE"])
+        self.assertIn("DETAILS", parse_fields(None))
+
+    def test_unknown_field(self):
+        with self.assertRaises(HTTPException) as ctx:
+            parse_fields("symbol,password")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Unit tests for /today insight items built from MIP.APP.TODAY_INSIGHTS rows. No Snowflake needed.
+"""
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.routers.today import insight_from_row
+
+
+class TestInsightFromRow(unittest.TestCase):
+    def test_variant_columns_as_json_text(self):
+        row = {
+            "SYMBOL": "AAPL",
+            "MARKET_TYPE": "STOCK",
+            "PATTERN_ID": 3,
+            "MATURITY_SCORE": 88.8,
+            "MATURITY_STAGE": "CONFIDENT",
+            "REASONS": '["Enough recommendations to start judging quality."]',
+            "MEAN_H5": 0.006,
+            "PCT_POSITIVE_H5": 0.8,
+            "TODAY_SCORE": 0.622,
+            "PERFORMANCE_SUMMARY": '{"5": {"mean_outcome": 0.006, "pct_positive": 0.8, "n_outcomes": 25}}',
+        }
+        item = insight_from_row(row)
+        self.assertEqual(item["reasons"], ["Enough recommendations to start judging quality."])
+        self.assertEqual(item["performance_summary"], {5: {"mean_outcome": 0.006, "pct_positive": 0.8, "n_outcomes": 25}})
+        self.assertEqual(item["today_score"], 0.622)
+        self.assertEqual(
+            item["why_this_is_here"],
+            "Ranked by data maturity (score 89) and outcome history. "
+            "At 5-bar horizon: mean return 0.60%, positive 80% of the time.",
+        )
+
+    def test_missing_performance(self):
+        item = insight_from_row({"SYMBOL": "X", "MATURITY_SCORE": None, "REASONS": None, "PERFORMANCE_SUMMARY": None})
+        self.assertEqual((item["maturity_score"], item["reasons"], item["performance_summary"]), (0.0, [], {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -36,7 +36,7 @@ export default function EpisodeCard({ episode, portfolioId, isActive }) {
     let cancelled = false
     setLoading(true)
     setError(null)
-    fetch(`${API_BASE}/portfolios/${portfolioId}/episodes/${episodeId}`)
+    fetch(`${API_BASE}/portfolios/${portfolioId}/episodes/${episodeId}?points=300`)
       .then((res) => {
         if (!res.ok) throw new Error(res.statusText)
         return res.json()
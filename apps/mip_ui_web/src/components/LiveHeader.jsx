@@ -32,6 +32,8 @@ export default function LiveHeader() {
   const [error, setError] = useState(null)
   const [lastFetchedAt, setLastFetchedAt] = useState(null)
   const [tick, setTick] = useState(0)
+  const [streaming, setStreaming] = useState(false)
+  const [progress, setProgress] = useState(null)
 
   const fetchMetrics = useCallback(() => {
     fetch(`${API_BASE}/live/metrics?portfolio_id=${defaultPortfolioId}`)
@@ -48,11 +50,59 @@ export default function LiveHeader() {
       .finally(() => setLoading(false))
   }, [defaultPortfolioId])
 
+  // Push channel: GET /live/stream (one server-side watcher for all viewers). Polling only as a fallback
+  // when EventSource is unavailable or the stream cannot be opened.
   useEffect(() => {
-    fetchMetrics()
-    const interval = setInterval(fetchMetrics, POLL_INTERVAL_MS)
-    return () => clearInterval(interval)
-  }, [fetchMetrics])
+    if (typeof window === 'undefined' || !window.EventSource) {
+      fetchMetrics()
+      const interval = setInterval(fetchMetrics, POLL_INTERVAL_MS)
+      return () => clearInterval(interval)
+    }
+    let interval = null
+    let opened = false
+    const source = new EventSource(`${API_BASE}/live/stream?portfolio_id=${defaultPortfolioId}`)
+    source.addEventListener('open', () => {
+      opened = true
+      setStreaming(true)
+      if (interval) {
+        clearInterval(interval)
+        interval = null
+      }
+    })
+    source.addEventListener('metrics', (e) => {
+      setMetrics(JSON.parse(e.data))
+      setLastFetchedAt(Date.now())
+      setError(null)
+      setLoading(false)
+    })
+    source.addEventListener('run', (e) => {
+      const run = JSON.parse(e.data)
+      setProgress((prev) =>
+        run.status === 'RUNNING'
+          ? { runId: run.run_id, steps: prev?.runId === run.run_id ? prev.steps : [] }
+          : null
+      )
+    })
+    source.addEventListener('step', (e) => {
+      const step = JSON.parse(e.data)
+      if (step.scope && step.scope !== 'AGG') return
+      setProgress((prev) =>
+        prev && prev.runId === step.run_id ? { ...prev, steps: [...prev.steps, step] } : prev
+      )
+    })
+    source.addEventListener('error', () => {
+      setStreaming(false)
+      if (!opened && !interval) {
+        // Stream not reachable (e.g. older API): poll until the browser's reconnect succeeds.
+        fetchMetrics()
+        interval = setInterval(fetchMetrics, POLL_INTERVAL_MS)
+      }
+    })
+    return () => {
+      source.close()
+      if (interval) clearInterval(interval)
+    }
+  }, [defaultPortfolioId, fetchMetrics])
 
   useEffect(() => {
     const id = setInterval(() => setTick((t) => t + 1), 1000)
@@ -75,6 +125,7 @@ export default function LiveHeader() {
   const outcomes = metrics?.outcomes ?? {}
   const sinceLastRun = outcomes.since_last_run ?? 0
   const lastCalculatedAt = outcomes.last_calculated_at ?? null
+  const lastStep = progress?.steps[progress.steps.length - 1] ?? null
 
   return (
     <div className="live-header" role="region" aria-label="Live metrics">
@@ -90,6 +141,13 @@ export default function LiveHeader() {
         </span>
       )}
 
+      {progress && (
+        <span className="live-header-item live-header-item--pulse">
+          Pipeline running
+          {lastStep && `: ${lastStep.step_name ?? lastStep.event_name} (${progress.steps.length} step${progress.steps.length !== 1 ? 's' : ''} done)`}
+        </span>
+      )}
+
       {lastBrief?.found && (
         <span className="live-header-item" title={explainMode ? undefined : null}>
           Latest brief: {relativeTime(lastBrief.as_of_ts)}
@@ -113,7 +171,7 @@ export default function LiveHeader() {
 
       {displaySeconds != null && (
         <span className="live-header-item live-header-meta">
-          Updated {displaySeconds} sec ago
+          {streaming ? 'Live · updated' : 'Updated'} {displaySeconds} sec ago
         </span>
       )}
 
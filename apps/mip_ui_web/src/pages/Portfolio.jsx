@@ -30,6 +30,7 @@ export default function Portfolio() {
   const [episodes, setEpisodes] = useState([])
   const [timeline, setTimeline] = useState(null)
   const [activeAnalytics, setActiveAnalytics] = useState(null)
+  const [batchById, setBatchById] = useState({})
   const { setContext } = useExplainCenter()
   const openExplainRiskGate = useExplainSection(RISK_GATE_EXPLAIN_CONTEXT)
 
@@ -76,7 +77,7 @@ export default function Portfolio() {
           const activeEp = snapData?.active_episode
           const activeEpisodeId = activeEp?.episode_id ?? activeEp?.EPISODE_ID
           if (activeEpisodeId && !cancelled) {
-            fetch(`${API_BASE}/portfolios/${portfolioId}/episodes/${activeEpisodeId}`)
+            fetch(`${API_BASE}/portfolios/${portfolioId}/episodes/${activeEpisodeId}?points=300`)
               .then(r => r.ok ? r.json() : null)
               .then(data => { if (!cancelled) setActiveAnalytics(data) })
               .catch(() => { if (!cancelled) setActiveAnalytics(null) })
@@ -87,6 +88,17 @@ export default function Portfolio() {
           setEpisodes([])
           setTimeline(null)
           setActiveAnalytics(null)
+          // One batch call for every card's snapshot + episode summaries (no per-portfolio requests)
+          const ids = list.map((p) => p.PORTFOLIO_ID ?? p.portfolio_id).filter((id) => id != null)
+          if (ids.length > 0) {
+            const batchRes = await fetch(`${API_BASE}/portfolios/batch?ids=${ids.join(',')}`).catch(() => null)
+            const batch = batchRes?.ok ? await batchRes.json() : null
+            if (!cancelled) {
+              const byId = {}
+              for (const entry of batch?.portfolios ?? []) byId[entry.portfolio_id] = entry
+              setBatchById(byId)
+            }
+          }
         }
       } catch (e) {
         if (!cancelled) setError(e.message)
@@ -597,6 +609,9 @@ export default function Portfolio() {
             <th title="Gate state: SAFE = green, CAUTION = yellow, STOPPED = red">Gate</th>
             <th title="Active episode: green = active">Health</th>
             <th>Active episode</th>
+            <th>Equity</th>
+            <th>Trades</th>
+            <th>Episodes</th>
           </tr>
         </thead>
         <tbody>
@@ -607,6 +622,8 @@ export default function Portfolio() {
             const episodeLabel = ep
               ? `#${ep.episode_id ?? ep.EPISODE_ID ?? '—'} since ${(ep.start_ts ?? ep.START_TS ?? '').toString().slice(0, 10)}`
               : '—'
+            const batch = batchById[p.PORTFOLIO_ID ?? p.portfolio_id]
+            const totalEquity = batch?.snapshot?.cash_and_exposure?.total_equity
             return (
               <tr key={p.PORTFOLIO_ID ?? p.portfolio_id}>
                 <td><Link to={`/portfolios/${p.PORTFOLIO_ID ?? p.portfolio_id}`}>{p.NAME ?? p.name}</Link></td>
@@ -628,6 +645,9 @@ export default function Portfolio() {
                   />
                 </td>
                 <td>{episodeLabel}</td>
+                <td>{totalEquity != null ? Number(totalEquity).toLocaleString(undefined, { maximumFractionDigits: 0 }) : '—'}</td>
+                <td>{batch?.snapshot?.trades_total ?? '—'}</td>
+                <td>{batch?.episodes?.length ?? '—'}</td>
               </tr>
             )
           })}
@@ -62,6 +62,9 @@ function FromBriefBanner({ portfolioId, asOfTs, pipelineRunId, onClearFilters })
   )
 }
 
+// Columns SignalRow renders; DETAILS stays on the server
+const SIGNAL_FIELDS = 'recommendation_id,symbol,market_type,pattern_id,score,trust_label,recommended_action,is_eligible,gating_reason,signal_ts'
+
 // Signal row component
 function SignalRow({ signal }) {
   const trustClass = (signal.TRUST_LABEL || signal.trust_label || '').toLowerCase()
@@ -95,6 +98,7 @@ export default function Signals() {
   
   const [signalsData, setSignalsData] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState(null)
   
   // Parse filters from URL
@@ -112,9 +116,10 @@ export default function Signals() {
   
   const hasFilters = Object.values(filters).some(v => v && v !== 'brief')
   
-  // Fetch signals
-  const fetchSignals = useCallback(async () => {
-    setLoading(true)
+  // Fetch signals; a cursor appends the next page to the current list
+  const fetchSignals = useCallback(async (cursor = null) => {
+    if (cursor) setLoadingMore(true)
+    else setLoading(true)
     setError(null)
     
     try {
@@ -128,15 +133,26 @@ export default function Signals() {
       if (filters.trustLabel) params.set('trust_label', filters.trustLabel)
       params.set('include_fallback', 'true')
       params.set('limit', '100')
+      params.set('fields', SIGNAL_FIELDS)
+      if (cursor) params.set('cursor', cursor)
       
       const res = await fetch(`${API_BASE}/signals?${params}`)
       if (!res.ok) throw new Error(res.statusText)
       const data = await res.json()
-      setSignalsData(data)
+      if (cursor) {
+        setSignalsData(prev => ({
+          ...data,
+          signals: [...(prev?.signals || []), ...data.signals],
+          count: (prev?.count || 0) + data.count,
+        }))
+      } else {
+        setSignalsData(data)
+      }
     } catch (e) {
       setError(e.message)
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }, [filters.symbol, filters.marketType, filters.patternId, filters.horizonBars, filters.runId, filters.asOfTs, filters.trustLabel])
   
@@ -191,6 +207,7 @@ export default function Signals() {
   const fallbackUsed = signalsData?.fallback_used
   const fallbackReason = signalsData?.fallback_reason
   const queryType = signalsData?.query_type
+  const nextCursor = signalsData?.next_cursor
   
   return (
     <>
@@ -293,6 +310,16 @@ export default function Signals() {
               ))}
             </tbody>
           </table>
+          {nextCursor && (
+            <button
+              type="button"
+              className="signals-load-more"
+              disabled={loadingMore}
+              onClick={() => fetchSignals(nextCursor)}
+            >
+              {loadingMore ? 'Loading…' : 'Load more'}
+            </button>
+          )}
         </div>
       )}
       
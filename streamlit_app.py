@@ -1,5 +1,6 @@
 import json
 import math
+import time
 from datetime import date, datetime, timedelta
 
 import altair as alt
@@ -16,6 +17,18 @@ SIGNAL_GENERATOR_SP = "MIP.APP.SP_GENERATE_MOMENTUM_RECS"
 DAILY_PIPELINE_TASK = "MIP.APP.TASK_RUN_DAILY_PIPELINE"
 DAILY_PIPELINE_SP = "MIP.APP.SP_RUN_DAILY_PIPELINE"
 
+# Cache lifetimes for st.cache_data fetchers. Rows keyed by a simulation RUN_ID never change after the
+# run, so they can live much longer than reads of mutable tables.
+RUN_SCOPED_CACHE_TTL = 3600
+LIVE_CACHE_TTL = 60
+# Pipeline-derived frames are keyed on the data version (latest pipeline run), so they only need a long
+# safety TTL; the version probe itself is re-checked every DATA_VERSION_PROBE_TTL seconds.
+DATA_CACHE_TTL = 6 * 3600
+DATA_VERSION_PROBE_TTL = 30
+# Point budget for time-series charts (about a chart's pixel width). Altair embeds every row in the Vega spec
+# sent to the browser, so bars and equity series are bucketed down to this before charting.
+CHART_MAX_POINTS = 600
+
 
 # --- Helper functions ---
 
@@ -25,7 +38,10 @@ def run_sql(query: str):
 
 
 def to_pandas(df):
-    """Convert Snowpark DataFrame to pandas safely (or return None)."""
+    """
+    Convert Snowpark DataFrame to pandas safely (or return None). Snowpark fetches Arrow result batches, so
+    numeric and timestamp columns arrive typed; post-process column-wise rather than with iterrows().
+    """
     if df is None:
         return None
     try:
@@ -109,6 +125,7 @@ def fetch_task_metadata(task_name: str):
         return None, str(exc)
 
 
+@st.cache_data(ttl=LIVE_CACHE_TTL)
 def fetch_task_history(task_name: str, limit: int = 20):
     """Fetch recent task history rows for a task."""
     database, _, _ = parse_task_parts(task_name)
@@ -129,6 +146,7 @@ def fetch_task_history(task_name: str, limit: int = 20):
     return to_pandas(run_sql(query))
 
 
+@st.cache_data(ttl=300)
 def fetch_audit_log_options(column_name: str):
     query = f"""
         select distinct {column_name}
@@ -139,6 +157,7 @@ def fetch_audit_log_options(column_name: str):
     return to_pandas(run_sql(query))
 
 
+@st.cache_data(ttl=LIVE_CACHE_TTL)
 def fetch_audit_log(
     date_start: date,
     date_end: date,
@@ -186,7 +205,8 @@ def fetch_audit_log(
     return to_pandas(run_sql(query))
 
 
-def fetch_portfolios():
+@st.cache_data(ttl=DATA_CACHE_TTL)
+def fetch_portfolios(data_version: str):
     query = """
         select
             p.PORTFOLIO_ID,
@@ -210,6 +230,7 @@ def fetch_portfolios():
     return to_pandas(run_sql(query))
 
 
+@st.cache_data(ttl=300)
 def fetch_portfolio_profiles():
     query = """
         select
@@ -251,6 +272,7 @@ def create_portfolio(
         )
     """
     run_sql(query).collect()
+    clear_portfolio_frames()
 
 
 def fetch_portfolio_run_id(portfolio_id: int):
@@ -265,6 +287,7 @@ def fetch_portfolio_run_id(portfolio_id: int):
     return df.iloc[0]["LAST_SIMULATION_RUN_ID"]
 
 
+@st.cache_data(ttl=RUN_SCOPED_CACHE_TTL)
 def fetch_portfolio_daily(portfolio_id: int, run_id: str):
     query = f"""
         select
@@ -286,6 +309,7 @@ def fetch_portfolio_daily(portfolio_id: int, run_id: str):
     return to_pandas(run_sql(query))
 
 
+@st.cache_data(ttl=RUN_SCOPED_CACHE_TTL)
 def fetch_portfolio_trades(portfolio_id: int, run_id: str):
     query = f"""
         select
@@ -306,6 +330,7 @@ def fetch_portfolio_trades(portfolio_id: int, run_id: str):
     return to_pandas(run_sql(query))
 
 
+@st.cache_data(ttl=RUN_SCOPED_CACHE_TTL)
 def fetch_portfolio_positions(portfolio_id: int, run_id: str):
     query = f"""
         select
@@ -355,53 +380,67 @@ def fetch_ingest_universe():
     return to_pandas(run_sql(query))
 
 
+def stage_frame(df: pd.DataFrame, table_name: str) -> str:
+    """
+    Bulk-load a typed frame into a session-scoped temporary table with write_pandas (Parquet upload + COPY,
+    one round trip regardless of row count) and return its qualified name for set-based DML.
+    """
+    session.write_pandas(
+        df.reset_index(drop=True),
+        table_name,
+        database="MIP",
+        schema="APP",
+        auto_create_table=True,
+        overwrite=True,
+        table_type="temporary",
+        quote_identifiers=False,
+    )
+    return f"MIP.APP.{table_name}"
+
+
 def save_ingest_universe_updates(df: pd.DataFrame) -> None:
     if df is None or df.empty:
         return
 
     if "TO_DELETE" in df.columns:
-        delete_mask = df["TO_DELETE"].fillna(False)
+        delete_mask = df["TO_DELETE"].fillna(False).astype(bool)
     else:
         delete_mask = pd.Series(False, index=df.index)
-    delete_rows = df[delete_mask].copy()
-    upsert_rows = df[~delete_mask].copy()
-
-    if not delete_rows.empty:
-        delete_tuples = ",\n                ".join(
-            f"({sql_literal(row['MARKET_TYPE'])}, {sql_literal(row['SYMBOL'])}, "
-            f"{sql_literal(int(row['INTERVAL_MINUTES']))})"
-            for _, row in delete_rows.iterrows()
-        )
-        delete_sql = f"""
-            delete from MIP.APP.INGEST_UNIVERSE
-             where (MARKET_TYPE, SYMBOL, INTERVAL_MINUTES) in (
-                {delete_tuples}
-             )
-        """
-        run_sql(delete_sql).collect()
+    notes = df["NOTES"] if "NOTES" in df.columns else pd.Series(None, index=df.index)
+    edits = pd.DataFrame(
+        {
+            "SYMBOL": df["SYMBOL"].astype(str),
+            "MARKET_TYPE": df["MARKET_TYPE"].astype(str),
+            "INTERVAL_MINUTES": pd.to_numeric(df["INTERVAL_MINUTES"]).astype("int64"),
+            "IS_ENABLED": df["IS_ENABLED"].fillna(False).astype(bool),
+            "PRIORITY": pd.to_numeric(df["PRIORITY"]).fillna(0).astype("int64"),
+            "NOTES": notes.astype(object).where(notes.notna(), None),
+            "TO_DELETE": delete_mask,
+        }
+    )
+    staged = stage_frame(edits, "INGEST_UNIVERSE_EDITS")
 
-    if upsert_rows.empty:
-        return
+    if delete_mask.any():
+        run_sql(
+            f"""
+            delete from MIP.APP.INGEST_UNIVERSE t
+            using {staged} s
+             where s.TO_DELETE
+               and t.MARKET_TYPE = s.MARKET_TYPE
+               and t.SYMBOL = s.SYMBOL
+               and t.INTERVAL_MINUTES = s.INTERVAL_MINUTES
+            """
+        ).collect()
 
-    values_rows = ",\n                ".join(
-        f"({sql_literal(row['SYMBOL'])}, {sql_literal(row['MARKET_TYPE'])}, "
-        f"{sql_literal(int(row['INTERVAL_MINUTES']))}, {sql_literal(bool(row['IS_ENABLED']))}, "
-        f"{sql_literal(int(row['PRIORITY']))}, {sql_literal(normalize_optional_value(row.get('NOTES')))})"
-        for _, row in upsert_rows.iterrows()
-    )
+    if delete_mask.all():
+        return
 
     merge_sql = f"""
         merge into MIP.APP.INGEST_UNIVERSE t
         using (
-            select
-                column1 as SYMBOL,
-                column2 as MARKET_TYPE,
-                column3 as INTERVAL_MINUTES,
-                column4 as IS_ENABLED,
-                column5 as PRIORITY,
-                column6 as NOTES
-            from values
-                {values_rows}
+            select SYMBOL, MARKET_TYPE, INTERVAL_MINUTES, IS_ENABLED, PRIORITY, NOTES
+            from {staged}
+            where not TO_DELETE
         ) s
            on t.SYMBOL = s.SYMBOL
           and t.MARKET_TYPE = s.MARKET_TYPE
@@ -597,27 +636,89 @@ def run_post_ingest_health_checks():
     return results
 
 
+def downsample_series(df: pd.DataFrame, value_cols: list[str], max_points: int = CHART_MAX_POINTS) -> pd.DataFrame:
+    """
+    Time-ordered frame reduced to at most max_points rows: first, last, and the rows holding each bucket's min
+    and max of every value column, so line/area charts keep their peaks and troughs.
+    """
+    if df is None or len(df) <= max_points:
+        return df
+    frame = df.reset_index(drop=True)
+    buckets = max(1, (max_points - 2) // (2 * len(value_cols)))
+    bucket = (pd.RangeIndex(len(frame)) * buckets) // len(frame)
+    keep = {0, len(frame) - 1}
+    for col in value_cols:
+        grouped = pd.to_numeric(frame[col], errors="coerce").groupby(bucket)
+        keep.update(int(i) for i in grouped.idxmin().dropna())
+        keep.update(int(i) for i in grouped.idxmax().dropna())
+    return frame.loc[sorted(keep)].reset_index(drop=True)
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL)
+def fetch_bucketed_bars(
+    symbol: str,
+    market_type: str,
+    interval_minutes: int,
+    from_ts: str,
+    max_points: int,
+    data_version: str,
+):
+    """
+    OHLC bars since from_ts, bucketed in the warehouse to at most max_points rows: first OPEN, max HIGH,
+    min LOW and last CLOSE per equal-width time bucket (BAR_COUNT bars each). Windows with no more than
+    max_points bars come back one bar per row.
+    """
+    query = f"""
+        with bars as (
+            select
+                TS,
+                OPEN,
+                coalesce(HIGH, CLOSE) as HIGH,
+                coalesce(LOW, CLOSE) as LOW,
+                CLOSE
+            from MIP.MART.MARKET_BARS
+            where SYMBOL = {sql_literal(symbol)}
+              and MARKET_TYPE = {sql_literal(market_type)}
+              and INTERVAL_MINUTES = {int(interval_minutes)}
+              and TS >= to_timestamp_ntz({sql_literal(from_ts)})
+        ),
+        span as (
+            select min(TS) as MIN_TS, max(TS) as MAX_TS, count(*) as BAR_TOTAL
+            from bars
+        )
+        select
+            min(b.TS) as TS,
+            max(b.TS) as TS_END,
+            min_by(b.OPEN, b.TS) as OPEN,
+            max(b.HIGH) as HIGH,
+            min(b.LOW) as LOW,
+            max_by(b.CLOSE, b.TS) as CLOSE,
+            count(*) as BAR_COUNT
+        from bars b
+        cross join span s
+        group by iff(
+            s.BAR_TOTAL <= {int(max_points)},
+            datediff(second, s.MIN_TS, b.TS),
+            floor(
+                datediff(second, s.MIN_TS, b.TS) * {int(max_points)}
+                / (datediff(second, s.MIN_TS, s.MAX_TS) + 1)
+            )
+        )
+        order by TS
+    """
+    return to_pandas(run_sql(query))
+
+
 def render_signal_visualizer(symbol: str, market_type: str, interval_minutes: int) -> None:
     window_days = st.number_input(
         "Days of history", min_value=1, max_value=90, value=10, step=1, key="signal_window"
     )
     from_ts = datetime.now() - timedelta(days=window_days)
-    from_ts_str = from_ts.strftime("%Y-%m-%d %H:%M:%S")
+    # Minute precision keeps the cache key stable across reruns within the same minute.
+    from_ts_str = from_ts.strftime("%Y-%m-%d %H:%M:00")
 
-    price_df = to_pandas(
-        run_sql(
-            f"""
-            select
-                TS,
-                CLOSE
-            from MIP.MART.MARKET_BARS
-            where SYMBOL = '{symbol}'
-              and MARKET_TYPE = '{market_type}'
-              and INTERVAL_MINUTES = {interval_minutes}
-              and TS >= to_timestamp_ntz('{from_ts_str}')
-            order by TS
-            """
-        )
+    price_df = fetch_bucketed_bars(
+        symbol, market_type, interval_minutes, from_ts_str, CHART_MAX_POINTS, fetch_data_version()
     )
 
     rec_vis_df = to_pandas(
@@ -649,17 +750,29 @@ def render_signal_visualizer(symbol: str, market_type: str, interval_minutes: in
         st.info("No price data available for the selected symbol / window.")
         return
 
-    price_df["CLOSE"] = price_df["CLOSE"].astype(float)
+    for col in ("OPEN", "HIGH", "LOW", "CLOSE"):
+        price_df[col] = price_df[col].astype(float)
 
+    # High/low band keeps each bucket's extremes visible; the line follows the bucket close.
+    price_band = (
+        alt.Chart(price_df)
+        .mark_area(opacity=0.2)
+        .encode(
+            x=alt.X("TS:T", title="Time"),
+            y=alt.Y("LOW:Q", title="Price"),
+            y2="HIGH:Q",
+        )
+    )
     price_line = (
         alt.Chart(price_df)
         .mark_line()
         .encode(
             x=alt.X("TS:T", title="Time"),
             y=alt.Y("CLOSE:Q", title="Price"),
-            tooltip=["TS", "CLOSE"],
+            tooltip=["TS", "OPEN", "HIGH", "LOW", "CLOSE", "BAR_COUNT"],
         )
     )
+    price_chart = price_band + price_line
 
     if rec_vis_df is not None and not rec_vis_df.empty:
         rec_vis_df["CLOSE"] = rec_vis_df["CLOSE"].astype(float)
@@ -676,15 +789,51 @@ def render_signal_visualizer(symbol: str, market_type: str, interval_minutes: in
             )
         )
 
-        chart = (price_line + signal_points).properties(height=280)
+        chart = (price_chart + signal_points).properties(height=280)
     else:
-        chart = price_line.properties(height=280)
+        chart = price_chart.properties(height=280)
 
+    bucketed = int(price_df["BAR_COUNT"].max()) > 1
+    if bucketed:
+        st.caption(f"{int(price_df['BAR_COUNT'].sum())} bars shown as {len(price_df)} buckets (high/low band kept).")
     st.altair_chart(chart, use_container_width=True)
 
 
-@st.cache_data(ttl=300)
-def fetch_latest_pipeline_event():
+@st.cache_data(ttl=DATA_VERSION_PROBE_TTL)
+def fetch_data_version() -> str:
+    """
+    Cache key for pipeline-derived frames: the latest PIPELINE_RUN id and status, so cached frames are
+    dropped when a run starts or finishes and kept otherwise. Falls back to a 5-minute bucket if the
+    probe fails.
+    """
+    query = """
+        select RUN_ID, STATUS
+        from MIP.APP.PIPELINE_RUN
+        order by STARTED_AT desc
+        limit 1
+    """
+    try:
+        rows = run_sql(query).collect()
+    except Exception:
+        return f"unknown:{int(time.time() // 300)}"
+    if not rows:
+        return "none"
+    return f"{rows[0]['RUN_ID']}:{rows[0]['STATUS']}"
+
+
+def refresh_data_now() -> None:
+    """Drop every cached frame and the version probe (manual refresh, or after an in-app run)."""
+    st.cache_data.clear()
+
+
+def clear_portfolio_frames() -> None:
+    """Drop the data_version-keyed portfolio frames after an in-app portfolio write (the version does not move)."""
+    fetch_portfolios.clear()
+    fetch_portfolio_overview.clear()
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL)
+def fetch_latest_pipeline_event(data_version: str):
     query = """
         select
             event_ts,
@@ -698,8 +847,8 @@ def fetch_latest_pipeline_event():
     return to_pandas(run_sql(query))
 
 
-@st.cache_data(ttl=300)
-def fetch_data_freshness():
+@st.cache_data(ttl=DATA_CACHE_TTL)
+def fetch_data_freshness(data_version: str):
     bars_query = """
         select
             MARKET_TYPE,
@@ -724,8 +873,8 @@ def fetch_data_freshness():
     }
 
 
-@st.cache_data(ttl=300)
-def fetch_opportunity_snapshot():
+@st.cache_data(ttl=DATA_CACHE_TTL)
+def fetch_opportunity_snapshot(data_version: str):
     count_query = """
         select count(*) as OPPORTUNITY_COUNT
         from MIP.APP.V_OPPORTUNITY_FEED
@@ -751,8 +900,8 @@ def fetch_opportunity_snapshot():
     }
 
 
-@st.cache_data(ttl=300)
-def fetch_portfolio_overview():
+@st.cache_data(ttl=DATA_CACHE_TTL)
+def fetch_portfolio_overview(data_version: str):
     query = """
         select
             p.PORTFOLIO_ID,
@@ -769,7 +918,7 @@ def fetch_portfolio_overview():
     return to_pandas(run_sql(query))
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=RUN_SCOPED_CACHE_TTL)
 def fetch_portfolio_sparkline(portfolio_id: int, run_id: str):
     query = f"""
         select TS, TOTAL_EQUITY
@@ -782,7 +931,7 @@ def fetch_portfolio_sparkline(portfolio_id: int, run_id: str):
     return to_pandas(run_sql(query))
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=RUN_SCOPED_CACHE_TTL)
 def fetch_portfolio_latest_daily(portfolio_id: int, run_id: str):
     query = f"""
         select
@@ -800,13 +949,14 @@ def fetch_portfolio_latest_daily(portfolio_id: int, run_id: str):
     return to_pandas(run_sql(query))
 
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=DATA_CACHE_TTL)
 def fetch_opportunity_feed(
     market_types: list[str],
     intervals: list[int],
     pattern_ids: list[str],
     lookback_days: int,
     min_abs_score: float,
+    data_version: str,
 ):
     filters = [f"TS >= dateadd('day', -{lookback_days}, current_timestamp())"]
     if market_types:
@@ -840,8 +990,10 @@ def fetch_opportunity_feed(
     return to_pandas(run_sql(query))
 
 
-@st.cache_data(ttl=300)
-def fetch_symbol_bars(symbols: tuple[str, ...], market_type: str, interval_minutes: int, limit: int):
+@st.cache_data(ttl=DATA_CACHE_TTL)
+def fetch_symbol_bars(
+    symbols: tuple[str, ...], market_type: str, interval_minutes: int, limit: int, data_version: str
+):
     if not symbols:
         return None
     symbols_list = ", ".join(sql_literal(symbol) for symbol in symbols)
@@ -861,8 +1013,8 @@ def fetch_symbol_bars(symbols: tuple[str, ...], market_type: str, interval_minut
     return to_pandas(run_sql(query))
 
 
-@st.cache_data(ttl=300)
-def fetch_scorecard(horizon_days: int, lookback_days: int):
+@st.cache_data(ttl=DATA_CACHE_TTL)
+def fetch_scorecard(horizon_days: int, lookback_days: int, data_version: str):
     query = f"""
         select
             coalesce(p.NAME, concat('Pattern ', s.PATTERN_ID)) as PATTERN_NAME,
@@ -1209,7 +1361,7 @@ def render_overview():
         "Use Admin/Ops for manual runs."
     )
 
-    pipeline_df = fetch_latest_pipeline_event()
+    pipeline_df = fetch_latest_pipeline_event(fetch_data_version())
     if pipeline_df is None or pipeline_df.empty:
         st.info("No pipeline audit events available yet.")
     else:
@@ -1225,7 +1377,7 @@ def render_overview():
         cols[2].metric("Last error", error_display or "—")
 
     section_header("Data freshness")
-    freshness = fetch_data_freshness()
+    freshness = fetch_data_freshness(fetch_data_version())
     bars_df = freshness.get("bars")
     returns_df = freshness.get("returns")
     recs_df = freshness.get("recs")
@@ -1243,7 +1395,7 @@ def render_overview():
         st.info("No market bars found yet.")
 
     section_header("Portfolio snapshot")
-    portfolio_df = fetch_portfolio_overview()
+    portfolio_df = fetch_portfolio_overview(fetch_data_version())
     if portfolio_df is None or portfolio_df.empty:
         st.info("No portfolio runs yet.")
     else:
@@ -1285,6 +1437,7 @@ def render_overview():
         if run_id:
             spark_df = fetch_portfolio_sparkline(int(portfolio_row["PORTFOLIO_ID"]), run_id)
             if spark_df is not None and not spark_df.empty:
+                spark_df = downsample_series(spark_df, ["TOTAL_EQUITY"])
                 spark_df["TOTAL_EQUITY"] = spark_df["TOTAL_EQUITY"].astype(float)
                 spark_chart = (
                     alt.Chart(spark_df)
@@ -1295,7 +1448,7 @@ def render_overview():
                 st.altair_chart(spark_chart, use_container_width=True)
 
     section_header("Opportunities snapshot")
-    snapshot = fetch_opportunity_snapshot()
+    snapshot = fetch_opportunity_snapshot(fetch_data_version())
     count_df = snapshot.get("count")
     top_df = snapshot.get("top")
     count_value = (
@@ -1344,6 +1497,7 @@ def render_opportunities():
         selected_patterns,
         lookback_days,
         min_abs_score,
+        fetch_data_version(),
     )
 
     if feed_df is None or feed_df.empty:
@@ -1357,7 +1511,7 @@ def render_opportunities():
         symbol_list = (
             feed_df.loc[feed_df["MARKET_TYPE"] == market_type, "SYMBOL"].dropna().unique().tolist()
         )
-        bars_df = fetch_symbol_bars(tuple(symbol_list), market_type, 1440, 20)
+        bars_df = fetch_symbol_bars(tuple(symbol_list), market_type, 1440, 20, fetch_data_version())
         if bars_df is None or bars_df.empty:
             continue
         for symbol, group in bars_df.groupby("SYMBOL"):
@@ -1412,7 +1566,7 @@ def render_portfolio():
     section_header("Portfolio")
     st.caption("Risk-first view of simulations and holdings.")
 
-    portfolios_df = fetch_portfolios()
+    portfolios_df = fetch_portfolios(fetch_data_version())
     profiles_df = fetch_portfolio_profiles()
     selection = None
     portfolio_options = {}
@@ -1421,8 +1575,8 @@ def render_portfolio():
         st.info("Create a portfolio to run simulations.")
     else:
         portfolio_options = {
-            f"{row['PORTFOLIO_ID']} • {row['NAME']}": row["PORTFOLIO_ID"]
-            for _, row in portfolios_df.iterrows()
+            f"{portfolio_id} • {name}": portfolio_id
+            for portfolio_id, name in zip(portfolios_df["PORTFOLIO_ID"], portfolios_df["NAME"])
         }
         selection = st.selectbox("Select portfolio", list(portfolio_options.keys()))
         portfolio_id = portfolio_options[selection]
@@ -1493,14 +1647,15 @@ def render_portfolio():
                 f"{profile_row['BUST_EQUITY_PCT']:.2%}" if profile_row is not None and pd.notnull(profile_row["BUST_EQUITY_PCT"]) else "—",
             )
 
+            chart_df = downsample_series(daily_df, ["TOTAL_EQUITY", "DRAWDOWN"])
             eq_chart = (
-                alt.Chart(daily_df)
+                alt.Chart(chart_df)
                 .mark_line()
                 .encode(x="TS:T", y=alt.Y("TOTAL_EQUITY:Q", title="Equity"))
                 .properties(height=220)
             )
             dd_chart = (
-                alt.Chart(daily_df)
+                alt.Chart(chart_df)
                 .mark_area(opacity=0.4)
                 .encode(x="TS:T", y=alt.Y("DRAWDOWN:Q", title="Drawdown"))
                 .properties(height=180)
@@ -1549,10 +1704,7 @@ def render_portfolio():
                 )
             with col4:
                 if profiles_df is not None and not profiles_df.empty:
-                    profile_options = {
-                        f"{row['NAME']}": row["PROFILE_ID"]
-                        for _, row in profiles_df.iterrows()
-                    }
+                    profile_options = dict(zip(profiles_df["NAME"].astype(str), profiles_df["PROFILE_ID"]))
                     new_profile_name = st.selectbox(
                         "Risk profile",
                         options=list(profile_options.keys()),
@@ -1629,6 +1781,8 @@ def render_portfolio():
                     )
                 """
                 results = run_sql(query).collect()
+                # New LAST_SIMULATION_RUN_ID / FINAL_EQUITY; run-scoped frames are keyed by the new run id.
+                clear_portfolio_frames()
                 if results:
                     st.success("Simulation completed.")
                     st.json(results[0][0])
@@ -1643,7 +1797,7 @@ def render_training_trust():
     horizon_days = st.selectbox("Horizon (days)", options=[5, 10, 20], index=0)
     lookback_days = st.selectbox("Lookback window", options=[30, 60, 90], index=2)
 
-    scorecard_df = fetch_scorecard(horizon_days, lookback_days)
+    scorecard_df = fetch_scorecard(horizon_days, lookback_days, fetch_data_version())
     if scorecard_df is None or scorecard_df.empty:
         st.info("No scorecard data available yet.")
         return
@@ -1688,9 +1842,16 @@ def render_admin_ops():
         "Use Admin/Ops for manual runs."
     )
 
-    tabs = st.tabs(["Pipeline", "Ingestion", "Patterns", "Audit Log", "Advanced"])
+    # A section selector instead of st.tabs: tabs execute every tab body (and its queries) on each rerun.
+    section = st.radio(
+        "Section",
+        ["Pipeline", "Ingestion", "Patterns", "Audit Log", "Advanced"],
+        horizontal=True,
+        key="admin_ops_section",
+        label_visibility="collapsed",
+    )
 
-    with tabs[0]:
+    if section == "Pipeline":
         section_header("Pipeline controls")
         task_metadata, task_metadata_error = fetch_task_metadata(DAILY_PIPELINE_TASK)
         task_state = None
@@ -1727,6 +1888,7 @@ def render_admin_ops():
             with st.spinner("Running SP_RUN_DAILY_PIPELINE..."):
                 try:
                     run_sql(f"call {DAILY_PIPELINE_SP}()").collect()
+                    refresh_data_now()
                     st.success("Pipeline triggered successfully.")
                 except Exception as exc:
                     st.error(f"Failed to run pipeline: {exc}")
@@ -1799,7 +1961,7 @@ def render_admin_ops():
         else:
             st.dataframe(history_df, use_container_width=True, height=320)
 
-    with tabs[1]:
+    if section == "Ingestion":
         section_header("Ingestion universe")
         st.caption("Manage AlphaVantage ingestion scope and run ingestion manually.")
 
@@ -1807,6 +1969,7 @@ def render_admin_ops():
             with st.spinner("Running AlphaVantage ingestion…"):
                 try:
                     res = session.sql("call MIP.APP.SP_INGEST_ALPHAVANTAGE_BARS()").collect()
+                    refresh_data_now()
                     msg = res[0][0] if res and len(res[0]) > 0 else "Ingestion completed successfully."
                     st.success(msg)
                     st.session_state["post_ingest_checks"] = run_post_ingest_health_checks()
@@ -2009,7 +2172,7 @@ def render_admin_ops():
                 st.markdown("**Sample duplicate keys in MARKET_RETURNS**")
                 st.dataframe(dup_returns_samples, use_container_width=True)
 
-    with tabs[2]:
+    if section == "Patterns":
         section_header("Pattern management")
         if st.button("Seed / refresh MOMENTUM_DEMO pattern"):
             res = run_sql("call MIP.APP.SP_SEED_MIP_DEMO()").collect()
@@ -2046,15 +2209,22 @@ def render_admin_ops():
             )
 
             if st.button("Save pattern toggles"):
-                changes = edited_patterns[["PATTERN_ID", "ENABLED"]].copy()
-                for _, row in changes.iterrows():
-                    run_sql(
-                        f"""
-                        update MIP.APP.PATTERN_DEFINITION
-                        set ENABLED = {sql_literal(bool(row['ENABLED']))}
-                        where PATTERN_ID = {int(row['PATTERN_ID'])}
-                        """
-                    ).collect()
+                changes = pd.DataFrame(
+                    {
+                        "PATTERN_ID": edited_patterns["PATTERN_ID"].astype("int64"),
+                        "ENABLED": edited_patterns["ENABLED"].fillna(False).astype(bool),
+                    }
+                )
+                staged = stage_frame(changes, "PATTERN_TOGGLE_EDITS")
+                run_sql(
+                    f"""
+                    update MIP.APP.PATTERN_DEFINITION t
+                    set ENABLED = s.ENABLED
+                    from {staged} s
+                    where t.PATTERN_ID = s.PATTERN_ID
+                      and t.ENABLED is distinct from s.ENABLED
+                    """
+                ).collect()
                 st.success("Pattern toggles updated.")
 
             st.markdown("### Pattern KPIs")
@@ -2176,7 +2346,7 @@ def render_admin_ops():
             else:
                 st.dataframe(perf_df, use_container_width=True, height=260)
 
-    with tabs[3]:
+    if section == "Audit Log":
         section_header("Audit log viewer")
         audit_filters = st.columns(4)
         default_end = date.today()
@@ -2247,7 +2417,7 @@ def render_admin_ops():
             summary_cols = [col for col in summary_cols if col in audit_df.columns]
             st.dataframe(audit_df[summary_cols], use_container_width=True, height=320)
 
-            for _, row in audit_df.iterrows():
+            for row in audit_df.to_dict("records"):
                 title = (
                     f"{row.get('EVENT_TS')} • {row.get('EVENT_TYPE')} • "
                     f"{row.get('EVENT_NAME')} • {row.get('STATUS')}"
@@ -2263,7 +2433,7 @@ def render_admin_ops():
                     if error_message:
                         st.error(error_message)
 
-    with tabs[4]:
+    if section == "Advanced":
         section_header("Signals & evaluation")
         with st.expander("Market overview (latest bars)", expanded=False):
             render_market_overview_compact()
@@ -2314,10 +2484,12 @@ def render_admin_ops():
             if market_timeframe_df is None or market_timeframe_df.empty:
                 st.info("No active patterns found for learning cycle.")
             else:
-                options = [
-                    (row["MARKET_TYPE"], int(row["INTERVAL_MINUTES"]))
-                    for _, row in market_timeframe_df.iterrows()
-                ]
+                options = list(
+                    zip(
+                        market_timeframe_df["MARKET_TYPE"],
+                        market_timeframe_df["INTERVAL_MINUTES"].astype(int).tolist(),
+                    )
+                )
                 selected = st.multiselect("Market / timeframe", options=options, default=options)
 
                 horizon_minutes = st.number_input("Horizon (minutes)", min_value=1, value=1440, step=1)
@@ -2421,24 +2593,21 @@ apply_layout(
     "Compact, portfolio-style console for pipeline health, opportunities, and risk.",
 )
 
-page = st.sidebar.radio(
-    "Navigation",
-    [
-        "Overview",
-        "Opportunities",
-        "Portfolio",
-        "Training & Trust",
-        "Admin / Ops",
-    ],
-)
+# Page router: only the selected page's render function (and so its fetches) runs on a rerun.
+PAGES = {
+    "Overview": render_overview,
+    "Opportunities": render_opportunities,
+    "Portfolio": render_portfolio,
+    "Training & Trust": render_training_trust,
+    "Admin / Ops": render_admin_ops,
+}
+
+page = st.sidebar.radio("Navigation", list(PAGES), key="nav_page")
+
+# Cached frames live until the latest pipeline run changes; "Refresh now" drops them immediately.
+st.sidebar.caption(f"Data version: {fetch_data_version().split(':')[0][:8]}")
+if st.sidebar.button("Refresh now", help="Re-query everything instead of waiting for the next pipeline run."):
+    refresh_data_now()
+    st.rerun()
 
-if page == "Overview":
-    render_overview()
-elif page == "Opportunities":
-    render_opportunities()
-elif page == "Portfolio":
-    render_portfolio()
-elif page == "Training & Trust":
-    render_training_trust()
-else:
-    render_admin_ops()
+PAGES[page]()